@@ -1,18 +1,9 @@
 import argparse
-from src.commands.hash_object import hash_object_git
-from src.commands.init import init
-from src.commands.add import add_files, ls_files, read_index
-from src.commands.status import git_status
-from src.commands.objects import cat_file, write_tree, create_commit
-from src.commands.gitignore import read_gitignore
-from src.commands.rev_parse import rev_parse
-from src.commands.show_ref import show_refs
-from src.commands.log import show_log
-from src.commands.ls_tree import show_tree
-from src.commands.checkout import checkout
-from src.commands.reset import reset
 import sys
 
+# Les modules des commandes sont importés dans la branche de la commande
+# exécutée : une invocation ne charge que ce dont elle a besoin
+
 def create_gitignore(pattern):
     """Crée ou met à jour le fichier .gitignore avec un pattern"""
     try:
@@ -26,58 +17,60 @@ def create_gitignore(pattern):
 
 def index_to_tree():
     """Crée un tree à partir de l'index actuel"""
+    from src.commands.add import read_index
+    from src.commands.objects import write_tree
     index = read_index()
     if not index:
         print("Aucun fichier dans l'index. Utilisez 'gitBis add' d'abord.")
         return None
     
-    # Créer les entrées pour le tree
-    entries = []
-    for file_path, sha in index.items():
-        mode = 0o100644  # Mode pour un fichier normal
-        entries.append((mode, file_path, sha))
-    
-    # Utiliser write_tree() qui crée un tree à partir des fichiers actuels
+    # write_tree() construit les trees imbriqués depuis l'index (cache-tree)
     return write_tree()
 
 def commit_with_message(message):
     """Crée un commit avec un message (commande porcelain)"""
+    from src.commands.objects import create_commit
+    from src.commands.refs import resolve_ref, update_head_target, current_branch
+    from src.commands.commit_graph import update_commit_graph
     # Créer un tree à partir de l'index
     tree_sha = index_to_tree()
     if not tree_sha:
         return None
     
-    # Récupérer le commit parent actuel
-    parent_sha = None
-    try:
-        with open('.mon_git/refs/heads/main.txt', 'r') as f:
-            content = f.read().strip()
-            if not content.startswith('#'):
-                parent_sha = content
-    except FileNotFoundError:
-        pass
+    # Récupérer le commit parent actuel (branche pointée par HEAD)
+    parent_sha = resolve_ref("HEAD")
     
     # Créer le commit
     commit_sha = create_commit(tree_sha, message=message, parent_sha1=parent_sha)
     if commit_sha:
         print(f"Commit créé : {commit_sha}")
         
-        # Mettre à jour HEAD et la branche
+        # Mettre à jour la branche (sous verrou, seulement si elle pointe
+        # toujours sur le parent : un commit concurrent n'est pas écrasé)
         try:
-            # Mettre à jour la branche main
-            with open('.mon_git/refs/heads/main.txt', 'w') as f:
-                f.write(commit_sha)
-            
-            print(f"Branche main mise à jour vers {commit_sha[:7]}")
-            return commit_sha
+            update_head_target(commit_sha, expected=parent_sha)
+            print(f"Branche {current_branch() or 'HEAD'} mise à jour vers {commit_sha[:7]}")
         except Exception as e:
             print(f"Erreur lors de la mise à jour de HEAD : {e}")
             return commit_sha
+        
+        # Ajouter le nouveau commit au commit-graph (seul ce commit est lu)
+        try:
+            update_commit_graph([commit_sha])
+        except Exception as e:
+            print(f"Attention : commit-graph non mis à jour : {e}")
+        return commit_sha
     else:
         print("Erreur lors de la création du commit.")
         return None
 
-def main():
+def main(argv=None):
+    """
+    Exécute une commande gitBis
+
+    Args:
+        argv (list): Arguments sans le nom du programme (défaut : sys.argv[1:])
+    """
     parser = argparse.ArgumentParser(prog="gitBis", description="Mini Git en python", epilog="Merci d'utiliser gitBis !")
     subparsers = parser.add_subparsers(dest="command", required=True, help="Commandes disponibles")
 
@@ -86,7 +79,10 @@ def main():
 
     # Sous-commande : add
     parser_add = subparsers.add_parser("add", help="Ajouter des fichiers à l'index")
-    parser_add.add_argument("files", nargs="+", help="Fichiers à ajouter")
+    parser_add.add_argument("files", nargs="*", help="Fichiers à ajouter")
+    parser_add.add_argument("-u", "--update", action="store_true", help="Mettre à jour les fichiers suivis modifiés ou supprimés")
+    parser_add.add_argument("-j", "--jobs", type=int, default=None, help="Nombre de workers pour le hachage (défaut : nombre de cœurs)")
+    parser_add.add_argument("--processes", action="store_true", help="Hacher dans des processus plutôt que des threads")
 
     # Sous-commande : ls-files
     parser_ls_files = subparsers.add_parser("ls-files", help="Lister les fichiers dans l'index")
@@ -123,6 +119,23 @@ def main():
     parser_hash.add_argument("file", type=str, help="Le fichier à hacher")
     parser_hash.add_argument("-w", "--write", action="store_true", help="Écrire l'objet dans le dépôt Git")
 
+    # Sous-commande : migrate-objects
+    parser_migrate = subparsers.add_parser("migrate-objects", help="Convertir les objets .txt en objets binaires compressés")
+
+    # Sous-commande : repack
+    parser_repack = subparsers.add_parser("repack", help="Regrouper les objets dans un pack indexé")
+    parser_repack.add_argument("-d", action="store_true", help="Supprimer les objets loose et les anciens packs")
+    parser_repack.add_argument("--window", type=int, default=10, help="Nombre de bases candidates pour les deltas")
+    parser_repack.add_argument("--depth", type=int, default=50, help="Profondeur maximale des chaînes de deltas")
+
+    # Sous-commande : commit-graph
+    parser_commit_graph = subparsers.add_parser("commit-graph", help="Écrire le commit-graph (parents, générations, dates)")
+    parser_commit_graph.add_argument("action", choices=["write"], help="Action à effectuer")
+    parser_commit_graph.add_argument("--changed-paths", action="store_true", help="Ajouter les filtres de Bloom des chemins modifiés (log -- <chemin>)")
+
+    # Sous-commande : pack-refs
+    parser_pack_refs = subparsers.add_parser("pack-refs", help="Regrouper les références dans packed-refs")
+
     # Sous-commande : rev-parse
     parser_rev_parse = subparsers.add_parser("rev-parse", help="Convertir une référence en SHA-1")
     parser_rev_parse.add_argument("ref", help="Référence à résoudre (HEAD, nom de branche, SHA-1 partiel, etc.)")
@@ -133,8 +146,11 @@ def main():
     parser_show_ref.add_argument("--tags", action="store_true", help="Afficher seulement les tags")
 
     # Sous-commande : log
-    parser_log = subparsers.add_parser("log", help="Afficher l'historique des commits")
+    parser_log = subparsers.add_parser("log", help="Afficher l'historique des commits",
+                                       usage="gitBis log [--oneline] [--first-parent] [--topo-order] [-n N] [commit] [-- <chemin>...]")
     parser_log.add_argument("--oneline", action="store_true", help="Afficher en format compact")
+    parser_log.add_argument("--first-parent", action="store_true", help="Ne suivre que le premier parent des merges")
+    parser_log.add_argument("--topo-order", action="store_true", help="Ne jamais afficher un commit avant ses enfants")
     parser_log.add_argument("-n", "--max-count", type=int, help="Limiter le nombre de commits")
     parser_log.add_argument("commit", nargs="?", default="HEAD", help="Commit de départ (par défaut: HEAD)")
 
@@ -143,9 +159,29 @@ def main():
     parser_ls_tree.add_argument("tree_sha", help="Hash du tree à afficher")
     parser_ls_tree.add_argument("-l", "--long", action="store_true", help="Afficher les longs formats")
 
+    # Sous-commande : merge-base
+    parser_merge_base = subparsers.add_parser("merge-base", help="Trouver l'ancêtre commun de deux commits")
+    parser_merge_base.add_argument("--all", action="store_true", help="Afficher tous les meilleurs ancêtres communs")
+    parser_merge_base.add_argument("--is-ancestor", action="store_true", help="Tester si le premier commit est un ancêtre du second (code de retour)")
+    parser_merge_base.add_argument("commit1", help="Premier commit")
+    parser_merge_base.add_argument("commit2", help="Second commit")
+
+    # Sous-commande : diff
+    parser_diff = subparsers.add_parser("diff", help="Afficher les différences ligne à ligne")
+    parser_diff.add_argument("--cached", "--staged", action="store_true", help="Comparer l'index au commit (HEAD par défaut)")
+    parser_diff.add_argument("-U", "--unified", type=int, default=3, help="Nombre de lignes de contexte")
+    parser_diff.add_argument("commits", nargs="*", help="Zéro, un ou deux commits")
+
+    # Sous-commande : diff-tree
+    parser_diff_tree = subparsers.add_parser("diff-tree", help="Comparer deux trees (ou commits)")
+    parser_diff_tree.add_argument("-r", action="store_true", help="Descendre dans les sous-dossiers")
+    parser_diff_tree.add_argument("old", help="Tree ou commit de départ")
+    parser_diff_tree.add_argument("new", help="Tree ou commit d'arrivée")
+
     # Sous-commande : checkout
     parser_checkout = subparsers.add_parser("checkout", help="Basculer de branche ou créer une branche")
     parser_checkout.add_argument("-b", action="store_true", help="Créer et basculer vers une nouvelle branche")
+    parser_checkout.add_argument("-f", "--force", action="store_true", help="Écraser les modifications locales")
     parser_checkout.add_argument("target", help="Branche, commit ou nouvelle branche")
     parser_checkout.add_argument("start_point", nargs="?", default="HEAD", help="Point de départ pour la nouvelle branche")
 
@@ -156,15 +192,42 @@ def main():
     parser_reset.add_argument("--hard", action="store_true", help="Réinitialiser HEAD, l'index et le working directory")
     parser_reset.add_argument("commit", help="Commit vers lequel réinitialiser")
 
-    args = parser.parse_args()
+    # Sous-commande : fsmonitor
+    parser_fsmonitor = subparsers.add_parser("fsmonitor", help="Démon de surveillance du working directory (status, add -u)")
+    parser_fsmonitor.add_argument("action", choices=["start", "stop", "status", "run"], help="Action à effectuer (run : au premier plan)")
+    parser_fsmonitor.add_argument("--polling", dest="watcher", action="store_const", const="polling", default="auto", help="Parcourir périodiquement au lieu d'utiliser inotify")
+
+    # Sous-commande : serve
+    parser_serve = subparsers.add_parser("serve", help="Exécuter les commandes dans un processus qui garde ses caches (socket ou stdin)")
+    parser_serve.add_argument("--stdio", action="store_true", help="Lire les requêtes JSON sur stdin au lieu du socket .mon_git/gitbis.sock")
+    parser_serve.add_argument("--stop", action="store_true", help="Arrêter le serveur du dépôt")
+
+    # Les chemins placés après "--" (log -- <chemin>) ne passent pas par
+    # argparse ; pour les autres commandes, argparse traite "--" lui-même
+    if argv is None:
+        argv = sys.argv[1:]
+    pathspec = []
+    if argv[:1] == ["log"] and "--" in argv:
+        separator = argv.index("--")
+        argv, pathspec = argv[:separator], argv[separator + 1:]
+    args = parser.parse_args(argv)
 
     if args.command == "init":
+        from src.commands.init import init
         init()
     elif args.command == "add":
-        add_files(args.files)
+        from src.commands.add import add_files, update_files
+        if args.update:
+            update_files(jobs=args.jobs)
+        elif args.files:
+            add_files(args.files, jobs=args.jobs, use_processes=args.processes)
+        else:
+            print("Erreur : aucun fichier indiqué (utilisez 'gitBis add <fichiers>' ou 'gitBis add -u')")
     elif args.command == "ls-files":
+        from src.commands.add import ls_files
         ls_files(verbose=args.verbose)
     elif args.command == "status":
+        from src.commands.status import git_status
         git_status()
     elif args.command == "gitignore":
         create_gitignore(args.pattern)
@@ -172,6 +235,7 @@ def main():
         commit_with_message(args.message)
     elif args.command == "cat-file":
         try:
+            from src.commands.objects import cat_file
             if args.t:
                 cat_file("-t", args.sha)
             elif args.p:
@@ -182,6 +246,7 @@ def main():
             print(f"Erreur: {e}")
     elif args.command == "write-tree":
         try:
+            from src.commands.objects import write_tree
             result = write_tree()
             if result:
                 # Ne pas afficher de message supplémentaire, juste le hash
@@ -192,6 +257,7 @@ def main():
             print(f"Erreur: {e}")
     elif args.command == "commit-tree":
         try:
+            from src.commands.objects import create_commit
             result = create_commit(args.tree_sha, parent_sha1=args.parent, message=args.message)
             if result:
                 # Ne pas afficher de message supplémentaire, juste le hash
@@ -202,6 +268,7 @@ def main():
             print(f"Erreur: {e}")
     elif args.command == "hash-object":
         try:
+            from src.commands.hash_object import hash_object_git
             result = hash_object_git(args.file, write=args.write)
             if result:
                 print(f"Hash SHA-1 de '{args.file}': {result}")
@@ -209,8 +276,38 @@ def main():
                 print("Erreur lors du hash ou de l'écriture.")
         except Exception as e:
             print(f"Erreur: {e}")
+    elif args.command == "migrate-objects":
+        try:
+            from src.commands.objects import migrate_objects
+            stats = migrate_objects()
+            print(f"{stats['migrated']} objet(s) converti(s), {stats['skipped']} déjà présent(s)")
+            for sha in stats['corrupted']:
+                print(f"Attention : l'objet {sha} ne correspond plus à son hash, conservé au format texte")
+        except Exception as e:
+            print(f"Erreur: {e}")
+    elif args.command == "repack":
+        try:
+            from src.commands.pack import repack
+            repack(remove_redundant=args.d, window=args.window, depth=args.depth)
+        except Exception as e:
+            print(f"Erreur: {e}")
+    elif args.command == "commit-graph":
+        try:
+            from src.commands.commit_graph import write_commit_graph_from_refs
+            count = write_commit_graph_from_refs(changed_paths=args.changed_paths)
+            print(f"Commit-graph écrit : {count} commit(s)")
+        except Exception as e:
+            print(f"Erreur: {e}")
+    elif args.command == "pack-refs":
+        try:
+            from src.commands.refs import pack_refs
+            count = pack_refs()
+            print(f"{count} référence(s) packée(s) dans packed-refs")
+        except Exception as e:
+            print(f"Erreur: {e}")
     elif args.command == "rev-parse":
         try:
+            from src.commands.rev_parse import rev_parse
             result = rev_parse(args.ref)
             if result:
                 print(result)
@@ -220,28 +317,59 @@ def main():
             print(f"Erreur: {e}")
     elif args.command == "show-ref":
         try:
+            from src.commands.show_ref import show_refs
             show_refs(heads_only=args.heads, tags_only=args.tags)
         except Exception as e:
             print(f"Erreur: {e}")
     elif args.command == "log":
         try:
-            show_log(start_ref=args.commit, oneline=args.oneline, limit=args.max_count)
+            from src.commands.log import show_log
+            show_log(start_ref=args.commit, oneline=args.oneline, limit=args.max_count, paths=pathspec,
+                     first_parent=args.first_parent, topo_order=args.topo_order)
         except Exception as e:
             print(f"Erreur: {e}")
     elif args.command == "ls-tree":
         try:
+            from src.commands.ls_tree import show_tree
             show_tree(args.tree_sha, long_format=args.long)
         except Exception as e:
             print(f"Erreur: {e}")
+    elif args.command == "merge-base":
+        try:
+            from src.commands.merge_base import merge_base
+            success = merge_base(args.commit1, args.commit2, show_all=args.all,
+                                 check_ancestor=args.is_ancestor)
+            if not success:
+                sys.exit(1)
+        except Exception as e:
+            print(f"Erreur: {e}")
+    elif args.command == "diff":
+        try:
+            from src.commands.diff import show_diff
+            success = show_diff(args.commits, cached=args.cached, context=args.unified)
+            if not success:
+                sys.exit(1)
+        except Exception as e:
+            print(f"Erreur: {e}")
+    elif args.command == "diff-tree":
+        try:
+            from src.commands.diff_tree import show_diff_tree
+            success = show_diff_tree(args.old, args.new, recursive=args.r)
+            if not success:
+                sys.exit(1)
+        except Exception as e:
+            print(f"Erreur: {e}")
     elif args.command == "checkout":
         try:
-            success = checkout(args.target, args.b, args.start_point)
+            from src.commands.checkout import checkout
+            success = checkout(args.target, args.b, args.start_point, args.force)
             if not success:
                 sys.exit(1)
         except Exception as e:
             print(f"Erreur: {e}")
     elif args.command == "reset":
         try:
+            from src.commands.reset import reset
             # Déterminer le mode de reset
             mode = "mixed"  # Mode par défaut
             if args.soft:
@@ -254,6 +382,21 @@ def main():
                 sys.exit(1)
         except Exception as e:
             print(f"Erreur: {e}")
+    elif args.command == "fsmonitor":
+        try:
+            from src.commands.fsmonitor import fsmonitor
+            if not fsmonitor(args.action, watcher=args.watcher):
+                sys.exit(1)
+        except Exception as e:
+            print(f"Erreur: {e}")
+    elif args.command == "serve":
+        try:
+            from src.commands.serve import serve, stop_server
+            success = stop_server() if args.stop else serve(main, stdio=args.stdio)
+            if not success:
+                sys.exit(1)
+        except Exception as e:
+            print(f"Erreur: {e}")
     else:
         print("Commande non reconnue. Utilisez --help pour voir les options disponibles.")
 
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Client léger de gitBis serve
+
+Transmet ses arguments au serveur du dépôt courant (.mon_git/gitbis.sock),
+affiche sa sortie et reprend son code de retour. Sans serveur, la commande est
+exécutée directement, comme avec gitBis.py.
+
+Usage : python3 gitBis_client.py <commande> [arguments]
+"""
+
+import sys
+
+from src.commands.serve import forward
+
+
+def main():
+    argv = sys.argv[1:]
+    code = forward(argv)
+    if code is None:
+        # Aucun serveur : exécution dans ce processus
+        import gitBis
+        gitBis.main(argv)
+        code = 0
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
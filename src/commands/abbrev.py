@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Module pour les SHA-1 abrégés
+Résolution d'un préfixe en SHA-1 complet (avec détection d'ambiguïté) et
+calcul de la plus courte abréviation unique d'un objet.
+
+Les recherches se font par dichotomie :
+- objets "loose" : seul le dossier fan-out du préfixe (2 premiers caractères)
+  est listé, une fois, puis gardé trié en mémoire tant que le dossier n'a pas
+  été modifié
+- objets packés : dichotomie dans l'index .idx projeté en mémoire
+"""
+
+import os
+import re
+import sys
+from bisect import bisect_left
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.pack import get_packs
+
+
+# Longueur par défaut des abréviations affichées et plus petite longueur
+# acceptée (comme git)
+DEFAULT_ABBREV = 7
+MIN_ABBREV = 4
+
+HEX_PREFIX = re.compile(r'^[0-9a-f]{1,40}$')
+
+# Listes triées des dossiers fan-out : {chemin_absolu: (mtime_ns, [sha, ...])}
+_fanout_cache = {}
+
+
+class AmbiguousShaError(ValueError):
+    """Préfixe correspondant à plusieurs objets"""
+
+    def __init__(self, prefix, candidates):
+        super().__init__(f"short SHA1 {prefix} is ambiguous")
+        self.prefix = prefix
+        self.candidates = candidates
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def loose_fanout(fanout):
+    """
+    SHA-1 triés des objets "loose" d'un dossier fan-out
+
+    Args:
+        fanout (str): Deux premiers caractères hexadécimaux
+
+    Returns:
+        list: SHA-1 complets triés (binaires et ancien format .txt)
+    """
+    path = os.path.abspath(os.path.join(get_git_dir(), "objects", fanout))
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _fanout_cache.pop(path, None)
+        return []
+
+    cached = _fanout_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    shas = set()
+    for filename in os.listdir(path):
+        name = filename[:-4] if filename.endswith('.txt') else filename
+        if len(name) == 38:
+            shas.add(fanout + name)
+    shas = sorted(shas)
+    _fanout_cache[path] = (mtime, shas)
+    return shas
+
+
+def find_objects_by_prefix(prefix, limit=None):
+    """
+    Retourne les objets (loose et packés) dont le SHA-1 commence par un préfixe
+
+    Args:
+        prefix (str): Préfixe hexadécimal
+        limit (int): Arrêter dès que ce nombre de résultats est atteint
+
+    Returns:
+        list: SHA-1 correspondants, triés
+    """
+    prefix = prefix.lower()
+    if not HEX_PREFIX.match(prefix):
+        return []
+    if len(prefix) < 2:
+        # Préfixe d'un seul caractère : 16 dossiers fan-out possibles
+        matches = []
+        for digit in '0123456789abcdef':
+            matches.extend(find_objects_by_prefix(prefix + digit, limit))
+            if limit is not None and len(matches) >= limit:
+                break
+        return sorted(set(matches))
+
+    matches = set()
+    loose = loose_fanout(prefix[:2])
+    i = bisect_left(loose, prefix)
+    while i < len(loose) and loose[i].startswith(prefix):
+        matches.add(loose[i])
+        if limit is not None and len(matches) >= limit:
+            return sorted(matches)
+        i += 1
+
+    for pack in get_packs(refresh=True):
+        matches.update(pack.find_prefix(prefix))
+        if limit is not None and len(matches) >= limit:
+            break
+    return sorted(matches)
+
+
+def resolve_abbrev(prefix):
+    """
+    Résout un SHA-1 abrégé en SHA-1 complet
+
+    Args:
+        prefix (str): SHA-1 complet ou abrégé
+
+    Returns:
+        str: SHA-1 complet ou None si aucun objet ne correspond
+
+    Raises:
+        AmbiguousShaError: Si plusieurs objets commencent par ce préfixe
+    """
+    # Deux résultats suffisent pour savoir si le préfixe est ambigu
+    matches = find_objects_by_prefix(prefix, limit=2)
+    if len(matches) > 1:
+        raise AmbiguousShaError(prefix, find_objects_by_prefix(prefix))
+    return matches[0] if matches else None
+
+
+def _common_prefix_length(a, b):
+    """Nombre de caractères communs en tête de deux SHA-1"""
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def shortest_unique_abbrev(sha, min_length=DEFAULT_ABBREV):
+    """
+    Plus courte abréviation d'un objet qui ne désigne aucun autre objet
+
+    Seuls les voisins immédiats de sha dans chaque liste triée (dossier
+    fan-out, index de chaque pack) peuvent partager un préfixe plus long.
+    L'abréviation fait au moins MIN_ABBREV caractères : les objets d'un autre
+    dossier fan-out ne partagent alors jamais le préfixe.
+
+    Args:
+        sha (str): SHA-1 complet
+        min_length (int): Longueur minimale de l'abréviation
+
+    Returns:
+        str: Abréviation unique
+    """
+    longest = 0
+    loose = loose_fanout(sha[:2])
+    i = bisect_left(loose, sha)
+    for j in (i - 1, i, i + 1):
+        if 0 <= j < len(loose) and loose[j] != sha:
+            longest = max(longest, _common_prefix_length(sha, loose[j]))
+
+    for pack in get_packs(refresh=True):
+        i = pack.lower_bound(sha)
+        for j in (i - 1, i, i + 1):
+            if 0 <= j < pack.count:
+                other = pack.sha_at(j)
+                if other != sha:
+                    longest = max(longest, _common_prefix_length(sha, other))
+
+    return sha[:min(len(sha), max(min_length, MIN_ABBREV, longest + 1))]
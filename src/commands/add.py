@@ -2,7 +2,12 @@ import os
 import struct
 import hashlib
 import zlib
-from .gitignore import read_gitignore, should_ignore, filter_ignored_files
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .index import Index, read_index_file, write_index_file, lock_index, file_stat, stat_matches, path_key
+from .lockfile import LockError
+from .gitignore import IgnoreMatcher, normalize_path
+from .scanner import scan_worktree
+from .fsmonitor import query_changes
 
 def get_git_dir():
     """
@@ -28,106 +33,230 @@ def get_git_dir():
 
 # Utilisation de la fonction de détection automatique
 GIT_DIR = get_git_dir()
-INDEX_PATH = os.path.join(GIT_DIR, 'index.txt')
+INDEX_PATH = os.path.join(GIT_DIR, 'index')
 
-def read_index():
-    """Lire l'index texte Git"""
-    git_dir = get_git_dir()
-    index_path = os.path.join(git_dir, 'index.txt')
-    if not os.path.exists(index_path):
-        return {}
+def read_index_entries():
+    """
+    Lire l'index binaire avec les données stat de chaque entrée
     
-    index_data = {}
+    Returns:
+        dict: {filename: {'sha': str, 'mode': int, 'stat': dict ou None}}
+    """
     try:
-        with open(index_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Ignorer les commentaires et lignes vides
-                if line and not line.startswith('#'):
-                    # Format: mode|hash|filename
-                    if '|' in line:
-                        parts = line.split('|')
-                        if len(parts) >= 3:
-                            mode = int(parts[0])
-                            sha = parts[1]
-                            filename = parts[2]
-                            index_data[filename] = sha
+        return dict(read_index_file().items())
     except Exception as e:
         print(f"Erreur lors de la lecture de l'index: {e}")
         return {}
+
+def read_index():
+    """Lire l'index Git"""
+    return {filename: entry['sha'] for filename, entry in read_index_entries().items()}
+
+def write_index(index_data, stats=None):
+    """
+    Écrire l'index binaire Git
+    
+    Args:
+        index_data (dict): {filename: sha}
+        stats (dict): {filename: stat} ; une entrée sans stat sera rehachée par status
+    """
+    try:
+        write_index_file(Index.from_dict(index_data, stats))
+    except Exception as e:
+        print(f"Erreur lors de l'écriture de l'index: {e}")
+
+def _hash_with_stat(file_path):
+    """
+    Hache et écrit un fichier (exécuté sur le pool)
+    
+    Le stat est lu avant le hachage : une modification pendant la lecture
+    changera le mtime et sera détectée par le prochain status.
+    
+    Returns:
+        tuple: (sha, stat)
+    """
+    from .objects import hash_file_streaming
+    stat = file_stat(file_path)
+    return hash_file_streaming(file_path, True), stat
+
+def default_jobs():
+    """Nombre de workers par défaut pour add (un par cœur)"""
+    return os.cpu_count() or 1
+
+def add_files(paths, jobs=None, use_processes=False):
+    """
+    Ajouter des fichiers à l'index (staging area)
     
-    return index_data
+    Le parcours des dossiers (scanner partagé avec status), le hachage et
+    l'écriture des objets sont répartis sur des pools de workers : chaque
+    fichier découvert est haché sans attendre la fin du parcours. L'affichage
+    et l'index sont triés par chemin, donc identiques quel que soit le nombre
+    de workers. Un fichier déjà indexé n'est
+    relu que si son stat a changé depuis l'ajout précédent.
+    
+    L'index est verrouillé (.mon_git/index.lock) de sa lecture à son écriture :
+    deux add simultanés s'exécutent l'un après l'autre sans perdre de fichiers.
+    
+    Args:
+        paths (list): Fichiers et dossiers à ajouter
+        jobs (int): Nombre de workers (par défaut : nombre de cœurs)
+        use_processes (bool): Hacher dans des processus plutôt que des threads
+    """
+    try:
+        lock = lock_index()
+    except LockError as e:
+        print(f"Erreur : {e}")
+        return
+    with lock:
+        _add_files_locked(paths, lock, jobs, use_processes)
+
+def _add_files_locked(paths, lock, jobs, use_processes):
+    """Corps de add_files, exécuté avec le verrou de l'index"""
+    try:
+        index = read_index_file()
+    except Exception as e:
+        print(f"Erreur lors de la lecture de l'index: {e}")
+        index = Index()
+    # .gitignore compilés une fois ; les dossiers ignorés ne sont pas parcourus
+    ignore = IgnoreMatcher()
+    jobs = max(1, jobs or default_jobs())
+
+    hashes = {}
+    already_added = set()
+    files_count = 0
+    hash_pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    with hash_pool_class(max_workers=jobs) as hash_pool:
+
+        def submit_file(relative_path, stat=None):
+            nonlocal files_count
+            if relative_path in hashes or relative_path in already_added:
+                return
+            files_count += 1
+            # Fichier déjà dans l'index et stat inchangé : pas besoin de le relire
+            entry = index.get(relative_path)
+            if entry is not None and entry['stat'] is not None:
+                if stat is None:
+                    unchanged = stat_matches(relative_path, entry['stat'])
+                else:
+                    unchanged = stat == entry['stat']
+                if unchanged:
+                    already_added.add(relative_path)
+                    return
+            hashes[relative_path] = hash_pool.submit(_hash_with_stat, relative_path)
+
+        # Collecter tous les fichiers à ajouter ; chaque fichier est haché dès
+        # qu'il est trouvé, pendant que le scanner liste les dossiers suivants
+        for path in paths:
+            relative_path = normalize_path(os.path.relpath(path))
+            if os.path.isfile(path):
+                # Filtrer les fichiers ignorés
+                if not ignore.is_ignored(relative_path):
+                    submit_file(relative_path)
+            elif os.path.isdir(path):
+                for scan_entry in scan_worktree(relative_path, ignore, jobs):
+                    submit_file(scan_entry.path, scan_entry.stat)
+            else:
+                print(f"Erreur : '{path}' n'est ni un fichier ni un dossier")
+
+        # Résultats dans l'ordre des chemins (sortie déterministe)
+        for relative_path in sorted(already_added | set(hashes)):
+            if relative_path in already_added:
+                print(f"Déjà ajouté : {relative_path}")
+                continue
+            try:
+                sha, stat = hashes[relative_path].result()
+                if sha:
+                    entry = index.get(relative_path)
+                    unchanged = entry is not None and entry['sha'] == sha
+                    # Seuls les dossiers contenant un fichier modifié sortent du cache-tree
+                    index.set(relative_path, sha, stat)
+                    if unchanged:
+                        print(f"Déjà ajouté : {relative_path}")
+                    else:
+                        print(f"Ajouté : {relative_path}")
+                else:
+                    print(f"Erreur lors de l'ajout de : {relative_path}")
+            except Exception as e:
+                print(f"Erreur avec {relative_path}: {e}")
 
-def write_index(index_data):
-    """Écrire l'index au format texte Git"""
-    git_dir = get_git_dir()
-    index_path = os.path.join(git_dir, 'index.txt')
+    # Sauvegarder l'index mis à jour
     try:
-        with open(index_path, 'w') as f:
-            f.write("# Git Index File\n")
-            f.write("# Version: 2\n")
-            f.write(f"# Number of entries: {len(index_data)}\n")
-            f.write("# Format: mode|hash|filename\n")
-            
-            # Écrire chaque entrée
-            for file_path, sha in index_data.items():
-                # Mode (100644 pour les fichiers normaux)
-                mode = 100644
-                f.write(f"{mode}|{sha}|{file_path}\n")
-                
+        write_index_file(index, lock)
     except Exception as e:
         print(f"Erreur lors de l'écriture de l'index: {e}")
+    print(f"Index mis à jour avec {files_count} fichier(s)")
 
-def add_files(paths):
-    """Ajouter des fichiers à l'index (staging area)"""
-    from .objects import hash_object
+def update_files(jobs=None):
+    """
+    Met à jour l'index avec les fichiers suivis modifiés ou supprimés (add -u)
     
-    index = read_index()
-    files_to_add = []
-    gitignore_patterns = read_gitignore()
-
-    # Collecter tous les fichiers à ajouter
-    for path in paths:
-        if os.path.isfile(path):
-            files_to_add.append(path)
-        elif os.path.isdir(path):
-            # Parcourir récursivement le dossier
-            for root, dirs, files in os.walk(path):
-                # Ignorer les dossiers .git et .mon_git
-                dirs[:] = [d for d in dirs if d not in ['.git', '.mon_git']]
-                for file in files:
-                    full_path = os.path.join(root, file)
-                    files_to_add.append(full_path)
-        else:
-            print(f"Erreur : '{path}' n'est ni un fichier ni un dossier")
-            continue
-
-    # Filtrer les fichiers ignorés
-    files_to_add = filter_ignored_files(files_to_add, gitignore_patterns)
-
-    # Traiter chaque fichier
-    for file_path in files_to_add:
-        relative_path = os.path.relpath(file_path, start=os.getcwd())
-        
-        # Vérifier si le fichier est déjà dans l'index
-        if relative_path in index:
-            print(f"Déjà ajouté : {relative_path}")
-            continue
-
-        # Calculer le hash et ajouter à l'index
+    Les nouveaux fichiers ne sont pas ajoutés. Si le démon fsmonitor tourne,
+    seuls les chemins qu'il signale depuis le jeton de l'index sont vérifiés.
+    Le jeton n'est pas avancé : les fichiers non suivis n'ont pas été
+    vérifiés, c'est le prochain status qui le fera.
+    
+    Args:
+        jobs (int): Nombre de threads de hachage (par défaut : nombre de cœurs)
+    """
+    try:
+        lock = lock_index()
+    except LockError as e:
+        print(f"Erreur : {e}")
+        return
+    with lock:
         try:
-            sha = hash_object(file_path, write=True)
-            if sha:
-                index[relative_path] = sha
-                print(f"Ajouté : {relative_path}")
-            else:
-                print(f"Erreur lors de l'ajout de : {relative_path}")
+            index = read_index_file()
         except Exception as e:
-            print(f"Erreur avec {relative_path}: {e}")
+            print(f"Erreur lors de la lecture de l'index: {e}")
+            return
+        _, changed = query_changes(index.fsmonitor_token)
+        jobs = max(1, jobs or default_jobs())
 
-    # Sauvegarder l'index mis à jour
-    write_index(index)
-    print(f"Index mis à jour avec {len(files_to_add)} fichier(s)")
+        removed = []
+        hashes = {}
+        with ThreadPoolExecutor(max_workers=jobs) as hash_pool:
+            for relative_path, entry in list(index.items()):
+                if changed is not None and entry['stat'] is not None and relative_path not in changed:
+                    continue
+                try:
+                    stat = file_stat(relative_path)
+                except (FileNotFoundError, NotADirectoryError):
+                    removed.append(relative_path)
+                    continue
+                except OSError:
+                    stat = None
+                if stat is not None and stat == entry['stat']:
+                    continue
+                hashes[relative_path] = hash_pool.submit(_hash_with_stat, relative_path)
+
+            updated = False
+            for relative_path in sorted(set(removed) | set(hashes), key=path_key):
+                if relative_path not in hashes:
+                    index.remove(relative_path)
+                    print(f"Supprimé : {relative_path}")
+                    updated = True
+                    continue
+                try:
+                    sha, stat = hashes[relative_path].result()
+                except Exception as e:
+                    print(f"Erreur avec {relative_path}: {e}")
+                    continue
+                if not sha:
+                    print(f"Erreur lors de l'ajout de : {relative_path}")
+                    continue
+                entry = index.get(relative_path)
+                if sha != entry['sha'] or stat != entry['stat']:
+                    index.set(relative_path, sha, stat)
+                    updated = True
+                if sha != entry['sha']:
+                    print(f"Ajouté : {relative_path}")
+
+        if updated:
+            try:
+                write_index_file(index, lock)
+            except Exception as e:
+                print(f"Erreur lors de l'écriture de l'index: {e}")
 
 def ls_files(verbose=False):
     """Lister les fichiers dans l'index"""
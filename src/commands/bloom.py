@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Module pour les filtres de Bloom des chemins modifiés (commit-graph --changed-paths)
+
+Pour chaque commit, un filtre de Bloom contient les chemins modifiés par
+rapport à son premier parent, dossiers parents compris. Un filtre répond
+"peut-être" ou "sûrement pas" : quand il répond "sûrement pas", log -- <chemin>
+passe au commit suivant sans lire un seul tree.
+
+Le format est celui de git (chunks BIDX / BDAT) :
+- murmur3 32 bits, graines 0x293ae76f et 0x7e646e2c, double hachage
+- 7 fonctions de hachage, 10 bits par chemin
+- plus de 512 chemins modifiés : filtre d'un octet 0xff ("peut-être" partout)
+- aucun chemin modifié : filtre d'un octet 0x00
+"""
+
+import struct
+
+
+BLOOM_HASH_VERSION = 1
+BLOOM_NUM_HASHES = 7
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_MAX_CHANGED_PATHS = 512
+
+BLOOM_SEED_0 = 0x293ae76f
+BLOOM_SEED_1 = 0x7e646e2c
+
+BLOOM_TOO_LARGE = b'\xff'
+BLOOM_EMPTY = b'\x00'
+
+
+def murmur3_32(data, seed):
+    """
+    Hachage murmur3 32 bits (version x86_32)
+
+    Args:
+        data (bytes): Données à hacher
+        seed (int): Graine
+
+    Returns:
+        int: Hash sur 32 bits
+    """
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+    h = seed & 0xffffffff
+    length = len(data)
+    blocks = length // 4
+    for (k,) in struct.iter_unpack('<I', data[:blocks * 4]):
+        k = (k * c1) & 0xffffffff
+        k = ((k << 15) | (k >> 17)) & 0xffffffff
+        k = (k * c2) & 0xffffffff
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & 0xffffffff
+        h = (h * 5 + 0xe6546b64) & 0xffffffff
+
+    # Comme la version 1 des filtres de git, les octets de fin sont signés
+    tail = [b - 0x100 if b >= 0x80 else b for b in data[blocks * 4:]]
+    k = 0
+    if len(tail) >= 3:
+        k ^= (tail[2] << 16) & 0xffffffff
+    if len(tail) >= 2:
+        k ^= (tail[1] << 8) & 0xffffffff
+    if tail:
+        k ^= tail[0] & 0xffffffff
+        k = (k * c1) & 0xffffffff
+        k = ((k << 15) | (k >> 17)) & 0xffffffff
+        k = (k * c2) & 0xffffffff
+        h ^= k
+
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & 0xffffffff
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & 0xffffffff
+    h ^= h >> 16
+    return h
+
+
+def bloom_key(path):
+    """
+    Hashes d'un chemin, calculés une fois et réutilisés pour chaque filtre
+
+    Args:
+        path (str): Chemin séparé par '/' (sans '/' final)
+
+    Returns:
+        list: BLOOM_NUM_HASHES entiers de 32 bits
+    """
+    data = path.encode('utf-8', errors='surrogateescape')
+    h0 = murmur3_32(data, BLOOM_SEED_0)
+    h1 = murmur3_32(data, BLOOM_SEED_1)
+    return [(h0 + i * h1) & 0xffffffff for i in range(BLOOM_NUM_HASHES)]
+
+
+def with_parent_dirs(paths):
+    """Ajoute les dossiers parents de chaque chemin ("a/b/c" -> "a", "a/b", "a/b/c")"""
+    result = set()
+    for path in paths:
+        parts = path.split('/')
+        for i in range(1, len(parts) + 1):
+            result.add('/'.join(parts[:i]))
+    return result
+
+
+def build_bloom_filter(changed_paths):
+    """
+    Construit le filtre de Bloom d'un commit
+
+    Args:
+        changed_paths (iterable): Fichiers modifiés par le commit
+
+    Returns:
+        bytes: Filtre au format de git
+    """
+    keys = with_parent_dirs(changed_paths)
+    if not keys:
+        return BLOOM_EMPTY
+    if len(keys) > BLOOM_MAX_CHANGED_PATHS:
+        return BLOOM_TOO_LARGE
+
+    size = (len(keys) * BLOOM_BITS_PER_ENTRY + 7) // 8
+    bits = bytearray(size)
+    total_bits = size * 8
+    for path in keys:
+        for h in bloom_key(path):
+            pos = h % total_bits
+            bits[pos >> 3] |= 1 << (pos & 7)
+    return bytes(bits)
+
+
+def bloom_maybe_contains(bloom_filter, key):
+    """
+    Interroge un filtre
+
+    Args:
+        bloom_filter (bytes): Filtre d'un commit
+        key (list): Hashes du chemin (voir bloom_key)
+
+    Returns:
+        bool: False si le chemin n'a sûrement pas été modifié, True sinon
+    """
+    total_bits = len(bloom_filter) * 8
+    if total_bits == 0:
+        return True
+    for h in key:
+        pos = h % total_bits
+        if not bloom_filter[pos >> 3] & (1 << (pos & 7)):
+            return False
+    return True
@@ -4,42 +4,9 @@
 import os
 import sys
 import zlib
-import glob
 
 GIT_DIR = ".mon_git"
 
-def resolve_short_sha(short_sha):
-    """
-    Résout un SHA court en SHA complet
-    
-    Args:
-        short_sha (str): SHA court (7+ caractères)
-    
-    Returns:
-        str: SHA complet ou None si non trouvé
-    """
-    if len(short_sha) >= 40:
-        return short_sha
-    
-    git_dir = get_git_dir()
-    objects_dir = os.path.join(git_dir, "objects")
-    
-    # Chercher dans tous les sous-répertoires
-    for subdir in os.listdir(objects_dir):
-        subdir_path = os.path.join(objects_dir, subdir)
-        if os.path.isdir(subdir_path) and len(subdir) == 2:
-            # Chercher les fichiers qui commencent par le SHA court
-            pattern = os.path.join(subdir_path, f"{short_sha[len(subdir):]}*")
-            matches = glob.glob(pattern)
-            if matches:
-                # Extraire le nom du fichier (sans extension)
-                filename = os.path.basename(matches[0])
-                if filename.endswith('.txt'):
-                    filename = filename[:-4]
-                return subdir + filename
-    
-    return None
-
 def get_git_dir():
     """Retourne le chemin du dossier .mon_git"""
     return ".mon_git"
@@ -53,7 +20,12 @@ def cat_file(sha1):
     try:
         # Résoudre le SHA court si nécessaire
         if len(sha1) < 40:
-            resolved_sha = resolve_short_sha(sha1)
+            from src.commands.abbrev import resolve_abbrev, AmbiguousShaError
+            try:
+                resolved_sha = resolve_abbrev(sha1)
+            except AmbiguousShaError as e:
+                print(f"Erreur : SHA-1 court ambigu '{sha1}' ({len(e.candidates)} objets correspondent).")
+                return False
             if resolved_sha is None:
                 print(f"Erreur : SHA-1 invalide '{sha1}'. Il doit contenir 40 caractères hexadécimaux.")
                 return False
@@ -73,15 +45,10 @@ def cat_file(sha1):
             print(content.decode('utf-8', errors='replace'))
         elif obj_type == 'tree':
             # Affichage du contenu d'un objet tree
-            if isinstance(content, bytes):
-                content_str = content.decode('utf-8')
-            else:
-                content_str = content
-            
-            lines = content_str.strip().split('\n')
-            for line in lines:
-                if line.strip():
-                    print(line)
+            from src.commands.objects import iter_tree_entries
+            for mode, name, entry_sha in iter_tree_entries(content):
+                entry_type = 'tree' if mode.lstrip('0').startswith('4') else 'blob'
+                print(f"{mode.zfill(6)} {entry_type} {entry_sha}\t{name}")
         elif obj_type == 'commit':
             # Affichage du contenu d'un objet commit
             if isinstance(content, bytes):
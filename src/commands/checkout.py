@@ -11,6 +11,10 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.commands.rev_parse import rev_parse
+from src.commands import refs
+from src.commands.commit_graph import lookup_commit
+from src.commands.workspace import checkout_tree, CheckoutError
+from src.commands.lockfile import LockError
 
 
 def get_git_dir():
@@ -28,8 +32,9 @@ def branch_exists(branch_name):
     Returns:
         bool: True si la branche existe
     """
-    branch_file = f".mon_git/refs/heads/{branch_name}.txt"
-    return os.path.exists(branch_file)
+    ref_name = f"refs/heads/{branch_name}"
+    # Un fichier de branche sans commit (créé par init) compte aussi
+    return os.path.exists(refs.loose_ref_path(ref_name)) or refs.ref_exists(ref_name)
 
 
 def create_branch(branch_name, commit_sha):
@@ -44,13 +49,8 @@ def create_branch(branch_name, commit_sha):
         bool: True si la branche a été créée
     """
     try:
-        # Créer le fichier de la branche
-        branch_file = f".mon_git/refs/heads/{branch_name}.txt"
-        os.makedirs(os.path.dirname(branch_file), exist_ok=True)
-        
-        with open(branch_file, 'w') as f:
-            f.write(commit_sha)
-        
+        # Créer le fichier de la branche (échoue si un autre processus l'a créée)
+        refs.write_ref(f"refs/heads/{branch_name}", commit_sha, expected=None)
         return True
     except Exception as e:
         print(f"Erreur lors de la création de la branche: {e}")
@@ -71,12 +71,10 @@ def update_head(branch_name=None, commit_sha=None):
     try:
         if branch_name:
             # HEAD pointe vers une branche
-            with open('.mon_git/HEAD.txt', 'w') as f:
-                f.write(f"ref: refs/heads/{branch_name}")
+            refs.write_ref("HEAD", f"ref: refs/heads/{branch_name}")
         elif commit_sha:
             # HEAD pointe directement vers un commit (detached HEAD)
-            with open('.mon_git/HEAD.txt', 'w') as f:
-                f.write(commit_sha)
+            refs.write_ref("HEAD", commit_sha)
         
         return True
     except Exception as e:
@@ -92,23 +90,50 @@ def get_current_branch():
         str: Nom de la branche actuelle ou None si detached HEAD
     """
     try:
-        with open('.mon_git/HEAD.txt', 'r') as f:
-            content = f.read().strip()
-        
-        if content.startswith('ref: refs/heads/'):
-            return content[16:]  # Enlever "ref: refs/heads/"
-        else:
-            return None  # Detached HEAD
+        return refs.current_branch()  # None si detached HEAD
     except Exception:
         return None
 
 
-def checkout_branch(branch_name):
+def update_working_tree(commit_sha, force=False):
+    """
+    Met le working directory et l'index dans l'état d'un commit
+    
+    Seuls les fichiers qui diffèrent entre HEAD et le commit sont écrits ou
+    supprimés ; les modifications indexées des autres fichiers sont conservées
+    (voir workspace.checkout_tree).
+    
+    Args:
+        commit_sha (str): SHA-1 du commit cible (None : branche sans commit)
+        force (bool): Écraser les modifications locales
+    
+    Returns:
+        bool: True si le working directory a été mis à jour
+    """
+    if not commit_sha:
+        return True
+    try:
+        head_sha = refs.resolve_ref("HEAD")
+        head_tree = lookup_commit(head_sha)['tree'] if head_sha else None
+        checkout_tree(lookup_commit(commit_sha)['tree'], force=force, head_tree=head_tree)
+        return True
+    except CheckoutError as e:
+        print(f"error: {e}")
+        print("Please commit your changes or stash them before you switch branches.")
+        print("Aborting")
+        return False
+    except (LockError, ValueError) as e:
+        print(f"Erreur lors de la mise à jour du working directory: {e}")
+        return False
+
+
+def checkout_branch(branch_name, force=False):
     """
     Basculer vers une branche existante
     
     Args:
         branch_name (str): Nom de la branche
+        force (bool): Écraser les modifications locales
     
     Returns:
         bool: True si le basculement a réussi
@@ -117,12 +142,8 @@ def checkout_branch(branch_name):
         print(f"fatal: A branch named '{branch_name}' could not be found.")
         return False
     
-    # Récupérer le SHA-1 de la branche
-    try:
-        with open(f'.mon_git/refs/heads/{branch_name}.txt', 'r') as f:
-            commit_sha = f.read().strip()
-    except Exception as e:
-        print(f"Erreur lors de la lecture de la branche: {e}")
+    # Mettre à jour le working directory avant HEAD (rien ne change en cas d'échec)
+    if not update_working_tree(refs.resolve_ref(f"refs/heads/{branch_name}"), force):
         return False
     
     # Mettre à jour HEAD
@@ -133,12 +154,13 @@ def checkout_branch(branch_name):
         return False
 
 
-def checkout_commit(commit_sha):
+def checkout_commit(commit_sha, force=False):
     """
     Basculer vers un commit spécifique (detached HEAD)
     
     Args:
         commit_sha (str): SHA-1 du commit
+        force (bool): Écraser les modifications locales
     
     Returns:
         bool: True si le basculement a réussi
@@ -149,6 +171,10 @@ def checkout_commit(commit_sha):
         print(f"fatal: reference is not a tree: {commit_sha}")
         return False
     
+    # Mettre à jour le working directory
+    if not update_working_tree(resolved_sha, force):
+        return False
+    
     # Mettre à jour HEAD
     if update_head(commit_sha=resolved_sha):
         print(f"Note: checking out '{resolved_sha[:7]}'.")
@@ -158,13 +184,14 @@ def checkout_commit(commit_sha):
         return False
 
 
-def create_and_checkout_branch(branch_name, start_point="HEAD"):
+def create_and_checkout_branch(branch_name, start_point="HEAD", force=False):
     """
     Créer une nouvelle branche et basculer dessus
     
     Args:
         branch_name (str): Nom de la nouvelle branche
         start_point (str): Point de départ (commit ou branche)
+        force (bool): Écraser les modifications locales
     
     Returns:
         bool: True si la création et le basculement ont réussi
@@ -179,6 +206,10 @@ def create_and_checkout_branch(branch_name, start_point="HEAD"):
         print(f"fatal: reference is not a tree: {start_point}")
         return False
     
+    # Mettre à jour le working directory (rien à faire si start_point est HEAD)
+    if (force or commit_sha != refs.resolve_ref("HEAD")) and not update_working_tree(commit_sha, force):
+        return False
+    
     # Créer la branche
     if not create_branch(branch_name, commit_sha):
         return False
@@ -191,7 +222,7 @@ def create_and_checkout_branch(branch_name, start_point="HEAD"):
         return False
 
 
-def checkout(target, create_branch_flag=False, start_point="HEAD"):
+def checkout(target, create_branch_flag=False, start_point="HEAD", force=False):
     """
     Fonction principale de checkout
     
@@ -199,20 +230,21 @@ def checkout(target, create_branch_flag=False, start_point="HEAD"):
         target (str): Cible (nom de branche, SHA-1, ou nouvelle branche)
         create_branch_flag (bool): True si créer une nouvelle branche
         start_point (str): Point de départ pour la nouvelle branche
+        force (bool): Écraser les modifications locales (-f)
     
     Returns:
         bool: True si le checkout a réussi
     """
     if create_branch_flag:
         # Créer et basculer vers une nouvelle branche
-        return create_and_checkout_branch(target, start_point)
+        return create_and_checkout_branch(target, start_point, force)
     else:
         # Vérifier si c'est une branche existante
         if branch_exists(target):
-            return checkout_branch(target)
+            return checkout_branch(target, force)
         else:
             # Essayer de basculer vers un commit
-            return checkout_commit(target)
+            return checkout_commit(target, force)
 
 
 def main():
@@ -225,6 +257,7 @@ def main():
     
     args = sys.argv[1:]
     create_branch_flag = False
+    force = False
     target = None
     start_point = "HEAD"
     
@@ -240,12 +273,15 @@ def main():
             else:
                 print("fatal: -b requires a branch name")
                 sys.exit(1)
+        elif arg == "-f" or arg == "--force":
+            force = True
         elif arg == "--help" or arg == "-h":
             print("Usage: gitBis checkout <branch|commit>")
             print("   or: gitBis checkout -b <new_branch> [<start_point>]")
             print("")
             print("Basculer vers une branche ou un commit")
             print("  -b    Créer et basculer vers une nouvelle branche")
+            print("  -f    Écraser les modifications locales")
             sys.exit(0)
         elif not target:
             target = arg
@@ -262,7 +298,7 @@ def main():
         print("fatal: A branch name or commit is required")
         sys.exit(1)
     
-    success = checkout(target, create_branch_flag, start_point)
+    success = checkout(target, create_branch_flag, start_point, force)
     if not success:
         sys.exit(1)
 
@@ -0,0 +1,804 @@
+#!/usr/bin/env python3
+"""
+Module pour le commit-graph
+Fichier binaire .mon_git/objects/info/commit-graph qui donne, pour chaque
+commit, son tree, ses parents, son numéro de génération et sa date, sans lire
+ni décompresser les objets commit.
+
+Le format suit celui de git (commit-graph v1) :
+- en-tête : "CGPH" <version> <version du hash> <nombre de chunks> <0>
+- table des chunks : (identifiant, offset) terminée par un identifiant nul
+- OIDF : fan-out[256] ; OIDL : SHA-1 triés
+- CDAT : tree, position des deux premiers parents, génération (30 bits)
+  et date du commit (34 bits)
+- EDGE : parents supplémentaires des merges à plus de deux parents
+- BIDX / BDAT (optionnels, --changed-paths) : filtre de Bloom des chemins
+  modifiés par chaque commit (voir bloom.py)
+- BASE (couches) : SHA-1 des couches inférieures
+- SHA-1 de tout le fichier à la fin
+
+Comme dans git, le graphe peut être découpé en couches : chaque commit ajoute
+une petite couche (objects/info/commit-graphs/graph-<sha>.graph, listées dans
+commit-graph-chain) au lieu de réécrire tout le fichier. Les positions des
+parents sont globales : une couche ne contient que ses commits et désigne ceux
+des couches inférieures par leur position dans la chaîne. Une couche trop
+petite par rapport à la nouvelle est fusionnée avec elle, ce qui garde la
+chaîne courte (nombre de couches logarithmique). gitBis commit-graph write
+réécrit un seul fichier et supprime la chaîne.
+"""
+
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import tempfile
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.objects import read_object
+from src.commands.lockfile import LockFile
+from src.commands.bloom import (build_bloom_filter, BLOOM_HASH_VERSION, BLOOM_NUM_HASHES,
+                                BLOOM_BITS_PER_ENTRY, BLOOM_MAX_CHANGED_PATHS, BLOOM_TOO_LARGE)
+
+
+GRAPH_SIGNATURE = b'CGPH'
+GRAPH_VERSION = 1
+HASH_VERSION_SHA1 = 1
+
+CHUNK_OID_FANOUT = b'OIDF'
+CHUNK_OID_LOOKUP = b'OIDL'
+CHUNK_COMMIT_DATA = b'CDAT'
+CHUNK_EXTRA_EDGES = b'EDGE'
+CHUNK_BLOOM_INDEX = b'BIDX'
+CHUNK_BLOOM_DATA = b'BDAT'
+CHUNK_BASE_GRAPHS = b'BASE'
+BDAT_HEADER_SIZE = 12
+
+CDAT_ENTRY_SIZE = 36
+GRAPH_PARENT_NONE = 0x70000000
+GRAPH_EXTRA_EDGES = 0x80000000
+GRAPH_LAST_EDGE = 0x80000000
+GENERATION_MAX = 0x3fffffff
+
+# Une couche est fusionnée avec la nouvelle si elle a moins de
+# GRAPH_SPLIT_FACTOR fois ses commits
+GRAPH_SPLIT_FACTOR = 2
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def get_graph_path():
+    """Retourne le chemin du fichier commit-graph"""
+    return os.path.join(get_git_dir(), "objects", "info", "commit-graph")
+
+
+def get_graph_chain_dir():
+    """Retourne le dossier des couches du commit-graph"""
+    return os.path.join(get_git_dir(), "objects", "info", "commit-graphs")
+
+
+def get_graph_chain_path():
+    """Retourne le chemin du fichier qui liste les couches (de la base au sommet)"""
+    return os.path.join(get_graph_chain_dir(), "commit-graph-chain")
+
+
+def get_graph_layer_path(graph_hash):
+    """Retourne le chemin d'une couche d'après son SHA-1"""
+    return os.path.join(get_graph_chain_dir(), f"graph-{graph_hash}.graph")
+
+
+def parse_commit_header(content):
+    """
+    Extrait le tree, les parents et la date d'un objet commit
+
+    Args:
+        content (bytes): Contenu de l'objet commit
+
+    Returns:
+        tuple: (tree, [parents], date) ; date = 0 si le commit n'en a pas
+    """
+    tree = None
+    parents = []
+    commit_time = 0
+    for line in content.split(b'\n'):
+        if not line:
+            break
+        if line.startswith(b'tree '):
+            tree = line[5:].decode()
+        elif line.startswith(b'parent '):
+            parents.append(line[7:].decode())
+        elif line.startswith(b'committer ') or (line.startswith(b'author ') and not commit_time):
+            # "<nom> <email> <timestamp> <fuseau>"
+            fields = line.rsplit(b' ', 2)
+            if len(fields) == 3 and fields[1].isdigit():
+                commit_time = int(fields[1])
+    return tree, parents, commit_time
+
+
+class CommitGraph:
+    """
+    Commit-graph ouvert en lecture, projeté en mémoire (mmap)
+
+    Pour une chaîne, l'objet est la couche du sommet ; les positions (find_index,
+    sha_at, entry_at...) sont globales et renvoient aux couches inférieures.
+    """
+
+    def __init__(self, path, base=None):
+        """
+        Args:
+            path (str): Fichier du graphe (ou d'une couche)
+            base (CommitGraph): Couche inférieure (None : graphe complet ou base)
+        """
+        self.path = path
+        self.base = base
+        self.base_count = len(base) if base is not None else 0
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data = self.data
+        if len(data) < 8 + 20 or data[:4] != GRAPH_SIGNATURE:
+            raise ValueError(f"Invalid commit-graph: {path}")
+        version, hash_version, num_chunks, num_bases = data[4], data[5], data[6], data[7]
+        if version != GRAPH_VERSION or hash_version != HASH_VERSION_SHA1:
+            raise ValueError(f"Unsupported commit-graph version: {path}")
+        self.hash = data[-20:].hex()
+
+        self.chunks = {}
+        for i in range(num_chunks):
+            start = 8 + 12 * i
+            chunk_id = data[start:start + 4]
+            offset = struct.unpack('>Q', data[start + 4:start + 12])[0]
+            self.chunks[chunk_id] = offset
+        for required in (CHUNK_OID_FANOUT, CHUNK_OID_LOOKUP, CHUNK_COMMIT_DATA):
+            if required not in self.chunks:
+                raise ValueError(f"Commit-graph chunk {required.decode()} missing: {path}")
+
+        # Une couche doit être lue au-dessus des couches qu'elle désigne
+        expected_bases = [layer.hash for layer in base.layers()] if base is not None else []
+        bases = []
+        if num_bases:
+            start = self.chunks.get(CHUNK_BASE_GRAPHS)
+            if start is not None:
+                bases = [data[start + 20 * i:start + 20 * (i + 1)].hex() for i in range(num_bases)]
+        if bases != expected_bases:
+            raise ValueError(f"Commit-graph chain mismatch: {path}")
+
+        fanout_start = self.chunks[CHUNK_OID_FANOUT]
+        self.fanout = struct.unpack('>256I', data[fanout_start:fanout_start + 1024])
+        self.count = self.fanout[255]
+        self.oid_table = self.chunks[CHUNK_OID_LOOKUP]
+        self.cdat_table = self.chunks[CHUNK_COMMIT_DATA]
+        self.edge_table = self.chunks.get(CHUNK_EXTRA_EDGES)
+        self.bloom_index = self.chunks.get(CHUNK_BLOOM_INDEX)
+        self.bloom_data = self.chunks.get(CHUNK_BLOOM_DATA)
+        if self.bloom_data is not None:
+            hash_version, num_hashes, bits = struct.unpack(
+                '>III', data[self.bloom_data:self.bloom_data + BDAT_HEADER_SIZE])
+            if (hash_version, num_hashes, bits) != (BLOOM_HASH_VERSION, BLOOM_NUM_HASHES,
+                                                    BLOOM_BITS_PER_ENTRY):
+                # Paramètres inconnus : les filtres sont ignorés
+                self.bloom_index = self.bloom_data = None
+
+    @property
+    def has_bloom_filters(self):
+        """True si cette couche contient les filtres des chemins modifiés"""
+        return self.bloom_index is not None and self.bloom_data is not None
+
+    def layers(self):
+        """Couches de la chaîne, de la base à celle-ci"""
+        layers = []
+        layer = self
+        while layer is not None:
+            layers.append(layer)
+            layer = layer.base
+        layers.reverse()
+        return layers
+
+    def close(self):
+        """Ferme la projection mémoire (et celles des couches inférieures)"""
+        for layer in self.layers():
+            layer.data.close()
+
+    def __len__(self):
+        return self.base_count + self.count
+
+    def __contains__(self, sha):
+        return self.find_index(sha) is not None
+
+    def _layer_at(self, index):
+        """Couche qui contient la position globale index"""
+        layer = self
+        while index < layer.base_count:
+            layer = layer.base
+        return layer
+
+    def sha_at(self, index):
+        """Retourne le SHA-1 (hexadécimal) de la n-ième entrée"""
+        layer = self._layer_at(index)
+        start = layer.oid_table + 20 * (index - layer.base_count)
+        return layer.data[start:start + 20].hex()
+
+    def find_index(self, sha):
+        """
+        Recherche dichotomique d'un commit dans le graphe (couche par couche)
+
+        Returns:
+            int: Position du commit ou None s'il est absent
+        """
+        try:
+            target = bytes.fromhex(sha)
+        except (TypeError, ValueError):
+            return None
+        if len(target) != 20:
+            return None
+        layer = self
+        while layer is not None:
+            lo = layer.fanout[target[0] - 1] if target[0] > 0 else 0
+            hi = layer.fanout[target[0]]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                start = layer.oid_table + 20 * mid
+                current = layer.data[start:start + 20]
+                if current < target:
+                    lo = mid + 1
+                elif current > target:
+                    hi = mid
+                else:
+                    return layer.base_count + mid
+            layer = layer.base
+        return None
+
+    def entry_at(self, index):
+        """
+        Décode l'entrée CDAT d'un commit
+
+        Returns:
+            tuple: (tree, [positions des parents], génération, date)
+        """
+        layer = self._layer_at(index)
+        data = layer.data
+        start = layer.cdat_table + CDAT_ENTRY_SIZE * (index - layer.base_count)
+        tree = data[start:start + 20].hex()
+        parent1, parent2, high, low = struct.unpack('>IIII', data[start + 20:start + 36])
+
+        parents = []
+        if parent1 != GRAPH_PARENT_NONE:
+            parents.append(parent1)
+        if parent2 & GRAPH_EXTRA_EDGES:
+            pos = layer.edge_table + 4 * (parent2 & ~GRAPH_EXTRA_EDGES)
+            while True:
+                edge = struct.unpack('>I', data[pos:pos + 4])[0]
+                parents.append(edge & ~GRAPH_LAST_EDGE)
+                if edge & GRAPH_LAST_EDGE:
+                    break
+                pos += 4
+        elif parent2 != GRAPH_PARENT_NONE:
+            parents.append(parent2)
+
+        generation = high >> 2
+        commit_time = ((high & 0x3) << 32) | low
+        return tree, parents, generation, commit_time
+
+    def bloom_filter_at(self, index):
+        """
+        Filtre de Bloom d'un commit
+
+        Returns:
+            bytes: Filtre des chemins modifiés, ou None si sa couche n'en a pas
+        """
+        layer = self._layer_at(index)
+        if not layer.has_bloom_filters:
+            return None
+        index -= layer.base_count
+        start = 0
+        if index > 0:
+            pos = layer.bloom_index + 4 * (index - 1)
+            start = struct.unpack('>I', layer.data[pos:pos + 4])[0]
+        pos = layer.bloom_index + 4 * index
+        end = struct.unpack('>I', layer.data[pos:pos + 4])[0]
+        base = layer.bloom_data + BDAT_HEADER_SIZE
+        return layer.data[base + start:base + end]
+
+    def layer_bloom_filters(self):
+        """
+        Returns:
+            dict: {sha: filtre} pour les commits de cette couche (vide sans filtres)
+        """
+        if not self.has_bloom_filters:
+            return {}
+        positions = range(self.base_count, self.base_count + self.count)
+        return {self.sha_at(i): self.bloom_filter_at(i) for i in positions}
+
+    def bloom_filters(self):
+        """
+        Returns:
+            dict: {sha: filtre} pour tous les commits des couches qui en ont
+        """
+        filters = {}
+        for layer in self.layers():
+            filters.update(layer.layer_bloom_filters())
+        return filters
+
+    def get(self, sha):
+        """
+        Returns:
+            dict: {'tree', 'parents', 'generation', 'time'} ou None si absent
+        """
+        index = self.find_index(sha)
+        if index is None:
+            return None
+        tree, parents, generation, commit_time = self.entry_at(index)
+        return {
+            'tree': tree,
+            'parents': [self.sha_at(p) for p in parents],
+            'generation': generation,
+            'time': commit_time,
+        }
+
+    def layer_commits(self):
+        """
+        Returns:
+            dict: {sha: (tree, [parents], date)} pour les commits de cette couche
+        """
+        result = {}
+        for i in range(self.base_count, self.base_count + self.count):
+            tree, parents, _, commit_time = self.entry_at(i)
+            result[self.sha_at(i)] = (tree, [self.sha_at(p) for p in parents], commit_time)
+        return result
+
+    def commits(self):
+        """
+        Returns:
+            dict: {sha: (tree, [parents], date)} pour tous les commits du graphe
+        """
+        result = {}
+        for layer in self.layers():
+            result.update(layer.layer_commits())
+        return result
+
+
+_graph_state = {'path': None, 'key': None, 'graph': None}
+
+
+def _stat_key(path):
+    """Clé (inode, taille, mtime) d'un fichier, None s'il n'existe pas"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def read_graph_chain():
+    """
+    Returns:
+        list: SHA-1 des couches listées dans commit-graph-chain (base d'abord)
+    """
+    try:
+        with open(get_graph_chain_path(), 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _open_graph():
+    """Ouvre le graphe complet s'il existe, sinon la chaîne de couches"""
+    if os.path.exists(get_graph_path()):
+        return CommitGraph(get_graph_path())
+    graph = None
+    for graph_hash in read_graph_chain():
+        graph = CommitGraph(get_graph_layer_path(graph_hash), graph)
+    return graph
+
+
+def get_commit_graph():
+    """
+    Retourne le commit-graph du dépôt courant (rechargé s'il a été réécrit)
+
+    Les couches sont nommées par leur SHA-1 et ne changent jamais : le stat du
+    fichier commit-graph-chain suffit à savoir si la chaîne a changé.
+
+    Returns:
+        CommitGraph: Graphe ouvert (couche du sommet pour une chaîne) ou None
+                     s'il n'existe pas
+    """
+    path = os.path.abspath(get_graph_path())
+    key = (_stat_key(path), _stat_key(os.path.abspath(get_graph_chain_path())))
+
+    if _graph_state['path'] == path and _graph_state['key'] == key:
+        return _graph_state['graph']
+
+    if _graph_state['graph'] is not None:
+        _graph_state['graph'].close()
+
+    graph = None
+    if key != (None, None):
+        try:
+            graph = _open_graph()
+        except (OSError, ValueError) as e:
+            print(f"Attention : commit-graph ignoré : {e}")
+
+    _graph_state.update({'path': path, 'key': key, 'graph': graph})
+    return graph
+
+
+def lookup_commit(sha):
+    """
+    Informations d'un commit : commit-graph d'abord, objet commit sinon
+
+    Returns:
+        dict: {'tree', 'parents', 'generation', 'time'} ; generation vaut None
+              si le commit n'est pas dans le graphe
+    """
+    graph = get_commit_graph()
+    if graph is not None:
+        info = graph.get(sha)
+        if info is not None:
+            return info
+
+    obj_type, content = read_object(sha)
+    if obj_type != 'commit':
+        raise ValueError(f"Object {sha} is not a commit")
+    tree, parents, commit_time = parse_commit_header(content)
+    return {'tree': tree, 'parents': parents, 'generation': None, 'time': commit_time}
+
+
+def get_bloom_filter(sha):
+    """
+    Filtre de Bloom des chemins modifiés par un commit
+
+    Returns:
+        bytes: Filtre, ou None si le commit n'est pas dans le graphe ou si sa
+               couche a été écrite sans --changed-paths
+    """
+    graph = get_commit_graph()
+    if graph is None:
+        return None
+    index = graph.find_index(sha)
+    if index is None:
+        return None
+    return graph.bloom_filter_at(index)
+
+
+def get_commit_parents(sha):
+    """Retourne la liste des parents d'un commit (commit-graph d'abord)"""
+    return lookup_commit(sha)['parents']
+
+
+def collect_commits(start_shas, known=None):
+    """
+    Lit les commits atteignables depuis start_shas, sans relire ceux déjà connus
+
+    Args:
+        start_shas (list): Commits de départ
+        known (dict): Commits déjà connus {sha: (tree, [parents], date)}
+
+    Returns:
+        dict: {sha: (tree, [parents], date)} pour les nouveaux commits
+    """
+    known = known or {}
+    found = {}
+    stack = [sha for sha in start_shas if sha]
+    while stack:
+        sha = stack.pop()
+        if sha in known or sha in found:
+            continue
+        obj_type, content = read_object(sha)
+        if obj_type != 'commit':
+            continue
+        tree, parents, commit_time = parse_commit_header(content)
+        found[sha] = (tree, parents, commit_time)
+        stack.extend(parents)
+    return found
+
+
+def _compute_generations(commits, base=None):
+    """
+    Numéro de génération : 1 pour une racine, 1 + max(parents) sinon
+
+    Args:
+        commits (dict): {sha: (tree, [parents], date)}
+        base (CommitGraph): Couches inférieures : la génération d'un parent
+                            absent de commits y est lue, pas recalculée
+
+    Returns:
+        dict: {sha: génération}
+    """
+    generations = {}
+    if base is not None:
+        for tree, parents, _ in commits.values():
+            for parent in parents:
+                if parent not in commits and parent not in generations:
+                    generations[parent] = base.entry_at(base.find_index(parent))[2]
+    for start in commits:
+        if start in generations:
+            continue
+        stack = [start]
+        while stack:
+            sha = stack[-1]
+            if sha in generations:
+                stack.pop()
+                continue
+            pending = [p for p in commits[sha][1] if p not in generations]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            parent_generations = [generations[p] for p in commits[sha][1]]
+            generations[sha] = min(GENERATION_MAX, 1 + max(parent_generations, default=0))
+    return generations
+
+
+def compute_bloom_filter(sha, commits, base=None):
+    """
+    Filtre de Bloom d'un commit : chemins modifiés par rapport au premier parent
+
+    Args:
+        sha (str): SHA-1 du commit
+        commits (dict): {sha: (tree, [parents], date)}
+        base (CommitGraph): Couches inférieures (parents absents de commits)
+
+    Returns:
+        bytes: Filtre au format de git
+    """
+    from src.commands.diff_tree import diff_trees
+
+    tree, parents, _ = commits[sha]
+    parent_tree = None
+    if parents:
+        parent = parents[0]
+        parent_tree = commits[parent][0] if parent in commits else base.get(parent)['tree']
+    changed = []
+    for change in diff_trees(parent_tree, tree):
+        changed.append(change[1])
+        if len(changed) > BLOOM_MAX_CHANGED_PATHS:
+            return BLOOM_TOO_LARGE
+    return build_bloom_filter(changed)
+
+
+def build_commit_graph(commits, bloom_filters=None, base=None):
+    """
+    Construit le contenu d'un commit-graph (ou d'une couche)
+
+    Args:
+        commits (dict): {sha: (tree, [parents], date)} ; chaque parent doit
+                        être dans commits ou dans base
+        bloom_filters (dict): {sha: filtre} déjà calculés ; si ce n'est pas
+                              None, les filtres manquants sont calculés et
+                              les chunks BIDX / BDAT sont écrits
+        base (CommitGraph): Couches inférieures (None : graphe complet)
+
+    Returns:
+        bytes: Contenu du fichier, terminé par son SHA-1
+    """
+    base_count = len(base) if base is not None else 0
+    shas = sorted(commits)
+    positions = {sha: base_count + i for i, sha in enumerate(shas)}
+    generations = _compute_generations(commits, base)
+
+    fanout = [0] * 256
+    for sha in shas:
+        fanout[int(sha[:2], 16)] += 1
+    for i in range(1, 256):
+        fanout[i] += fanout[i - 1]
+
+    oid_lookup = b''.join(bytes.fromhex(sha) for sha in shas)
+    cdat = bytearray()
+    edges = []
+    for sha in shas:
+        tree, parents, commit_time = commits[sha]
+        parent_positions = [positions[p] if p in positions else base.find_index(p) for p in parents]
+        parent1 = parent_positions[0] if parent_positions else GRAPH_PARENT_NONE
+        if len(parent_positions) > 2:
+            parent2 = GRAPH_EXTRA_EDGES | len(edges)
+            extra = parent_positions[1:]
+            edges.extend(extra[:-1])
+            edges.append(extra[-1] | GRAPH_LAST_EDGE)
+        elif len(parent_positions) == 2:
+            parent2 = parent_positions[1]
+        else:
+            parent2 = GRAPH_PARENT_NONE
+        commit_time = min(commit_time, (1 << 34) - 1)
+        high = (generations[sha] << 2) | (commit_time >> 32)
+        cdat += bytes.fromhex(tree) + struct.pack('>IIII', parent1, parent2, high, commit_time & 0xffffffff)
+
+    chunks = [
+        (CHUNK_OID_FANOUT, struct.pack('>256I', *fanout)),
+        (CHUNK_OID_LOOKUP, oid_lookup),
+        (CHUNK_COMMIT_DATA, bytes(cdat)),
+    ]
+    if edges:
+        chunks.append((CHUNK_EXTRA_EDGES, struct.pack(f'>{len(edges)}I', *edges)))
+    if bloom_filters is not None:
+        bloom_index = bytearray()
+        bloom_data = [struct.pack('>III', BLOOM_HASH_VERSION, BLOOM_NUM_HASHES, BLOOM_BITS_PER_ENTRY)]
+        end = 0
+        for sha in shas:
+            bloom_filter = bloom_filters.get(sha)
+            if bloom_filter is None:
+                bloom_filter = compute_bloom_filter(sha, commits, base)
+            end += len(bloom_filter)
+            bloom_index += struct.pack('>I', end)
+            bloom_data.append(bytes(bloom_filter))
+        chunks.append((CHUNK_BLOOM_INDEX, bytes(bloom_index)))
+        chunks.append((CHUNK_BLOOM_DATA, b''.join(bloom_data)))
+    base_layers = base.layers() if base is not None else []
+    if base_layers:
+        chunks.append((CHUNK_BASE_GRAPHS, b''.join(bytes.fromhex(layer.hash) for layer in base_layers)))
+
+    header = GRAPH_SIGNATURE + bytes([GRAPH_VERSION, HASH_VERSION_SHA1, len(chunks), len(base_layers)])
+    offset = len(header) + 12 * (len(chunks) + 1)
+    table = bytearray()
+    for chunk_id, chunk_data in chunks:
+        table += chunk_id + struct.pack('>Q', offset)
+        offset += len(chunk_data)
+    table += b'\0\0\0\0' + struct.pack('>Q', offset)
+
+    content = header + bytes(table) + b''.join(chunk_data for _, chunk_data in chunks)
+    return content + hashlib.sha1(content).digest()
+
+
+def _write_file(path, content):
+    """Écrit un fichier de manière atomique (fichier temporaire renommé)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='tmp_graph_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _remove_unused_layers(kept):
+    """Supprime les couches qui ne sont plus dans la chaîne"""
+    chain_dir = get_graph_chain_dir()
+    if not os.path.isdir(chain_dir):
+        return
+    kept_names = {os.path.basename(get_graph_layer_path(graph_hash)) for graph_hash in kept}
+    for name in os.listdir(chain_dir):
+        if name.endswith('.graph') and name not in kept_names:
+            try:
+                os.remove(os.path.join(chain_dir, name))
+            except FileNotFoundError:
+                pass
+
+
+def write_commit_graph(commits, bloom_filters=None):
+    """
+    Écrit le commit-graph pour un ensemble fermé de commits
+
+    IMPACT SUR .MON_GIT :
+    - Écrit .mon_git/objects/info/commit-graph (fichier temporaire renommé)
+    - Supprime la chaîne de couches (objects/info/commit-graphs), remplacée
+
+    Args:
+        commits (dict): {sha: (tree, [parents], date)} ; tous les parents
+                        doivent être présents
+        bloom_filters (dict): Voir build_commit_graph
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    path = get_graph_path()
+    _write_file(path, build_commit_graph(commits, bloom_filters))
+    if os.path.exists(get_graph_chain_path()):
+        with LockFile(get_graph_chain_path()) as lock:
+            os.remove(get_graph_chain_path())
+            _remove_unused_layers([])
+    return path
+
+
+def _ref_tips():
+    """Commits pointés par HEAD et par toutes les branches"""
+    from src.commands.rev_parse import rev_parse
+    from src.commands.show_ref import get_all_refs
+
+    tips = []
+    head = rev_parse("HEAD")
+    if head:
+        tips.append(head)
+    for sha, ref_name in get_all_refs():
+        if sha and sha not in tips:
+            tips.append(sha)
+    return tips
+
+
+def write_commit_graph_from_refs(changed_paths=False):
+    """
+    Construit le commit-graph de tous les commits atteignables (gitBis commit-graph write)
+
+    Args:
+        changed_paths (bool): Écrire aussi les filtres de Bloom des chemins
+                              modifiés ; ceux du graphe actuel sont réutilisés
+
+    Returns:
+        int: Nombre de commits dans le graphe
+    """
+    commits = collect_commits(_ref_tips())
+    bloom_filters = None
+    if changed_paths:
+        graph = get_commit_graph()
+        bloom_filters = graph.bloom_filters() if graph is not None else {}
+    write_commit_graph(commits, bloom_filters)
+    return len(commits)
+
+
+def update_commit_graph(new_shas):
+    """
+    Ajoute des commits au commit-graph dans une nouvelle couche
+
+    Seuls les nouveaux commits (et leurs ancêtres absents du graphe) sont lus,
+    et leur génération est calculée à partir de celle, déjà stockée, de leurs
+    parents : le graphe existant n'est ni décodé ni réécrit. Les couches du
+    sommet qui ont moins de GRAPH_SPLIT_FACTOR fois les commits de la nouvelle
+    couche y sont fusionnées ; chaque commit est ainsi recopié O(log n) fois
+    au total et la chaîne garde O(log n) couches. Un graphe complet existant
+    devient la base de la chaîne.
+
+    IMPACT SUR .MON_GIT :
+    - Écrit objects/info/commit-graphs/graph-<sha>.graph
+    - Réécrit objects/info/commit-graphs/commit-graph-chain (sous verrou)
+    - Déplace objects/info/commit-graph dans la chaîne, supprime les couches
+      fusionnées
+
+    Args:
+        new_shas (list): Commits à ajouter (ex : le commit qui vient d'être créé)
+
+    Returns:
+        int: Nombre de commits ajoutés
+    """
+    with LockFile(get_graph_chain_path()) as lock:
+        graph = get_commit_graph()
+        found = collect_commits(new_shas, graph if graph is not None else {})
+        if not found:
+            return 0
+
+        layers = graph.layers() if graph is not None else []
+        # Les filtres de Bloom sont écrits si la couche du sommet en a
+        bloom_filters = {} if layers and layers[-1].has_bloom_filters else None
+        commits = dict(found)
+        while layers and len(commits) * GRAPH_SPLIT_FACTOR > layers[-1].count:
+            top = layers.pop()
+            commits.update(top.layer_commits())
+            if bloom_filters is not None:
+                bloom_filters.update(top.layer_bloom_filters())
+        base = layers[-1] if layers else None
+
+        content = build_commit_graph(commits, bloom_filters, base)
+        graph_hash = content[-20:].hex()
+        _write_file(get_graph_layer_path(graph_hash), content)
+
+        full_graph = get_graph_path()
+        if os.path.exists(full_graph):
+            if layers:
+                # Le graphe complet reste la base de la chaîne
+                os.replace(full_graph, get_graph_layer_path(layers[0].hash))
+            else:
+                os.remove(full_graph)
+
+        chain = [layer.hash for layer in layers] + [graph_hash]
+        lock.write(''.join(f"{h}\n" for h in chain))
+        lock.commit()
+        _remove_unused_layers(chain)
+    return len(found)
+
+
+def main():
+    """Fonction principale pour la commande commit-graph"""
+    if len(sys.argv) < 2 or sys.argv[1] != "write":
+        print("Usage: gitBis commit-graph write [--changed-paths]")
+        sys.exit(1)
+    count = write_commit_graph_from_refs(changed_paths="--changed-paths" in sys.argv[2:])
+    print(f"Commit-graph écrit : {count} commit(s)")
+
+
+if __name__ == "__main__":
+    main()
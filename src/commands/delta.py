@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Module pour la compression delta des objets dans les packs
+Encode un objet comme une suite d'instructions copy/insert par rapport à un
+objet de base, au format des deltas de git :
+
+- en-tête : taille de la base et taille du résultat (varints 7 bits)
+- copy   : 1xxxxxxx suivi des octets d'offset (4 max) et de taille (3 max)
+- insert : 0xxxxxxx (1 à 127) suivi d'autant d'octets littéraux
+"""
+
+# Taille des blocs indexés dans l'objet de base
+BLOCK_SIZE = 16
+
+# Limites imposées par le format
+MAX_INSERT = 0x7f
+MAX_COPY = 0xffffff
+
+# Nombre maximum de positions mémorisées pour un même bloc
+MAX_BLOCK_CANDIDATES = 8
+
+
+def _encode_varint(value):
+    """Encode une taille en varint 7 bits (poids faibles en premier)"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _decode_varint(data, pos):
+    """Décode un varint 7 bits, retourne (valeur, nouvelle_position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def _encode_copy(offset, size):
+    """Encode une instruction copy (offset et taille dans la base)"""
+    op = 0x80
+    args = bytearray()
+    for i in range(4):
+        byte = (offset >> (8 * i)) & 0xff
+        if byte:
+            op |= 1 << i
+            args.append(byte)
+    for i in range(3):
+        byte = (size >> (8 * i)) & 0xff
+        if byte:
+            op |= 1 << (4 + i)
+            args.append(byte)
+    return bytes([op]) + bytes(args)
+
+
+def _flush_insert(out, pending):
+    """Écrit les octets littéraux en attente par paquets de 127"""
+    for start in range(0, len(pending), MAX_INSERT):
+        chunk = pending[start:start + MAX_INSERT]
+        out.append(len(chunk))
+        out += chunk
+
+
+def _index_base(base):
+    """
+    Indexe les blocs de l'objet de base
+
+    Returns:
+        dict: {bloc: [positions]} pour chaque bloc aligné de BLOCK_SIZE octets
+    """
+    index = {}
+    for pos in range(0, len(base) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        positions = index.setdefault(base[pos:pos + BLOCK_SIZE], [])
+        if len(positions) < MAX_BLOCK_CANDIDATES:
+            positions.append(pos)
+    return index
+
+
+def _match_length(base, base_pos, target, target_pos, limit):
+    """Longueur de la correspondance à partir d'un bloc commun (comparaison par tranches)"""
+    size = BLOCK_SIZE
+    step = 256
+    while size < limit:
+        step = min(step, limit - size)
+        if base[base_pos + size:base_pos + size + step] == target[target_pos + size:target_pos + size + step]:
+            size += step
+            continue
+        while base[base_pos + size] == target[target_pos + size]:
+            size += 1
+        break
+    return size
+
+
+def create_delta(base, target, max_size=None):
+    """
+    Calcule le delta permettant de reconstruire target à partir de base
+
+    Args:
+        base (bytes): Objet de base
+        target (bytes): Objet à encoder
+        max_size (int): Abandonne (retourne None) si le delta dépasse cette taille
+
+    Returns:
+        bytes: Delta au format git, ou None si plus grand que max_size
+    """
+    out = bytearray(_encode_varint(len(base)) + _encode_varint(len(target)))
+    index = _index_base(base)
+    pending = bytearray()
+    base_len = len(base)
+    target_len = len(target)
+    i = 0
+
+    while i < target_len:
+        best_offset = best_size = 0
+        if i + BLOCK_SIZE <= target_len:
+            for candidate in index.get(target[i:i + BLOCK_SIZE], ()):
+                size = _match_length(base, candidate, target, i,
+                                     min(base_len - candidate, target_len - i, MAX_COPY))
+                if size > best_size:
+                    best_offset, best_size = candidate, size
+
+        if best_size < BLOCK_SIZE:
+            pending.append(target[i])
+            i += 1
+            continue
+
+        # Étendre la correspondance vers l'arrière sur les littéraux en attente
+        forward = best_size
+        while pending and best_offset > 0 and best_size < MAX_COPY \
+                and base[best_offset - 1] == pending[-1]:
+            pending.pop()
+            best_offset -= 1
+            best_size += 1
+
+        _flush_insert(out, pending)
+        pending = bytearray()
+        out += _encode_copy(best_offset, best_size)
+        i += forward
+
+        if max_size is not None and len(out) > max_size:
+            return None
+
+    _flush_insert(out, pending)
+    if max_size is not None and len(out) > max_size:
+        return None
+    return bytes(out)
+
+
+def apply_delta(base, delta):
+    """
+    Reconstruit un objet à partir de sa base et d'un delta
+
+    Args:
+        base (bytes): Objet de base
+        delta (bytes): Delta au format git
+
+    Returns:
+        bytes: Objet reconstruit
+    """
+    base_size, pos = _decode_varint(delta, 0)
+    if base_size != len(base):
+        raise ValueError(f"Delta base size mismatch ({base_size} != {len(base)})")
+    result_size, pos = _decode_varint(delta, pos)
+
+    result = bytearray()
+    delta_len = len(delta)
+    while pos < delta_len:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            if size == 0:
+                size = 0x10000
+            result += base[offset:offset + size]
+        elif op:
+            result += delta[pos:pos + op]
+            pos += op
+        else:
+            raise ValueError("Invalid delta opcode 0")
+
+    if len(result) != result_size:
+        raise ValueError(f"Delta result size mismatch ({len(result)} != {result_size})")
+    return bytes(result)
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Module pour la commande diff
+Affiche les différences ligne à ligne au format unifié de git.
+
+- gitBis diff                : working directory / index
+- gitBis diff --cached [C]   : index / commit C (HEAD par défaut)
+- gitBis diff C              : working directory / commit C
+- gitBis diff A B            : commit A / commit B
+
+Les lignes sont comparées par l'algorithme de Myers (O(ND), N lignes, D
+différences) sur des identifiants entiers : chaque ligne distincte reçoit un
+numéro, on ne compare donc jamais deux chaînes pendant la recherche. Le
+préfixe et le suffixe communs sont retirés avant : une petite modification
+dans un gros fichier ne coûte que la taille de la zone modifiée. Un fichier
+binaire (octet NUL dans ses premiers 8000 octets, comme git) n'est pas
+découpé en lignes.
+"""
+
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.objects import read_object, write_object, iter_tree_files
+from src.commands.index import read_index_file, file_stat, stat_matches, MODE_SYMLINK
+from src.commands.diff_tree import diff_trees, resolve_tree
+from src.commands.abbrev import DEFAULT_ABBREV
+
+
+# Taille de la zone examinée pour détecter un fichier binaire (comme git)
+BINARY_CHECK_SIZE = 8000
+
+# Au-delà de ce nombre de différences, la recherche du diff minimal est
+# abandonnée et la zone modifiée est affichée comme remplacée en bloc
+MAX_EDIT_COST = 4096
+
+DEFAULT_CONTEXT = 3
+
+ZERO_SHA = "0" * 40
+NO_NEWLINE = "\\ No newline at end of file"
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def is_binary(data):
+    """Indique si un contenu est binaire (octet NUL au début du fichier)"""
+    return b'\0' in data[:BINARY_CHECK_SIZE]
+
+
+def split_lines(data):
+    """Découpe un contenu en lignes, en gardant les fins de ligne"""
+    return data.splitlines(keepends=True)
+
+
+def _myers(a, b):
+    """
+    Plus longue suite commune de deux séquences d'entiers (Myers, O(ND))
+
+    Args:
+        a (list): Identifiants des lignes de l'ancien contenu
+        b (list): Identifiants des lignes du nouveau contenu
+
+    Returns:
+        list: Couples (i, j) de lignes identiques, dans l'ordre, ou None si
+              le nombre de différences dépasse MAX_EDIT_COST
+    """
+    n, m = len(a), len(b)
+    max_d = min(n + m, MAX_EDIT_COST)
+    offset = max_d + 1
+    # v[offset + k] : x le plus avancé atteint sur la diagonale k = x - y
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        # État avant l'étape d, diagonales -d-1 .. d+1
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace, x, y):
+    """Remonte les étapes de _myers pour retrouver les lignes identiques"""
+    pairs = []
+    for d in range(len(trace) - 1, 0, -1):
+        state = trace[d]
+        k = x - y
+        if k == -d or (k != d and state[k - 1 + d + 1] < state[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = state[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((x, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        pairs.append((x, y))
+    pairs.reverse()
+    return pairs
+
+
+def diff_lines(a_lines, b_lines):
+    """
+    Calcule les zones modifiées entre deux listes de lignes
+
+    Args:
+        a_lines (list): Lignes de l'ancien contenu
+        b_lines (list): Lignes du nouveau contenu
+
+    Returns:
+        list: Blocs (i1, i2, j1, j2) : a_lines[i1:i2] est remplacé par b_lines[j1:j2]
+    """
+    n, m = len(a_lines), len(b_lines)
+    prefix = 0
+    while prefix < n and prefix < m and a_lines[prefix] == b_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < n - prefix and suffix < m - prefix
+           and a_lines[n - 1 - suffix] == b_lines[m - 1 - suffix]):
+        suffix += 1
+
+    # Un identifiant entier par ligne distincte
+    ids = {}
+    a = [ids.setdefault(line, len(ids)) for line in a_lines[prefix:n - suffix]]
+    b = [ids.setdefault(line, len(ids)) for line in b_lines[prefix:m - suffix]]
+
+    pairs = _myers(a, b) if a and b else []
+    if pairs is None:
+        pairs = []
+
+    blocks = []
+    i = j = 0
+    for pi, pj in pairs + [(len(a), len(b))]:
+        if pi > i or pj > j:
+            blocks.append((prefix + i, prefix + pi, prefix + j, prefix + pj))
+        i, j = pi + 1, pj + 1
+    return blocks
+
+
+def _format_range(start, length):
+    """Plage d'un en-tête de hunk ("@@ -1,3 +1,4 @@")"""
+    if length == 1:
+        return f"{start + 1}"
+    if length == 0:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def _format_line(marker, line):
+    """Ligne de hunk, suivie du marqueur de git si elle n'a pas de fin de ligne"""
+    text = marker + line.decode('utf-8', errors='replace').rstrip('\r\n')
+    if not line.endswith(b'\n'):
+        return [text, NO_NEWLINE]
+    return [text]
+
+
+def unified_hunks(a_lines, b_lines, context=DEFAULT_CONTEXT):
+    """
+    Produit les hunks d'un diff unifié
+
+    Args:
+        a_lines (list): Lignes de l'ancien contenu
+        b_lines (list): Lignes du nouveau contenu
+        context (int): Nombre de lignes de contexte autour des modifications
+
+    Returns:
+        list: Lignes du diff (en-têtes "@@" compris)
+    """
+    blocks = diff_lines(a_lines, b_lines)
+    output = []
+    start = 0
+    while start < len(blocks):
+        # Regrouper les blocs séparés par au plus 2 * context lignes identiques
+        end = start + 1
+        while end < len(blocks) and blocks[end][0] - blocks[end - 1][1] <= 2 * context:
+            end += 1
+        group = blocks[start:end]
+
+        first, last = group[0], group[-1]
+        a_start = max(0, first[0] - context)
+        a_end = min(len(a_lines), last[1] + context)
+        b_start = first[2] - (first[0] - a_start)
+        b_end = last[3] + (a_end - last[1])
+        output.append(f"@@ -{_format_range(a_start, a_end - a_start)} "
+                      f"+{_format_range(b_start, b_end - b_start)} @@")
+
+        pos = a_start
+        for i1, i2, j1, j2 in group:
+            for line in a_lines[pos:i1]:
+                output.extend(_format_line(' ', line))
+            for line in a_lines[i1:i2]:
+                output.extend(_format_line('-', line))
+            for line in b_lines[j1:j2]:
+                output.extend(_format_line('+', line))
+            pos = i2
+        for line in a_lines[pos:a_end]:
+            output.extend(_format_line(' ', line))
+        start = end
+    return output
+
+
+def _side_data(side):
+    """Contenu d'un côté du diff (lu dans les objets s'il n'est pas déjà chargé)"""
+    if side is None:
+        return b''
+    mode, sha, data = side
+    if data is None:
+        obj_type, data = read_object(sha)
+    return data
+
+
+def format_file_diff(path, old, new, context=DEFAULT_CONTEXT):
+    """
+    Diff d'un fichier au format de git
+
+    Args:
+        path (str): Chemin du fichier
+        old (tuple): (mode, sha, contenu ou None) ; None si le fichier est ajouté
+        new (tuple): (mode, sha, contenu ou None) ; None si le fichier est supprimé
+        context (int): Lignes de contexte
+
+    Returns:
+        list: Lignes du diff (vide si les deux côtés sont identiques)
+    """
+    old_mode, old_sha = (old[0], old[1]) if old else (None, ZERO_SHA)
+    new_mode, new_sha = (new[0], new[1]) if new else (None, ZERO_SHA)
+    if old_sha == new_sha and old_mode == new_mode:
+        return []
+
+    lines = [f"diff --git a/{path} b/{path}"]
+    if old is None:
+        lines.append(f"new file mode {new_mode:06o}")
+    elif new is None:
+        lines.append(f"deleted file mode {old_mode:06o}")
+    elif old_mode != new_mode:
+        lines.append(f"old mode {old_mode:06o}")
+        lines.append(f"new mode {new_mode:06o}")
+    if old_sha == new_sha:
+        return lines
+
+    index_line = f"index {old_sha[:DEFAULT_ABBREV]}..{new_sha[:DEFAULT_ABBREV]}"
+    if old is not None and new is not None and old_mode == new_mode:
+        index_line += f" {old_mode:06o}"
+    lines.append(index_line)
+
+    a_name = f"a/{path}" if old else "/dev/null"
+    b_name = f"b/{path}" if new else "/dev/null"
+    old_data = _side_data(old)
+    new_data = _side_data(new)
+    if is_binary(old_data) or is_binary(new_data):
+        lines.append(f"Binary files {a_name} and {b_name} differ")
+        return lines
+
+    lines.append(f"--- {a_name}")
+    lines.append(f"+++ {b_name}")
+    lines.extend(unified_hunks(split_lines(old_data), split_lines(new_data), context))
+    return lines
+
+
+def _tree_files(tree_sha):
+    """Fichiers d'un tree : {chemin: (mode, sha, None)}"""
+    return {path: (int(mode, 8), sha, None) for path, mode, sha in iter_tree_files(tree_sha)}
+
+
+def _index_files(index):
+    """Entrées de l'index : {chemin: (mode, sha, None)}"""
+    return {name: (entry['mode'], entry['sha'], None) for name, entry in index.items()}
+
+
+def _compare_files(old_files, new_files):
+    """Chemins qui diffèrent entre deux ensembles de fichiers, triés"""
+    changes = []
+    for path in sorted(set(old_files) | set(new_files)):
+        old, new = old_files.get(path), new_files.get(path)
+        if old is None or new is None or old[:2] != new[:2]:
+            changes.append((path, old, new))
+    return changes
+
+
+def _read_worktree_file(path):
+    """
+    Lit un fichier du working directory
+
+    Returns:
+        tuple: (mode, sha, contenu), ou None si le fichier n'existe pas
+    """
+    try:
+        mode = file_stat(path)['mode']
+        if mode == MODE_SYMLINK:
+            data = os.readlink(path).encode('utf-8', errors='surrogateescape')
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return mode, write_object('blob', data, write=False), data
+
+
+def tree_changes(old_tree, new_tree):
+    """
+    Fichiers modifiés entre deux trees (sous-dossiers identiques ignorés)
+
+    Returns:
+        list: (chemin, ancien, nouveau) avec ancien/nouveau = (mode, sha, None) ou None
+    """
+    changes = []
+    for status, path, old_mode, old_sha, new_mode, new_sha in diff_trees(old_tree, new_tree):
+        old = (int(old_mode, 8), old_sha, None) if old_mode else None
+        new = (int(new_mode, 8), new_sha, None) if new_mode else None
+        changes.append((path, old, new))
+    return changes
+
+
+def index_changes(tree_sha, index):
+    """
+    Fichiers qui diffèrent entre un tree et l'index (diff --cached)
+
+    Si l'index correspond à un tree connu (racine du cache-tree), les deux
+    trees sont comparés directement et les sous-dossiers identiques ignorés.
+    """
+    cached_root = index.cache_tree.get('')
+    if cached_root:
+        return tree_changes(tree_sha, cached_root)
+    old_files = _tree_files(tree_sha) if tree_sha else {}
+    return _compare_files(old_files, _index_files(index))
+
+
+def worktree_changes(base_files, index):
+    """
+    Fichiers du working directory qui diffèrent d'un ensemble de fichiers
+
+    Un fichier dont le stat correspond à l'index et dont l'entrée d'index a le
+    même SHA-1 que la référence n'est pas relu.
+
+    Args:
+        base_files (dict): {chemin: (mode, sha, None)} (index ou commit)
+        index (Index): Index actuel (pour les stats)
+
+    Returns:
+        list: (chemin, ancien, nouveau), nouveau contenant le contenu lu
+    """
+    changes = []
+    for path in sorted(base_files):
+        old = base_files[path]
+        entry = index.get(path)
+        if (entry is not None and entry['sha'] == old[1] and entry['mode'] == old[0]
+                and stat_matches(path, entry['stat'])):
+            continue
+        new = _read_worktree_file(path)
+        if new is None or new[:2] != old[:2]:
+            changes.append((path, old, new))
+    return changes
+
+
+def show_diff(revisions=None, cached=False, context=DEFAULT_CONTEXT):
+    """
+    Affiche un diff unifié
+
+    Args:
+        revisions (list): Zéro, une ou deux références de commit
+        cached (bool): Comparer l'index à un commit (HEAD par défaut)
+        context (int): Lignes de contexte autour des modifications
+
+    Returns:
+        bool: True si succès, False si une référence est invalide
+    """
+    revisions = list(revisions or [])
+    if len(revisions) > 2 or (cached and len(revisions) > 1):
+        print("Usage: gitBis diff [--cached] [<commit> [<commit>]]")
+        return False
+
+    trees = []
+    for rev in revisions:
+        tree = resolve_tree(rev)
+        if tree is None:
+            print(f"fatal: ambiguous argument '{rev}': unknown revision or path not in the working tree.")
+            return False
+        trees.append(tree)
+
+    if len(trees) == 2:
+        changes = tree_changes(trees[0], trees[1])
+    else:
+        index = read_index_file()
+        if cached:
+            # Sans commit (dépôt vide), l'index est comparé à un tree vide
+            tree = trees[0] if trees else resolve_tree("HEAD")
+            changes = index_changes(tree, index)
+        elif trees:
+            base = _tree_files(trees[0])
+            changes = worktree_changes(base, index)
+            # Fichiers ajoutés à l'index mais absents du commit
+            for path in index:
+                if path not in base:
+                    new = _read_worktree_file(path)
+                    if new is not None:
+                        changes.append((path, None, new))
+            changes.sort(key=lambda change: change[0])
+        else:
+            changes = worktree_changes(_index_files(index), index)
+
+    for path, old, new in changes:
+        for line in format_file_diff(path, old, new, context):
+            print(line)
+    return True
+
+
+def main():
+    """Fonction principale pour la commande diff"""
+    args = sys.argv[1:]
+    cached = False
+    context = DEFAULT_CONTEXT
+    revisions = []
+    for arg in args:
+        if arg in ("--cached", "--staged"):
+            cached = True
+        elif arg.startswith("-U") and arg[2:].isdigit():
+            context = int(arg[2:])
+        else:
+            revisions.append(arg)
+    if not show_diff(revisions, cached, context):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Module pour la commande diff-tree
+Compare deux objets tree sans les aplatir.
+
+Les deux trees sont parcourus en parallèle, dans l'ordre des entrées (celui
+de git : un dossier "a" est comparé comme "a/"). Un sous-tree dont le SHA-1
+est le même des deux côtés est identique : il n'est ni lu ni parcouru. Le coût
+dépend donc du nombre de dossiers modifiés, pas de la taille des trees.
+"""
+
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.objects import read_object, iter_tree_entries, is_tree_mode
+
+
+ZERO_SHA = "0" * 40
+ZERO_MODE = "000000"
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def _sort_key(mode, name):
+    """Clé de tri de git : les dossiers sont comparés avec un "/" final"""
+    key = name.encode('utf-8', errors='surrogateescape')
+    return key + b'/' if is_tree_mode(mode) else key
+
+
+def read_tree_entries(tree_sha):
+    """
+    Entrées d'un tree triées dans l'ordre de git
+
+    Args:
+        tree_sha (str): SHA-1 du tree (None : tree vide)
+
+    Returns:
+        list: Tuples (clé_de_tri, mode, nom, sha)
+    """
+    if tree_sha is None:
+        return []
+    obj_type, content = read_object(tree_sha)
+    if obj_type != 'tree':
+        raise ValueError(f"Object {tree_sha} is not a tree")
+    entries = [(_sort_key(mode, name), mode, name, sha)
+               for mode, name, sha in iter_tree_entries(content)]
+    entries.sort()
+    return entries
+
+
+def _normalize_mode(mode):
+    """Mode sur 6 chiffres, comme dans la sortie de git ("40000" -> "040000")"""
+    return mode.rjust(6, '0')
+
+
+def normalize_paths(paths):
+    """
+    Normalise une liste de chemins ("./src/" -> "src")
+
+    Returns:
+        list: Chemins normalisés, ou None si l'un d'eux désigne tout le dépôt
+    """
+    if not paths:
+        return None
+    normalized = []
+    for path in paths:
+        path = os.path.normpath(path).replace(os.sep, '/')
+        if path == '.':
+            return None
+        normalized.append(path)
+    return normalized
+
+
+def _path_selected(path, is_tree, paths):
+    """
+    Indique si une entrée est concernée par les chemins demandés
+
+    Une entrée est concernée si elle est l'un des chemins, se trouve dessous,
+    ou (pour un dossier) en contient un.
+    """
+    for wanted in paths:
+        if path == wanted or path.startswith(wanted + '/'):
+            return True
+        if is_tree and wanted.startswith(path + '/'):
+            return True
+    return False
+
+
+def diff_trees(old_tree, new_tree, prefix='', recursive=True, paths=None):
+    """
+    Compare deux trees et produit les entrées ajoutées, modifiées ou supprimées
+
+    Avec paths, seules les entrées le long de ces chemins sont lues : le coût
+    dépend de la profondeur des chemins, pas de la taille des trees.
+
+    Args:
+        old_tree (str): SHA-1 du tree de départ (None : tree vide)
+        new_tree (str): SHA-1 du tree d'arrivée (None : tree vide)
+        prefix (str): Préfixe ajouté aux chemins (ex : "dossier/")
+        recursive (bool): Descendre dans les sous-trees modifiés ; sinon un
+                          sous-tree modifié est produit comme une seule entrée
+        paths (list): Limiter la comparaison à ces chemins (voir normalize_paths)
+
+    Yields:
+        tuple: (statut, chemin, ancien_mode, ancien_sha, nouveau_mode, nouveau_sha)
+               avec statut 'A' (ajouté), 'M' (modifié) ou 'D' (supprimé) ;
+               le mode et le sha du côté absent valent None
+    """
+    if old_tree == new_tree:
+        return
+
+    old_entries = read_tree_entries(old_tree)
+    new_entries = read_tree_entries(new_tree)
+    i = j = 0
+    while i < len(old_entries) or j < len(new_entries):
+        old = old_entries[i] if i < len(old_entries) else None
+        new = new_entries[j] if j < len(new_entries) else None
+
+        if new is None or (old is not None and old[0] < new[0]):
+            _, mode, name, sha = old
+            i += 1
+            if paths is None or _path_selected(prefix + name, is_tree_mode(mode), paths):
+                yield from _one_side('D', prefix + name, mode, sha, recursive, paths)
+        elif old is None or new[0] < old[0]:
+            _, mode, name, sha = new
+            j += 1
+            if paths is None or _path_selected(prefix + name, is_tree_mode(mode), paths):
+                yield from _one_side('A', prefix + name, mode, sha, recursive, paths)
+        else:
+            i += 1
+            j += 1
+            _, old_mode, name, old_sha = old
+            _, new_mode, _, new_sha = new
+            if old_sha == new_sha and _normalize_mode(old_mode) == _normalize_mode(new_mode):
+                # Entrée (ou sous-tree entier) identique : rien à lire
+                continue
+            path = prefix + name
+            if paths is not None and not _path_selected(path, is_tree_mode(old_mode), paths):
+                continue
+            if is_tree_mode(old_mode) and recursive:
+                yield from diff_trees(old_sha, new_sha, path + '/', recursive, paths)
+            else:
+                yield ('M', path, old_mode, old_sha, new_mode, new_sha)
+
+
+def _one_side(status, path, mode, sha, recursive, paths=None):
+    """Entrée présente d'un seul côté ; un sous-tree est détaillé fichier par fichier"""
+    if is_tree_mode(mode) and recursive:
+        if status == 'A':
+            yield from diff_trees(None, sha, path + '/', recursive, paths)
+        else:
+            yield from diff_trees(sha, None, path + '/', recursive, paths)
+    elif status == 'A':
+        yield ('A', path, None, None, mode, sha)
+    else:
+        yield ('D', path, mode, sha, None, None)
+
+
+def resolve_tree(ref):
+    """
+    Résout une référence (commit, tree, branche, SHA-1 abrégé) en tree
+
+    Args:
+        ref (str): Référence à résoudre
+
+    Returns:
+        str: SHA-1 du tree, ou None si la référence est invalide
+    """
+    from src.commands.rev_parse import rev_parse
+    sha = rev_parse(ref)
+    if not sha:
+        return None
+    try:
+        obj_type, content = read_object(sha)
+    except (ValueError, FileNotFoundError):
+        return None
+    if obj_type == 'tree':
+        return sha
+    if obj_type == 'commit':
+        from src.commands.commit_graph import lookup_commit
+        return lookup_commit(sha)['tree']
+    return None
+
+
+def format_change(change):
+    """
+    Formate une entrée au format "raw" de git diff-tree
+
+    Returns:
+        str: ":<ancien_mode> <nouveau_mode> <ancien_sha> <nouveau_sha> <statut>\\t<chemin>"
+    """
+    status, path, old_mode, old_sha, new_mode, new_sha = change
+    old_mode = _normalize_mode(old_mode) if old_mode else ZERO_MODE
+    new_mode = _normalize_mode(new_mode) if new_mode else ZERO_MODE
+    return f":{old_mode} {new_mode} {old_sha or ZERO_SHA} {new_sha or ZERO_SHA} {status}\t{path}"
+
+
+def show_diff_tree(old_ref, new_ref, recursive=False):
+    """
+    Affiche les différences entre deux trees (ou commits)
+
+    Args:
+        old_ref (str): Tree ou commit de départ
+        new_ref (str): Tree ou commit d'arrivée
+        recursive (bool): Descendre dans les sous-dossiers (-r)
+
+    Returns:
+        bool: True si succès, False si une référence est invalide
+    """
+    old_tree = resolve_tree(old_ref)
+    if old_tree is None:
+        print(f"fatal: Not a valid object name '{old_ref}'")
+        return False
+    new_tree = resolve_tree(new_ref)
+    if new_tree is None:
+        print(f"fatal: Not a valid object name '{new_ref}'")
+        return False
+
+    for change in diff_trees(old_tree, new_tree, recursive=recursive):
+        print(format_change(change))
+    return True
+
+
+def main():
+    """Fonction principale pour la commande diff-tree"""
+    args = sys.argv[1:]
+    recursive = '-r' in args
+    refs = [arg for arg in args if arg != '-r']
+    if len(refs) != 2:
+        print("Usage: gitBis diff-tree [-r] <tree-ish> <tree-ish>")
+        sys.exit(1)
+    if not show_diff_tree(refs[0], refs[1], recursive):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
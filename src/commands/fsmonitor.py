@@ -0,0 +1,634 @@
+"""
+Module pour le démon fsmonitor (surveillance du working directory)
+
+Même avec le stat de l'index, status fait un lstat par fichier suivi. Le démon
+fsmonitor, lancé à part (gitBis fsmonitor start), surveille le working
+directory et note chaque chemin modifié dans un journal numéroté :
+- inotify (Linux, via ctypes), ou à défaut un parcours périodique qui compare
+  le stat de chaque fichier (--polling)
+- un jeton "<identifiant du démon>:<numéro>" désigne un instant du journal ;
+  status l'enregistre dans l'index et demande au démon, la fois suivante, les
+  chemins modifiés depuis ce jeton
+- les requêtes passent par un socket Unix (.mon_git/fsmonitor.sock), une
+  requête JSON par ligne et une réponse JSON par ligne :
+  {"command": "query", "token": ...} -> {"token": ..., "paths": [...]}
+- "paths" vaut null si le jeton est inconnu ou périmé (démon relancé, journal
+  tronqué, débordement d'inotify) : il faut alors tout vérifier
+
+Avant de répondre, le démon crée un fichier "cookie" dans .mon_git et attend
+de le voir passer : tous les événements antérieurs à la requête ont alors été
+notés. Sans démon, status et add -u vérifient tous les fichiers, comme avant.
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import select
+import socket
+import struct
+import threading
+import subprocess
+from collections import deque
+
+from .scanner import SKIPPED_DIRS
+
+
+SOCKET_NAME = "fsmonitor.sock"
+COOKIE_PREFIX = "fsmonitor-cookie-"
+
+# Événements gardés en mémoire ; les jetons plus anciens sont périmés
+MAX_EVENTS = 100000
+# Attente maximale du cookie côté démon, et d'une réponse côté client (s)
+SYNC_TIMEOUT = 1.0
+CLIENT_TIMEOUT = 3.0
+POLL_INTERVAL = 1.0
+
+# Script lancé en arrière-plan par "fsmonitor start"
+GITBIS_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "gitBis.py")
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONTFOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# wd, mask, cookie, taille du nom (struct inotify_event)
+EVENT_FORMAT = 'iIII'
+EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def get_socket_path():
+    """Retourne le chemin du socket du démon"""
+    return os.path.join(get_git_dir(), SOCKET_NAME)
+
+
+class ChangeLog:
+    """Journal des chemins modifiés, numérotés dans l'ordre des événements"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        # Nouvel identifiant à chaque lancement : les jetons d'un ancien démon
+        # ne sont jamais acceptés
+        self.daemon_id = os.urandom(8).hex()
+        self.max_events = max_events
+        self.seq = 0
+        # Les jetons antérieurs à ce numéro ont perdu des événements
+        self.oldest = 0
+        self.events = deque()
+        self.lock = threading.Lock()
+
+    def record(self, path):
+        """Note un chemin modifié ('' : tout le working directory)"""
+        with self.lock:
+            if not path:
+                self._reset()
+                return
+            self.seq += 1
+            self.events.append((self.seq, path))
+            if len(self.events) > self.max_events:
+                self.oldest = self.events.popleft()[0]
+
+    def reset(self):
+        """Tout a pu changer (débordement) : les jetons existants sont périmés"""
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.seq += 1
+        self.oldest = self.seq
+        self.events.clear()
+
+    def token(self):
+        """Jeton de l'instant présent"""
+        with self.lock:
+            return f"{self.daemon_id}:{self.seq}"
+
+    def changes_since(self, token):
+        """
+        Args:
+            token (str): Jeton d'une réponse précédente (ou None)
+
+        Returns:
+            tuple: (jeton actuel, chemins modifiés depuis token triés, ou None
+                   si le jeton est inconnu ou périmé)
+        """
+        with self.lock:
+            current = f"{self.daemon_id}:{self.seq}"
+            daemon_id, _, seq = (token or '').partition(':')
+            if daemon_id != self.daemon_id or not seq.isdigit():
+                return current, None
+            seq = int(seq)
+            if seq < self.oldest or seq > self.seq:
+                return current, None
+            return current, sorted({path for event_seq, path in self.events if event_seq > seq})
+
+
+class ChangedPaths:
+    """Chemins signalés par le démon, avec les dossiers qui les contiennent"""
+
+    def __init__(self, paths):
+        self.paths = set(paths)
+        # Dossiers dont le contenu a pu changer ('' = racine)
+        self.dirs = {''}
+        for path in self.paths:
+            parts = path.split('/')
+            for i in range(1, len(parts)):
+                self.dirs.add('/'.join(parts[:i]))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        """Le chemin, ou un dossier qui le contient (créé, renommé...), a changé"""
+        while path:
+            if path in self.paths:
+                return True
+            path = path.rpartition('/')[0]
+        return False
+
+    def touches_dir(self, directory):
+        """Une entrée du dossier a pu être créée, supprimée ou modifiée"""
+        return directory in self.dirs or directory in self
+
+
+def _load_libc():
+    """libc avec les fonctions inotify, ou OSError si elles sont absentes"""
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError) as e:
+        raise OSError(errno.ENOSYS, f"inotify indisponible : {e}")
+    return libc
+
+
+class InotifyWatcher:
+    """Surveillance par inotify : un watch par dossier du working directory"""
+
+    name = "inotify"
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+            | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONTFOLLOW | IN_EXCL_UNLINK)
+
+    def __init__(self, changes):
+        """
+        Raises:
+            OSError: Si inotify n'est pas disponible
+        """
+        import ctypes
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 : {os.strerror(err)}")
+        self.changes = changes
+        # {wd: dossier surveillé ('' = racine)}
+        self._wds = {}
+        self._cookie_wd = None
+        self._cookie_count = 0
+        self._seen_cookies = set()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _add_watch(self, path, mask):
+        """Retourne le wd, ou None si le dossier a disparu"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        return wd if wd >= 0 else None
+
+    def _watch_tree(self, directory):
+        """Surveille un dossier et tous ses sous-dossiers"""
+        wd = self._add_watch(directory or '.', self.MASK)
+        if wd is None:
+            return
+        self._wds[wd] = directory
+        prefix = directory + '/' if directory else ''
+        try:
+            with os.scandir(directory or '.') as it:
+                subdirs = [entry.name for entry in it
+                           if entry.is_dir(follow_symlinks=False) and entry.name not in SKIPPED_DIRS]
+        except OSError:
+            return
+        for name in subdirs:
+            self._watch_tree(prefix + name)
+
+    def start(self):
+        self._watch_tree('')
+        # Seules les créations de cookies sont suivies dans .mon_git
+        self._cookie_wd = self._add_watch(get_git_dir(), IN_CREATE | IN_MOVED_TO | IN_ONLYDIR)
+        self._thread = threading.Thread(target=self._run, name="fsmonitor-inotify", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        os.close(self._fd)
+
+    def _run(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.2)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            self._process(data)
+
+    def _process(self, data):
+        """Décode un bloc d'événements et les note dans le journal"""
+        pos = 0
+        while pos + EVENT_SIZE <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from(EVENT_FORMAT, data, pos)
+            name = os.fsdecode(data[pos + EVENT_SIZE:pos + EVENT_SIZE + length].rstrip(b'\0'))
+            pos += EVENT_SIZE + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Événements perdus par le noyau
+                self.changes.reset()
+                continue
+            if wd == self._cookie_wd:
+                if name.startswith(COOKIE_PREFIX):
+                    with self._cond:
+                        self._seen_cookies.add(name)
+                        self._cond.notify_all()
+                continue
+            directory = self._wds.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # Dossier supprimé : son parent a reçu l'événement
+                del self._wds[wd]
+                continue
+            if not name:
+                # Événement sur le dossier lui-même (IN_DELETE_SELF, IN_ATTRIB...)
+                self.changes.record(directory)
+                continue
+            if not directory and name in SKIPPED_DIRS:
+                continue
+            path = directory + '/' + name if directory else name
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Nouveau dossier : surveillé à son tour ; son contenu créé avant
+                # le watch est couvert par le chemin du dossier
+                self._watch_tree(path)
+            self.changes.record(path)
+
+    def sync(self, timeout=SYNC_TIMEOUT):
+        """
+        Attend que tous les événements antérieurs à l'appel soient notés
+
+        Returns:
+            bool: False si le cookie n'a pas été vu à temps
+        """
+        with self._cond:
+            self._cookie_count += 1
+            name = f"{COOKIE_PREFIX}{os.getpid()}-{self._cookie_count}"
+        path = os.path.join(get_git_dir(), name)
+        try:
+            open(path, 'w').close()
+        except OSError:
+            return False
+        try:
+            with self._cond:
+                return self._cond.wait_for(lambda: name in self._seen_cookies, timeout)
+        finally:
+            with self._cond:
+                self._seen_cookies.discard(name)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class PollingWatcher:
+    """Surveillance par parcours périodique (sans inotify)"""
+
+    name = "polling"
+
+    def __init__(self, changes, interval=POLL_INTERVAL):
+        self.changes = changes
+        self.interval = interval
+        self._snapshot = {}
+        self._started = 0
+        self._done = 0
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _take_snapshot(self):
+        """
+        Returns:
+            dict: {chemin: stat} de chaque fichier et dossier ; pour un dossier
+                  seul l'inode compte (ses entrées sont comparées une à une)
+        """
+        snapshot = {}
+        stack = ['']
+        while stack:
+            directory = stack.pop()
+            prefix = directory + '/' if directory else ''
+            try:
+                with os.scandir(directory or '.') as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name in SKIPPED_DIRS:
+                    continue
+                path = prefix + entry.name
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    snapshot[path] = (st.st_ino,)
+                    stack.append(path)
+                else:
+                    snapshot[path] = (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino, st.st_mode)
+        return snapshot
+
+    def start(self):
+        self._snapshot = self._take_snapshot()
+        self._thread = threading.Thread(target=self._run, name="fsmonitor-polling", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                self._started += 1
+                number = self._started
+            snapshot = self._take_snapshot()
+            old = self._snapshot
+            for path in sorted(old.keys() | snapshot.keys()):
+                if old.get(path) != snapshot.get(path):
+                    self.changes.record(path)
+            self._snapshot = snapshot
+            with self._cond:
+                self._done = number
+                self._cond.notify_all()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def sync(self, timeout=SYNC_TIMEOUT):
+        """Attend la fin d'un parcours commencé après l'appel"""
+        with self._cond:
+            target = self._started + 1
+            self._wake.set()
+            return self._cond.wait_for(lambda: self._done >= target, timeout)
+
+
+def create_watcher(changes, kind="auto"):
+    """
+    Args:
+        changes (ChangeLog): Journal à remplir
+        kind (str): "inotify", "polling" ou "auto" (inotify si disponible)
+
+    Returns:
+        InotifyWatcher ou PollingWatcher
+    """
+    if kind == "polling":
+        return PollingWatcher(changes)
+    try:
+        return InotifyWatcher(changes)
+    except OSError:
+        if kind == "inotify":
+            raise
+        return PollingWatcher(changes)
+
+
+class FsmonitorDaemon:
+    """Démon fsmonitor : surveillance du working directory et socket de requêtes"""
+
+    def __init__(self, watcher="auto"):
+        self.changes = ChangeLog()
+        self.watcher = create_watcher(self.changes, watcher)
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+
+    def handle(self, request):
+        """
+        Traite une requête décodée
+
+        Returns:
+            dict: Réponse à renvoyer au client
+        """
+        command = request.get('command')
+        if command == 'query':
+            synced = self.watcher.sync()
+            token, paths = self.changes.changes_since(request.get('token'))
+            return {'token': token, 'paths': paths if synced else None}
+        if command == 'status':
+            return {'watcher': self.watcher.name, 'token': self.changes.token(), 'pid': os.getpid()}
+        if command == 'stop':
+            self._stop.set()
+            return {'stopped': True}
+        return {'error': f"commande inconnue : {command}"}
+
+    def _serve_connection(self, conn):
+        """Répond aux requêtes d'une connexion, une ligne JSON à la fois"""
+        with conn:
+            conn.settimeout(CLIENT_TIMEOUT)
+            try:
+                for line in conn.makefile('rb'):
+                    try:
+                        response = self.handle(json.loads(line))
+                    except (ValueError, AttributeError):
+                        response = {'error': "requête invalide"}
+                    conn.sendall(json.dumps(response).encode() + b'\n')
+            except OSError:
+                pass
+
+    def wait_ready(self, timeout=None):
+        """Attend que le socket accepte les connexions"""
+        return self._ready.wait(timeout)
+
+    def shutdown(self):
+        self._stop.set()
+
+    def serve_forever(self):
+        """
+        Lance la surveillance et répond aux requêtes jusqu'à "stop"
+
+        IMPACT SUR .MON_GIT :
+        - Crée .mon_git/fsmonitor.sock, supprimé à l'arrêt
+        - Crée et supprime des fichiers .mon_git/fsmonitor-cookie-*
+        """
+        path = get_socket_path()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if os.path.exists(path):
+                # Socket d'un démon arrêté brutalement
+                os.remove(path)
+            server.bind(path)
+            server.listen()
+            server.settimeout(0.2)
+            self.watcher.start()
+            self._ready.set()
+            while not self._stop.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(path):
+                os.remove(path)
+            self.watcher.stop()
+
+
+def send_request(request, timeout=CLIENT_TIMEOUT):
+    """
+    Envoie une requête au démon
+
+    Returns:
+        dict: Réponse, ou None si aucun démon ne répond
+    """
+    path = get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(path)
+            client.sendall(json.dumps(request).encode() + b'\n')
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data)
+    except (OSError, ValueError):
+        return None
+
+
+def query_changes(token):
+    """
+    Chemins modifiés depuis un jeton
+
+    Args:
+        token (str): Jeton enregistré dans l'index (ou None)
+
+    Returns:
+        tuple: (nouveau jeton, ChangedPaths) ; ChangedPaths vaut None s'il
+               faut tout vérifier, et le jeton vaut None sans démon
+    """
+    response = send_request({'command': 'query', 'token': token})
+    if not response or 'token' not in response:
+        return None, None
+    paths = response.get('paths')
+    return response['token'], ChangedPaths(paths) if paths is not None else None
+
+
+def start_daemon(watcher="auto"):
+    """
+    Lance le démon en arrière-plan (gitBis fsmonitor run)
+
+    Returns:
+        bool: True si le démon répond
+    """
+    if not os.path.isdir(get_git_dir()):
+        print(f"Erreur : ce répertoire n'est pas un dépôt Git ('{get_git_dir()}' manquant).")
+        return False
+    if send_request({'command': 'status'}) is not None:
+        print("fsmonitor est déjà lancé")
+        return True
+    command = [sys.executable, GITBIS_SCRIPT, "fsmonitor", "run"]
+    if watcher != "auto":
+        command.append(f"--{watcher}")
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        status = send_request({'command': 'status'})
+        if status is not None:
+            print(f"fsmonitor lancé ({status['watcher']}, pid {status['pid']})")
+            return True
+        time.sleep(0.05)
+    print("Erreur : fsmonitor ne répond pas")
+    return False
+
+
+def stop_daemon():
+    """Arrête le démon, retourne False s'il ne tournait pas"""
+    if send_request({'command': 'stop'}) is None:
+        print("fsmonitor n'est pas lancé")
+        return False
+    # Le démon répond avant de fermer son socket
+    deadline = time.monotonic() + 5
+    while os.path.exists(get_socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print("fsmonitor arrêté")
+    return True
+
+
+def show_status():
+    """Affiche l'état du démon"""
+    status = send_request({'command': 'status'})
+    if status is None:
+        print("fsmonitor n'est pas lancé")
+        return False
+    print(f"fsmonitor actif ({status['watcher']}, pid {status['pid']}, jeton {status['token']})")
+    return True
+
+
+def run_daemon(watcher="auto"):
+    """Exécute le démon au premier plan jusqu'à "fsmonitor stop" """
+    if send_request({'command': 'status'}) is not None:
+        print("fsmonitor est déjà lancé")
+        return False
+    try:
+        FsmonitorDaemon(watcher).serve_forever()
+    except OSError as e:
+        print(f"Erreur fsmonitor : {e}")
+        return False
+    return True
+
+
+def fsmonitor(action, watcher="auto"):
+    """
+    Commande fsmonitor
+
+    Args:
+        action (str): "start", "stop", "status" ou "run" (premier plan)
+        watcher (str): "auto", "inotify" ou "polling"
+    """
+    if action == "start":
+        return start_daemon(watcher)
+    if action == "stop":
+        return stop_daemon()
+    if action == "status":
+        return show_status()
+    if action == "run":
+        return run_daemon(watcher)
+    print(f"Action inconnue : {action}")
+    return False
@@ -1,12 +1,13 @@
 import os
 import re
-import fnmatch
+
+GITIGNORE_FILE = ".gitignore"
 
 def read_gitignore():
     """Lit le fichier .gitignore et retourne la liste des patterns"""
-    gitignore_path = ".gitignore"
+    gitignore_path = GITIGNORE_FILE
     patterns = []
-    
+
     if os.path.exists(gitignore_path):
         try:
             with open(gitignore_path, 'r') as f:
@@ -17,43 +18,259 @@ def read_gitignore():
                         patterns.append(line)
         except Exception as e:
             print(f"Erreur lors de la lecture de .gitignore: {e}")
-    
+
     return patterns
 
+def _translate_glob(pattern):
+    """
+    Traduit un pattern gitignore en expression régulière
+
+    - '*' et '?' ne traversent pas les '/'
+    - '**/' au début ou entre deux '/' : zéro ou plusieurs dossiers
+    - '/**' à la fin : tout le contenu du dossier
+    - '[...]' : classe de caractères ('!' ou '^' pour la négation)
+    - '\\' : le caractère suivant est pris littéralement
+
+    Returns:
+        str: Expression régulière (sans groupe capturant)
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i) and (i == 0 or pattern[i - 1] == '/'):
+                if pattern[i + 2:i + 3] == '/':
+                    out.append('(?:.*/)?')
+                    i += 3
+                    continue
+                if i + 2 == n:
+                    out.append('.*')
+                    i += 2
+                    continue
+            while i + 1 < n and pattern[i + 1] == '*':
+                i += 1
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = i + 1
+            if end < n and pattern[end] in '!^':
+                end += 1
+            if end < n and pattern[end] == ']':
+                end += 1
+            while end < n and pattern[end] != ']':
+                end += 1
+            if end >= n:
+                out.append(re.escape(c))
+            else:
+                content = pattern[i + 1:end]
+                if content[:1] in ('!', '^'):
+                    content = '^/' + content[1:]
+                out.append('[' + content.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+def parse_pattern(line):
+    """
+    Analyse une ligne de .gitignore
+
+    Args:
+        line (str): Ligne du fichier
+
+    Returns:
+        tuple: (regex, négation, dossier_seulement), ou None pour une ligne
+               vide ou un commentaire
+    """
+    line = line.rstrip('\r\n')
+    # Les espaces finaux sont ignorés, sauf s'ils sont échappés
+    while line.endswith(' ') and not line.endswith('\\ '):
+        line = line[:-1]
+    if not line or line.startswith('#'):
+        return None
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    # Un '/' ailleurs qu'à la fin ancre le pattern au dossier du .gitignore
+    anchored = '/' in line
+    if line.startswith('/'):
+        line = line[1:]
+    if not line:
+        return None
+    regex = _translate_glob(line)
+    if not anchored:
+        # Sans '/', le pattern s'applique au nom à n'importe quelle profondeur
+        regex = '(?:.*/)?' + regex
+    return regex, negated, dir_only
+
+class IgnoreRules:
+    """Patterns d'un fichier .gitignore, compilés en une expression par type d'entrée"""
+
+    def __init__(self, lines):
+        self.rules = [rule for rule in map(parse_pattern, lines) if rule]
+        self._file_regex = self._compile([i for i, rule in enumerate(self.rules) if not rule[2]])
+        self._dir_regex = self._compile(range(len(self.rules)))
+
+    def _compile(self, indexes):
+        """
+        Combine des patterns en une seule expression
+
+        Les patterns sont placés dans l'ordre inverse : la première alternative
+        qui correspond est donc le dernier pattern du fichier, celui qui
+        l'emporte dans git.
+        """
+        parts = [f"(?P<r{i}>{self.rules[i][0]})" for i in reversed(list(indexes))]
+        return re.compile('|'.join(parts), re.DOTALL) if parts else None
+
+    def match(self, path, is_dir=False):
+        """
+        Args:
+            path (str): Chemin relatif au dossier du .gitignore ('/' comme séparateur)
+            is_dir (bool): Le chemin est un dossier
+
+        Returns:
+            bool: True si ignoré, False si ré-inclus par '!', None si aucun
+                  pattern ne correspond
+        """
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return None
+        match = regex.fullmatch(path)
+        if match is None:
+            return None
+        return not self.rules[int(match.lastgroup[1:])][1]
+
+def load_ignore_rules(path):
+    """
+    Lit et compile un fichier .gitignore
+
+    Returns:
+        IgnoreRules: Règles du fichier, ou None s'il n'existe pas
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+            return IgnoreRules(f.readlines())
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return None
+    except OSError as e:
+        print(f"Erreur lors de la lecture de {path}: {e}")
+        return None
+
+class IgnoreMatcher:
+    """
+    Décide si un chemin du working directory est ignoré
+
+    Chaque .gitignore (racine et sous-dossiers) est lu et compilé une seule
+    fois, au premier chemin de son dossier. Comme dans git :
+    - le .gitignore le plus profond l'emporte, et dans un fichier le dernier
+      pattern qui correspond
+    - un pattern '!' ré-inclut un chemin
+    - tout ce qui se trouve sous un dossier ignoré est ignoré : un parcours
+      qui consulte is_ignored avant d'entrer dans un dossier n'a pas besoin
+      de le lister
+    """
+
+    def __init__(self, root='.', patterns=None):
+        """
+        Args:
+            root (str): Racine du working directory
+            patterns (list): Patterns de la racine ; s'ils sont donnés, les
+                             fichiers .gitignore ne sont pas lus
+        """
+        self.root = root
+        self._rules = {}
+        self._ignored_dirs = {}
+        if patterns is not None:
+            self._rules[''] = IgnoreRules(patterns)
+            self._nested = False
+        else:
+            self._nested = True
+
+    def rules_for(self, directory):
+        """Règles du .gitignore d'un dossier ('' = racine), ou None"""
+        if directory not in self._rules:
+            if self._nested:
+                path = os.path.join(self.root, directory, GITIGNORE_FILE)
+                self._rules[directory] = load_ignore_rules(path)
+            else:
+                self._rules[directory] = None
+        return self._rules[directory]
+
+    def _match(self, path, is_dir):
+        """Applique les .gitignore du plus profond au plus proche de la racine"""
+        parts = path.split('/')
+        for depth in range(len(parts) - 1, -1, -1):
+            rules = self.rules_for('/'.join(parts[:depth]))
+            if rules is None:
+                continue
+            result = rules.match('/'.join(parts[depth:]), is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def is_dir_ignored(self, directory):
+        """Indique si un dossier (ou l'un de ses parents) est ignoré"""
+        ignored = self._ignored_dirs.get(directory)
+        if ignored is None:
+            parent = directory.rpartition('/')[0]
+            ignored = (bool(parent) and self.is_dir_ignored(parent)) or self._match(directory, True)
+            self._ignored_dirs[directory] = ignored
+        return ignored
+
+    def is_ignored(self, path, is_dir=False):
+        """
+        Args:
+            path (str): Chemin relatif à la racine
+            is_dir (bool): Le chemin est un dossier
+
+        Returns:
+            bool: True si le chemin est ignoré
+        """
+        path = normalize_path(path)
+        if not path:
+            return False
+        if is_dir:
+            return self.is_dir_ignored(path)
+        parent = path.rpartition('/')[0]
+        if parent and self.is_dir_ignored(parent):
+            return True
+        return self._match(path, False)
+
+def normalize_path(path):
+    """Chemin relatif avec des '/' ("./src\\a.py" -> "src/a.py")"""
+    path = path.replace(os.sep, '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path.rstrip('/') if path != '.' else ''
+
+_pattern_matchers = {}
+
+def _matcher_for_patterns(patterns):
+    """Matcher compilé pour une liste de patterns (réutilisé entre les appels)"""
+    key = tuple(patterns)
+    matcher = _pattern_matchers.get(key)
+    if matcher is None:
+        matcher = IgnoreMatcher(patterns=list(patterns))
+        _pattern_matchers.clear()
+        _pattern_matchers[key] = matcher
+    return matcher
+
 def should_ignore(path, patterns):
     """Détermine si un fichier/dossier doit être ignoré selon les patterns"""
-    # Normaliser le chemin pour utiliser des slashes
-    normalized_path = path.replace(os.sep, '/')
-    
-    for pattern in patterns:
-        # Gérer les patterns avec des wildcards
-        if fnmatch.fnmatch(normalized_path, pattern):
-            return True
-        
-        # Gérer les patterns qui se terminent par /
-        if pattern.endswith('/'):
-            if normalized_path.startswith(pattern[:-1]) or normalized_path == pattern[:-1]:
-                return True
-        
-        # Gérer les patterns qui commencent par /
-        if pattern.startswith('/'):
-            if normalized_path.endswith(pattern[1:]) or normalized_path == pattern[1:]:
-                return True
-        
-        # Gérer les patterns simples
-        if pattern in normalized_path:
-            return True
-    
-    return False
+    return _matcher_for_patterns(patterns).is_ignored(path, is_dir=os.path.isdir(path))
 
 def filter_ignored_files(files, patterns):
     """Filtre une liste de fichiers en excluant ceux qui correspondent aux patterns"""
     if not patterns:
         return files
-    
-    filtered_files = []
-    for file_path in files:
-        if not should_ignore(file_path, patterns):
-            filtered_files.append(file_path)
-    
-    return filtered_files 
\ No newline at end of file
+
+    matcher = _matcher_for_patterns(patterns)
+    return [file_path for file_path in files if not matcher.is_ignored(file_path)]
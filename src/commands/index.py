@@ -1,66 +1,688 @@
-# gestion de l'index (staging area)
+#!/usr/bin/env python3
+"""
+Module pour l'index (staging area)
+Lecture et écriture de l'index binaire .mon_git/index, au format "DIRC" v2 de git :
+
+- en-tête : signature DIRC, version, nombre d'entrées
+- entrées triées par chemin : champs stat et mode sur 32 bits, SHA-1 sur
+  20 octets, flags, chemin terminé par des NUL (alignement sur 8 octets)
+- extension optionnelle "TREE" (cache-tree) : SHA des trees déjà calculés
+  par write-tree, pour ne réécrire que les dossiers modifiés
+- extension optionnelle "UNTC" (cache des fichiers non suivis) : pour chaque
+  dossier, son mtime et les fichiers non suivis qu'il contenait, pour que
+  status ne relise que les dossiers modifiés
+- extension optionnelle "FSMT" : jeton du démon fsmonitor correspondant au
+  dernier status (les fichiers modifiés depuis sont demandés au démon)
+- somme de contrôle SHA-1 de tout le fichier à la fin
+
+C'est le seul format lu et écrit par add, status, reset et commit. Les anciens
+formats (index.txt "mode|hash|filename", index "sha filename" de reset, index
+JSON) sont convertis automatiquement à la première lecture.
+"""
 
 import os
 import json
-from . import create_tree, hash_object
-INDEX_PATH = '.mon_git/index'
+import time
+import struct
+import hashlib
+from bisect import bisect_left
+
+from .lockfile import LockFile, LockError
+
+
+INDEX_SIGNATURE = b'DIRC'
+INDEX_VERSION = 2
+
+# ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size, sha, flags
+ENTRY_FORMAT = '>10I20sH'
+ENTRY_HEADER_SIZE = struct.calcsize(ENTRY_FORMAT)
+NAME_MASK = 0xfff
+
+EXT_CACHE_TREE = b'TREE'
+# Format propre à mon_git (l'extension "UNTR" de git est différente) : la
+# majuscule initiale la rend optionnelle, git l'ignore
+EXT_UNTRACKED = b'UNTC'
+EXT_FSMONITOR = b'FSMT'
+
+# Données stat mémorisées pour chaque entrée de l'index
+STAT_FIELDS = ('mtime_ns', 'ctime_ns', 'size', 'ino', 'mode')
+
+MODE_FILE = 0o100644
+MODE_EXECUTABLE = 0o100755
+MODE_SYMLINK = 0o120000
+
+# Un index réécrit dans la même seconde pourrait garder le même stat : il
+# n'est gardé en mémoire qu'une fois plus ancien que ce délai
+RACY_WINDOW_NS = 1_000_000_000
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def get_index_path():
+    """Retourne le chemin de l'index binaire"""
+    return os.path.join(get_git_dir(), "index")
+
+
+def path_key(name):
+    """Clé de tri d'un chemin (ordre des octets, comme git)"""
+    return name.encode('utf-8', errors='surrogateescape')
+
+
+def git_mode(st_mode):
+    """Convertit un st_mode en mode git (100644, 100755 ou 120000)"""
+    if (st_mode & 0o170000) == 0o120000:
+        return MODE_SYMLINK
+    if st_mode & 0o111:
+        return MODE_EXECUTABLE
+    return MODE_FILE
+
+
+def _split_ns(value):
+    """Sépare un temps en nanosecondes en (secondes, nanosecondes) sur 32 bits"""
+    return (value // 1000000000) & 0xffffffff, value % 1000000000
+
+
+def file_stat(path):
+    """
+    Lit les informations stat d'un fichier telles qu'elles sont stockées dans l'index
+
+    Returns:
+        dict: {'mtime_ns', 'ctime_ns', 'size', 'ino', 'mode'}
+    """
+    return stat_from_result(os.lstat(path))
+
+
+def stat_from_result(st):
+    """
+    Convertit un résultat de lstat (ou DirEntry.stat) en stat de l'index
+
+    Les valeurs sont tronquées à 32 bits comme dans l'index binaire, pour que la
+    comparaison avec une entrée relue soit exacte.
+
+    Returns:
+        dict: {'mtime_ns', 'ctime_ns', 'size', 'ino', 'mode'}
+    """
+    mtime_s, mtime_n = _split_ns(st.st_mtime_ns)
+    ctime_s, ctime_n = _split_ns(st.st_ctime_ns)
+    return {
+        'mtime_ns': mtime_s * 1000000000 + mtime_n,
+        'ctime_ns': ctime_s * 1000000000 + ctime_n,
+        'size': st.st_size & 0xffffffff,
+        'ino': st.st_ino & 0xffffffff,
+        'mode': git_mode(st.st_mode),
+    }
+
+
+def stat_matches(path, stat):
+    """
+    Indique si un fichier est inchangé depuis son ajout, sans le relire
+
+    Args:
+        path (str): Chemin du fichier
+        stat (dict): Stat mémorisé dans l'index (None = inconnu ou racy)
+
+    Returns:
+        bool: True si le stat actuel est identique à celui de l'index
+    """
+    if stat is None:
+        return False
+    try:
+        return file_stat(path) == stat
+    except OSError:
+        return False
+
+
+class Index:
+    """Entrées de l'index triées par chemin (recherche par dichotomie)"""
+
+    def __init__(self):
+        self._keys = []
+        self._names = []
+        self._entries = []
+        # Cache-tree : {dossier ('' = racine): sha du tree}
+        self.cache_tree = {}
+        # Cache des fichiers non suivis : {dossier ('' = racine): {'mtime_ns',
+        # 'gitignore' (mtime_ns, taille) ou None, 'untracked', 'dirs'}}
+        self.untracked_cache = {}
+        # Jeton fsmonitor du dernier status (None : tout vérifier)
+        self.fsmonitor_token = None
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __contains__(self, name):
+        return self._find(name) is not None
+
+    def _find(self, name):
+        """Position de name dans l'index, ou None"""
+        key = path_key(name)
+        pos = bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return pos
+        return None
+
+    def get(self, name):
+        """
+        Returns:
+            dict: {'sha', 'mode', 'stat'} ou None si le chemin n'est pas indexé
+        """
+        pos = self._find(name)
+        return self._entries[pos] if pos is not None else None
+
+    def set(self, name, sha, stat=None, mode=None):
+        """Ajoute ou remplace l'entrée d'un chemin"""
+        if mode is None:
+            mode = stat['mode'] if stat else MODE_FILE
+        entry = {'sha': sha, 'mode': mode, 'stat': stat}
+        key = path_key(name)
+        pos = bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            old = self._entries[pos]
+            if old['sha'] != sha or old['mode'] != mode:
+                self.invalidate_path(name)
+            self._entries[pos] = entry
+        else:
+            self.invalidate_path(name)
+            self.invalidate_untracked(name)
+            self._keys.insert(pos, key)
+            self._names.insert(pos, name)
+            self._entries.insert(pos, entry)
+
+    def invalidate_path(self, name):
+        """Retire du cache-tree tous les dossiers contenant name"""
+        parts = name.split('/')[:-1]
+        self.cache_tree.pop('', None)
+        for i in range(1, len(parts) + 1):
+            self.cache_tree.pop('/'.join(parts[:i]), None)
+
+    def invalidate_untracked(self, name):
+        """
+        Force la relecture du dossier de name au prochain status
+
+        Un fichier qui entre dans l'index ou en sort change la liste des
+        fichiers non suivis sans changer le mtime de son dossier.
+        """
+        record = self.untracked_cache.get(name.rpartition('/')[0])
+        if record is not None:
+            record['mtime_ns'] = None
+
+    def _append(self, name, entry):
+        """Ajoute une entrée déjà triée (lecture du fichier)"""
+        self._keys.append(path_key(name))
+        self._names.append(name)
+        self._entries.append(entry)
+
+    def remove(self, name):
+        """Retire un chemin de l'index, retourne True s'il était présent"""
+        pos = self._find(name)
+        if pos is None:
+            return False
+        self.invalidate_path(name)
+        self.invalidate_untracked(name)
+        del self._keys[pos], self._names[pos], self._entries[pos]
+        return True
+
+    def copy(self):
+        """Copie modifiable (les entrées, jamais modifiées sur place, sont partagées)"""
+        other = Index()
+        other._keys = list(self._keys)
+        other._names = list(self._names)
+        other._entries = list(self._entries)
+        other.cache_tree = dict(self.cache_tree)
+        other.untracked_cache = {directory: dict(record)
+                                 for directory, record in self.untracked_cache.items()}
+        other.fsmonitor_token = self.fsmonitor_token
+        return other
+
+    def names_under(self, directory):
+        """Chemins indexés sous un dossier ('' = tout l'index), dans l'ordre"""
+        if not directory:
+            return list(self._names)
+        start = bisect_left(self._keys, path_key(directory + '/'))
+        end = bisect_left(self._keys, path_key(directory + '0'), start)
+        return self._names[start:end]
+
+    def items(self):
+        """Itère sur (chemin, entrée) dans l'ordre de l'index"""
+        return zip(self._names, self._entries)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: {chemin: sha}
+        """
+        return {name: entry['sha'] for name, entry in self.items()}
+
+    @classmethod
+    def from_dict(cls, index_data, stats=None):
+        """Construit un index à partir de {chemin: sha} et de {chemin: stat}"""
+        stats = stats or {}
+        index = cls()
+        for name in sorted(index_data, key=path_key):
+            stat = stats.get(name)
+            mode = stat['mode'] if stat else MODE_FILE
+            index._append(name, {'sha': index_data[name], 'mode': mode, 'stat': stat})
+        return index
+
+
+def parse_index(data, index_mtime_ns=None):
+    """
+    Décode le contenu binaire d'un index
 
+    Protection "racy git" : une entrée dont le mtime n'est pas strictement
+    antérieur à l'écriture de l'index a pu être modifiée dans la même unité de
+    temps sans que son stat change. Son stat est alors ignoré (None) pour
+    forcer le recalcul du hash, et il ne sera pas réécrit tel quel. De même,
+    un dossier du cache des fichiers non suivis modifié dans cette unité de
+    temps sera relu.
 
-def read_index():
-    if os.path.exists(INDEX_PATH):
-        with open(INDEX_PATH, 'r') as f:
-            return json.load(f)
-    return {}
+    Args:
+        data (bytes): Contenu du fichier index
+        index_mtime_ns (int): mtime du fichier index
 
-def write_index(index):
-    with open(INDEX_PATH, 'w') as f:
-        json.dump(index, f, indent=2)
+    Returns:
+        Index: Entrées de l'index
+    """
+    if len(data) < 32 or data[:4] != INDEX_SIGNATURE:
+        raise ValueError("Index invalide (signature DIRC absente)")
+    if hashlib.sha1(data[:-20]).digest() != data[-20:]:
+        raise ValueError("Index corrompu (somme de contrôle invalide)")
+    version, count = struct.unpack_from('>II', data, 4)
+    if version != INDEX_VERSION:
+        raise ValueError(f"Version d'index non supportée : {version}")
 
-def add(files):
-    index = read_index()
+    index = Index()
+    pos = 12
+    end = len(data) - 20
+    for _ in range(count):
+        if pos + ENTRY_HEADER_SIZE > end:
+            raise ValueError("Index tronqué")
+        (ctime_s, ctime_n, mtime_s, mtime_n, _dev, ino, mode,
+         _uid, _gid, size, sha, flags) = struct.unpack_from(ENTRY_FORMAT, data, pos)
+        name_start = pos + ENTRY_HEADER_SIZE
+        name_len = flags & NAME_MASK
+        if name_len == NAME_MASK:
+            name_len = data.index(b'\0', name_start) - name_start
+        name = data[name_start:name_start + name_len].decode('utf-8', errors='surrogateescape')
+        # Entrée + NUL final, alignée sur 8 octets
+        pos += (ENTRY_HEADER_SIZE + name_len + 8) & ~7
 
-    for file_path in files:
-        if not os.path.isfile(file_path):
-            print(f"Skipped (not a file): {file_path}")
+        stat = None
+        if mtime_s or mtime_n or ctime_s or ctime_n:
+            stat = {
+                'mtime_ns': mtime_s * 1000000000 + mtime_n,
+                'ctime_ns': ctime_s * 1000000000 + ctime_n,
+                'size': size,
+                'ino': ino,
+                'mode': mode,
+            }
+            if index_mtime_ns is not None and stat['mtime_ns'] >= index_mtime_ns:
+                stat = None
+        index._append(name, {'sha': sha.hex(), 'mode': mode, 'stat': stat})
+
+    # Extensions : signature sur 4 octets, taille, données
+    while pos + 8 <= end:
+        signature = data[pos:pos + 4]
+        size = struct.unpack_from('>I', data, pos + 4)[0]
+        ext_data = data[pos + 8:pos + 8 + size]
+        if signature == EXT_CACHE_TREE:
+            index.cache_tree = _parse_cache_tree(ext_data)
+        elif signature == EXT_UNTRACKED:
+            index.untracked_cache = _parse_untracked_cache(ext_data, index_mtime_ns)
+        elif signature == EXT_FSMONITOR:
+            index.fsmonitor_token = ext_data.decode('ascii')
+        elif not b'A' <= signature[:1] <= b'Z':
+            # Extension obligatoire inconnue
+            raise ValueError(f"Extension d'index non supportée : {signature!r}")
+        pos += 8 + size
+    return index
+
+
+def _parse_cache_tree(data):
+    """
+    Décode l'extension TREE
+
+    Chaque nœud (parcours préfixe) : "<nom>\0<nb_entrées> <nb_sous_dossiers>\n"
+    suivi du SHA-1 du tree si nb_entrées >= 0 (-1 = tree invalidé).
+
+    Returns:
+        dict: {dossier: sha}
+    """
+    cache_tree = {}
+    pos = 0
+    # Pile de (chemin_du_parent, sous-dossiers restant à lire)
+    stack = []
+    while pos < len(data):
+        nul = data.index(b'\0', pos)
+        name = data[pos:nul].decode('utf-8', errors='surrogateescape')
+        newline = data.index(b'\n', nul)
+        entry_count, subtree_count = (int(v) for v in data[nul + 1:newline].split(b' '))
+        pos = newline + 1
+
+        while stack and stack[-1][1] == 0:
+            stack.pop()
+        if stack:
+            parent, remaining = stack[-1]
+            stack[-1] = (parent, remaining - 1)
+            path = f"{parent}/{name}" if parent else name
+        else:
+            path = ''
+
+        if entry_count >= 0:
+            cache_tree[path] = data[pos:pos + 20].hex()
+            pos += 20
+        stack.append((path, subtree_count))
+    return cache_tree
+
+
+def _serialize_cache_tree(index):
+    """
+    Encode l'extension TREE à partir des dossiers de l'index
+
+    Returns:
+        bytes: Données de l'extension
+    """
+    entry_counts = {'': 0}
+    children = {'': []}
+    for name in index:
+        entry_counts[''] += 1
+        parent = ''
+        parts = name.split('/')[:-1]
+        for i in range(len(parts)):
+            path = '/'.join(parts[:i + 1])
+            if path not in entry_counts:
+                entry_counts[path] = 0
+                children[path] = []
+                children[parent].append(path)
+            entry_counts[path] += 1
+            parent = path
+
+    out = bytearray()
+    stack = ['']
+    while stack:
+        path = stack.pop()
+        name = path.rsplit('/', 1)[-1]
+        sha = index.cache_tree.get(path)
+        count = entry_counts[path] if sha else -1
+        out += path_key(name) + b'\0' + f"{count} {len(children[path])}\n".encode()
+        if sha:
+            out += bytes.fromhex(sha)
+        stack.extend(reversed(children[path]))
+    return bytes(out)
+
+
+def _parse_untracked_cache(data, index_mtime_ns=None):
+    """
+    Décode l'extension UNTC
+
+    Chaque dossier : "<chemin>\0<mtime_ns> <mtime_ns_gitignore> <taille_gitignore>
+    <nb_non_suivis> <nb_sous_dossiers>\n" (-1 = inconnu ou absent), suivi des
+    noms, chacun terminé par un NUL.
+
+    Returns:
+        dict: {dossier: {'mtime_ns', 'gitignore', 'untracked', 'dirs'}}
+    """
+    untracked_cache = {}
+    pos = 0
+    while pos < len(data):
+        nul = data.index(b'\0', pos)
+        directory = data[pos:nul].decode('utf-8', errors='surrogateescape')
+        newline = data.index(b'\n', nul)
+        mtime_ns, ignore_mtime_ns, ignore_size, untracked_count, dir_count = (
+            int(v) for v in data[nul + 1:newline].split(b' '))
+        pos = newline + 1
+
+        names = []
+        for _ in range(untracked_count + dir_count):
+            nul = data.index(b'\0', pos)
+            names.append(data[pos:nul].decode('utf-8', errors='surrogateescape'))
+            pos = nul + 1
+
+        if index_mtime_ns is not None and ignore_mtime_ns >= index_mtime_ns:
+            # .gitignore peut-être modifié sans changer de stat : le dossier et
+            # ses sous-dossiers seront entièrement relus
             continue
+        if mtime_ns < 0 or (index_mtime_ns is not None and mtime_ns >= index_mtime_ns):
+            mtime_ns = None
+        untracked_cache[directory] = {
+            'mtime_ns': mtime_ns,
+            'gitignore': (ignore_mtime_ns, ignore_size) if ignore_size >= 0 else None,
+            'untracked': names[:untracked_count],
+            'dirs': names[untracked_count:],
+        }
+    return untracked_cache
 
-        sha = hash_object(file_path)
-        index[file_path] = sha
-        print(f"Added {file_path}")
 
-    write_index(index)
+def _serialize_untracked_cache(untracked_cache):
+    """
+    Encode l'extension UNTC
 
-def rm(files, cached=False):
-    index = read_index()
-    for file_path in files:
-        # Suppression du fichier sur le disque sauf si --cached
-        if not cached and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                print(f"Supprimé du disque : {file_path}")
-            except Exception as e:
-                print(f"Erreur lors de la suppression de {file_path} : {e}")
-        elif not cached:
-            print(f"Fichier non trouvé sur le disque : {file_path}")
-
-        # Suppression de l'index
-        if file_path in index:
-            del index[file_path]
-            print(f"Supprimé de l'index : {file_path}")
+    Returns:
+        bytes: Données de l'extension
+    """
+    out = bytearray()
+    for directory in sorted(untracked_cache, key=path_key):
+        record = untracked_cache[directory]
+        mtime_ns = record['mtime_ns'] if record['mtime_ns'] is not None else -1
+        ignore_mtime_ns, ignore_size = record['gitignore'] or (-1, -1)
+        out += path_key(directory) + b'\0'
+        out += (f"{mtime_ns} {ignore_mtime_ns} {ignore_size} "
+                f"{len(record['untracked'])} {len(record['dirs'])}\n").encode()
+        for name in record['untracked'] + record['dirs']:
+            out += path_key(name) + b'\0'
+    return bytes(out)
+
+
+def serialize_index(index):
+    """
+    Encode un index au format binaire
+
+    Args:
+        index (Index): Entrées à écrire
+
+    Returns:
+        bytes: Contenu du fichier, somme de contrôle comprise
+    """
+    parts = [INDEX_SIGNATURE + struct.pack('>II', INDEX_VERSION, len(index))]
+    for name, entry in index.items():
+        stat = entry['stat']
+        if stat is None:
+            # Stat inconnu : champs à zéro, l'entrée sera toujours rehachée
+            times = (0, 0, 0, 0)
+            ino = size = 0
+        else:
+            times = _split_ns(stat['ctime_ns']) + _split_ns(stat['mtime_ns'])
+            ino, size = stat['ino'], stat['size']
+        name_bytes = path_key(name)
+        flags = min(len(name_bytes), NAME_MASK)
+        header = struct.pack(ENTRY_FORMAT, *times, 0, ino & 0xffffffff, entry['mode'],
+                             0, 0, size & 0xffffffff, bytes.fromhex(entry['sha']), flags)
+        padding = 8 - (ENTRY_HEADER_SIZE + len(name_bytes)) % 8
+        parts.append(header + name_bytes + b'\0' * padding)
+    if index.cache_tree:
+        ext_data = _serialize_cache_tree(index)
+        parts.append(EXT_CACHE_TREE + struct.pack('>I', len(ext_data)) + ext_data)
+    if index.untracked_cache:
+        ext_data = _serialize_untracked_cache(index.untracked_cache)
+        parts.append(EXT_UNTRACKED + struct.pack('>I', len(ext_data)) + ext_data)
+    if index.fsmonitor_token:
+        ext_data = index.fsmonitor_token.encode('ascii')
+        parts.append(EXT_FSMONITOR + struct.pack('>I', len(ext_data)) + ext_data)
+    content = b''.join(parts)
+    return content + hashlib.sha1(content).digest()
+
+
+def _read_legacy_index(git_dir, raw):
+    """
+    Lit un index dans un des anciens formats texte
+
+    Args:
+        git_dir (str): Répertoire .mon_git
+        raw (bytes): Contenu de .mon_git/index s'il n'est pas binaire (ou None)
+
+    Returns:
+        dict: {chemin: sha}
+    """
+    entries = {}
+    if raw is not None:
+        text = raw.decode('utf-8', errors='surrogateescape')
+        if text.lstrip().startswith('{'):
+            # Index JSON {chemin: sha}
+            entries.update(json.loads(text))
         else:
-            print(f"Fichier non présent dans l'index : {file_path}")
+            # Index de reset : "sha filename"
+            for line in text.splitlines():
+                line = line.strip()
+                if line and ' ' in line:
+                    sha, filename = line.split(' ', 1)
+                    entries[filename] = sha
+
+    text_path = os.path.join(git_dir, 'index.txt')
+    if os.path.exists(text_path):
+        with open(text_path, 'r') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                # Format: mode|hash|filename (ou avec les champs stat à la suite)
+                if line.strip() and not line.startswith('#') and '|' in line:
+                    parts = line.split('|')
+                    if len(parts) >= 3 + len(STAT_FIELDS):
+                        parts = parts[:-len(STAT_FIELDS)]
+                    if len(parts) >= 3:
+                        entries['|'.join(parts[2:])] = parts[1]
+
+    return entries
+
+
+def lock_index(timeout=None):
+    """
+    Prend le verrou .mon_git/index.lock
+
+    À prendre avant de lire l'index quand on compte le réécrire : deux
+    processus ne peuvent alors pas écraser les modifications l'un de l'autre.
+
+    Args:
+        timeout (float): Attente maximale en secondes (défaut : LOCK_TIMEOUT)
+
+    Returns:
+        LockFile: Verrou pris, à passer à write_index_file
+
+    Raises:
+        LockError: Si un autre processus garde le verrou
+    """
+    lock = LockFile(get_index_path())
+    if timeout is None:
+        return lock.acquire()
+    return lock.acquire(timeout)
+
+
+def try_lock_index():
+    """
+    Prend le verrou de l'index sans attendre
+
+    Returns:
+        LockFile: Verrou pris, ou None si un autre processus le détient
+    """
+    try:
+        return lock_index(timeout=0)
+    except LockError:
+        return None
 
-    write_index(index)
 
+def write_index_file(index, lock=None):
+    """
+    Écrit l'index binaire de manière atomique
 
-def index_to_tree():
-    index = read_index()
-    entries = []
-    for path, sha in index.items():
-        mode = b"100644" 
-        name = os.path.basename(path)
-        entries.append((mode, name, sha))
-    tree_sha1 = create_tree(entries)
-    print("DEBUG tree_sha1:", tree_sha1)
-    return tree_sha1
+    IMPACT SUR .MON_GIT :
+    - Écrit .mon_git/index.lock puis le renomme en .mon_git/index
+    - Supprime l'ancien index.txt s'il existe encore
+
+    Args:
+        index (Index): Entrées à écrire
+        lock (LockFile): Verrou déjà pris par lock_index ; sinon il est pris
+                         (et libéré) ici
+    """
+    git_dir = get_git_dir()
+    data = serialize_index(index)
+    with (lock or lock_index()) as held:
+        held.write(data)
+        held.commit()
+    legacy_path = os.path.join(git_dir, 'index.txt')
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+_index_state = {'path': None, 'key': None, 'index': None}
+
+
+def clear_index_cache():
+    """Oublie l'index gardé en mémoire"""
+    _index_state.update({'path': None, 'key': None, 'index': None})
+
+
+def read_index_file():
+    """
+    Lit l'index binaire en une seule lecture
+
+    Dans un processus qui dure (gitBis serve), l'index décodé est gardé en
+    mémoire et n'est relu que si le fichier a été remplacé (inode, taille,
+    mtime, ctime). Chaque appel reçoit sa propre copie.
+
+    IMPACT SUR .MON_GIT :
+    - Aucun si l'index est déjà au format binaire (un index.txt restant est
+      supprimé : l'index binaire fait foi)
+    - Sinon convertit l'ancien index texte en .mon_git/index (binaire)
+
+    Returns:
+        Index: Entrées de l'index (vide si aucun index)
+    """
+    git_dir = get_git_dir()
+    index_path = get_index_path()
+
+    legacy_text = os.path.exists(os.path.join(git_dir, 'index.txt'))
+    abs_path = os.path.abspath(index_path)
+    data = None
+    index_mtime_ns = None
+    if os.path.exists(index_path):
+        with open(index_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            key = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+            if not legacy_text and _index_state['path'] == abs_path and _index_state['key'] == key:
+                return _index_state['index'].copy()
+            data = f.read()
+            index_mtime_ns = st.st_mtime_ns
+
+    if data is not None and data.startswith(INDEX_SIGNATURE):
+        try:
+            index = parse_index(data, index_mtime_ns)
+        except ValueError:
+            if not legacy_text:
+                raise
+            # Index binaire illisible : index.txt est lu, mais l'index binaire
+            # n'est pas écrasé par la conversion
+            return Index.from_dict(_read_legacy_index(git_dir, None))
+        if legacy_text:
+            # index.txt oublié par une ancienne conversion : l'index binaire fait foi
+            try:
+                os.remove(os.path.join(git_dir, 'index.txt'))
+            except FileNotFoundError:
+                pass
+        if index_mtime_ns < time.time_ns() - RACY_WINDOW_NS:
+            _index_state.update({'path': abs_path, 'key': key, 'index': index.copy()})
+        return index
+    if data is None and not legacy_text:
+        return Index()
 
+    # Conversion d'un ancien index (JSON ou "sha chemin", et index.txt)
+    raw = data
+    index = Index.from_dict(_read_legacy_index(git_dir, raw))
+    # Conversion enregistrée seulement si personne d'autre n'écrit l'index
+    lock = try_lock_index()
+    if lock is not None:
+        write_index_file(index, lock)
+    return index
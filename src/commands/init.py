@@ -1,6 +1,8 @@
 import os
 import struct
 
+from .index import Index, serialize_index
+
 def init():
     """
     Initialise un nouveau dépôt Git en créant la structure .mon_git.
@@ -9,7 +11,7 @@ def init():
     - Si .mon_git existe déjà : le supprime et en crée un nouveau
     - Si .mon_git n'existe pas : le crée
     - Crée le répertoire avec tous les sous-dossiers nécessaires
-    - Crée les fichiers de configuration de base (HEAD.txt, config.txt, index.txt)
+    - Crée les fichiers de configuration de base (HEAD.txt, config.txt, index)
     - Initialise la branche main par défaut
     """
     git_dir = '.mon_git'
@@ -40,12 +42,9 @@ def init():
         f.write(f'\tignorecase = true\n')
         f.write(f'\tprecomposeunicode = true\n')
     
-    # Création du fichier index.txt (format texte au lieu de binaire)
-    with open(os.path.join(git_dir, 'index.txt'), 'w') as f:
-        f.write('# Git Index File\n')
-        f.write('# Version: 2\n')
-        f.write('# Number of entries: 0\n')
-        f.write('# Format: mode|hash|filename\n')
+    # Création de l'index binaire vide (format DIRC v2)
+    with open(os.path.join(git_dir, 'index'), 'wb') as f:
+        f.write(serialize_index(Index()))
     
     # Création de la branche main (vide pour l'instant)
     with open(os.path.join(git_dir, 'refs', 'heads', 'main.txt'), 'w') as f:
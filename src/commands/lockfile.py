@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Module pour les verrous de fichiers (refs, HEAD, index)
+Même principe que git : pour modifier <fichier>, on crée <fichier>.lock en
+exclusif (O_CREAT | O_EXCL), on y écrit le nouveau contenu, puis on le renomme
+sur <fichier> (os.replace, atomique).
+
+- un seul processus à la fois peut modifier un fichier donné
+- un lecteur voit toujours l'ancien ou le nouveau contenu, jamais un fichier
+  tronqué ou à moitié écrit
+- chaque fichier a son propre verrou : deux processus qui modifient des
+  branches différentes ne s'attendent pas
+"""
+
+import os
+import time
+
+
+LOCK_SUFFIX = ".lock"
+
+# Attente maximale (secondes) avant d'abandonner si le verrou est pris
+LOCK_TIMEOUT = 10.0
+LOCK_RETRY_DELAY = 0.005
+LOCK_MAX_RETRY_DELAY = 0.1
+
+
+class LockError(OSError):
+    """Verrou déjà pris par un autre processus"""
+
+
+class LockFile:
+    """Verrou <chemin>.lock, utilisable comme gestionnaire de contexte"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + LOCK_SUFFIX
+        self.file = None
+
+    @property
+    def held(self):
+        """True tant que le verrou est pris par cet objet"""
+        return self.file is not None
+
+    def acquire(self, timeout=LOCK_TIMEOUT):
+        """
+        Crée le fichier .lock, en réessayant jusqu'à timeout secondes
+
+        Args:
+            timeout (float): Attente maximale ; 0 pour ne pas attendre
+
+        Returns:
+            LockFile: self
+
+        Raises:
+            LockError: Si le verrou est toujours pris après timeout secondes
+        """
+        deadline = time.monotonic() + timeout
+        delay = LOCK_RETRY_DELAY
+        os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+                self.file = os.fdopen(fd, 'wb')
+                return self
+            except FileExistsError:
+                if time.monotonic() >= deadline:
+                    raise LockError(
+                        f"Unable to create '{self.lock_path}': File exists. "
+                        "Another gitBis process seems to be running in this repository."
+                    )
+                time.sleep(delay)
+                delay = min(delay * 2, LOCK_MAX_RETRY_DELAY)
+
+    def write(self, data):
+        """Écrit dans le fichier .lock (bytes ou str)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.file.write(data)
+
+    def commit(self):
+        """Remplace le fichier cible par le contenu écrit et libère le verrou"""
+        self.file.close()
+        self.file = None
+        try:
+            os.replace(self.lock_path, self.path)
+        except OSError:
+            os.remove(self.lock_path)
+            raise
+
+    def rollback(self):
+        """Libère le verrou sans modifier le fichier cible (sans effet après commit)"""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        try:
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        if not self.held:
+            self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.rollback()
+        return False
@@ -7,6 +7,8 @@ Affiche l'historique des commits
 import os
 import time
 import sys
+import heapq
+from itertools import islice
 from datetime import datetime
 
 # Ajouter le répertoire parent au path pour les imports
@@ -14,6 +16,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.commands.rev_parse import rev_parse
 from src.commands.objects import read_object
+from src.commands.commit_graph import lookup_commit, get_bloom_filter, GENERATION_MAX
+from src.commands.bloom import bloom_key, bloom_maybe_contains
+from src.commands.diff_tree import diff_trees, normalize_paths
+from src.commands.abbrev import shortest_unique_abbrev
+
+
+# Commits absents du commit-graph : traités comme plus récents que tous les autres
+GENERATION_INFINITY = GENERATION_MAX + 1
 
 
 def get_git_dir():
@@ -91,9 +101,9 @@ def format_commit_line(commit_sha, commit_info, oneline=False):
     Returns:
         str: Ligne formatée
     """
-    short_sha = commit_sha[:7]
-    
     if oneline:
+        # Abréviation la plus courte qui reste unique dans le dépôt
+        short_sha = shortest_unique_abbrev(commit_sha)
         message = commit_info['message'] if commit_info['message'] else "No message"
         return f"{short_sha} {message}"
     else:
@@ -101,8 +111,9 @@ def format_commit_line(commit_sha, commit_info, oneline=False):
         lines = []
         lines.append(f"commit {commit_sha}")
         
-        if commit_info['parent']:
-            lines.append(f"parent {commit_info['parent']}")
+        # Tous les parents (plusieurs pour un merge)
+        for parent in commit_info['parents']:
+            lines.append(f"parent {parent}")
         
         if commit_info['author']:
             lines.append(f"author {commit_info['author']}")
@@ -119,67 +130,191 @@ def format_commit_line(commit_sha, commit_info, oneline=False):
         return "\n".join(lines)
 
 
-def get_commit_history(start_ref="HEAD", max_count=None):
+def commit_touches_paths(commit_sha, paths, keys=None, first_parent=True):
     """
-    Récupère l'historique des commits
+    Indique si un commit modifie l'un des chemins
+    
+    Si le commit-graph a un filtre de Bloom pour ce commit et qu'il exclut
+    tous les chemins, aucun tree n'est lu. Sinon seuls les trees le long des
+    chemins sont lus, et la comparaison s'arrête dès que les SHA-1 des deux
+    côtés sont identiques : le coût dépend de la profondeur des chemins, pas
+    de la taille du tree.
+    
+    Un merge n'est retenu que s'il diffère de chacun de ses parents (ou du
+    premier seulement avec first_parent) : un merge qui reprend les chemins
+    d'un de ses parents ne les modifie pas.
     
     Args:
-        start_ref (str): Référence de départ (HEAD par défaut)
-        max_count (int): Nombre maximum de commits à afficher
+        commit_sha (str): SHA-1 du commit
+        paths (list): Chemins normalisés (voir normalize_paths)
+        keys (list): Hashes de Bloom des chemins (voir bloom_key), calculés
+                     une fois pour tout l'historique
+        first_parent (bool): Ne comparer qu'au premier parent
     
     Returns:
-        list: Liste des SHA-1 des commits dans l'ordre chronologique inverse
+        bool: True si au moins un chemin a changé
     """
-    commits = []
-    current_sha = rev_parse(start_ref)
+    bloom_filter = get_bloom_filter(commit_sha)
+    if bloom_filter is not None:
+        # Le filtre décrit les changements par rapport au premier parent
+        keys = keys or [bloom_key(path) for path in paths]
+        if not any(bloom_maybe_contains(bloom_filter, key) for key in keys):
+            return False
     
-    if not current_sha:
-        return commits
+    info = lookup_commit(commit_sha)
+    parents = info['parents'][:1] if first_parent else info['parents']
+    for parent in parents or [None]:
+        parent_tree = lookup_commit(parent)['tree'] if parent else None
+        if next(diff_trees(parent_tree, info['tree'], paths=paths), None) is None:
+            return False
+    return True
+
+
+def _generation(info):
+    """Génération du commit-graph ; infinie pour un commit absent du graphe"""
+    return info['generation'] if info['generation'] is not None else GENERATION_INFINITY
+
+
+def _walk_date_order(start_sha, first_parent):
+    """
+    Parcourt l'historique du commit le plus récent au plus ancien
+
+    Les commits à visiter sont dans un tas ordonné par date : chaque commit
+    produit coûte O(log n), et seuls les commits produits (et leurs parents)
+    sont lus.
+    """
+    seen = {start_sha}
+    counter = 0
+    heap = [(-lookup_commit(start_sha)['time'], counter, start_sha)]
+    while heap:
+        _, _, sha = heapq.heappop(heap)
+        yield sha
+        parents = lookup_commit(sha)['parents']
+        for parent in parents[:1] if first_parent else parents:
+            if parent in seen:
+                continue
+            seen.add(parent)
+            counter += 1
+            heapq.heappush(heap, (-lookup_commit(parent)['time'], counter, parent))
+
+
+def _walk_topo_order(start_sha, first_parent):
+    """
+    Parcourt l'historique sans jamais produire un parent avant un de ses enfants
+
+    Comme le --topo-order incrémental de git : un commit est produit quand
+    tous ses enfants l'ont été. Pour connaître ses enfants, une seconde
+    marche (par génération décroissante) ne va que jusqu'à la génération du
+    commit ; les commits plus anciens ne sont pas lus. Sans commit-graph
+    (générations inconnues), cette marche parcourt tout l'historique.
+    """
+    def parents_of(sha):
+        parents = lookup_commit(sha)['parents']
+        return parents[:1] if first_parent else parents
+
+    in_degree = {}
+    explored = {start_sha}
+    explore_heap = [(-_generation(lookup_commit(start_sha)), start_sha)]
+
+    def explore_to(generation):
+        # Compte les enfants de tous les commits de génération >= generation
+        while explore_heap and -explore_heap[0][0] >= generation:
+            _, sha = heapq.heappop(explore_heap)
+            for parent in parents_of(sha):
+                in_degree[parent] = in_degree.get(parent, 0) + 1
+                if parent not in explored:
+                    explored.add(parent)
+                    heapq.heappush(explore_heap, (-_generation(lookup_commit(parent)), parent))
+
+    # Pile : les commits d'une même branche restent groupés
+    stack = [start_sha]
+    while stack:
+        sha = stack.pop()
+        yield sha
+        for parent in reversed(parents_of(sha)):
+            explore_to(_generation(lookup_commit(parent)))
+            in_degree[parent] -= 1
+            if in_degree[parent] == 0:
+                stack.append(parent)
+
+
+def iter_commits(start_ref="HEAD", first_parent=False, topo_order=False, paths=None):
+    """
+    Itère paresseusement sur l'historique d'un commit
     
-    visited = set()
-    queue = [current_sha]
+    Parents, dates et générations viennent du commit-graph : les objets
+    commit ne sont pas décompressés. Le parcours s'arrête dès que l'appelant
+    cesse d'itérer (log -n 10 ne lit que le début de l'historique).
     
-    while queue and (max_count is None or len(commits) < max_count):
-        commit_sha = queue.pop(0)
-        
-        if commit_sha in visited:
-            continue
-        
-        visited.add(commit_sha)
-        commits.append(commit_sha)
-        
-        # Lire le commit pour trouver le parent
-        commit_info = read_commit_object(commit_sha)
-        if commit_info and commit_info['parent']:
-            queue.append(commit_info['parent'])
+    Args:
+        start_ref (str): Référence de départ (HEAD par défaut)
+        first_parent (bool): Ne suivre que le premier parent des merges
+        topo_order (bool): Ne jamais produire un commit avant ses enfants
+        paths (list): Ne garder que les commits qui modifient ces chemins
+    
+    Yields:
+        str: SHA-1 des commits, du plus récent au plus ancien
+    """
+    start_sha = rev_parse(start_ref)
+    if not start_sha:
+        return
+    
+    paths = normalize_paths(paths)
+    keys = [bloom_key(path) for path in paths] if paths else None
+    walk = _walk_topo_order if topo_order else _walk_date_order
+    for sha in walk(start_sha, first_parent):
+        if paths is None or commit_touches_paths(sha, paths, keys, first_parent):
+            yield sha
+
+
+def get_commit_history(start_ref="HEAD", max_count=None, paths=None,
+                       first_parent=False, topo_order=False):
+    """
+    Récupère l'historique des commits
     
-    return commits
+    Args:
+        start_ref (str): Référence de départ (HEAD par défaut)
+        max_count (int): Nombre maximum de commits à afficher
+        paths (list): Ne garder que les commits qui modifient ces chemins
+        first_parent (bool): Ne suivre que le premier parent des merges
+        topo_order (bool): Ordre topologique (voir iter_commits)
+    
+    Returns:
+        list: Liste des SHA-1 des commits dans l'ordre chronologique inverse
+    """
+    commits = iter_commits(start_ref, first_parent, topo_order, paths)
+    return list(islice(commits, max_count))
 
 
-def show_log(start_ref="HEAD", oneline=False, limit=None):
+def show_log(start_ref="HEAD", oneline=False, limit=None, paths=None,
+             first_parent=False, topo_order=False):
     """
     Affiche l'historique des commits
     
+    Les commits sont affichés au fur et à mesure du parcours.
+    
     Args:
         start_ref (str): Référence de départ
         oneline (bool): Format compact
         limit (int): Nombre maximum de commits
+        paths (list): Ne montrer que les commits qui modifient ces chemins
+        first_parent (bool): Ne suivre que le premier parent des merges
+        topo_order (bool): Ne jamais afficher un commit avant ses enfants
     
     Returns:
         bool: True si succès, False si échec
     """
     try:
-        commits = get_commit_history(start_ref, limit)
-        
-        if not commits:
-            print("Aucun commit trouvé.")
-            return True
-        
-        for commit_sha in commits:
+        shown = 0
+        commits = iter_commits(start_ref, first_parent, topo_order, paths)
+        for commit_sha in islice(commits, limit):
             commit_info = read_commit_object(commit_sha)
             if commit_info:
                 print(format_commit_line(commit_sha, commit_info, oneline))
+                shown += 1
         
+        if not shown:
+            print("Aucun commit trouvé.")
         return True
     except Exception as e:
         print(f"Erreur lors de l'affichage du log: {e}")
@@ -189,44 +324,59 @@ def show_log(start_ref="HEAD", oneline=False, limit=None):
 def main():
     """Fonction principale pour la commande log"""
     
-    # Parser les arguments
+    # Parser les arguments ; les chemins suivent "--"
+    args = sys.argv[1:]
+    paths = None
+    if "--" in args:
+        separator = args.index("--")
+        args, paths = args[:separator], args[separator + 1:]
+    
     oneline = False
+    first_parent = False
+    topo_order = False
     max_count = None
     start_ref = "HEAD"
     
-    i = 1
-    while i < len(sys.argv):
-        arg = sys.argv[i]
+    i = 0
+    while i < len(args):
+        arg = args[i]
         
         if arg == "--oneline":
             oneline = True
+        elif arg == "--first-parent":
+            first_parent = True
+        elif arg == "--topo-order":
+            topo_order = True
         elif arg == "-n" or arg == "--max-count":
-            if i + 1 < len(sys.argv):
+            if i + 1 < len(args):
                 try:
-                    max_count = int(sys.argv[i + 1])
+                    max_count = int(args[i + 1])
                     i += 1
                 except ValueError:
-                    print(f"Erreur: '{sys.argv[i + 1]}' n'est pas un nombre valide")
+                    print(f"Erreur: '{args[i + 1]}' n'est pas un nombre valide")
                     sys.exit(1)
             else:
                 print("Erreur: -n/--max-count nécessite un argument")
                 sys.exit(1)
         elif arg == "--help" or arg == "-h":
-            print("Usage: gitBis log [--oneline] [-n <num>] [<commit>]")
+            print("Usage: gitBis log [--oneline] [--first-parent] [--topo-order] [-n <num>] [<commit>] [-- <chemin>...]")
             print("  --oneline    Afficher en format compact")
+            print("  --first-parent  Ne suivre que le premier parent des merges")
+            print("  --topo-order    Ne jamais afficher un commit avant ses enfants")
             print("  -n, --max-count <num>  Limiter le nombre de commits")
             print("  <commit>     Commit de départ (par défaut: HEAD)")
+            print("  -- <chemin>  Seulement les commits qui modifient ces chemins")
             sys.exit(0)
         elif not arg.startswith("-"):
             start_ref = arg
         else:
             print(f"Option inconnue: {arg}")
-            print("Usage: gitBis log [--oneline] [-n <num>] [<commit>]")
+            print("Usage: gitBis log [--oneline] [--first-parent] [--topo-order] [-n <num>] [<commit>] [-- <chemin>...]")
             sys.exit(1)
         
         i += 1
     
-    show_log(start_ref, oneline, max_count)
+    show_log(start_ref, oneline, max_count, paths, first_parent, topo_order)
 
 
 if __name__ == "__main__":
@@ -6,12 +6,12 @@ Affiche le contenu d'un objet tree
 
 import os
 import sys
-import glob
 
 # Ajouter le répertoire parent au path pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.commands.objects import read_object
+from src.commands.objects import read_object, iter_tree_entries
+from src.commands.abbrev import resolve_abbrev, AmbiguousShaError
 
 
 def get_git_dir():
@@ -19,39 +19,6 @@ def get_git_dir():
     return ".mon_git"
 
 
-def resolve_short_sha(short_sha):
-    """
-    Résout un SHA court en SHA complet
-    
-    Args:
-        short_sha (str): SHA court (7+ caractères)
-    
-    Returns:
-        str: SHA complet ou None si non trouvé
-    """
-    if len(short_sha) >= 40:
-        return short_sha
-    
-    git_dir = get_git_dir()
-    objects_dir = os.path.join(git_dir, "objects")
-    
-    # Chercher dans tous les sous-répertoires
-    for subdir in os.listdir(objects_dir):
-        subdir_path = os.path.join(objects_dir, subdir)
-        if os.path.isdir(subdir_path) and len(subdir) == 2:
-            # Chercher les fichiers qui commencent par le SHA court
-            pattern = os.path.join(subdir_path, f"{short_sha[len(subdir):]}*")
-            matches = glob.glob(pattern)
-            if matches:
-                # Extraire le nom du fichier (sans extension)
-                filename = os.path.basename(matches[0])
-                if filename.endswith('.txt'):
-                    filename = filename[:-4]
-                return subdir + filename
-    
-    return None
-
-
 def parse_tree_content(tree_content):
     """
     Parse le contenu d'un objet tree
@@ -64,38 +31,17 @@ def parse_tree_content(tree_content):
     """
     entries = []
     
-    # Convertir en string si c'est des bytes
-    if isinstance(tree_content, bytes):
-        content_str = tree_content.decode('utf-8')
-    else:
-        content_str = tree_content
-    
-    # Parser ligne par ligne
-    lines = content_str.strip().split('\n')
-    
-    for line in lines:
-        if not line.strip():
-            continue
-        
-        # Format: mode name sha
-        parts = line.split(' ')
-        if len(parts) < 3:
-            continue
-        
-        mode = parts[0]
-        sha = parts[-1]  # Le SHA est à la fin
-        name = ' '.join(parts[1:-1])  # Le nom peut contenir des espaces
-        
+    for mode, name, sha in iter_tree_entries(tree_content):
         # Déterminer le type basé sur le mode
-        if mode.startswith('100'):
+        if mode.startswith('100') or mode.startswith('120'):
             obj_type = 'blob'
-        elif mode.startswith('400'):
+        elif mode.lstrip('0').startswith('400'):
             obj_type = 'tree'
         else:
             obj_type = 'unknown'
         
         entries.append({
-            'mode': mode,
+            'mode': mode.zfill(6),
             'type': obj_type,
             'sha': sha,
             'name': name
@@ -131,7 +77,11 @@ def show_tree(tree_sha, long_format=False):
     try:
         # Résoudre le SHA court si nécessaire
         if len(tree_sha) < 40:
-            resolved_sha = resolve_short_sha(tree_sha)
+            try:
+                resolved_sha = resolve_abbrev(tree_sha)
+            except AmbiguousShaError:
+                print(f"error: short SHA1 {tree_sha} is ambiguous")
+                return False
             if resolved_sha is None:
                 print(f"fatal: Not a valid object name '{tree_sha}'")
                 return False
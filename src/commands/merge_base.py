@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Module pour la commande merge-base
+Ancêtre commun de deux commits et test d'ascendance.
+
+Les commits sont parcourus dans une file de priorité, du plus récent au plus
+ancien : numéro de génération du commit-graph d'abord, date du commit
+ensuite. Un commit a toujours une génération plus grande que ses parents, ce
+qui permet d'arrêter le parcours tôt :
+- merge-base s'arrête dès que tous les commits restant dans la file sont des
+  ancêtres d'un ancêtre commun déjà trouvé
+- --is-ancestor A B n'explore pas les commits dont la génération est
+  inférieure ou égale à celle de A : A ne peut pas être leur ancêtre
+"""
+
+import os
+import sys
+import heapq
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.rev_parse import rev_parse
+from src.commands.commit_graph import lookup_commit, GENERATION_MAX
+
+
+# Commits absents du commit-graph : traités comme plus récents que tous les autres
+GENERATION_INFINITY = GENERATION_MAX + 1
+
+PARENT1 = 1
+PARENT2 = 2
+STALE = 4
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def _priority(sha, info):
+    """Clé de tas : les générations (puis dates) les plus grandes sortent d'abord"""
+    generation = info['generation'] if info['generation'] is not None else GENERATION_INFINITY
+    return (-generation, -info['time'], sha)
+
+
+def is_ancestor(ancestor, descendant):
+    """
+    Indique si un commit est un ancêtre d'un autre (ou le même commit)
+
+    Args:
+        ancestor (str): SHA-1 de l'ancêtre supposé
+        descendant (str): SHA-1 du descendant supposé
+
+    Returns:
+        bool: True si ancestor est atteignable depuis descendant
+    """
+    if ancestor == descendant:
+        return True
+    target_generation = lookup_commit(ancestor)['generation']
+
+    seen = {descendant}
+    heap = [_priority(descendant, lookup_commit(descendant))]
+    while heap:
+        _, _, sha = heapq.heappop(heap)
+        for parent in lookup_commit(sha)['parents']:
+            if parent == ancestor:
+                return True
+            if parent in seen:
+                continue
+            seen.add(parent)
+            info = lookup_commit(parent)
+            if (target_generation is not None and info['generation'] is not None
+                    and info['generation'] <= target_generation):
+                # Génération trop petite : ancestor ne peut pas être atteint par là
+                continue
+            heapq.heappush(heap, _priority(parent, info))
+    return False
+
+
+def _paint_down_to_common(one, two):
+    """
+    Ancêtres communs candidats de deux commits
+
+    Chaque commit reçoit les marques des côtés depuis lesquels il est
+    atteignable ; un commit atteint des deux côtés est un ancêtre commun, et
+    ses propres ancêtres sont marqués STALE (ils ne peuvent pas être le
+    meilleur ancêtre commun).
+
+    Returns:
+        list: Ancêtres communs trouvés (éventuellement redondants)
+    """
+    flags = {one: PARENT1}
+    flags[two] = flags.get(two, 0) | PARENT2
+    heap = [_priority(sha, lookup_commit(sha)) for sha in flags]
+    heapq.heapify(heap)
+    results = []
+
+    while any(not flags[sha] & STALE for _, _, sha in heap):
+        _, _, sha = heapq.heappop(heap)
+        sha_flags = flags[sha] & (PARENT1 | PARENT2 | STALE)
+        if sha_flags == PARENT1 | PARENT2:
+            if sha not in results:
+                results.append(sha)
+            sha_flags |= STALE
+        for parent in lookup_commit(sha)['parents']:
+            if flags.get(parent, 0) & sha_flags == sha_flags:
+                continue
+            flags[parent] = flags.get(parent, 0) | sha_flags
+            heapq.heappush(heap, _priority(parent, lookup_commit(parent)))
+    return results
+
+
+def merge_bases(one, two):
+    """
+    Meilleurs ancêtres communs de deux commits
+
+    Args:
+        one (str): SHA-1 du premier commit
+        two (str): SHA-1 du second commit
+
+    Returns:
+        list: Ancêtres communs dont aucun n'est ancêtre d'un autre
+              (vide si les historiques sont disjoints)
+    """
+    if one == two:
+        return [one]
+    candidates = _paint_down_to_common(one, two)
+    if len(candidates) <= 1:
+        return candidates
+    return [sha for sha in candidates
+            if not any(other != sha and is_ancestor(sha, other) for other in candidates)]
+
+
+def merge_base(commit1, commit2, show_all=False, check_ancestor=False):
+    """
+    Affiche l'ancêtre commun de deux commits, ou teste l'ascendance
+
+    Args:
+        commit1 (str): Premier commit (référence ou SHA-1)
+        commit2 (str): Second commit
+        show_all (bool): Afficher tous les meilleurs ancêtres communs
+        check_ancestor (bool): Seulement tester si commit1 est un ancêtre de
+                               commit2 (rien n'est affiché)
+
+    Returns:
+        bool: True si un ancêtre commun existe (ou si commit1 est un ancêtre
+              de commit2 avec check_ancestor), False sinon
+    """
+    shas = []
+    for ref in (commit1, commit2):
+        sha = rev_parse(ref)
+        if not sha:
+            print(f"fatal: Not a valid object name {ref}")
+            return False
+        shas.append(sha)
+
+    if check_ancestor:
+        return is_ancestor(shas[0], shas[1])
+
+    bases = merge_bases(shas[0], shas[1])
+    for sha in (bases if show_all else bases[:1]):
+        print(sha)
+    return bool(bases)
+
+
+def main():
+    """Fonction principale pour la commande merge-base"""
+    args = sys.argv[1:]
+    show_all = "--all" in args
+    check_ancestor = "--is-ancestor" in args
+    commits = [arg for arg in args if arg not in ("--all", "--is-ancestor")]
+    if len(commits) != 2:
+        print("Usage: gitBis merge-base [--all] <commit> <commit>")
+        print("       gitBis merge-base --is-ancestor <commit> <commit>")
+        sys.exit(1)
+    if not merge_base(commits[0], commits[1], show_all, check_ancestor):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Module pour le cache des objets
+Cache LRU en mémoire, borné en octets, placé devant objects.read_object.
+
+Deux budgets séparés : les commits/trees (petits, relus très souvent par log,
+reset, ls-tree...) ne sont pas évincés par quelques gros blobs.
+
+Les caches peuvent être utilisés depuis plusieurs threads (pools de add et de
+checkout) : chaque opération est protégée par un verrou.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+# Budgets par défaut (en octets)
+DEFAULT_METADATA_BUDGET = 32 * 1024 * 1024
+DEFAULT_BLOB_BUDGET = 64 * 1024 * 1024
+
+
+class LRUCache:
+    """Cache LRU dont la taille est mesurée en octets"""
+
+    def __init__(self, max_bytes, max_item_bytes=None):
+        """
+        Args:
+            max_bytes (int): Budget total du cache
+            max_item_bytes (int): Taille maximale d'une entrée (par défaut max_bytes / 4)
+        """
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes if max_item_bytes is not None else max_bytes // 4
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, count_miss=True):
+        """
+        Retourne la valeur associée à key (ou None) et la marque comme récente
+
+        Args:
+            key: Clé recherchée
+            count_miss (bool): Compter un échec si la clé est absente
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Ajoute une entrée en évinçant les moins récentes si le budget est dépassé
+
+        Args:
+            key: Clé de l'entrée
+            value: Valeur à mémoriser
+            size (int): Taille de la valeur en octets
+
+        Returns:
+            bool: True si l'entrée a été mémorisée
+        """
+        if size > self.max_item_bytes:
+            return False
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self.entries:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def discard(self, key):
+        """Retire une entrée du cache si elle existe"""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Compteurs et occupation du cache
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def reset_stats(self):
+        """Remet les compteurs à zéro"""
+        with self.lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+class ObjectCache:
+    """Cache des objets Git : un LRU pour commits/trees/tags, un autre pour les blobs"""
+
+    def __init__(self, metadata_budget=DEFAULT_METADATA_BUDGET, blob_budget=DEFAULT_BLOB_BUDGET):
+        self.metadata = LRUCache(metadata_budget)
+        self.blobs = LRUCache(blob_budget)
+        self.git_dir = None
+        # Protège le compteur d'échecs global (les LRU ont leur propre verrou)
+        self.lock = threading.Lock()
+        self.misses = 0
+
+    def bind(self, git_dir):
+        """Associe le cache à un dépôt ; il est vidé si le dépôt change"""
+        git_dir = os.path.abspath(git_dir)
+        if git_dir != self.git_dir:
+            self.clear()
+            self.git_dir = git_dir
+
+    def get(self, sha):
+        """
+        Returns:
+            tuple: (type_objet, contenu) ou None si absent du cache
+        """
+        # Une seule lecture (sous verrou) par cache : une éviction entre un
+        # test d'appartenance et la lecture ne peut pas faire manquer l'objet
+        cached = self.metadata.get(sha, count_miss=False)
+        if cached is None:
+            cached = self.blobs.get(sha, count_miss=False)
+        if cached is None:
+            with self.lock:
+                self.misses += 1
+        return cached
+
+    def put(self, sha, obj_type, content):
+        """Mémorise un objet dans le budget correspondant à son type"""
+        cache = self.blobs if obj_type == 'blob' else self.metadata
+        cache.put(sha, (obj_type, content), len(content))
+
+    def invalidate(self, sha=None):
+        """Retire un objet du cache, ou vide tout le cache si sha est None"""
+        if sha is None:
+            self.clear()
+        else:
+            self.metadata.discard(sha)
+            self.blobs.discard(sha)
+
+    def clear(self):
+        """Vide les deux caches"""
+        self.metadata.clear()
+        self.blobs.clear()
+
+    def configure(self, metadata_budget=None, blob_budget=None):
+        """Change les budgets (le contenu actuel est vidé)"""
+        if metadata_budget is not None:
+            self.metadata = LRUCache(metadata_budget)
+        if blob_budget is not None:
+            self.blobs = LRUCache(blob_budget)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'metadata': {...}, 'blobs': {...}, 'hits': int, 'misses': int}
+            (les échecs ne sont comptés que globalement : le type est inconnu)
+        """
+        metadata = self.metadata.stats()
+        blobs = self.blobs.stats()
+        return {
+            'metadata': metadata,
+            'blobs': blobs,
+            'hits': metadata['hits'] + blobs['hits'],
+            'misses': self.misses,
+        }
+
+    def reset_stats(self):
+        """Remet tous les compteurs à zéro"""
+        self.metadata.reset_stats()
+        self.blobs.reset_stats()
+        with self.lock:
+            self.misses = 0
@@ -7,6 +7,10 @@ import os
 import zlib
 import argparse
 import struct
+import tempfile
+
+from .pack import read_packed_object, packed_object_exists
+from .object_cache import ObjectCache
 
 
 def get_git_dir():
@@ -18,14 +22,157 @@ def get_git_dir():
 # Utilisation de la fonction de détection automatique
 GIT_DIR = get_git_dir()
 
+# Cache LRU partagé par tous les appelants de read_object
+_object_cache = ObjectCache()
+
+OBJECT_TYPES = ('blob', 'tree', 'commit', 'tag')
+
+# Taille des blocs lus lors du hachage d'un fichier (mémoire constante)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def object_path(sha):
+    """
+    Retourne le chemin d'un objet "loose" au format binaire.
+    
+    Structure : .mon_git/objects/ab/cdef1234... (sans extension, comme git)
+    """
+    return os.path.join(get_git_dir(), 'objects', sha[:2], sha[2:])
+
+
+def legacy_object_path(sha):
+    """Retourne le chemin d'un objet stocké dans l'ancien format texte (.txt)"""
+    return os.path.join(get_git_dir(), 'objects', sha[:2], f"{sha[2:]}.txt")
+
+
+def object_exists(sha):
+    """
+    Vérifie si un objet existe dans la base d'objets (binaire ou ancien format texte).
+    
+    Args:
+        sha (str): Hash SHA-1 de l'objet
+    
+    Returns:
+        bool: True si l'objet existe
+    """
+    if not sha:
+        return False
+    if packed_object_exists(sha):
+        return True
+    if os.path.exists(object_path(sha)) or os.path.exists(legacy_object_path(sha)):
+        return True
+    return packed_object_exists(sha, refresh=True)
+
+
+def write_object(obj_type, content, write=True):
+    """
+    Calcule le hash d'un objet et l'écrit compressé dans .mon_git/objects.
+    
+    IMPACT SUR .MON_GIT :
+    - Si write=True : écrit .mon_git/objects/<2_premiers>/<reste_hash>
+    - Format : zlib(<type> <taille>\0<contenu>), identique au format de git
+    - L'écriture passe par un fichier temporaire renommé atomiquement
+    - Un objet déjà présent n'est jamais réécrit
+    
+    Args:
+        obj_type (str): Type de l'objet (blob, tree, commit)
+        content (bytes): Contenu brut de l'objet
+        write (bool): Si True, écrit l'objet dans .mon_git/objects
+    
+    Returns:
+        str: Hash SHA-1 de l'objet
+    """
+    store = f"{obj_type} {len(content)}\0".encode() + content
+    sha1 = hashlib.sha1(store).hexdigest()
+
+    if write:
+        path = object_path(sha1)
+        if not os.path.exists(path) and not packed_object_exists(sha1):
+            dir_path = os.path.dirname(path)
+            os.makedirs(dir_path, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix='tmp_obj_')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(zlib.compress(store))
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    return sha1
+
+
+def hash_file_streaming(file_path, write=True):
+    """
+    Calcule le hash d'un fichier (blob) par blocs, sans le charger en mémoire.
+    
+    IMPACT SUR .MON_GIT :
+    - Si write=True : écrit .mon_git/objects/<2_premiers>/<reste_hash>
+    - L'en-tête "blob <taille>\0" est calculé à partir de la taille du fichier
+    - Le contenu est haché et compressé (zlib.compressobj) bloc par bloc dans
+      un fichier temporaire renommé atomiquement une fois le hash connu
+    - La mémoire utilisée ne dépend pas de la taille du fichier
+    
+    Args:
+        file_path (str): Chemin vers le fichier à hacher
+        write (bool): Si True, écrit l'objet dans .mon_git/objects
+    
+    Returns:
+        str: Hash SHA-1 du blob
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f"blob {size}\0".encode()
+        sha = hashlib.sha1(header)
+
+        if not write:
+            read = 0
+            for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b''):
+                sha.update(chunk)
+                read += len(chunk)
+            if read != size:
+                raise ValueError(f"File changed while hashing: {file_path}")
+            return sha.hexdigest()
+
+        objects_dir = os.path.join(get_git_dir(), 'objects')
+        os.makedirs(objects_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=objects_dir, prefix='tmp_obj_')
+        try:
+            compressor = zlib.compressobj()
+            read = 0
+            with os.fdopen(fd, 'wb') as out:
+                out.write(compressor.compress(header))
+                for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+                    read += len(chunk)
+                    out.write(compressor.compress(chunk))
+                out.write(compressor.flush())
+            if read != size:
+                raise ValueError(f"File changed while hashing: {file_path}")
+
+            sha1 = sha.hexdigest()
+            path = object_path(sha1)
+            if os.path.exists(path) or packed_object_exists(sha1):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return sha1
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
 def hash_object(file_path, write=True):
     """
     Calcule le hash SHA-1 d'un fichier et optionnellement l'écrit dans .mon_git/objects.
     
     IMPACT SUR .MON_GIT :
-    - Si write=True : Crée le dossier .mon_git/objects/<2_premiers_caracteres>/ et y écrit le fichier texte
-    - Format : <type>|<taille>|<contenu> en format texte lisible
-    - Structure : .mon_git/objects/ab/cdef1234...txt (ab = 2 premiers caractères du hash)
+    - Si write=True : Crée le dossier .mon_git/objects/<2_premiers_caracteres>/ et y écrit l'objet
+    - Format : zlib(blob <taille>\0<contenu>), le contenu binaire est conservé tel quel
+    - Structure : .mon_git/objects/ab/cdef1234... (ab = 2 premiers caractères du hash)
     
     Args:
         file_path (str): Chemin vers le fichier à hacher
@@ -37,29 +184,83 @@ def hash_object(file_path, write=True):
     if not os.path.isfile(file_path):
         raise ValueError(f"File not found: {file_path}")
 
-    with open(file_path, 'rb') as f:
-        content = f.read()
+    sha1 = hash_file_streaming(file_path, write=write)
 
-    header = f"blob {len(content)}\0".encode()
-    store = header + content
+    print(sha1)
+    return sha1
 
-    sha1 = hashlib.sha1(store).hexdigest()
 
-    if write:
-        git_dir = get_git_dir()
-        object_path = os.path.join(git_dir, 'objects', sha1[:2], f"{sha1[2:]}.txt")
-        dir_path = os.path.dirname(object_path)
-        os.makedirs(dir_path, exist_ok=True)
-
-        with open(object_path, 'w') as f:
-            f.write(f"# Git Object: {sha1}\n")
-            f.write(f"# Type: blob\n")
-            f.write(f"# Size: {len(content)}\n")
-            f.write(f"blob|{len(content)}|\n")
-            f.write(content.decode('utf-8', errors='replace'))
+def parse_object(sha, data):
+    """
+    Sépare l'en-tête et le contenu d'un objet décompressé.
+    
+    Args:
+        sha (str): Hash SHA-1 de l'objet (pour les messages d'erreur)
+        data (bytes): Objet décompressé : <type> <taille>\0<contenu>
+    
+    Returns:
+        tuple: (type_objet, contenu)
+    """
+    null_index = data.find(b'\0')
+    if null_index == -1:
+        raise ValueError(f"Invalid object format for {sha}")
+    try:
+        obj_type, size = data[:null_index].decode().split(' ')
+        size = int(size)
+    except ValueError:
+        raise ValueError(f"Invalid object header for {sha}")
+    content = data[null_index + 1:]
+    if len(content) != size:
+        raise ValueError(f"Object {sha} is truncated ({len(content)} != {size})")
+    return obj_type, content
+
+
+def _parse_legacy_object(sha, raw):
+    """
+    Reconstruit le contenu canonique d'un objet écrit dans l'ancien format texte.
+    
+    L'ancien format écrivait des commentaires "# ...", une ligne "<type>|<taille>|"
+    puis le contenu sous forme lisible (les trees en lignes "mode nom sha").
+    
+    Args:
+        sha (str): Hash SHA-1 de l'objet
+        raw (bytes): Contenu brut du fichier .txt
+    
+    Returns:
+        tuple: (type_objet, contenu) avec le contenu tel qu'il a été haché
+    """
+    text = raw.decode('utf-8', errors='replace')
+    lines = text.split('\n')
+    i = 0
+    while i < len(lines) and (lines[i].startswith('#') or not lines[i].strip()):
+        i += 1
+    if i == len(lines):
+        raise ValueError(f"Object {sha} is empty or invalid.")
+
+    header_line = lines[i]
+    if '|' not in header_line:
+        # Format legacy : <type> <taille>\0<contenu> non compressé
+        return parse_object(sha, raw[raw.find(header_line.encode()):])
+
+    obj_type = header_line.split('|')[0]
+    body = '\n'.join(lines[i + 1:])
+
+    if obj_type == 'tree':
+        entries = []
+        for line in body.split('\n'):
+            parts = line.split(' ')
+            if len(parts) < 3:
+                continue
+            mode, name, entry_sha = parts[0], ' '.join(parts[1:-1]), parts[-1]
+            entries.append(f"{mode} {name}\0".encode() + bytes.fromhex(entry_sha))
+        return obj_type, b''.join(entries)
+
+    if obj_type == 'commit' and body.endswith('\n'):
+        # create_commit ajoutait un saut de ligne final qui n'était pas haché
+        body = body[:-1]
+
+    return obj_type, body.encode('utf-8')
 
-    print(sha1)
-    return sha1
 
 def read_object(sha):
     """
@@ -67,8 +268,11 @@ def read_object(sha):
     
     IMPACT SUR .MON_GIT :
     - Aucun impact (lecture seule)
-    - Lit depuis .mon_git/objects/<2_premiers>/<reste_hash>.txt
-    - Décompresse avec zlib et parse l'en-tête
+    - Consulte d'abord le cache LRU en mémoire (voir get_object_cache_stats)
+    - Puis les packs (.mon_git/objects/pack, index en mmap)
+    - Puis lit depuis .mon_git/objects/<2_premiers>/<reste_hash>
+    - Une seule décompression zlib puis séparation de l'en-tête
+    - Les objets de l'ancien format texte (.txt) restent lisibles
     
     Args:
         sha (str): Hash SHA-1 de l'objet à lire
@@ -76,42 +280,130 @@ def read_object(sha):
     Returns:
         tuple: (type_objet, contenu_decompressé)
     """
-    git_dir = get_git_dir()
-    path = os.path.join(git_dir, 'objects', sha[:2], f"{sha[2:]}.txt")
+    _object_cache.bind(get_git_dir())
+    cached = _object_cache.get(sha)
+    if cached is not None:
+        return cached
+
+    obj_type, content = _read_object_uncached(sha)
+    _object_cache.put(sha, obj_type, content)
+    return obj_type, content
+
+
+def _read_object_uncached(sha):
+    """Lit un objet depuis les packs ou les fichiers loose, sans passer par le cache"""
+    packed = read_packed_object(sha)
+    if packed is not None:
+        return packed
+
+    try:
+        with open(object_path(sha), 'rb') as f:
+            compressed = f.read()
+    except (FileNotFoundError, NotADirectoryError):
+        compressed = None
+
+    if compressed is not None:
+        try:
+            data = zlib.decompress(compressed)
+        except zlib.error as e:
+            raise ValueError(f"Error reading object {sha}: {e}")
+        return parse_object(sha, data)
+
+    path = legacy_object_path(sha)
     if not os.path.exists(path):
+        # Un pack a pu être créé depuis le dernier chargement
+        packed = read_packed_object(sha, refresh=True)
+        if packed is not None:
+            return packed
         raise ValueError(f"Object {sha} not found.")
 
-    with open(path, 'r') as f:
-        content = f.read()
-        
-    # Le contenu est stocké en texte, on le décode
+    with open(path, 'rb') as f:
+        raw = f.read()
+
     try:
-        # Supprimer les commentaires et lignes vides
-        lines = [line.strip() for line in content.split('\n') if line.strip() and not line.startswith('#')]
-        if not lines:
-            raise ValueError(f"Object {sha} is empty or invalid.")
-            
-        # La première ligne contient l'en-tête
-        header_line = lines[0]
-        if '|' in header_line:
-            obj_type, size = header_line.split('|')[:2]
-            size = int(size)
-            # Le reste du contenu
-            content_data = '\n'.join(lines[1:]).encode('utf-8')
-        else:
-            # Format legacy
-            null_index = content.find('\0')
-            if null_index == -1:
-                raise ValueError(f"Invalid object format for {sha}")
-            header = content[:null_index]
-            content_data = content[null_index+1:].encode('utf-8')
-            obj_type, size = header.split()
-            size = int(size)
-            
-        return obj_type, content_data
+        return _parse_legacy_object(sha, raw)
     except Exception as e:
         raise ValueError(f"Error reading object {sha}: {e}")
 
+
+def get_object_cache_stats():
+    """
+    Retourne les compteurs du cache d'objets de read_object.
+    
+    Returns:
+        dict: {'hits', 'misses', 'metadata': {...}, 'blobs': {...}}
+    """
+    return _object_cache.stats()
+
+
+def clear_object_cache(sha=None):
+    """
+    Invalide le cache d'objets (un seul objet si sha est fourni).
+    
+    À appeler par les processus de longue durée quand le dépôt est modifié
+    par un autre processus (ex : objets supprimés).
+    """
+    _object_cache.invalidate(sha)
+
+
+def configure_object_cache(metadata_budget=None, blob_budget=None):
+    """
+    Change les budgets du cache d'objets (en octets).
+    
+    Args:
+        metadata_budget (int): Budget pour les commits, trees et tags
+        blob_budget (int): Budget pour les blobs
+    """
+    _object_cache.configure(metadata_budget, blob_budget)
+
+
+def migrate_objects():
+    """
+    Convertit tous les objets de l'ancien format texte (.txt) en objets binaires.
+    
+    IMPACT SUR .MON_GIT :
+    - Pour chaque .mon_git/objects/xx/yyyy.txt : écrit .mon_git/objects/xx/yyyy compressé
+    - Supprime le .txt une fois l'objet binaire écrit
+    - Un objet dont le contenu ne correspond plus à son hash (contenu binaire
+      altéré par l'ancien format) est conservé tel quel et signalé
+    
+    Returns:
+        dict: Statistiques {'migrated': int, 'skipped': int, 'corrupted': list}
+    """
+    objects_dir = os.path.join(get_git_dir(), 'objects')
+    stats = {'migrated': 0, 'skipped': 0, 'corrupted': []}
+    if not os.path.isdir(objects_dir):
+        return stats
+
+    for subdir in sorted(os.listdir(objects_dir)):
+        subdir_path = os.path.join(objects_dir, subdir)
+        if len(subdir) != 2 or not os.path.isdir(subdir_path):
+            continue
+        for filename in sorted(os.listdir(subdir_path)):
+            if not filename.endswith('.txt'):
+                continue
+            sha = subdir + filename[:-4]
+            legacy_path = os.path.join(subdir_path, filename)
+            if os.path.exists(object_path(sha)):
+                os.remove(legacy_path)
+                stats['skipped'] += 1
+                continue
+            try:
+                with open(legacy_path, 'rb') as f:
+                    obj_type, content = _parse_legacy_object(sha, f.read())
+            except Exception:
+                stats['corrupted'].append(sha)
+                continue
+            if write_object(obj_type, content, write=False) != sha:
+                stats['corrupted'].append(sha)
+                continue
+            write_object(obj_type, content)
+            os.remove(legacy_path)
+            stats['migrated'] += 1
+
+    return stats
+
+
 def cat_file(option, sha):
     """
     Affiche le type ou le contenu d'un objet Git (équivalent à git cat-file).
@@ -185,127 +477,100 @@ def cat_file(option, sha):
 
 def read_index():
     """
-    Lit le fichier index Git (.mon_git/index.txt) et retourne la liste des fichiers indexés.
+    Lit le fichier index Git (.mon_git/index) et retourne la liste des fichiers indexés.
     
     IMPACT SUR .MON_GIT :
-    - Aucun impact (lecture seule)
-    - Lit le fichier texte .mon_git/index.txt
-    - Parse les entrées selon le format texte
+    - Aucun impact (lecture seule), sauf conversion d'un ancien index texte
+    - Lit l'index binaire via le module index
     
     Returns:
         list: Liste des tuples (mode, nom_fichier, hash_sha1) pour chaque fichier indexé
     """
-    git_dir = get_git_dir()
-    index_path = os.path.join(git_dir, 'index.txt')
-    if not os.path.exists(index_path):
-        return []
-    
-    entries = []
+    from .index import read_index_file
     try:
-        with open(index_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Ignorer les commentaires et lignes vides
-                if line and not line.startswith('#'):
-                    # Format: mode|hash|filename
-                    if '|' in line:
-                        parts = line.split('|')
-                        if len(parts) >= 3:
-                            mode = int(parts[0])
-                            sha1 = parts[1]
-                            filename = parts[2]
-                            entries.append((mode, filename, sha1))
+        index = read_index_file()
     except Exception as e:
         print(f"Erreur lors de la lecture de l'index: {e}")
         return []
     
-    return entries
+    return [(int(f"{entry['mode']:o}"), filename, entry['sha']) for filename, entry in index.items()]
+
+def _write_index_trees(names, entries, cache_tree, prefix, start, end):
+    """
+    Écrit le tree du dossier prefix à partir des entrées [start, end) de l'index.
+    
+    Les sous-dossiers présents dans le cache-tree ne sont pas recalculés.
+    L'index est trié par octets : un dossier "a" y occupe une plage contiguë
+    et l'ordre des entrées est déjà celui de git (dossiers comparés en "nom/").
+    
+    Returns:
+        str: Hash SHA-1 du tree
+    """
+    from bisect import bisect_left
+    parts = []
+    prefix_len = len(prefix)
+    i = start
+    while i < end:
+        name = names[i][prefix_len:]
+        slash = name.find('/')
+        if slash == -1:
+            entry = entries[i]
+            parts.append(f"{entry['mode']:o} {name}\0".encode() + bytes.fromhex(entry['sha']))
+            i += 1
+            continue
+        
+        # Sous-dossier : toutes les entrées qui commencent par "<dossier>/"
+        subdir = name[:slash]
+        sub_path = prefix + subdir
+        # '0' suit immédiatement '/' : fin de la plage "<dossier>/..."
+        j = bisect_left(names, sub_path + '0', i, end)
+        sub_sha = cache_tree.get(sub_path)
+        if sub_sha is None:
+            sub_sha = _write_index_trees(names, entries, cache_tree, sub_path + '/', i, j)
+        parts.append(f"40000 {subdir}\0".encode() + bytes.fromhex(sub_sha))
+        i = j
+    
+    tree_sha = write_object('tree', b''.join(parts))
+    cache_tree[prefix[:-1]] = tree_sha
+    return tree_sha
+
 
 def write_tree():
     """
-    Crée un objet tree à partir des fichiers du répertoire de travail.
+    Crée les objets tree (un par dossier) à partir de l'index.
     
     IMPACT SUR .MON_GIT :
-    - Crée un nouvel objet tree dans .mon_git/objects/<2_premiers>/<reste_hash>.txt
-    - Le tree représente l'état actuel des fichiers du répertoire
-    - Format tree : <mode> <nom>\0<hash_binaire> pour chaque fichier
-    - Structure : .mon_git/objects/ab/cdef1234...txt (ab = 2 premiers caractères du hash)
+    - Crée un objet tree par dossier dans .mon_git/objects/<2_premiers>/<reste_hash>
+    - Format tree : <mode> <nom>\0<hash_binaire>, sous-dossiers en mode 40000
+    - Met à jour l'extension cache-tree de .mon_git/index : seuls les dossiers
+      contenant un fichier modifié depuis le dernier write-tree sont recalculés
+    - Si un autre processus verrouille l'index, le cache-tree n'est pas enregistré
     
     Returns:
-        str: Hash SHA-1 de l'objet tree créé
+        str: Hash SHA-1 du tree racine
     """
-    # Pour simplifier, on va créer un tree basé sur les fichiers actuels
-    # plutôt que de lire l'index qui semble corrompu
-    entries = []
-    
-    # Parcours des fichiers du répertoire de travail
-    for root, dirs, files in os.walk('.'):
-        # Ignorer .mon_git et .git
-        if '.mon_git' in dirs:
-            dirs.remove('.mon_git')
-        if '.git' in dirs:
-            dirs.remove('.git')
+    from .index import read_index_file, write_index_file, try_lock_index
+    # Le cache-tree n'est enregistré que si personne d'autre n'écrit l'index
+    lock = try_lock_index()
+    try:
+        index = read_index_file()
         
-        for file in files:
-            file_path = os.path.join(root, file)
-            # Ignorer les fichiers cachés et les fichiers spéciaux
-            if file.startswith('.') and file != '.gitignore':
-                continue
-            
-            # Calculer le hash du fichier
-            try:
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                
-                header = f"blob {len(content)}\0".encode()
-                store = header + content
-                sha1 = hashlib.sha1(store).hexdigest()
-                
-                # Mode pour un fichier normal (100644)
-                mode = 0o100644
-                
-                # Chemin relatif
-                rel_path = os.path.relpath(file_path, '.')
-                entries.append((mode, rel_path, sha1))
-                
-            except Exception as e:
-                print(f"Erreur lors du traitement de {file_path}: {e}")
-    
-    # Création du contenu du tree (même vide)
-    tree_content = b""
-    for mode, name, sha1 in entries:
-        # Conversion du mode en format octal (ex: 100644)
-        mode_str = f"{mode:06o}"
-        # Conversion du hash en bytes
-        sha_bytes = bytes.fromhex(sha1)
-        # Construction de l'entrée : mode nom\0hash
-        entry = f"{mode_str} {name}\0".encode() + sha_bytes
-        tree_content += entry
-    
-    # Calcul du hash du tree
-    tree_hash = hashlib.sha1(tree_content).hexdigest()
-    
-    # Création de l'objet tree
-    header = f"tree {len(tree_content)}\0".encode()
-    store = header + tree_content
-    
-    # Écriture dans .mon_git/objects
-    git_dir = get_git_dir()
-    object_path = os.path.join(git_dir, 'objects', tree_hash[:2], f"{tree_hash[2:]}.txt")
-    os.makedirs(os.path.dirname(object_path), exist_ok=True)
-    
-    with open(object_path, 'w') as f:
-        f.write(f"# Git Object: {tree_hash}\n")
-        f.write(f"# Type: tree\n")
-        f.write(f"# Size: {len(tree_content)}\n")
-        f.write(f"tree|{len(tree_content)}|\n")
-        # Écrire les entrées en format lisible
-        for mode, name, sha1 in entries:
-            mode_str = f"{mode:06o}"
-            f.write(f"{mode_str} {name} {sha1}\n")
-    
-    if not entries:
-        print("Aucun fichier trouvé pour créer le tree.")
+        if not len(index):
+            print("Aucun fichier trouvé pour créer le tree.")
+        
+        tree_hash = index.cache_tree.get('')
+        if tree_hash is None:
+            names = []
+            entries = []
+            for name, entry in index.items():
+                names.append(name)
+                entries.append(entry)
+            tree_hash = _write_index_trees(names, entries, index.cache_tree, '', 0, len(names))
+            if lock is not None:
+                write_index_file(index, lock)
+    finally:
+        if lock is not None:
+            lock.rollback()
     
     print(tree_hash)
     return tree_hash
@@ -325,19 +590,13 @@ def create_tree(entries):
     Returns:
         str: Hash SHA-1 de l'objet tree créé
     """
-    tree_content = b""
+    parts = []
     for mode, name, sha in entries:
         mode_str = mode.decode() if isinstance(mode, bytes) else mode
         # SHA doit être binaire, pas texte
         sha_bytes = bytes.fromhex(sha)
-        tree_content += f"{mode_str} {name}\0".encode() + sha_bytes
-    sha1 = hashlib.sha1(tree_content).hexdigest()
-    store = f"tree {len(tree_content)}\0".encode() + tree_content
-    object_path = os.path.join(GIT_DIR, 'objects', sha1[:2], sha1[2:])
-    os.makedirs(os.path.dirname(object_path), exist_ok=True)
-    with open(object_path, 'wb') as f:
-        f.write(zlib.compress(store))
-    return sha1
+        parts.append(f"{mode_str} {name}\0".encode() + sha_bytes)
+    return write_object('tree', b''.join(parts))
 
 def parse_tree(tree_content):
     """
@@ -353,25 +612,85 @@ def parse_tree(tree_content):
         dict: Dictionnaire {nom_fichier: hash_sha1} pour chaque entrée
     """
     files = {}
+    for mode, name, sha in iter_tree_entries(tree_content):
+        files[name] = sha
+    return files
+
+def iter_tree_entries(tree_content):
+    """
+    Itère sur les entrées binaires d'un objet tree.
+    
+    Args:
+        tree_content (bytes): Contenu brut d'un objet tree (<mode> <nom>\0<hash_binaire>...)
+    
+    Yields:
+        tuple: (mode, nom, hash_sha1) avec mode et nom en str
+    """
     i = 0
-    while i < len(tree_content):
+    length = len(tree_content)
+    while i < length:
         mode_end = tree_content.find(b' ', i)
         name_end = tree_content.find(b'\0', mode_end)
-        mode = tree_content[i:mode_end]
-        name = tree_content[mode_end+1:name_end].decode()
+        if mode_end == -1 or name_end == -1 or name_end + 21 > length:
+            raise ValueError("Invalid tree object")
+        mode = tree_content[i:mode_end].decode()
+        name = tree_content[mode_end+1:name_end].decode('utf-8', errors='replace')
         sha = tree_content[name_end+1:name_end+21].hex()
-        files[name] = sha
+        yield mode, name, sha
         i = name_end + 21
-    return files
+
+
+def is_tree_mode(mode):
+    """Indique si un mode d'entrée de tree désigne un sous-tree (40000)"""
+    return mode.lstrip('0').startswith('4')
+
+
+def iter_tree_files(tree_sha, prefix=''):
+    """
+    Parcourt récursivement un tree et ses sous-trees.
+    
+    Args:
+        tree_sha (str): Hash SHA-1 du tree racine
+        prefix (str): Préfixe ajouté aux chemins
+    
+    Yields:
+        tuple: (chemin, mode_str, sha) pour chaque fichier, chemins séparés par '/'
+    """
+    stack = [(tree_sha, prefix)]
+    while stack:
+        sha, path_prefix = stack.pop()
+        obj_type, content = read_object(sha)
+        if obj_type != 'tree':
+            raise ValueError(f"Object {sha} is not a tree")
+        subtrees = []
+        for mode, name, entry_sha in iter_tree_entries(content):
+            path = path_prefix + name
+            if is_tree_mode(mode):
+                subtrees.append((entry_sha, path + '/'))
+            else:
+                yield path, mode, entry_sha
+        stack.extend(reversed(subtrees))
+
+
+def flatten_tree(tree_sha):
+    """
+    Retourne tous les fichiers d'un tree, sous-dossiers compris.
+    
+    Returns:
+        dict: {chemin: hash_sha1} (chemins séparés par '/')
+    """
+    return {path: sha for path, mode, sha in iter_tree_files(tree_sha)}
 
 def create_commit(tree_sha1, parent_sha1=None, parent_sha2=None, message="Initial commit"):
     """
     Crée un objet commit Git avec les métadonnées appropriées.
     
     IMPACT SUR .MON_GIT :
-    - Crée un nouvel objet commit dans .mon_git/objects/<2_premiers>/<reste_hash>.txt
-    - Format commit : tree <hash_tree>\nparent <hash_parent>\n\n<message>
-    - Structure : .mon_git/objects/ab/cdef1234...txt (ab = 2 premiers caractères du hash)
+    - Crée un nouvel objet commit dans .mon_git/objects/<2_premiers>/<reste_hash>
+    - Format commit : tree <hash_tree>\nparent <hash_parent>\nauthor ...\ncommitter ...\n\n<message>
+    - Les lignes author/committer portent la date (timestamp et fuseau), lue
+      par le commit-graph
+    - Structure : .mon_git/objects/ab/cdef1234... (ab = 2 premiers caractères du hash)
     - Le commit référence un tree et optionnellement un ou deux parents
     - Vérifie que le tree existe avant de créer le commit
     
@@ -389,24 +708,21 @@ def create_commit(tree_sha1, parent_sha1=None, parent_sha2=None, message="Initia
     git_dir = get_git_dir()
     
     # Vérification que le tree existe
-    tree_path = os.path.join(git_dir, 'objects', tree_sha1[:2], f"{tree_sha1[2:]}.txt")
-    if not os.path.exists(tree_path):
+    if not object_exists(tree_sha1):
         raise ValueError(f"Tree {tree_sha1} not found. Use 'gitBis write-tree' first.")
     
     # Vérification que les parents existent si spécifiés
-    if parent_sha1:
-        parent_path = os.path.join(git_dir, 'objects', parent_sha1[:2], f"{parent_sha1[2:]}.txt")
-        if not os.path.exists(parent_path):
-            raise ValueError(f"Parent commit {parent_sha1} not found.")
+    if parent_sha1 and not object_exists(parent_sha1):
+        raise ValueError(f"Parent commit {parent_sha1} not found.")
     
-    if parent_sha2:
-        parent_path = os.path.join(git_dir, 'objects', parent_sha2[:2], f"{parent_sha2[2:]}.txt")
-        if not os.path.exists(parent_path):
-            raise ValueError(f"Parent commit {parent_sha2} not found.")
+    if parent_sha2 and not object_exists(parent_sha2):
+        raise ValueError(f"Parent commit {parent_sha2} not found.")
     
     # Récupération des informations d'auteur
     author = getpass.getuser()
     date = int(time.time())
+    timezone = time.strftime('%z', time.localtime(date)) or '+0000'
+    identity = f"{author} <{author}@localhost> {date} {timezone}"
     
     # Construction du contenu du commit
     commit_lines = [f"tree {tree_sha1}"]
@@ -417,28 +733,13 @@ def create_commit(tree_sha1, parent_sha1=None, parent_sha2=None, message="Initia
     if parent_sha2:
         commit_lines.append(f"parent {parent_sha2}")
     
+    commit_lines.append(f"author {identity}")
+    commit_lines.append(f"committer {identity}")
     commit_lines.extend(["", message])
     commit_content = "\n".join(commit_lines).encode()
 
-    # Création de l'objet commit
-    store = f"commit {len(commit_content)}".encode() + b'\x00' + commit_content
-    sha1 = hashlib.sha1(store).hexdigest()
-    
-    # Écriture dans .mon_git/objects
-    object_path = os.path.join(git_dir, 'objects', sha1[:2], f"{sha1[2:]}.txt")
-    os.makedirs(os.path.dirname(object_path), exist_ok=True)
-    
-    with open(object_path, 'w') as f:
-        f.write(f"# Git Object: {sha1}\n")
-        f.write(f"# Type: commit\n")
-        f.write(f"# Size: {len(commit_content)}\n")
-        f.write(f"commit|{len(commit_content)}|\n")
-        f.write(f"tree {tree_sha1}\n")
-        if parent_sha1:
-            f.write(f"parent {parent_sha1}\n")
-        if parent_sha2:
-            f.write(f"parent {parent_sha2}\n")
-        f.write(f"\n{message}\n")
+    # Création de l'objet commit dans .mon_git/objects
+    sha1 = write_object('commit', commit_content)
     
     print(sha1)
     return sha1
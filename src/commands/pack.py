@@ -0,0 +1,796 @@
+#!/usr/bin/env python3
+"""
+Module pour les packfiles
+Regroupe les objets "loose" dans un fichier pack unique accompagné d'un index
+trié (table de fan-out à 256 entrées), lu en mmap pour des recherches sans E/S.
+
+Le format suit celui de git (pack v2 / idx v2) :
+- pack : "PACK" <version> <nombre> puis chaque objet (en-tête type/taille + zlib),
+  terminé par le SHA-1 de tout le fichier
+- idx  : "\\377tOc" <version>, fan-out[256], SHA-1 triés, CRC32, offsets,
+  offsets 64 bits, SHA-1 du pack, SHA-1 de l'idx
+
+Les blobs peuvent être stockés en delta (OFS_DELTA) par rapport à une version
+proche du même fichier, avec une profondeur de chaîne bornée.
+"""
+
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import zlib
+import tempfile
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.delta import create_delta, apply_delta
+from src.commands.object_cache import LRUCache
+
+
+PACK_SIGNATURE = b'PACK'
+IDX_SIGNATURE = b'\xfftOc'
+PACK_VERSION = 2
+
+# Types d'objets dans un pack
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+# Paramètres par défaut de la compression delta (comme git repack)
+DEFAULT_WINDOW = 10
+DEFAULT_DEPTH = 50
+
+# Budget du cache des bases de delta (par pack, en octets)
+DELTA_BASE_CACHE_SIZE = 16 * 1024 * 1024
+
+TYPE_TO_NUM = {'commit': OBJ_COMMIT, 'tree': OBJ_TREE, 'blob': OBJ_BLOB, 'tag': OBJ_TAG}
+NUM_TO_TYPE = {num: name for name, num in TYPE_TO_NUM.items()}
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def get_pack_dir():
+    """Retourne le chemin du dossier des packs (.mon_git/objects/pack)"""
+    return os.path.join(get_git_dir(), "objects", "pack")
+
+
+def encode_object_header(type_num, size):
+    """
+    Encode l'en-tête d'un objet de pack (type sur 3 bits, taille en varint)
+
+    Args:
+        type_num (int): Type numérique de l'objet
+        size (int): Taille du contenu décompressé
+
+    Returns:
+        bytes: En-tête encodé
+    """
+    byte = (type_num << 4) | (size & 0x0f)
+    size >>= 4
+    header = bytearray()
+    while size:
+        header.append(byte | 0x80)
+        byte = size & 0x7f
+        size >>= 7
+    header.append(byte)
+    return bytes(header)
+
+
+def decode_object_header(data, pos):
+    """
+    Décode l'en-tête d'un objet de pack
+
+    Args:
+        data: Buffer du pack (bytes ou mmap)
+        pos (int): Position de l'en-tête
+
+    Returns:
+        tuple: (type_num, taille, position_des_données)
+    """
+    byte = data[pos]
+    pos += 1
+    type_num = (byte >> 4) & 0x07
+    size = byte & 0x0f
+    shift = 4
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        size |= (byte & 0x7f) << shift
+        shift += 7
+    return type_num, size, pos
+
+
+def encode_ofs_delta_offset(distance):
+    """Encode la distance (négative) vers la base d'un OFS_DELTA"""
+    out = [distance & 0x7f]
+    distance >>= 7
+    while distance:
+        distance -= 1
+        out.append(0x80 | (distance & 0x7f))
+        distance >>= 7
+    return bytes(reversed(out))
+
+
+def decode_ofs_delta_offset(data, pos):
+    """Décode la distance vers la base d'un OFS_DELTA, retourne (distance, position)"""
+    byte = data[pos]
+    pos += 1
+    distance = byte & 0x7f
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        distance = ((distance + 1) << 7) | (byte & 0x7f)
+    return distance, pos
+
+
+class PackFile:
+    """Pack ouvert en lecture : idx et pack sont projetés en mémoire (mmap)"""
+
+    def __init__(self, idx_path):
+        self.idx_path = idx_path
+        self.pack_path = idx_path[:-4] + '.pack'
+
+        with open(idx_path, 'rb') as f:
+            self.idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.pack_path, 'rb') as f:
+            self.pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.idx[:4] != IDX_SIGNATURE or struct.unpack('>I', self.idx[4:8])[0] != 2:
+            raise ValueError(f"Invalid pack index: {idx_path}")
+        if self.pack[:4] != PACK_SIGNATURE:
+            raise ValueError(f"Invalid pack file: {self.pack_path}")
+
+        self.fanout = struct.unpack('>256I', self.idx[8:8 + 1024])
+        self.count = self.fanout[255]
+        self.sha_table = 8 + 1024
+        self.crc_table = self.sha_table + 20 * self.count
+        self.offset_table = self.crc_table + 4 * self.count
+        self.large_offset_table = self.offset_table + 4 * self.count
+
+        # Cache des bases de delta : {offset: (type_objet, contenu)}
+        self.delta_base_cache = LRUCache(DELTA_BASE_CACHE_SIZE)
+
+    def close(self):
+        """Ferme les projections mémoire"""
+        self.idx.close()
+        self.pack.close()
+
+    def sha_at(self, index):
+        """Retourne le SHA-1 (hexadécimal) de la n-ième entrée de l'index"""
+        start = self.sha_table + 20 * index
+        return self.idx[start:start + 20].hex()
+
+    def offset_at(self, index):
+        """Retourne l'offset dans le pack de la n-ième entrée de l'index"""
+        start = self.offset_table + 4 * index
+        offset = struct.unpack('>I', self.idx[start:start + 4])[0]
+        if offset & 0x80000000:
+            large = self.large_offset_table + 8 * (offset & 0x7fffffff)
+            offset = struct.unpack('>Q', self.idx[large:large + 8])[0]
+        return offset
+
+    def _bounds(self, first_byte):
+        """Intervalle [début, fin[ des entrées dont le SHA commence par first_byte"""
+        start = self.fanout[first_byte - 1] if first_byte > 0 else 0
+        return start, self.fanout[first_byte]
+
+    def find_index(self, sha):
+        """
+        Recherche dichotomique d'un SHA-1 dans l'index
+
+        Args:
+            sha (str): SHA-1 complet (40 caractères hexadécimaux)
+
+        Returns:
+            int: Position dans l'index ou None si absent
+        """
+        target = bytes.fromhex(sha)
+        lo, hi = self._bounds(target[0])
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self.sha_table + 20 * mid
+            current = self.idx[start:start + 20]
+            if current < target:
+                lo = mid + 1
+            elif current > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def lower_bound(self, prefix):
+        """
+        Position de la première entrée supérieure ou égale à un préfixe
+
+        Args:
+            prefix (str): Préfixe hexadécimal (au moins 2 caractères)
+
+        Returns:
+            int: Position dans l'index (fin du bloc fan-out si aucune)
+        """
+        lo, hi = self._bounds(int(prefix[:2], 16))
+        low_key = bytes.fromhex(prefix + '0' * (40 - len(prefix)))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self.sha_table + 20 * mid
+            if self.idx[start:start + 20] < low_key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find_prefix(self, prefix):
+        """
+        Retourne les SHA-1 de ce pack qui commencent par un préfixe hexadécimal
+
+        Args:
+            prefix (str): Préfixe hexadécimal (au moins 2 caractères)
+
+        Returns:
+            list: SHA-1 correspondants, triés
+        """
+        lo = self.lower_bound(prefix)
+        matches = []
+        end = self.fanout[int(prefix[:2], 16)]
+        while lo < end:
+            sha = self.sha_at(lo)
+            if not sha.startswith(prefix):
+                break
+            matches.append(sha)
+            lo += 1
+        return matches
+
+    def __contains__(self, sha):
+        return self.find_index(sha) is not None
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.sha_at(index)
+
+    def _inflate(self, pos, size):
+        """Décompresse les données zlib commençant à pos (taille connue)"""
+        decompressor = zlib.decompressobj()
+        chunk_size = max(size + 64, 4096)
+        data = b''
+        while not decompressor.eof:
+            chunk = self.pack[pos:pos + chunk_size]
+            if not chunk:
+                raise ValueError(f"Truncated object in {self.pack_path}")
+            data += decompressor.decompress(chunk)
+            pos += chunk_size
+        return data
+
+    def read_at(self, offset):
+        """
+        Lit l'objet stocké à un offset du pack en résolvant les chaînes de deltas
+
+        Returns:
+            tuple: (type_objet, contenu)
+        """
+        # Remonter la chaîne jusqu'à un objet complet ou une base en cache
+        chain = []
+        while True:
+            cached = self.delta_base_cache.get(offset)
+            if cached is not None:
+                obj_type, content = cached
+                break
+
+            type_num, size, pos = decode_object_header(self.pack, offset)
+            if type_num == OBJ_OFS_DELTA:
+                distance, pos = decode_ofs_delta_offset(self.pack, pos)
+                chain.append((offset, pos, size))
+                offset -= distance
+            elif type_num == OBJ_REF_DELTA:
+                base_index = self.find_index(self.pack[pos:pos + 20].hex())
+                if base_index is None:
+                    raise ValueError(f"Missing delta base at {offset} in {self.pack_path}")
+                chain.append((offset, pos + 20, size))
+                offset = self.offset_at(base_index)
+            elif type_num in NUM_TO_TYPE:
+                obj_type, content = NUM_TO_TYPE[type_num], self._inflate(pos, size)
+                break
+            else:
+                raise ValueError(f"Unsupported pack object type {type_num} at {offset}")
+
+        # Appliquer les deltas de la base vers l'objet demandé
+        if chain and offset not in self.delta_base_cache:
+            self.delta_base_cache.put(offset, (obj_type, content), len(content))
+        for depth, (delta_offset, pos, size) in enumerate(reversed(chain)):
+            content = apply_delta(content, self._inflate(pos, size))
+            if depth < len(chain) - 1:
+                self.delta_base_cache.put(delta_offset, (obj_type, content), len(content))
+
+        return obj_type, content
+
+    def read(self, sha):
+        """
+        Lit un objet du pack
+
+        Args:
+            sha (str): SHA-1 complet
+
+        Returns:
+            tuple: (type_objet, contenu) ou None si l'objet n'est pas dans ce pack
+        """
+        index = self.find_index(sha)
+        if index is None:
+            return None
+        return self.read_at(self.offset_at(index))
+
+
+# Packs ouverts pour le dépôt courant (rechargés si le dossier des packs change)
+_pack_state = {'dir': None, 'mtime': None, 'packs': []}
+
+
+def get_packs(refresh=False):
+    """
+    Retourne la liste des packs du dépôt courant, ouverts en mmap
+
+    Args:
+        refresh (bool): Si True, vérifie si le dossier des packs a changé
+
+    Returns:
+        list: Liste de PackFile
+    """
+    pack_dir = os.path.abspath(get_pack_dir())
+    if _pack_state['dir'] == pack_dir and not refresh:
+        return _pack_state['packs']
+
+    try:
+        mtime = os.stat(pack_dir).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    if _pack_state['dir'] == pack_dir and _pack_state['mtime'] == mtime:
+        return _pack_state['packs']
+
+    for pack in _pack_state['packs']:
+        pack.close()
+
+    packs = []
+    if mtime is not None:
+        for filename in sorted(os.listdir(pack_dir)):
+            if filename.startswith('pack-') and filename.endswith('.idx'):
+                try:
+                    packs.append(PackFile(os.path.join(pack_dir, filename)))
+                except (OSError, ValueError) as e:
+                    print(f"Attention : pack ignoré {filename}: {e}")
+
+    _pack_state.update({'dir': pack_dir, 'mtime': mtime, 'packs': packs})
+    return packs
+
+
+def clear_pack_cache():
+    """
+    Ferme les packs ouverts ; ils seront rouverts à la prochaine lecture
+
+    À appeler par les processus de longue durée (gitBis serve) après une
+    commande qui supprime ou recrée des packs (init, repack -d).
+    """
+    for pack in _pack_state['packs']:
+        pack.close()
+    _pack_state.update({'dir': None, 'mtime': None, 'packs': []})
+
+
+def _find_pack(sha, refresh=False):
+    """Retourne (pack, index) du pack contenant sha, ou (None, None)"""
+    for pack in get_packs(refresh=refresh):
+        index = pack.find_index(sha)
+        if index is not None:
+            return pack, index
+    return None, None
+
+
+def read_packed_object(sha, refresh=False):
+    """
+    Lit un objet depuis les packs du dépôt
+
+    Args:
+        sha (str): SHA-1 complet
+        refresh (bool): Recharger la liste des packs si le dossier a changé
+
+    Returns:
+        tuple: (type_objet, contenu) ou None si l'objet n'est dans aucun pack
+    """
+    if len(sha) != 40:
+        return None
+    pack, index = _find_pack(sha, refresh=refresh)
+    if pack is None:
+        return None
+    return pack.read_at(pack.offset_at(index))
+
+
+def packed_object_exists(sha, refresh=False):
+    """Vérifie si un objet est présent dans un des packs"""
+    if not sha or len(sha) != 40:
+        return False
+    return _find_pack(sha, refresh=refresh)[0] is not None
+
+
+def find_packed_objects_by_prefix(prefix):
+    """
+    Retourne les SHA-1 des objets packés commençant par un préfixe
+
+    Args:
+        prefix (str): Préfixe hexadécimal (au moins 2 caractères)
+
+    Returns:
+        list: SHA-1 correspondants
+    """
+    matches = set()
+    for pack in get_packs(refresh=True):
+        matches.update(pack.find_prefix(prefix))
+    return sorted(matches)
+
+
+def list_loose_objects():
+    """
+    Liste les objets "loose" (binaires ou ancien format .txt)
+
+    Returns:
+        list: SHA-1 triés
+    """
+    objects_dir = os.path.join(get_git_dir(), "objects")
+    shas = set()
+    if not os.path.isdir(objects_dir):
+        return []
+    for subdir in os.listdir(objects_dir):
+        subdir_path = os.path.join(objects_dir, subdir)
+        if len(subdir) != 2 or not os.path.isdir(subdir_path):
+            continue
+        for filename in os.listdir(subdir_path):
+            name = filename[:-4] if filename.endswith('.txt') else filename
+            if len(name) == 38:
+                shas.add(subdir + name)
+    return sorted(shas)
+
+
+def write_pack(objects, pack_dir=None, deltas=None, count=None):
+    """
+    Écrit un pack et son index à partir d'une liste d'objets
+
+    Les objets peuvent être produits au fur et à mesure (générateur) : chacun
+    est compressé et écrit dès qu'il est reçu, sans garder son contenu.
+
+    IMPACT SUR .MON_GIT :
+    - Crée .mon_git/objects/pack/pack-<sha>.pack et pack-<sha>.idx
+    - Les fichiers sont écrits en temporaire puis renommés (l'idx en dernier)
+
+    Args:
+        objects (iterable): Tuples (sha, type_objet, contenu) ou
+                            (sha, type_objet, contenu, (sha_base, delta)),
+                            dans l'ordre d'écriture
+        pack_dir (str): Dossier de destination (par défaut .mon_git/objects/pack)
+        deltas (dict): {sha: (sha_base, delta)} ; la base doit précéder l'objet
+        count (int): Nombre d'objets (obligatoire si objects n'est pas une liste)
+
+    Returns:
+        str: Chemin du fichier .pack créé
+    """
+    pack_dir = pack_dir or get_pack_dir()
+    deltas = deltas or {}
+    if count is None:
+        count = len(objects)
+    os.makedirs(pack_dir, exist_ok=True)
+
+    entries = []  # (sha, offset, crc32)
+    offsets = {}
+    pack_hash = hashlib.sha1()
+    fd, tmp_pack = tempfile.mkstemp(dir=pack_dir, prefix='tmp_pack_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            header = PACK_SIGNATURE + struct.pack('>II', PACK_VERSION, count)
+            f.write(header)
+            pack_hash.update(header)
+            offset = len(header)
+
+            for sha, obj_type, content, *rest in objects:
+                delta_entry = rest[0] if rest else deltas.get(sha)
+                if delta_entry is not None:
+                    base_sha, delta = delta_entry
+                    raw = (encode_object_header(OBJ_OFS_DELTA, len(delta))
+                           + encode_ofs_delta_offset(offset - offsets[base_sha])
+                           + zlib.compress(delta))
+                else:
+                    raw = encode_object_header(TYPE_TO_NUM[obj_type], len(content)) + zlib.compress(content)
+                offsets[sha] = offset
+                f.write(raw)
+                pack_hash.update(raw)
+                entries.append((sha, offset, zlib.crc32(raw)))
+                offset += len(raw)
+            if len(entries) != count:
+                raise ValueError(f"Pack announced {count} objects but {len(entries)} were written")
+
+            checksum = pack_hash.digest()
+            f.write(checksum)
+
+        entries.sort()
+        idx_data = _build_index(entries, checksum)
+
+        name = f"pack-{checksum.hex()}"
+        pack_path = os.path.join(pack_dir, name + '.pack')
+        idx_path = os.path.join(pack_dir, name + '.idx')
+        os.replace(tmp_pack, pack_path)
+
+        fd, tmp_idx = tempfile.mkstemp(dir=pack_dir, prefix='tmp_idx_')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(idx_data)
+        os.replace(tmp_idx, idx_path)
+    except BaseException:
+        if os.path.exists(tmp_pack):
+            os.remove(tmp_pack)
+        raise
+
+    return pack_path
+
+
+def _build_index(entries, pack_checksum):
+    """
+    Construit le contenu d'un fichier idx v2
+
+    Args:
+        entries (list): Tuples (sha, offset, crc32) triés par SHA-1
+        pack_checksum (bytes): SHA-1 du pack
+
+    Returns:
+        bytes: Contenu de l'idx
+    """
+    fanout = [0] * 256
+    for sha, offset, crc in entries:
+        fanout[int(sha[:2], 16)] += 1
+    total = 0
+    for i in range(256):
+        total += fanout[i]
+        fanout[i] = total
+
+    offsets = []
+    large_offsets = []
+    for sha, offset, crc in entries:
+        if offset < 0x80000000:
+            offsets.append(offset)
+        else:
+            offsets.append(0x80000000 | len(large_offsets))
+            large_offsets.append(offset)
+
+    parts = [
+        IDX_SIGNATURE,
+        struct.pack('>I', 2),
+        struct.pack('>256I', *fanout),
+        b''.join(bytes.fromhex(sha) for sha, offset, crc in entries),
+        b''.join(struct.pack('>I', crc & 0xffffffff) for sha, offset, crc in entries),
+        b''.join(struct.pack('>I', offset) for offset in offsets),
+        b''.join(struct.pack('>Q', offset) for offset in large_offsets),
+        pack_checksum,
+    ]
+    data = b''.join(parts)
+    return data + hashlib.sha1(data).digest()
+
+
+def collect_blob_paths():
+    """
+    Associe chaque blob au chemin sous lequel il apparaît dans l'historique
+
+    Parcourt les commits accessibles depuis HEAD et les branches
+    (log.get_commit_history) ; les sous-arbres déjà visités ne sont pas relus.
+
+    Returns:
+        dict: {sha_blob: chemin} (chemin le plus récent rencontré)
+    """
+    from src.commands.log import get_commit_history, read_commit_object
+    from src.commands.show_ref import get_all_refs
+    from src.commands.objects import read_object, iter_tree_entries
+
+    paths = {}
+    seen_commits = set()
+    seen_trees = set()
+
+    def walk_tree(tree_sha, prefix):
+        if tree_sha in seen_trees:
+            return
+        seen_trees.add(tree_sha)
+        obj_type, content = read_object(tree_sha)
+        for mode, name, sha in iter_tree_entries(content):
+            if mode.lstrip('0').startswith('4'):
+                walk_tree(sha, f"{prefix}{name}/")
+            else:
+                paths.setdefault(sha, prefix + name)
+
+    starts = ['HEAD'] + [sha for sha, ref_name in get_all_refs()]
+    for start in starts:
+        try:
+            commits = get_commit_history(start)
+        except Exception:
+            continue
+        for commit_sha in commits:
+            if commit_sha in seen_commits:
+                continue
+            seen_commits.add(commit_sha)
+            try:
+                walk_tree(read_commit_object(commit_sha)['tree'], '')
+            except Exception:
+                continue
+
+    return paths
+
+
+def iter_deltas(blobs, window=DEFAULT_WINDOW, depth=DEFAULT_DEPTH):
+    """
+    Choisit une base pour chaque blob et calcule les deltas, au fil de l'eau
+
+    Les blobs doivent arriver triés par chemin puis par taille décroissante :
+    les versions d'un même fichier sont alors voisines et la plus grande sert
+    de base. Chaque blob est comparé aux `window` blobs précédents, seuls
+    gardés en mémoire ; le delta n'est gardé que s'il fait moins de la moitié
+    de l'objet et si la chaîne reste <= depth.
+
+    Args:
+        blobs (iterable): Tuples (sha, contenu), dans l'ordre d'écriture
+        window (int): Nombre de bases candidates
+        depth (int): Profondeur maximale d'une chaîne de deltas
+
+    Yields:
+        tuple: (sha, contenu, (sha_base, delta) ou None)
+    """
+    depths = {}
+    candidates = []
+
+    for sha, content in blobs:
+        depths[sha] = 0
+        best = None
+        if window > 0 and depth > 0 and len(content) >= 64:
+            max_size = len(content) // 2 - 20
+            for base_sha, base_content in reversed(candidates):
+                if depths[base_sha] >= depth or len(base_content) < len(content) // 32:
+                    continue
+                limit = len(best[1]) - 1 if best else max_size
+                delta = create_delta(base_content, content, max_size=limit)
+                if delta is not None:
+                    best = (base_sha, delta)
+            if best:
+                depths[sha] = depths[best[0]] + 1
+
+        yield sha, content, best
+
+        candidates.append((sha, content))
+        if len(candidates) > window:
+            candidates.pop(0)
+
+
+def _object_info(sha, packed):
+    """
+    Type et taille d'un objet à empaqueter (son contenu n'est pas conservé)
+
+    Un objet loose de l'ancien format (.txt) est rehaché : son contenu
+    reconstruit peut ne plus correspondre à son nom.
+
+    Args:
+        sha (str): SHA-1 de l'objet
+        packed (bool): L'objet est dans un pack existant (déjà vérifié)
+
+    Returns:
+        tuple: (type_objet, taille), ou None si l'objet est illisible ou ne
+               correspond pas à son SHA-1
+    """
+    from src.commands.objects import _read_object_uncached, write_object, object_path
+
+    try:
+        obj_type, content = _read_object_uncached(sha)
+    except (OSError, ValueError):
+        return None
+    if not packed and not os.path.exists(object_path(sha)):
+        if write_object(obj_type, content, write=False) != sha:
+            return None
+    return obj_type, len(content)
+
+
+def repack(remove_redundant=False, window=DEFAULT_WINDOW, depth=DEFAULT_DEPTH):
+    """
+    Regroupe tous les objets du dépôt (loose et packés) dans un pack unique
+
+    Seuls le type, la taille et le chemin de chaque objet restent en mémoire :
+    les objets sont relus un par un au moment d'être écrits, et seuls les
+    `window` blobs candidats comme base de delta sont gardés.
+
+    IMPACT SUR .MON_GIT :
+    - Crée un nouveau pack dans .mon_git/objects/pack
+    - Les blobs sont stockés en delta quand une version proche existe
+    - Si remove_redundant=True : supprime les objets loose et les anciens packs
+    - Un objet loose illisible ou dont le contenu ne correspond pas à son
+      SHA-1 (ancien format .txt altéré) n'est ni empaqueté ni supprimé
+
+    Args:
+        remove_redundant (bool): Supprimer les objets devenus redondants (-d)
+        window (int): Nombre de bases candidates par blob (0 désactive les deltas)
+        depth (int): Profondeur maximale des chaînes de deltas
+
+    Returns:
+        str: Chemin du pack créé, ou None s'il n'y a aucun objet
+    """
+    from src.commands.objects import _read_object_uncached, object_path, legacy_object_path
+
+    old_packs = list(get_packs(refresh=True))
+    loose = list_loose_objects()
+
+    packed = set()
+    for pack in old_packs:
+        packed.update(pack)
+
+    others = []  # (sha, type_objet)
+    blobs = []   # (sha, taille)
+    corrupted = []
+    for sha in sorted(packed.union(loose)):
+        info = _object_info(sha, sha in packed)
+        if info is None:
+            corrupted.append(sha)
+        elif info[0] == 'blob':
+            blobs.append((sha, info[1]))
+        else:
+            others.append((sha, info[0]))
+    for sha in corrupted:
+        print(f"Attention : objet {sha} ignoré (illisible ou ne correspondant pas à son SHA-1)")
+
+    if not others and not blobs:
+        print("Aucun objet à empaqueter.")
+        return None
+
+    paths = collect_blob_paths() if blobs and window > 0 and depth > 0 else {}
+    blobs.sort(key=lambda blob: (paths.get(blob[0], ''), -blob[1], blob[0]))
+    stats = {'deltas': 0}
+
+    def read_blobs():
+        for sha, size in blobs:
+            yield sha, _read_object_uncached(sha)[1]
+
+    def objects():
+        for sha, obj_type in others:
+            yield sha, obj_type, _read_object_uncached(sha)[1]
+        for sha, content, delta in iter_deltas(read_blobs(), window, depth):
+            if delta is not None:
+                stats['deltas'] += 1
+            yield sha, 'blob', content, delta
+
+    count = len(others) + len(blobs)
+    pack_path = write_pack(objects(), count=count)
+
+    if remove_redundant:
+        skipped = set(corrupted)
+        for pack in old_packs:
+            # Un pack qui contient un objet ignoré est conservé
+            if pack.pack_path != pack_path and not any(sha in pack for sha in skipped):
+                pack.close()
+                for path in (pack.idx_path, pack.pack_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+        for sha in loose:
+            if sha in skipped:
+                continue
+            for path in (object_path(sha), legacy_object_path(sha)):
+                if os.path.exists(path):
+                    os.remove(path)
+            subdir = os.path.dirname(object_path(sha))
+            if os.path.isdir(subdir) and not os.listdir(subdir):
+                os.rmdir(subdir)
+
+    _pack_state['dir'] = None
+    get_packs()
+    print(f"{count} objet(s) empaqueté(s) dans {os.path.basename(pack_path)} "
+          f"({stats['deltas']} en delta)")
+    return pack_path
+
+
+def main():
+    """Fonction principale pour la commande repack"""
+    remove_redundant = "-d" in sys.argv[1:]
+    repack(remove_redundant=remove_redundant)
+
+
+if __name__ == "__main__":
+    main()
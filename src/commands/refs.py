@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Module pour les références (branches, tags, HEAD)
+Point d'accès unique aux refs du dépôt, avec un cache par processus.
+
+Une référence est lue d'abord dans son fichier "loose"
+(.mon_git/refs/heads/main.txt), puis dans .mon_git/packed-refs :
+- packed-refs suit le format de git : une ligne "<sha> <nom>" par ref, triée
+  par nom, précédée de "# pack-refs with: peeled fully-peeled sorted"
+- un fichier loose est prioritaire sur la ligne packée de même nom
+- packed-refs n'est relu que si le fichier a été remplacé (inode, taille, mtime)
+- une ref loose déjà lue n'est pas rouverte tant que son stat n'a pas changé
+- chaque écriture prend le verrou <ref>.txt.lock et peut vérifier l'ancienne
+  valeur (compare-and-swap) : deux processus ne s'écrasent jamais en silence
+"""
+
+import os
+import sys
+import time
+from bisect import bisect_left
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.lockfile import LockFile
+
+
+PACKED_REFS_HEADER = "# pack-refs with: peeled fully-peeled sorted \n"
+
+# Un fichier modifié moins d'une seconde avant sa lecture peut être réécrit
+# sans que son mtime change : il n'est pas mis en cache ("racy")
+RACY_WINDOW_NS = 1_000_000_000
+
+MAX_SYMREF_DEPTH = 5
+
+# Valeur par défaut de write_ref(expected=...) : pas de compare-and-swap
+ANY_VALUE = object()
+
+
+class RefUpdateError(ValueError):
+    """La ref n'a plus la valeur attendue (modifiée par un autre processus)"""
+
+    def __init__(self, ref_name, expected, current):
+        super().__init__(
+            f"cannot lock ref '{ref_name}': is at {current or '(none)'} "
+            f"but expected {expected or '(none)'}"
+        )
+        self.ref_name = ref_name
+        self.expected = expected
+        self.current = current
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def get_packed_refs_path():
+    """Retourne le chemin du fichier packed-refs"""
+    return os.path.join(get_git_dir(), "packed-refs")
+
+
+def loose_ref_path(ref_name):
+    """
+    Chemin du fichier loose d'une référence
+
+    Args:
+        ref_name (str): "HEAD" ou nom complet, ex : "refs/heads/main"
+
+    Returns:
+        str: Chemin du fichier (.mon_git/HEAD.txt, .mon_git/refs/heads/main.txt...)
+    """
+    return os.path.join(get_git_dir(), *ref_name.split('/')) + ".txt"
+
+
+def _stat_key(st):
+    """Clé d'identité d'un fichier : change à chaque réécriture"""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class RefCache:
+    """Cache des refs d'un dépôt (packed-refs et refs loose déjà lues)"""
+
+    def __init__(self):
+        self.git_dir = None
+        self.packed_key = None
+        self.packed = {}
+        self.packed_names = []
+        self.loose = {}
+
+    def bind(self, git_dir):
+        """Associe le cache à un dépôt ; il est vidé si le dépôt change"""
+        git_dir = os.path.abspath(git_dir)
+        if git_dir != self.git_dir:
+            self.clear()
+            self.git_dir = git_dir
+
+    def clear(self):
+        """Vide le cache"""
+        self.packed_key = None
+        self.packed = {}
+        self.packed_names = []
+        self.loose = {}
+
+    def get_packed(self):
+        """
+        Refs de packed-refs, relues seulement si le fichier a changé
+
+        Returns:
+            dict: {nom_ref: sha}
+        """
+        path = get_packed_refs_path()
+        try:
+            key = _stat_key(os.stat(path))
+        except FileNotFoundError:
+            key = None
+        if key != self.packed_key:
+            self.packed = parse_packed_refs(path) if key is not None else {}
+            self.packed_names = sorted(self.packed)
+            self.packed_key = key
+        return self.packed
+
+    def get_loose(self, ref_name):
+        """
+        Contenu d'une ref loose (sha ou "ref: <cible>")
+
+        Returns:
+            str: Contenu, ou None si le fichier n'existe pas ou est un commentaire
+        """
+        path = loose_ref_path(ref_name)
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            self.loose.pop(ref_name, None)
+            return None
+
+        key = _stat_key(st)
+        cached = self.loose.get(ref_name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        value = read_ref_file(path)
+        if st.st_mtime_ns < time.time_ns() - RACY_WINDOW_NS:
+            self.loose[ref_name] = (key, value)
+        else:
+            self.loose.pop(ref_name, None)
+        return value
+
+    def forget(self, ref_name):
+        """Oublie la valeur en cache d'une ref qui vient d'être écrite"""
+        self.loose.pop(ref_name, None)
+
+
+_ref_cache = RefCache()
+
+
+def _cache():
+    """Cache des refs lié au dépôt courant"""
+    _ref_cache.bind(get_git_dir())
+    return _ref_cache
+
+
+def clear_ref_cache():
+    """Vide le cache des refs (ex : après une modification externe)"""
+    _ref_cache.clear()
+
+
+def read_ref_file(ref_path):
+    """Lit le contenu d'un fichier de référence"""
+    try:
+        with open(ref_path, 'r') as f:
+            content = f.read().strip()
+    except FileNotFoundError:
+        return None
+    # Ignorer les fichiers vides et les lignes de commentaire
+    if not content or content.startswith('#'):
+        return None
+    return content
+
+
+def parse_packed_refs(path):
+    """
+    Lit un fichier packed-refs
+
+    Args:
+        path (str): Chemin du fichier
+
+    Returns:
+        dict: {nom_ref: sha} (les lignes "^<sha>" des tags annotés sont ignorées)
+    """
+    refs = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#') or line.startswith('^'):
+                continue
+            sha, _, ref_name = line.partition(' ')
+            if len(sha) == 40 and ref_name:
+                refs[ref_name] = sha
+    return refs
+
+
+def read_ref(ref_name):
+    """
+    Contenu brut d'une référence (loose prioritaire sur packed-refs)
+
+    Args:
+        ref_name (str): "HEAD" ou nom complet, ex : "refs/heads/main"
+
+    Returns:
+        str: SHA-1, "ref: <cible>" pour une ref symbolique, ou None
+    """
+    cache = _cache()
+    value = cache.get_loose(ref_name)
+    if value is not None:
+        return value
+    return cache.get_packed().get(ref_name)
+
+
+def resolve_ref(ref_name):
+    """
+    Résout une référence en SHA-1 en suivant les refs symboliques
+
+    Args:
+        ref_name (str): "HEAD" ou nom complet, ex : "refs/heads/main"
+
+    Returns:
+        str: SHA-1 ou None si la référence (ou sa cible) n'existe pas
+    """
+    for _ in range(MAX_SYMREF_DEPTH):
+        value = read_ref(ref_name)
+        if value is None:
+            return None
+        if not value.startswith("ref: "):
+            return value
+        ref_name = value[5:].strip()
+    return None
+
+
+def read_head():
+    """Lit le contenu de HEAD ("ref: refs/heads/<branche>" ou un SHA-1)"""
+    return read_ref("HEAD")
+
+
+def head_ref_name():
+    """
+    Référence pointée par HEAD
+
+    Returns:
+        str: Ex : "refs/heads/main", ou None si HEAD est détaché
+    """
+    head = read_head()
+    if head and head.startswith("ref: "):
+        return head[5:].strip()
+    return None
+
+
+def current_branch():
+    """
+    Nom de la branche courante
+
+    Returns:
+        str: Nom de la branche, ou None si HEAD est détaché
+    """
+    ref_name = head_ref_name()
+    if ref_name and ref_name.startswith("refs/heads/"):
+        return ref_name[len("refs/heads/"):]
+    return None
+
+
+def ref_exists(ref_name):
+    """Vérifie si une référence existe (loose ou packée)"""
+    return read_ref(ref_name) is not None
+
+
+def _read_ref_locked(ref_name):
+    """Valeur actuelle d'une ref relue sur disque (sans le cache), verrou pris"""
+    value = read_ref_file(loose_ref_path(ref_name))
+    if value is not None:
+        return value
+    return _cache().get_packed().get(ref_name)
+
+
+def write_ref(ref_name, value, expected=ANY_VALUE):
+    """
+    Écrit une référence loose sous verrou, avec compare-and-swap optionnel
+
+    IMPACT SUR .MON_GIT :
+    - Crée .mon_git/<ref_name>.txt.lock, y écrit la valeur puis le renomme
+      en .mon_git/<ref_name>.txt
+    - La ref loose masque l'éventuelle ligne de packed-refs
+
+    Args:
+        ref_name (str): "HEAD" ou nom complet, ex : "refs/heads/main"
+        value (str): SHA-1 ou "ref: <cible>"
+        expected (str): Valeur que la ref doit avoir au moment de l'écriture
+                        (None : la ref ne doit pas exister) ; par défaut, aucune
+                        vérification
+
+    Raises:
+        RefUpdateError: Si la ref a été modifiée entre-temps
+        LockError: Si un autre processus garde le verrou de cette ref
+    """
+    with LockFile(loose_ref_path(ref_name)) as lock:
+        if expected is not ANY_VALUE:
+            current = _read_ref_locked(ref_name)
+            if current != expected:
+                raise RefUpdateError(ref_name, expected, current)
+        lock.write(value)
+        lock.commit()
+    _cache().forget(ref_name)
+
+
+def update_head_target(commit_sha, expected=ANY_VALUE):
+    """
+    Fait avancer HEAD : la branche courante, ou HEAD lui-même s'il est détaché
+
+    Args:
+        commit_sha (str): SHA-1 du commit
+        expected (str): SHA-1 attendu avant la mise à jour (voir write_ref)
+    """
+    write_ref(head_ref_name() or "HEAD", commit_sha, expected)
+
+
+def _loose_ref_names():
+    """Noms de toutes les refs loose sous refs/"""
+    names = []
+    refs_dir = os.path.join(get_git_dir(), "refs")
+    stack = [(refs_dir, "refs")]
+    while stack:
+        path, prefix = stack.pop()
+        try:
+            entries = list(os.scandir(path))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, f"{prefix}/{entry.name}"))
+            elif entry.name.endswith('.txt'):
+                names.append(f"{prefix}/{entry.name[:-4]}")
+    return names
+
+
+def list_refs(prefix="refs/"):
+    """
+    Toutes les références (loose prioritaires sur packed-refs)
+
+    Args:
+        prefix (str): Ne garder que les refs commençant par ce préfixe
+
+    Returns:
+        list: Tuples (sha, nom_ref) triés par nom
+    """
+    cache = _cache()
+    refs = {}
+    packed = cache.get_packed()
+    names = cache.packed_names
+    for ref_name in names[bisect_left(names, prefix):]:
+        if not ref_name.startswith(prefix):
+            break
+        refs[ref_name] = packed[ref_name]
+
+    for ref_name in _loose_ref_names():
+        if ref_name.startswith(prefix):
+            value = cache.get_loose(ref_name)
+            if value is not None and not value.startswith("ref: "):
+                refs[ref_name] = value
+
+    return [(refs[ref_name], ref_name) for ref_name in sorted(refs)]
+
+
+def pack_refs():
+    """
+    Regroupe toutes les refs dans packed-refs et supprime les fichiers loose
+
+    IMPACT SUR .MON_GIT :
+    - Réécrit .mon_git/packed-refs sous le verrou packed-refs.lock (trié)
+    - Supprime les fichiers .mon_git/refs/**/*.txt devenus redondants
+    - HEAD reste un fichier loose
+
+    Returns:
+        int: Nombre de refs packées
+    """
+    with LockFile(get_packed_refs_path()) as lock:
+        refs = list_refs()
+        lock.write(PACKED_REFS_HEADER)
+        for sha, ref_name in refs:
+            lock.write(f"{sha} {ref_name}\n")
+        lock.commit()
+
+    # Ne supprimer un fichier loose que s'il contient toujours la valeur packée
+    # (vérifié sous le verrou de la ref : une mise à jour concurrente est gardée)
+    packed = {ref_name: sha for sha, ref_name in refs}
+    for ref_name in _loose_ref_names():
+        ref_path = loose_ref_path(ref_name)
+        with LockFile(ref_path):
+            if read_ref_file(ref_path) == packed.get(ref_name):
+                os.remove(ref_path)
+        _cache().forget(ref_name)
+    return len(refs)
+
+
+def main():
+    """Fonction principale pour la commande pack-refs"""
+    count = pack_refs()
+    print(f"{count} référence(s) packée(s) dans packed-refs")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,11 @@ import shutil
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.commands.rev_parse import rev_parse
-from src.commands.objects import read_object
+from src.commands.objects import read_object, flatten_tree
+from src.commands.index import Index, read_index_file, write_index_file, lock_index
+from src.commands import refs
+from src.commands.workspace import checkout_tree
+from src.commands.diff_tree import diff_trees
 
 
 def get_git_dir():
@@ -27,37 +31,25 @@ def read_index():
     Returns:
         dict: Dictionnaire des fichiers dans l'index {filename: sha}
     """
-    index_file = ".mon_git/index"
-    index_content = {}
-    
-    if os.path.exists(index_file):
-        try:
-            with open(index_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and ' ' in line:
-                        parts = line.split(' ', 1)
-                        if len(parts) == 2:
-                            sha, filename = parts
-                            index_content[filename] = sha
-        except Exception as e:
-            print(f"Erreur lors de la lecture de l'index: {e}")
-    
-    return index_content
+    try:
+        return read_index_file().to_dict()
+    except Exception as e:
+        print(f"Erreur lors de la lecture de l'index: {e}")
+        return {}
 
 
 def write_index(index_content):
     """
     Écrit le contenu dans l'index
     
+    Les entrées n'ont pas de stat : status relira ces fichiers une fois,
+    puis mettra leur stat à jour dans l'index.
+    
     Args:
         index_content (dict): Dictionnaire des fichiers {filename: sha}
     """
-    index_file = ".mon_git/index"
     try:
-        with open(index_file, 'w') as f:
-            for filename, sha in index_content.items():
-                f.write(f"{sha} {filename}\n")
+        write_index_file(Index.from_dict(index_content))
     except Exception as e:
         print(f"Erreur lors de l'écriture de l'index: {e}")
 
@@ -79,107 +71,102 @@ def get_tree_content(tree_sha):
         if not result or len(result) != 2 or result[0] != 'tree':
             return tree_content
         
-        content = result[1]
-        if isinstance(content, bytes):
-            content_str = content.decode('utf-8')
-        else:
-            content_str = content
-        
-        lines = content_str.strip().split('\n')
-        for line in lines:
-            if line and ' ' in line:
-                parts = line.split(' ', 2)
-                if len(parts) >= 3:
-                    mode, sha, filename = parts[0], parts[1], parts[2]
-                    tree_content[filename] = sha
+        # Les sous-dossiers sont des trees imbriqués
+        tree_content.update(flatten_tree(tree_sha))
     except Exception as e:
         print(f"Erreur lors de la lecture du tree: {e}")
     
     return tree_content
 
 
-def update_working_directory(tree_content):
+def reset_index_to_tree(tree_sha):
     """
-    Met à jour le working directory avec le contenu du tree
+    Met l'index dans l'état d'un tree
+    
+    Si l'index correspond à un tree connu (racine du cache-tree), seuls les
+    chemins qui diffèrent entre ce tree et le tree cible sont modifiés : les
+    autres entrées gardent leur stat et status n'aura pas à les relire.
+    Sinon l'index est reconstruit à partir du tree.
     
     Args:
-        tree_content (dict): Dictionnaire des fichiers {filename: sha}
+        tree_sha (str): SHA-1 du tree cible
     """
-    # Pour simplifier, on ne met à jour que les fichiers qui existent réellement
-    for filename, sha in tree_content.items():
-        try:
-            result = read_object(sha)
-            if result and len(result) == 2 and result[0] == 'blob':
-                content = result[1]
-                if isinstance(content, bytes):
-                    content_str = content.decode('utf-8')
+    with lock_index() as lock:
+        index = read_index_file()
+        current_tree = index.cache_tree.get('')
+        if current_tree is None:
+            index = Index.from_dict(get_tree_content(tree_sha))
+        else:
+            for status, path, old_mode, old_sha, new_mode, new_sha in diff_trees(current_tree, tree_sha):
+                if status == 'D':
+                    index.remove(path)
                 else:
-                    content_str = content
-                
-                # Créer les répertoires parents si nécessaire
-                dir_path = os.path.dirname(filename)
-                if dir_path:
-                    os.makedirs(dir_path, exist_ok=True)
-                
-                with open(filename, 'w') as f:
-                    f.write(content_str)
-        except Exception as e:
-            # Ignorer silencieusement les erreurs pour les fichiers non trouvés
-            # Cela peut arriver si certains objets n'existent pas dans le dépôt
-            pass
+                    index.set(path, new_sha, mode=int(new_mode, 8))
+        # L'index correspond maintenant exactement au tree cible
+        index.cache_tree[''] = tree_sha
+        write_index_file(index, lock)
 
 
-def update_head(commit_sha):
+def update_head(commit_sha, expected_head=refs.ANY_VALUE):
     """
     Met à jour HEAD vers le commit spécifié
     
     Args:
         commit_sha (str): SHA-1 du commit
+        expected_head (str): SHA-1 de HEAD lu au début du reset ; la mise à
+                             jour échoue si un autre processus l'a déplacé
     
     Returns:
         bool: True si HEAD a été mis à jour
     """
     try:
-        with open('.mon_git/HEAD.txt', 'r') as f:
-            head_content = f.read().strip()
-        
-        if head_content.startswith('ref: refs/heads/'):
-            # HEAD pointe vers une branche
-            branch_name = head_content[16:]  # Enlever "ref: refs/heads/"
-            branch_file = f'.mon_git/refs/heads/{branch_name}.txt'
-            
-            with open(branch_file, 'w') as f:
-                f.write(commit_sha)
-        else:
-            # HEAD pointe directement vers un commit (detached HEAD)
-            with open('.mon_git/HEAD.txt', 'w') as f:
-                f.write(commit_sha)
-        
+        # La branche pointée par HEAD, ou HEAD lui-même s'il est détaché
+        refs.update_head_target(commit_sha, expected_head)
         return True
     except Exception as e:
         print(f"Erreur lors de la mise à jour de HEAD: {e}")
         return False
 
 
-def reset_soft(commit_sha):
+def head_unchanged(expected_head=refs.ANY_VALUE):
+    """
+    Vérifie, avant de toucher à l'index, que HEAD n'a pas bougé depuis le
+    début du reset (update_head le vérifie à nouveau sous verrou)
+    
+    Returns:
+        bool: True si HEAD a encore la valeur attendue
+    """
+    if expected_head is refs.ANY_VALUE:
+        return True
+    current = refs.resolve_ref("HEAD")
+    if current != expected_head:
+        error = refs.RefUpdateError(refs.head_ref_name() or "HEAD", expected_head, current)
+        print(f"Erreur lors de la mise à jour de HEAD: {error}")
+        return False
+    return True
+
+
+def reset_soft(commit_sha, expected_head=refs.ANY_VALUE):
     """
     Reset soft : réinitialise seulement HEAD
     
     Args:
         commit_sha (str): SHA-1 du commit cible
+        expected_head (str): SHA-1 attendu de HEAD (voir update_head)
     
     Returns:
         bool: True si le reset a réussi
     """
-    return update_head(commit_sha)
+    return update_head(commit_sha, expected_head)
 
 
-def reset_mixed(commit_sha):
+def reset_mixed(commit_sha, expected_head=refs.ANY_VALUE):
     """
     Reset mixed : réinitialise HEAD et l'index
     
     Args:
         commit_sha (str): SHA-1 du commit cible
+        expected_head (str): SHA-1 attendu de HEAD (voir update_head)
     
     Returns:
         bool: True si le reset a réussi
@@ -209,26 +196,27 @@ def reset_mixed(commit_sha):
             print(f"fatal: Invalid commit object: {commit_sha}")
             return False
         
-        # Mettre à jour HEAD
-        if not update_head(commit_sha):
+        if not head_unchanged(expected_head):
             return False
         
-        # Mettre à jour l'index avec le contenu du tree
-        tree_content = get_tree_content(tree_sha)
-        write_index(tree_content)
+        # Mettre à jour l'index avant HEAD : si l'index est verrouillé, HEAD
+        # ne bouge pas. Seuls les chemins qui changent sont touchés
+        reset_index_to_tree(tree_sha)
         
-        return True
+        # Mettre à jour HEAD
+        return update_head(commit_sha, expected_head)
     except Exception as e:
         print(f"Erreur lors du reset mixed: {e}")
         return False
 
 
-def reset_hard(commit_sha):
+def reset_hard(commit_sha, expected_head=refs.ANY_VALUE):
     """
     Reset hard : réinitialise HEAD, l'index et le working directory
     
     Args:
         commit_sha (str): SHA-1 du commit cible
+        expected_head (str): SHA-1 attendu de HEAD (voir update_head)
     
     Returns:
         bool: True si le reset a réussi
@@ -258,18 +246,16 @@ def reset_hard(commit_sha):
             print(f"fatal: Invalid commit object: {commit_sha}")
             return False
         
-        # Mettre à jour HEAD
-        if not update_head(commit_sha):
+        if not head_unchanged(expected_head):
             return False
         
-        # Mettre à jour l'index avec le contenu du tree
-        tree_content = get_tree_content(tree_sha)
-        write_index(tree_content)
+        # Mettre à jour l'index et le working directory avant HEAD : si l'index
+        # est verrouillé, HEAD ne bouge pas. Seuls les fichiers qui diffèrent
+        # du tree sont réécrits ou supprimés
+        checkout_tree(tree_sha, force=True)
         
-        # Mettre à jour le working directory
-        update_working_directory(tree_content)
-        
-        return True
+        # Mettre à jour HEAD
+        return update_head(commit_sha, expected_head)
     except Exception as e:
         print(f"Erreur lors du reset hard: {e}")
         return False
@@ -286,6 +272,9 @@ def reset(target, mode="mixed"):
     Returns:
         bool: True si le reset a réussi
     """
+    # HEAD avant le reset : la mise à jour échouera s'il bouge entre-temps
+    head_sha = refs.resolve_ref("HEAD")
+    
     # Résoudre la référence en SHA-1
     commit_sha = rev_parse(target)
     if not commit_sha:
@@ -304,11 +293,11 @@ def reset(target, mode="mixed"):
     
     # Exécuter le reset selon le mode
     if mode == "soft":
-        return reset_soft(commit_sha)
+        return reset_soft(commit_sha, head_sha)
     elif mode == "mixed":
-        return reset_mixed(commit_sha)
+        return reset_mixed(commit_sha, head_sha)
     elif mode == "hard":
-        return reset_hard(commit_sha)
+        return reset_hard(commit_sha, head_sha)
     else:
         print(f"fatal: Invalid reset mode: {mode}")
         return False
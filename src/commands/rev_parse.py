@@ -6,7 +6,12 @@ Convertit une référence en SHA-1
 
 import os
 import re
-from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import refs
 
 
 def get_git_dir():
@@ -15,28 +20,13 @@ def get_git_dir():
 
 
 def read_head():
-    """Lit le contenu de HEAD"""
-    head_path = os.path.join(get_git_dir(), "HEAD.txt")
-    try:
-        with open(head_path, 'r') as f:
-            content = f.read().strip()
-        return content
-    except FileNotFoundError:
-        return None
+    """Lit le contenu de HEAD (via le cache des refs)"""
+    return refs.read_head()
 
 
 def read_branch_ref(branch_name):
-    """Lit la référence d'une branche"""
-    ref_path = os.path.join(get_git_dir(), "refs", "heads", f"{branch_name}.txt")
-    try:
-        with open(ref_path, 'r') as f:
-            content = f.read().strip()
-            # Ignorer les lignes de commentaire
-            if content.startswith('#'):
-                return None
-            return content
-    except FileNotFoundError:
-        return None
+    """Lit la référence d'une branche (loose ou packed-refs)"""
+    return refs.resolve_ref(f"refs/heads/{branch_name}")
 
 
 def is_valid_sha1(sha1):
@@ -54,32 +44,61 @@ def is_partial_sha1(sha1):
 
 
 def find_object_by_partial_sha1(partial_sha):
-    """Trouve un objet par son SHA-1 partiel"""
-    objects_dir = os.path.join(get_git_dir(), "objects")
+    """
+    Trouve un objet par son SHA-1 partiel
     
-    if not os.path.exists(objects_dir):
+    Args:
+        partial_sha (str): SHA-1 abrégé
+    
+    Returns:
+        str: SHA-1 complet, ou None si aucun objet ne correspond ou si le
+             préfixe est ambigu
+    """
+    from src.commands.abbrev import resolve_abbrev, AmbiguousShaError
+    
+    try:
+        return resolve_abbrev(partial_sha)
+    except AmbiguousShaError as e:
+        print(f"error: short SHA1 {partial_sha} is ambiguous")
+        for candidate in e.candidates:
+            print(f"hint:   {candidate}")
         return None
+
+
+# Suffixes d'ascendance : ~<n> (n-ième ancêtre en premier parent), ^<n> (n-ième parent)
+ANCESTRY_SUFFIX = re.compile(r'([~^])(\d*)')
+
+
+def resolve_ancestry(sha, suffix):
+    """
+    Applique les suffixes ~n / ^n à un commit (parents lus dans le commit-graph)
     
-    # Chercher dans les sous-dossiers
-    for subdir in os.listdir(objects_dir):
-        subdir_path = os.path.join(objects_dir, subdir)
-        if os.path.isdir(subdir_path):
-            for filename in os.listdir(subdir_path):
-                # Vérifier si le nom du fichier commence par la suite du SHA-1 partiel
-                if filename.startswith(partial_sha[2:]):  # Enlever les 2 premiers caractères
-                    # Vérifier si c'est un fichier .txt (objet Git)
-                    if filename.endswith('.txt'):
-                        return subdir + filename[:-4]  # Retirer l'extension .txt
-                    else:
-                        return subdir + filename
-                # Vérifier aussi si le SHA-1 complet commence par le SHA-1 partiel
-                elif (subdir + filename[:-4] if filename.endswith('.txt') else subdir + filename).startswith(partial_sha):
-                    if filename.endswith('.txt'):
-                        return subdir + filename[:-4]
-                    else:
-                        return subdir + filename
+    Args:
+        sha (str): SHA-1 du commit de départ
+        suffix (str): Suffixes, ex : "~2^2"
     
-    return None
+    Returns:
+        str: SHA-1 du commit atteint ou None s'il n'existe pas
+    """
+    from src.commands.commit_graph import get_commit_parents
+    
+    for op, count in ANCESTRY_SUFFIX.findall(suffix):
+        n = int(count) if count else 1
+        try:
+            if op == '~':
+                for _ in range(n):
+                    parents = get_commit_parents(sha)
+                    if not parents:
+                        return None
+                    sha = parents[0]
+            elif n > 0:
+                parents = get_commit_parents(sha)
+                if len(parents) < n:
+                    return None
+                sha = parents[n - 1]
+        except ValueError:
+            return None
+    return sha
 
 
 def rev_parse(ref):
@@ -87,7 +106,8 @@ def rev_parse(ref):
     Convertit une référence en SHA-1 complet
     
     Args:
-        ref (str): La référence à résoudre (HEAD, nom de branche, SHA-1 partiel, etc.)
+        ref (str): La référence à résoudre (HEAD, nom de branche, SHA-1 partiel,
+                   avec éventuellement des suffixes ~n / ^n)
     
     Returns:
         str: Le SHA-1 complet ou None si la référence n'est pas trouvée
@@ -95,20 +115,21 @@ def rev_parse(ref):
     if not ref:
         return None
     
+    # Suffixes d'ascendance : HEAD~2, main^2, abc123~1^2...
+    match = re.match(r'^(.+?)((?:[~^]\d*)+)$', ref)
+    if match:
+        base = rev_parse(match.group(1))
+        if not base:
+            return None
+        return resolve_ancestry(base, match.group(2))
+    
     # Cas 1: SHA-1 complet déjà
     if is_valid_sha1(ref):
         return ref
     
-    # Cas 2: HEAD
+    # Cas 2: HEAD (directement un commit, ou la branche vers laquelle il pointe)
     if ref.upper() == "HEAD":
-        head_content = read_head()
-        if head_content and head_content.startswith("ref: "):
-            # HEAD pointe vers une branche
-            branch_name = head_content[5:].strip()  # Enlever "ref: " et les espaces
-            return read_branch_ref(branch_name.split('/')[-1])  # Prendre juste le nom de la branche
-        else:
-            # HEAD pointe directement vers un commit
-            return head_content
+        return refs.resolve_ref("HEAD")
     
     # Cas 3: Nom de branche
     branch_sha = read_branch_ref(ref)
@@ -121,19 +142,9 @@ def rev_parse(ref):
         if full_sha:
             return full_sha
     
-    # Cas 5: Référence avec refs/heads/
-    if ref.startswith("refs/heads/"):
-        branch_name = ref[11:]  # Enlever "refs/heads/"
-        return read_branch_ref(branch_name)
-    
-    # Cas 6: Référence avec refs/
+    # Cas 5: Référence complète (refs/heads/..., refs/tags/...)
     if ref.startswith("refs/"):
-        ref_path = os.path.join(get_git_dir(), ref + ".txt")
-        try:
-            with open(ref_path, 'r') as f:
-                return f.read().strip()
-        except FileNotFoundError:
-            pass
+        return refs.resolve_ref(ref)
     
     return None
 
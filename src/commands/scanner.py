@@ -0,0 +1,230 @@
+"""
+Module pour le parcours du working directory (status, add)
+
+Un seul parcours, construit sur os.scandir :
+- le stat de chaque fichier vient de l'entrée de dossier et n'est lu qu'une
+  fois, au premier accès (status le compare directement à l'index)
+- les dossiers ignorés (.gitignore) et .mon_git ne sont jamais listés
+- les chemins sont produits dans l'ordre de l'index (octets, un dossier "a"
+  étant comparé comme "a/") : status les fusionne avec l'index en une passe
+- avec jobs > 1, les sous-dossiers sont listés à l'avance sur un pool de
+  threads ; l'ordre de sortie reste le même
+
+scan_untracked ne cherche que les fichiers non suivis et s'appuie sur le cache
+de l'index : un dossier dont le mtime n'a pas changé n'a ni gagné ni perdu
+d'entrée, ses fichiers non suivis et ses sous-dossiers sont repris du cache
+sans le relire. Ses sous-dossiers sont tout de même visités (un lstat chacun) :
+une modification plus profonde ne change pas le mtime des parents. Avec les
+chemins signalés par fsmonitor, un dossier où rien n'a changé n'a même pas
+besoin de ce lstat.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .index import path_key, stat_from_result
+from .gitignore import normalize_path, GITIGNORE_FILE
+
+
+# Dossiers jamais parcourus
+SKIPPED_DIRS = ('.git', '.mon_git')
+
+
+class ScanEntry:
+    """Fichier du working directory : chemin relatif et stat"""
+
+    __slots__ = ('path', '_dir_entry', '_stat')
+
+    def __init__(self, path, dir_entry):
+        self.path = path
+        self._dir_entry = dir_entry
+        self._stat = None
+
+    @property
+    def stat(self):
+        """Stat au format de l'index, lu au premier accès (None si le fichier a disparu)"""
+        if self._stat is None:
+            try:
+                self._stat = stat_from_result(self._dir_entry.stat(follow_symlinks=False))
+            except OSError:
+                return None
+        return self._stat
+
+    def __repr__(self):
+        return f"ScanEntry({self.path!r})"
+
+
+def _list_directory(full_path, prefix, ignore):
+    """
+    Liste un dossier (éventuellement sur le pool de threads)
+
+    Args:
+        full_path (str): Chemin du dossier à ouvrir
+        prefix (str): Chemin relatif du dossier suivi de '/' ('' pour la racine)
+        ignore (IgnoreMatcher): Règles .gitignore, ou None
+
+    Returns:
+        list: (clé, chemin, DirEntry, est_un_dossier) dans l'ordre de l'index
+    """
+    entries = []
+    try:
+        with os.scandir(full_path) as it:
+            for entry in it:
+                path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in SKIPPED_DIRS:
+                        continue
+                    if ignore is not None and ignore.is_ignored(path, is_dir=True):
+                        continue
+                    entries.append((path_key(path) + b'/', path, entry, True))
+                elif entry.is_file(follow_symlinks=False) or entry.is_symlink():
+                    if ignore is not None and ignore.is_ignored(path):
+                        continue
+                    entries.append((path_key(path), path, entry, False))
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        print(f"Erreur lors du parcours : {e}")
+        return []
+    entries.sort(key=lambda item: item[0])
+    return entries
+
+
+def _walk(entries, pool, ignore):
+    """Produit les fichiers d'un dossier déjà listé, sous-dossiers compris"""
+    pending = {}
+    if pool is not None:
+        # Les sous-dossiers sont listés en parallèle pendant qu'on produit
+        # les entrées qui les précèdent
+        for key, path, dir_entry, is_dir in entries:
+            if is_dir:
+                pending[path] = pool.submit(_list_directory, dir_entry.path, path + '/', ignore)
+
+    for key, path, dir_entry, is_dir in entries:
+        if not is_dir:
+            yield ScanEntry(path, dir_entry)
+            continue
+        if pool is not None:
+            sub_entries = pending.pop(path).result()
+        else:
+            sub_entries = _list_directory(dir_entry.path, path + '/', ignore)
+        yield from _walk(sub_entries, pool, ignore)
+
+
+def scan_worktree(top='', ignore=None, jobs=1):
+    """
+    Parcourt le working directory
+
+    Args:
+        top (str): Dossier de départ relatif à la racine ('' = tout le dépôt)
+        ignore (IgnoreMatcher): Règles .gitignore appliquées pendant le
+                                parcours (None : rien n'est ignoré)
+        jobs (int): Nombre de threads qui listent les dossiers
+
+    Yields:
+        ScanEntry: Fichiers (et liens symboliques), dans l'ordre de l'index
+    """
+    top = normalize_path(top)
+    if top and ignore is not None and ignore.is_ignored(top, is_dir=True):
+        return
+    prefix = top + '/' if top else ''
+    root = top or '.'
+
+    if jobs <= 1:
+        yield from _walk(_list_directory(root, prefix, ignore), None, ignore)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        yield from _walk(_list_directory(root, prefix, ignore), pool, ignore)
+
+
+def _gitignore_signature(directory):
+    """Stat du .gitignore d'un dossier : (mtime_ns, taille), ou None s'il n'existe pas"""
+    try:
+        st = os.stat(os.path.join(directory or '.', GITIGNORE_FILE))
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_untracked_dir(directory, index, ignore):
+    """
+    Relit un dossier
+
+    Returns:
+        tuple: (noms des fichiers non suivis, noms des sous-dossiers parcourus)
+    """
+    prefix = directory + '/' if directory else ''
+    untracked, dirs = [], []
+    for key, path, dir_entry, is_dir in _list_directory(directory or '.', prefix, ignore):
+        if is_dir:
+            dirs.append(dir_entry.name)
+        elif path not in index:
+            untracked.append(dir_entry.name)
+    return untracked, dirs
+
+
+def _walk_untracked(directory, index, ignore, new_cache, force, changed):
+    """Produit les fichiers non suivis d'un dossier et de ses sous-dossiers"""
+    record = None if force else index.untracked_cache.get(directory)
+    if (changed is not None and record is not None and record['mtime_ns'] is not None
+            and not changed.touches_dir(directory)):
+        # fsmonitor : aucune entrée du dossier ni de son .gitignore n'a changé
+        new_cache[directory] = record
+        yield from _cached_entries(directory, index, ignore, new_cache, record, force, changed)
+        return
+    try:
+        # mtime lu avant la liste : une entrée créée pendant la lecture
+        # rendra le cache invalide au prochain parcours
+        mtime_ns = os.lstat(directory or '.').st_mtime_ns
+    except OSError:
+        return
+    gitignore = _gitignore_signature(directory)
+
+    if record is None or record['gitignore'] != gitignore:
+        # Dossier inconnu ou .gitignore modifié : les règles ont pu changer pour
+        # tous les sous-dossiers, qui sont relus aussi
+        force = True
+        record = None
+    elif record['mtime_ns'] != mtime_ns:
+        record = None
+    if record is None:
+        untracked, dirs = _read_untracked_dir(directory, index, ignore)
+        record = {'mtime_ns': mtime_ns, 'gitignore': gitignore,
+                  'untracked': untracked, 'dirs': dirs}
+    new_cache[directory] = record
+    yield from _cached_entries(directory, index, ignore, new_cache, record, force, changed)
+
+
+def _cached_entries(directory, index, ignore, new_cache, record, force, changed):
+    """Produit les fichiers non suivis d'un enregistrement du cache, sous-dossiers compris"""
+    prefix = directory + '/' if directory else ''
+    names = [(path_key(prefix + name), name, False) for name in record['untracked']]
+    names += [(path_key(prefix + name) + b'/', name, True) for name in record['dirs']]
+    names.sort()
+    for key, name, is_dir in names:
+        if is_dir:
+            yield from _walk_untracked(prefix + name, index, ignore, new_cache, force, changed)
+        else:
+            yield prefix + name
+
+
+def scan_untracked(index, ignore=None, changed=None):
+    """
+    Fichiers non suivis du working directory, avec le cache de l'index
+
+    index.untracked_cache est remplacé par le résultat du parcours (les
+    dossiers disparus en sortent) ; il est enregistré avec l'index.
+
+    Args:
+        index (Index): Index lu (fichiers suivis et cache)
+        ignore (IgnoreMatcher): Règles .gitignore (None : rien n'est ignoré)
+        changed (ChangedPaths): Chemins modifiés depuis le jeton fsmonitor
+                                de l'index (None : vérifier chaque dossier)
+
+    Returns:
+        list: Chemins des fichiers non suivis, dans l'ordre de l'index
+    """
+    new_cache = {}
+    untracked = list(_walk_untracked('', index, ignore, new_cache, False, changed))
+    index.untracked_cache = new_cache
+    return untracked
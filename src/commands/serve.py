@@ -0,0 +1,321 @@
+"""
+Module pour le mode serveur (gitBis serve)
+
+Chaque appel de gitBis.py paie le démarrage de Python, l'import des modules
+et la relecture du dépôt. gitBis serve exécute les commandes dans un seul
+processus qui reste lancé : les modules sont déjà importés et les caches
+(objets, refs, commit-graph, packs, index) restent chauds. Chacun vérifie le
+stat des fichiers qu'il a lus : une modification faite par un autre processus
+est vue à la requête suivante. Après init, repack et migrate-objects, qui
+recréent ou élaguent le stockage des objets, tous les caches sont vidés.
+
+Protocole : une requête JSON par ligne, une réponse JSON par ligne, sur le
+socket Unix .mon_git/gitbis.sock ou sur stdin/stdout (--stdio) :
+- {"command": "run", "argv": ["status"], "cwd": "..."}
+  -> {"exit": 0, "stdout": "...", "stderr": "..."}
+- {"command": "ping"} -> {"pid": ...}
+- {"command": "stop"} -> {"stopped": true}
+
+Les commandes s'exécutent l'une après l'autre (elles changent de dossier et
+redirigent la sortie standard du processus). gitBis_client.py transmet ses
+arguments au serveur, ou exécute la commande lui-même s'il n'y en a pas.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+
+SOCKET_NAME = "gitbis.sock"
+
+# Commandes qui recréent ou élaguent le stockage des objets : les caches du
+# processus (objets, packs, index, refs) sont vidés après leur exécution
+OBJECT_STORE_COMMANDS = ("init", "repack", "migrate-objects")
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def get_socket_path():
+    """Retourne le chemin du socket du serveur"""
+    return os.path.join(get_git_dir(), SOCKET_NAME)
+
+
+def clear_caches():
+    """Vide les caches gardés en mémoire entre deux commandes"""
+    from src.commands.objects import clear_object_cache
+    from src.commands.pack import clear_pack_cache
+    from src.commands.index import clear_index_cache
+    from src.commands.refs import clear_ref_cache
+    clear_object_cache()
+    clear_pack_cache()
+    clear_index_cache()
+    clear_ref_cache()
+
+
+def _exit_code(code):
+    """Code de retour d'un SystemExit (sys.exit(None), sys.exit(1), sys.exit("message"))"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+class CommandServer:
+    """Exécute des commandes gitBis dans le processus courant"""
+
+    def __init__(self, main):
+        """
+        Args:
+            main: Fonction main(argv) de gitBis.py
+        """
+        self.main = main
+        self.root = os.getcwd()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+
+    def run(self, argv, cwd=None):
+        """
+        Exécute une commande et capture sa sortie
+
+        Args:
+            argv (list): Arguments de la commande (sans "gitBis")
+            cwd (str): Dossier où l'exécuter (défaut : dossier du serveur)
+
+        Returns:
+            dict: {'exit', 'stdout', 'stderr'}
+        """
+        if argv[:1] == ["serve"] or argv[:2] == ["fsmonitor", "run"]:
+            return {'exit': 1, 'stdout': '', 'stderr': f"Erreur : '{' '.join(argv)}' ne peut pas être servi\n"}
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with self._lock:
+            previous = os.getcwd()
+            code = 0
+            try:
+                os.chdir(cwd or self.root)
+                with redirect_stdout(stdout), redirect_stderr(stderr):
+                    try:
+                        self.main(list(argv))
+                    except SystemExit as e:
+                        code = _exit_code(e.code)
+                    except Exception:
+                        traceback.print_exc()
+                        code = 1
+                    finally:
+                        # Objets supprimés ou dépôt recréé : les caches ne
+                        # doivent plus répondre avec l'ancien contenu
+                        if argv[:1] and argv[0] in OBJECT_STORE_COMMANDS:
+                            clear_caches()
+            except OSError as e:
+                stderr.write(f"Erreur : {e}\n")
+                code = 1
+            finally:
+                os.chdir(previous)
+        return {'exit': code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def handle(self, request):
+        """
+        Traite une requête décodée
+
+        Returns:
+            dict: Réponse à renvoyer au client
+        """
+        command = request.get('command', 'run')
+        if command == 'run':
+            argv = request.get('argv')
+            if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+                return {'error': "argv doit être une liste de chaînes"}
+            return self.run(argv, request.get('cwd'))
+        if command == 'ping':
+            return {'pid': os.getpid()}
+        if command == 'stop':
+            self._stop.set()
+            return {'stopped': True}
+        return {'error': f"commande inconnue : {command}"}
+
+    def _handle_line(self, line):
+        """Décode une ligne de requête et retourne la réponse encodée"""
+        try:
+            request = json.loads(line)
+            response = self.handle(request) if isinstance(request, dict) else {'error': "requête invalide"}
+        except ValueError:
+            response = {'error': "requête invalide"}
+        return json.dumps(response) + '\n'
+
+    def serve_stdio(self, stdin=None, stdout=None):
+        """Lit les requêtes sur stdin et écrit les réponses sur stdout"""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            if not line.strip():
+                continue
+            stdout.write(self._handle_line(line))
+            stdout.flush()
+            if self._stop.is_set():
+                break
+
+    def _serve_connection(self, conn):
+        """Répond aux requêtes d'une connexion, une ligne JSON à la fois"""
+        with conn:
+            try:
+                for line in conn.makefile('rb'):
+                    conn.sendall(self._handle_line(line).encode())
+            except OSError:
+                pass
+
+    def wait_ready(self, timeout=None):
+        """Attend que le socket accepte les connexions"""
+        return self._ready.wait(timeout)
+
+    def shutdown(self):
+        self._stop.set()
+
+    def serve_socket(self):
+        """
+        Répond aux requêtes du socket jusqu'à "stop"
+
+        IMPACT SUR .MON_GIT :
+        - Crée .mon_git/gitbis.sock, supprimé à l'arrêt
+        """
+        path = get_socket_path()
+        # Les commandes changent de dossier : le socket est supprimé par son
+        # chemin absolu (lié par son chemin relatif, plus court)
+        abs_path = os.path.abspath(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if os.path.exists(abs_path):
+                # Socket d'un serveur arrêté brutalement
+                os.remove(abs_path)
+            server.bind(path)
+            server.listen()
+            server.settimeout(0.2)
+            self._ready.set()
+            while not self._stop.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(abs_path):
+                os.remove(abs_path)
+
+
+def serve(main, stdio=False):
+    """
+    Commande serve
+
+    Args:
+        main: Fonction main(argv) de gitBis.py
+        stdio (bool): Requêtes sur stdin/stdout plutôt que sur le socket
+
+    Returns:
+        bool: False si le serveur n'a pas pu démarrer
+    """
+    server = CommandServer(main)
+    if stdio:
+        server.serve_stdio()
+        return True
+    if not os.path.isdir(get_git_dir()):
+        print(f"Erreur : ce répertoire n'est pas un dépôt Git ('{get_git_dir()}' manquant).")
+        return False
+    try:
+        running = forward_request({'command': 'ping'}) is not None
+    except (OSError, ValueError):
+        running = False
+    if running:
+        print("gitBis serve est déjà lancé")
+        return False
+    print(f"gitBis serve : en attente sur {get_socket_path()}")
+    sys.stdout.flush()
+    try:
+        server.serve_socket()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Erreur : {e}")
+        return False
+    return True
+
+
+def forward_request(request):
+    """
+    Envoie une requête au serveur du dépôt courant
+
+    Returns:
+        dict: Réponse, ou None si aucun serveur n'accepte la connexion
+    """
+    path = get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    # Connexion acceptée : la commande a peut-être été exécutée, une erreur
+    # n'autorise plus à la relancer ailleurs
+    with client:
+        client.sendall(json.dumps(request).encode() + b'\n')
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = client.recv(65536)
+            if not chunk:
+                raise ConnectionError("le serveur a fermé la connexion")
+            data += chunk
+    return json.loads(data)
+
+
+def forward(argv):
+    """
+    Exécute une commande via le serveur et affiche sa sortie
+
+    Args:
+        argv (list): Arguments de la commande
+
+    Returns:
+        int: Code de retour, ou None si aucun serveur ne tourne
+    """
+    try:
+        response = forward_request({'command': 'run', 'argv': argv, 'cwd': os.getcwd()})
+    except (OSError, ValueError) as e:
+        print(f"Erreur : gitBis serve : {e}", file=sys.stderr)
+        return 1
+    if response is None:
+        return None
+    if 'error' in response:
+        print(f"Erreur : gitBis serve : {response['error']}", file=sys.stderr)
+        return 1
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['exit']
+
+
+def stop_server():
+    """Arrête le serveur du dépôt courant, retourne False s'il ne tournait pas"""
+    try:
+        response = forward_request({'command': 'stop'})
+    except (OSError, ValueError):
+        response = None
+    if response is None:
+        print("gitBis serve n'est pas lancé")
+        return False
+    # Le serveur répond avant de fermer son socket
+    deadline = time.monotonic() + 5
+    while os.path.exists(get_socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print("gitBis serve arrêté")
+    return True
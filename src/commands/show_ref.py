@@ -5,8 +5,12 @@ Affiche les références du dépôt Git
 """
 
 import os
-import glob
-from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import refs
 
 
 def get_git_dir():
@@ -14,66 +18,14 @@ def get_git_dir():
     return ".mon_git"
 
 
-def read_ref_file(ref_path):
-    """Lit le contenu d'un fichier de référence"""
-    try:
-        with open(ref_path, 'r') as f:
-            content = f.read().strip()
-            # Ignorer les lignes de commentaire
-            if content.startswith('#'):
-                return None
-            return content
-    except FileNotFoundError:
-        return None
-
-
 def get_all_refs():
     """
-    Récupère toutes les références du dépôt
+    Récupère toutes les références du dépôt (refs loose et packed-refs)
     
     Returns:
         list: Liste de tuples (sha, ref_name)
     """
-    refs = []
-    git_dir = get_git_dir()
-    
-    # Chercher dans refs/heads/
-    heads_dir = os.path.join(git_dir, "refs", "heads")
-    if os.path.exists(heads_dir):
-        for branch_file in os.listdir(heads_dir):
-            if branch_file.endswith('.txt'):
-                branch_name = branch_file[:-4]  # Enlever l'extension .txt
-                ref_path = os.path.join(heads_dir, branch_file)
-                sha = read_ref_file(ref_path)
-                if sha:
-                    refs.append((sha, f"refs/heads/{branch_name}"))
-    
-    # Chercher dans refs/tags/ (pour les futures extensions)
-    tags_dir = os.path.join(git_dir, "refs", "tags")
-    if os.path.exists(tags_dir):
-        for tag_file in os.listdir(tags_dir):
-            if tag_file.endswith('.txt'):
-                tag_name = tag_file[:-4]  # Enlever l'extension .txt
-                ref_path = os.path.join(tags_dir, tag_file)
-                sha = read_ref_file(ref_path)
-                if sha:
-                    refs.append((sha, f"refs/tags/{tag_name}"))
-    
-    # Chercher dans refs/remotes/ (pour les futures extensions)
-    remotes_dir = os.path.join(git_dir, "refs", "remotes")
-    if os.path.exists(remotes_dir):
-        for remote_dir in os.listdir(remotes_dir):
-            remote_path = os.path.join(remotes_dir, remote_dir)
-            if os.path.isdir(remote_path):
-                for branch_file in os.listdir(remote_path):
-                    if branch_file.endswith('.txt'):
-                        branch_name = branch_file[:-4]
-                        ref_path = os.path.join(remote_path, branch_file)
-                        sha = read_ref_file(ref_path)
-                        if sha:
-                            refs.append((sha, f"refs/remotes/{remote_dir}/{branch_name}"))
-    
-    return refs
+    return refs.list_refs()
 
 
 def show_refs(heads_only=False, tags_only=False):
@@ -84,23 +36,20 @@ def show_refs(heads_only=False, tags_only=False):
         heads_only (bool): Afficher seulement les branches
         tags_only (bool): Afficher seulement les tags
     """
-    refs = get_all_refs()
+    all_refs = get_all_refs()
     
-    if not refs:
+    if not all_refs:
         print("Aucune référence trouvée dans le dépôt.")
         return
     
     # Filtrer selon les options
     if heads_only:
-        refs = [ref for ref in refs if ref[1].startswith("refs/heads/")]
+        all_refs = [ref for ref in all_refs if ref[1].startswith("refs/heads/")]
     elif tags_only:
-        refs = [ref for ref in refs if ref[1].startswith("refs/tags/")]
-    
-    # Trier par nom de référence
-    refs.sort(key=lambda x: x[1])
+        all_refs = [ref for ref in all_refs if ref[1].startswith("refs/tags/")]
     
-    # Afficher les références
-    for sha, ref_name in refs:
+    # Afficher les références (déjà triées par nom)
+    for sha, ref_name in all_refs:
         print(f"{sha} {ref_name}")
 
 
@@ -2,7 +2,10 @@ import os
 import hashlib
 import re
 import struct
-from .gitignore import read_gitignore, should_ignore, filter_ignored_files
+from .objects import hash_file_streaming
+from .gitignore import IgnoreMatcher
+from .scanner import scan_untracked
+from .fsmonitor import query_changes
 
 def get_git_dir():
     """
@@ -30,36 +33,23 @@ def get_git_dir():
 GIT_DIR = get_git_dir()
 
 def read_head():
-    """Lit .mon_git/HEAD.txt pour obtenir la référence (branche ou SHA)"""
-    git_dir = get_git_dir()
-    head_path = os.path.join(git_dir, "HEAD.txt")
-    try:
-        ref = open(head_path).read().strip()
-        if ref.startswith("ref:"):
-            # HEAD pointe vers une branche
-            ref_path = ref.split()[1]
-            ref_file = os.path.join(git_dir, ref_path + ".txt")
-            try:
-                commit_sha = open(ref_file).read().strip()
-                if commit_sha and not commit_sha.startswith('#'):  # Si le fichier contient un SHA
-                    return commit_sha
-                else:  # Si le fichier est vide ou contient des commentaires
-                    return ref_path.split('/')[-1]  # Retourne le nom de la branche
-            except FileNotFoundError:
-                # Aucune validation encore : retourne le nom de la branche
-                return ref_path.split('/')[-1]
-        # HEAD détaché : retourne le SHA
-        return ref
-    except FileNotFoundError:
+    """Lit HEAD pour obtenir la référence (branche ou SHA), via le cache des refs"""
+    from .refs import read_head as read_head_ref, resolve_ref
+    ref = read_head_ref()
+    if ref is None:
         return None
+    if ref.startswith("ref:"):
+        # HEAD pointe vers une branche (loose ou packed-refs)
+        ref_path = ref.split()[1]
+        # Branche sans commit : retourne le nom de la branche
+        return resolve_ref(ref_path) or ref_path.split('/')[-1]
+    # HEAD détaché : retourne le SHA
+    return ref
 
 def hash_file(path):
     """Calcule le SHA-1 Git d'un fichier (blob)"""
     try:
-        with open(path, "rb") as f:
-            data = f.read()
-        header = f"blob {len(data)}\0".encode()
-        return hashlib.sha1(header + data).hexdigest()
+        return hash_file_streaming(path, write=False)
     except Exception:
         return None
 
@@ -68,6 +58,167 @@ def read_index():
     from .add import read_index
     return read_index()
 
+def _refresh_entries(index, tracked):
+    """
+    Compare les fichiers suivis à l'index
+
+    Seuls les fichiers dont le stat a changé (ou dont l'entrée est "racy") sont
+    relus. Si leur contenu est en fait identique, le stat de l'index est mis à
+    jour pour que les status suivants n'aient plus à les relire.
+
+    Args:
+        index (Index): Index lu
+        tracked: (chemin, entrée de l'index, stat actuel ou None) des fichiers
+                 suivis présents dans le working tree
+
+    Returns:
+        tuple: ({fichier: sha_actuel}, True si des stats ont été rafraîchis)
+    """
+    current = {}
+    refreshed = False
+    for f, entry, stat in tracked:
+        if stat is not None and stat == entry['stat']:
+            current[f] = entry['sha']
+            continue
+        current[f] = hash_file(f)
+        if stat is not None and current[f] == entry['sha']:
+            index.set(f, entry['sha'], stat, mode=entry['mode'])
+            refreshed = True
+    return current, refreshed
+
+def _refresh_locked(tracked_files, ignore=None, with_untracked=False):
+    """
+    Lit l'index, compare les fichiers suivis et réécrit l'index si besoin
+
+    Avec with_untracked, le démon fsmonitor (s'il tourne) est interrogé avant
+    toute vérification : seuls les chemins qu'il signale depuis le jeton de
+    l'index sont vérifiés, puis le nouveau jeton est enregistré avec l'index.
+    
+    Args:
+        tracked_files: Fonction (index, chemins modifiés ou None) -> (chemin,
+                       entrée, stat) des fichiers suivis
+        ignore (IgnoreMatcher): Règles .gitignore pour les fichiers non suivis
+        with_untracked (bool): Chercher aussi les fichiers non suivis (avec le
+                               cache de l'index)
+
+    Returns:
+        tuple: ({fichier: sha_index}, {fichier: sha_actuel}, [non suivis] ou None)
+    """
+    from .index import read_index_file, write_index_file, try_lock_index
+    # Verrou pris sans attendre : si un autre processus écrit l'index, le
+    # status est calculé sans enregistrer les stats rafraîchis
+    lock = try_lock_index()
+    try:
+        try:
+            index = read_index_file()
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'index: {e}")
+            return {}, {}, [] if with_untracked else None
+        index_files = index.to_dict()
+        token, changed = None, None
+        if with_untracked:
+            token, changed = query_changes(index.fsmonitor_token)
+        current, refreshed = _refresh_entries(index, tracked_files(index, changed))
+
+        untracked = None
+        if with_untracked:
+            previous_cache = index.untracked_cache
+            untracked = scan_untracked(index, ignore, changed)
+            refreshed = refreshed or index.untracked_cache != previous_cache
+            # Le jeton n'est valable qu'avec l'index et le cache vérifiés ici
+            refreshed = refreshed or token != index.fsmonitor_token
+            index.fsmonitor_token = token
+
+        if refreshed and lock is not None:
+            try:
+                write_index_file(index, lock)
+            except Exception as e:
+                print(f"Erreur lors de l'écriture de l'index: {e}")
+        return index_files, current, untracked
+    finally:
+        if lock is not None:
+            lock.rollback()
+
+def refresh_index(work_files):
+    """
+    Calcule le hash actuel des fichiers suivis en s'appuyant sur le stat de l'index
+    
+    Les fichiers du working tree et l'index sont triés dans le même ordre : ils
+    sont fusionnés en une seule passe.
+    
+    Args:
+        work_files (list): Fichiers présents dans le working tree (ScanEntry
+                           du scanner, ou chemins)
+    
+    Returns:
+        tuple: ({fichier: sha_index}, {fichier: sha_actuel}) pour les fichiers suivis
+    """
+    from .index import file_stat, path_key
+    # Les chemins passés directement ne sont pas forcément triés
+    if any(isinstance(item, str) for item in work_files):
+        work_files = sorted(work_files, key=lambda item: path_key(getattr(item, 'path', item)))
+
+    def tracked_files(index, changed):
+        tracked = list(index.items())
+        pos = 0
+        for item in work_files:
+            f = getattr(item, 'path', item)
+            key = path_key(f)
+            while pos < len(tracked) and path_key(tracked[pos][0]) < key:
+                pos += 1
+            if pos == len(tracked) or tracked[pos][0] != f:
+                # Fichier non suivi
+                continue
+            entry = tracked[pos][1]
+            pos += 1
+            try:
+                stat = item.stat if not isinstance(item, str) else file_stat(f)
+            except OSError:
+                stat = None
+            yield f, entry, stat
+
+    index_files, current, _ = _refresh_locked(tracked_files)
+    return index_files, current
+
+def _tracked_on_disk(index, changed=None):
+    """
+    (chemin, entrée, stat) des fichiers de l'index encore présents sur le disque
+    
+    Un fichier que fsmonitor ne signale pas est inchangé : son stat n'est pas
+    relu (sauf si l'index n'en a pas, entrée "racy" ou modifiée par reset).
+    """
+    from .index import file_stat
+    for f, entry in list(index.items()):
+        if changed is not None and entry['stat'] is not None and f not in changed:
+            yield f, entry, entry['stat']
+            continue
+        try:
+            stat = file_stat(f)
+        except (FileNotFoundError, NotADirectoryError):
+            # Fichier supprimé
+            continue
+        except OSError:
+            stat = None
+        yield f, entry, stat
+
+def worktree_status(ignore=None):
+    """
+    État du working tree par rapport à l'index
+    
+    Les fichiers suivis sont vérifiés un par un (lstat) ; les fichiers non
+    suivis viennent du cache de l'index, où seuls les dossiers dont le mtime a
+    changé sont relus. Si le démon fsmonitor tourne, seuls les chemins qu'il
+    signale sont vérifiés.
+    
+    Args:
+        ignore (IgnoreMatcher): Règles .gitignore
+    
+    Returns:
+        tuple: ({fichier: sha_index}, {fichier: sha_actuel} pour les fichiers
+               suivis présents, [fichiers non suivis])
+    """
+    return _refresh_locked(_tracked_on_disk, ignore, with_untracked=True)
+
 def git_status():
     """Affiche le statut du dépôt Git"""
     
@@ -89,44 +240,24 @@ def git_status():
         print(f"Sur la branche {head}")
         print("Aucun commit encore")
 
-    # 3. Lire l'index (staging area)
-    index_files = read_index()
-    
-    # 4. Lire les patterns .gitignore
-    from .gitignore import read_gitignore, filter_ignored_files
-    gitignore_patterns = read_gitignore()
+    # 4. Patterns .gitignore (racine et sous-dossiers), compilés une fois
+    ignore = IgnoreMatcher()
     
-    # 5. Fichiers du working tree
-    work_files = []
-    for root, dirs, files in os.walk('.'):
-        # Ignorer les dossiers .git et .mon_git
-        dirs[:] = [d for d in dirs if d not in ['.git', '.mon_git']]
-        for f in files:
-            full = os.path.join(root, f)
-            rel = os.path.relpath(full, '.')
-            # Uniformiser les séparateurs en '/'
-            rel = rel.replace(os.sep, '/')
-            work_files.append(rel)
-
-    # 6. Filtrer les fichiers ignorés
-    work_files = filter_ignored_files(work_files, gitignore_patterns)
-
-    # 7. Détecter les nouveaux fichiers (non suivis)
-    untracked = [f for f in work_files if f not in index_files]
+    # 5-8. Fichiers suivis comparés à l'index, fichiers non suivis via le
+    # cache de l'index (les dossiers inchangés et ignorés ne sont pas relus)
+    index_files, current_hashes, untracked = worktree_status(ignore)
     
-    # 8. Détecter les fichiers modifiés (différents de l'index)
+    # 9. Détecter les fichiers modifiés (différents de l'index)
     modified = []
-    for f in work_files:
-        if f in index_files:
-            current_hash = hash_file(f)
-            if current_hash and current_hash != index_files[f]:
-                modified.append(f)
+    for f, current_hash in current_hashes.items():
+        if current_hash and current_hash != index_files[f]:
+            modified.append(f)
     
-    # 9. Détecter les fichiers supprimés (dans l'index mais pas dans le working tree)
-    deleted = [f for f in index_files if f not in work_files]
+    # 10. Détecter les fichiers supprimés (dans l'index mais pas dans le working tree)
+    deleted = [f for f in index_files if f not in current_hashes]
     
-    # 10. Détecter les fichiers prêts à être commités (dans l'index)
-    staged = [f for f in index_files if f in work_files and hash_file(f) == index_files[f]]
+    # 11. Détecter les fichiers prêts à être commités (dans l'index)
+    staged = [f for f in index_files if current_hashes.get(f) == index_files[f]]
 
     # Affichage
     if staged:
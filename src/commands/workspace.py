@@ -1,60 +1,280 @@
-# gestion du working directory (checkout, reset, etc.)
+#!/usr/bin/env python3
+"""
+Module pour le working directory (checkout, reset --hard)
+Met le working directory et l'index dans l'état d'un tree en ne touchant que
+les chemins qui changent.
+
+- checkout : fusion à deux arbres, le tree de HEAD est comparé au tree cible
+  (diff_trees) et seuls les chemins qui changent entre les deux sont touchés ;
+  les modifications indexées et les entrées présentes seulement dans l'index
+  sont conservées
+- force=True (reset --hard, checkout -f) : l'index est comparé au tree cible ;
+  un sous-dossier dont le tree est déjà dans le cache-tree de l'index est
+  identique et n'est pas parcouru
+- seuls les fichiers ajoutés ou modifiés sont écrits (sur un pool de threads),
+  seuls les fichiers supprimés sont retirés
+- les entrées écrites reçoivent leur nouveau stat : status ne les relit pas
+- des modifications locales (indexées ou non) qui seraient écrasées font
+  échouer le checkout avant toute écriture ; avec force=True elles sont au
+  contraire restaurées
+"""
+
 import os
-from . import read_object, parse_tree
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.objects import read_object, iter_tree_entries, is_tree_mode
+from src.commands.diff_tree import diff_trees
+from src.commands.index import (read_index_file, write_index_file, lock_index,
+                                file_stat, stat_matches, MODE_EXECUTABLE, MODE_SYMLINK)
+
+
+class CheckoutError(ValueError):
+    """Checkout impossible sans perdre des modifications locales"""
+
+    def __init__(self, paths):
+        super().__init__(
+            "Your local changes to the following files would be overwritten by checkout:\n"
+            + "\n".join(f"\t{path}" for path in paths)
+        )
+        self.paths = paths
+
+
+def get_git_dir():
+    """Retourne le chemin du dossier .mon_git"""
+    return ".mon_git"
+
+
+def default_jobs():
+    """Nombre de threads d'écriture par défaut (un par cœur)"""
+    return os.cpu_count() or 1
 
 
-def checkout(ref, new_branch=False):
-    head_path = os.path.join('.mon_git', 'HEAD')
-    refs_heads = os.path.join('.mon_git', 'refs', 'heads')
-    branch_path = os.path.join(refs_heads, ref)
+def diff_index_tree(index, tree_sha):
+    """
+    Compare l'index à un tree
 
-    if new_branch:
-        with open(head_path, 'r') as f:
-            head_ref = f.read().strip()
-        if head_ref.startswith('ref:'):
-            current_branch = head_ref.split(' ')[1]
-            with open(os.path.join('.mon_git', current_branch), 'r') as f:
-                sha = f.read().strip()
+    Args:
+        index (Index): Index actuel
+        tree_sha (str): SHA-1 du tree cible
+
+    Returns:
+        tuple: (à_écrire, à_supprimer, trees) avec
+               à_écrire : [(chemin, mode, sha)] fichiers ajoutés ou modifiés,
+               à_supprimer : [chemin] fichiers absents du tree cible,
+               trees : {dossier: sha} de tous les dossiers du tree cible
+    """
+    to_write = []
+    kept = set()
+    trees = {'': tree_sha}
+
+    stack = [(tree_sha, '')]
+    while stack:
+        sha, prefix = stack.pop()
+        obj_type, content = read_object(sha)
+        if obj_type != 'tree':
+            raise ValueError(f"Object {sha} is not a tree")
+        for mode_str, name, entry_sha in iter_tree_entries(content):
+            path = prefix + name
+            if is_tree_mode(mode_str):
+                trees[path] = entry_sha
+                if index.cache_tree.get(path) == entry_sha:
+                    # Sous-dossier identique dans l'index : rien à parcourir
+                    kept.update(index.names_under(path))
+                else:
+                    stack.append((entry_sha, path + '/'))
+                continue
+            mode = int(mode_str, 8)
+            entry = index.get(path)
+            kept.add(path)
+            if entry is None or entry['sha'] != entry_sha or entry['mode'] != mode:
+                to_write.append((path, mode, entry_sha))
+
+    to_remove = [name for name in index if name not in kept]
+    return to_write, to_remove, trees
+
+
+def _same_entry(entry, mode, sha):
+    """Indique si une entrée de l'index (ou son absence) correspond à un côté du diff"""
+    if entry is None:
+        return sha is None
+    return sha is not None and entry['sha'] == sha and entry['mode'] == int(mode, 8)
+
+
+def twoway_merge(index, head_tree, tree_sha):
+    """
+    Fusion à deux arbres : chemins à changer pour passer de HEAD au tree cible
+
+    Seuls les chemins qui diffèrent entre les deux trees sont examinés. Pour
+    chacun, l'entrée de l'index doit correspondre à HEAD (le chemin est alors
+    mis à jour) ou déjà au tree cible (rien à faire) ; sinon une modification
+    indexée serait perdue et le chemin est en conflit.
+
+    Args:
+        index (Index): Index actuel
+        head_tree (str): SHA-1 du tree de HEAD (None : branche sans commit)
+        tree_sha (str): SHA-1 du tree cible
+
+    Returns:
+        tuple: (à_écrire, à_supprimer, conflits) avec
+               à_écrire : [(chemin, mode, sha)] fichiers à écrire,
+               à_supprimer : [chemin] fichiers à retirer,
+               conflits : [chemin] modifications locales qui seraient perdues
+    """
+    to_write = []
+    to_remove = []
+    conflicts = []
+    for status, path, old_mode, old_sha, new_mode, new_sha in diff_trees(head_tree, tree_sha):
+        entry = index.get(path)
+        if _same_entry(entry, new_mode, new_sha):
+            # Déjà dans l'état cible (ou supprimé des deux côtés) : rien à faire
+            continue
+        if not _same_entry(entry, old_mode, old_sha):
+            # Modification indexée qui serait écrasée
+            conflicts.append(path)
+        elif entry is None:
+            # Nouveau fichier : ne pas écraser un fichier non suivi
+            if os.path.lexists(path) and not os.path.isdir(path):
+                conflicts.append(path)
+            else:
+                to_write.append((path, int(new_mode, 8), new_sha))
+        elif _has_local_changes(path, entry):
+            conflicts.append(path)
+        elif new_sha is None:
+            to_remove.append(path)
         else:
-            sha = head_ref
-        with open(branch_path, 'w') as f:
-            f.write(sha)
-        with open(head_path, 'w') as f:
-            f.write(f"ref: refs/heads/{ref}\n")
-        print(f"Nouvelle branche '{ref}' créée et checkout.")
+            to_write.append((path, int(new_mode, 8), new_sha))
+    return to_write, to_remove, sorted(conflicts)
+
+
+def _has_local_changes(path, entry):
+    """Indique si un fichier suivi diffère de son entrée dans l'index"""
+    if not os.path.lexists(path):
+        return False
+    if stat_matches(path, entry['stat']):
+        return False
+    from src.commands.objects import hash_file_streaming
+    try:
+        return hash_file_streaming(path, write=False) != entry['sha']
+    except OSError:
+        return True
+
+
+def _remove_file(path):
+    """Supprime un fichier puis ses dossiers parents devenus vides"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    parent = os.path.dirname(path)
+    while parent:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+
+def _write_file(path, mode, sha):
+    """
+    Écrit un blob dans le working directory (exécuté sur le pool)
+
+    Returns:
+        tuple: (chemin, stat du fichier écrit)
+    """
+    obj_type, content = read_object(sha)
+    if obj_type != 'blob':
+        raise ValueError(f"Object {sha} is not a blob")
+
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    if os.path.lexists(path):
+        os.remove(path)
+
+    if mode == MODE_SYMLINK:
+        os.symlink(content.decode('utf-8', errors='surrogateescape'), path)
     else:
-        if os.path.exists(branch_path):
-            with open(branch_path, 'r') as f:
-                sha = f.read().strip()
-            with open(head_path, 'w') as f:
-                f.write(f"ref: refs/heads/{ref}\n")
-            print(f"Basculé sur la branche '{ref}'.")
-        else:
-            sha = ref
-            with open(head_path, 'w') as f:
-                f.write(f"{sha}\n")
-            print(f"HEAD détaché à {sha}.")
-
-    # Lecture du commit et du tree (aucune gestion d'erreur)
-    commit_type, commit_content = read_object(sha)
-    tree_sha = commit_content.decode().splitlines()[0].split()[1]
-    obj_type, tree_content = read_object(tree_sha)
-    files_dict = parse_tree(tree_content)
-
-    # Suppression brutale du working dir (hors .mon_git)
-    for fname in os.listdir('.'):
-        if fname != '.mon_git':
-            if os.path.isfile(fname):
-                os.remove(fname)
-            elif os.path.isdir(fname):
-                import shutil
-                shutil.rmtree(fname)
-
-    # Restauration des fichiers du tree
-    for path, blob_sha in files_dict.items():
-        obj_type, content = read_object(blob_sha)
-        if os.path.dirname(path):
-            os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, 'wb') as f:
             f.write(content)
-    print("Working directory mis à jour.")
\ No newline at end of file
+        if mode == MODE_EXECUTABLE:
+            os.chmod(path, 0o755)
+    return path, file_stat(path)
+
+
+def checkout_tree(tree_sha, force=False, jobs=None, head_tree=None):
+    """
+    Met le working directory et l'index dans l'état d'un tree
+
+    Sans force, seuls les chemins qui diffèrent entre head_tree et tree_sha
+    sont mis à jour (voir twoway_merge) ; avec force, l'index et le working
+    directory deviennent exactement le tree cible.
+
+    IMPACT SUR .MON_GIT :
+    - Réécrit .mon_git/index (sous verrou) : entrées mises à jour avec leur
+      stat ; avec force, entrées du tree et cache-tree complet
+    - Working directory : écrit les fichiers ajoutés/modifiés, supprime les
+      fichiers absents du tree ; les autres fichiers ne sont pas touchés
+
+    Args:
+        tree_sha (str): SHA-1 du tree cible
+        force (bool): Écraser les modifications locales
+        jobs (int): Nombre de threads d'écriture (par défaut : nombre de cœurs)
+        head_tree (str): SHA-1 du tree de HEAD (None : branche sans commit),
+                         ignoré avec force
+
+    Returns:
+        dict: {'written': int, 'removed': int, 'unchanged': int}
+
+    Raises:
+        CheckoutError: Si des modifications locales seraient perdues
+        LockError: Si un autre processus verrouille l'index
+    """
+    if not force and head_tree == tree_sha:
+        # Même tree que HEAD : ni l'index ni le working directory ne changent
+        return {'written': 0, 'removed': 0, 'unchanged': len(read_index_file())}
+
+    with lock_index() as lock:
+        index = read_index_file()
+        if force:
+            to_write, to_remove, trees = diff_index_tree(index, tree_sha)
+            # Les fichiers suivis modifiés ou supprimés localement sont restaurés
+            skip = {path for path, mode, sha in to_write}
+            skip.update(to_remove)
+            for name, entry in index.items():
+                if name not in skip and (not os.path.lexists(name) or _has_local_changes(name, entry)):
+                    to_write.append((name, entry['mode'], entry['sha']))
+        else:
+            # Index identique à HEAD : il sera identique au tree cible
+            matches_head = head_tree is not None and index.cache_tree.get('') == head_tree
+            to_write, to_remove, conflicts = twoway_merge(index, head_tree, tree_sha)
+            if conflicts:
+                raise CheckoutError(conflicts)
+            # Les dossiers modifiés sont invalidés par index.set / index.remove
+            trees = {'': tree_sha} if matches_head else {}
+
+        # Suppressions d'abord : un fichier peut laisser place à un dossier
+        for path in to_remove:
+            _remove_file(path)
+            index.remove(path)
+
+        modes = {path: mode for path, mode, sha in to_write}
+        shas = {path: sha for path, mode, sha in to_write}
+        with ThreadPoolExecutor(max_workers=max(1, jobs or default_jobs())) as pool:
+            futures = [pool.submit(_write_file, path, mode, sha) for path, mode, sha in to_write]
+            for future in futures:
+                path, stat = future.result()
+                index.set(path, shas[path], stat, mode=modes[path])
+
+        # Trees connus de l'index après le checkout
+        index.cache_tree.update(trees)
+        write_index_file(index, lock)
+
+    return {
+        'written': len(to_write),
+        'removed': len(to_remove),
+        'unchanged': len(index) - len(to_write),
+    }
@@ -0,0 +1,86 @@
+"""
+Tests unitaires pour les SHA-1 abrégés (abbrev.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.abbrev import (resolve_abbrev, find_objects_by_prefix,
+                                 shortest_unique_abbrev, AmbiguousShaError)
+from src.commands.objects import write_object
+from src.commands.pack import repack
+from src.commands.rev_parse import rev_parse
+from src.commands.cat_file import cat_file
+from tests.utils.test_helpers import temp_repo
+
+
+def colliding_blobs(length):
+    """Retourne deux contenus de blobs dont les SHA-1 partagent length caractères"""
+    seen = {}
+    i = 0
+    while True:
+        content = f"blob {i}".encode()
+        sha = write_object("blob", content, write=False)
+        if sha[:length] in seen:
+            return seen[sha[:length]], content
+        seen[sha[:length]] = content
+        i += 1
+
+
+class TestAbbrev:
+    """Tests pour la résolution des SHA-1 abrégés"""
+    
+    def test_resolve_unique_prefix(self):
+        """Test de résolution d'un préfixe unique"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"contenu")
+            
+            assert resolve_abbrev(sha[:7]) == sha
+            assert resolve_abbrev(sha[:7].upper()) == sha
+            assert resolve_abbrev(sha) == sha
+            assert resolve_abbrev("zzzz") is None
+    
+    def test_ambiguous_prefix(self):
+        """Test de détection d'un préfixe ambigu"""
+        with temp_repo() as repo:
+            first, second = colliding_blobs(3)
+            sha1 = write_object("blob", first)
+            sha2 = write_object("blob", second)
+            
+            with pytest.raises(AmbiguousShaError) as info:
+                resolve_abbrev(sha1[:3])
+            assert info.value.candidates == sorted([sha1, sha2])
+            assert resolve_abbrev(sha1[:12]) == sha1
+            assert rev_parse(sha1[:3]) is None
+            assert cat_file(sha1[:3]) is False
+    
+    def test_shortest_unique_abbrev(self):
+        """Test du calcul de l'abréviation minimale"""
+        with temp_repo() as repo:
+            first, second = colliding_blobs(4)
+            sha1 = write_object("blob", first)
+            sha2 = write_object("blob", second)
+            
+            assert shortest_unique_abbrev(sha1) == sha1[:7]
+            abbrev = shortest_unique_abbrev(sha1, min_length=4)
+            assert len(abbrev) > 4
+            assert find_objects_by_prefix(abbrev) == [sha1]
+            assert not sha2.startswith(abbrev)
+    
+    def test_packed_objects(self):
+        """Test que les objets packés sont aussi pris en compte"""
+        with temp_repo() as repo:
+            first, second = colliding_blobs(4)
+            sha1 = write_object("blob", first)
+            repack(remove_redundant=True)
+            sha2 = write_object("blob", second)
+            
+            assert resolve_abbrev(sha1[:10]) == sha1
+            with pytest.raises(AmbiguousShaError):
+                resolve_abbrev(sha1[:4])
+            assert find_objects_by_prefix(shortest_unique_abbrev(sha1, 4)) == [sha1]
+            assert find_objects_by_prefix(shortest_unique_abbrev(sha2, 4)) == [sha2]
@@ -0,0 +1,95 @@
+"""
+Tests unitaires pour les filtres de Bloom des chemins modifiés (bloom.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.bloom import (murmur3_32, bloom_key, build_bloom_filter, bloom_maybe_contains,
+                                BLOOM_TOO_LARGE, BLOOM_EMPTY, BLOOM_MAX_CHANGED_PATHS)
+from src.commands.commit_graph import write_commit_graph_from_refs, get_bloom_filter, update_commit_graph
+from src.commands import log
+from src.commands.log import get_commit_history
+from src.commands.objects import create_commit, create_tree, write_object
+from tests.utils.test_helpers import temp_repo
+
+
+def commit_files(files, parent=None, message="commit"):
+    """Crée un commit contenant {nom: contenu} (un seul niveau de dossier)"""
+    dirs = {}
+    entries = []
+    for name, content in files.items():
+        blob = write_object("blob", content.encode())
+        if '/' in name:
+            directory, base = name.split('/', 1)
+            dirs.setdefault(directory, []).append(("100644", base, blob))
+        else:
+            entries.append(("100644", name, blob))
+    for directory, sub_entries in dirs.items():
+        entries.append(("40000", directory, create_tree(sub_entries)))
+    sha = create_commit(create_tree(entries), parent_sha1=parent, message=message)
+    with open(".mon_git/refs/heads/main.txt", "w") as f:
+        f.write(sha)
+    return sha
+
+
+class TestBloom:
+    """Tests pour les filtres de Bloom"""
+
+    def test_murmur3_reference_values(self):
+        """Valeurs de référence de murmur3 utilisées par git"""
+        assert murmur3_32(b"", 0) == 0
+        assert murmur3_32(b"Hello world!", 0) == 0x627b0c2c
+        assert murmur3_32(b"The quick brown fox jumps over the lazy dog", 0) == 0x2e4ff723
+
+    def test_filter_contains_paths_and_parent_dirs(self):
+        """Le filtre contient les fichiers modifiés et leurs dossiers parents"""
+        bloom_filter = build_bloom_filter(["src/app/main.py", "README.md"])
+        for path in ("src", "src/app", "src/app/main.py", "README.md"):
+            assert bloom_maybe_contains(bloom_filter, bloom_key(path))
+        misses = sum(bloom_maybe_contains(bloom_filter, bloom_key(f"autre/{i}")) for i in range(200))
+        assert misses < 20
+
+    def test_empty_and_too_large_filters(self):
+        """Filtre vide : rien n'a changé ; filtre trop grand : tout a peut-être changé"""
+        assert build_bloom_filter([]) == BLOOM_EMPTY
+        assert not bloom_maybe_contains(BLOOM_EMPTY, bloom_key("a"))
+        many = [f"f{i}" for i in range(BLOOM_MAX_CHANGED_PATHS + 1)]
+        assert build_bloom_filter(many) == BLOOM_TOO_LARGE
+        assert bloom_maybe_contains(BLOOM_TOO_LARGE, bloom_key("a"))
+
+    def test_log_skips_trees_with_filters(self, monkeypatch):
+        """log -- <chemin> ne lit aucun tree pour les commits exclus par le filtre"""
+        with temp_repo() as repo:
+            first = commit_files({"src/a.txt": "1", "b.txt": "1"})
+            second = commit_files({"src/a.txt": "1", "b.txt": "2"}, first)
+            third = commit_files({"src/a.txt": "2", "b.txt": "2"}, second)
+            assert write_commit_graph_from_refs(changed_paths=True) == 3
+
+            assert get_bloom_filter(second) is not None
+            compared = []
+            original = log.diff_trees
+            monkeypatch.setattr(log, "diff_trees",
+                                lambda *args, **kwargs: compared.append(args) or original(*args, **kwargs))
+
+            assert get_commit_history(paths=["src/a.txt"]) == [third, first]
+            # Seuls les commits dont le filtre répond "peut-être" sont comparés
+            assert len(compared) == 2
+
+    def test_update_keeps_filters(self):
+        """Un commit ajouté au graphe reçoit son filtre, les autres sont conservés"""
+        with temp_repo() as repo:
+            first = commit_files({"a.txt": "1"})
+            write_commit_graph_from_refs(changed_paths=True)
+            old_filter = get_bloom_filter(first)
+
+            second = commit_files({"a.txt": "1", "b.txt": "1"}, first)
+            assert update_commit_graph([second]) == 1
+
+            assert get_bloom_filter(first) == old_filter
+            assert bloom_maybe_contains(get_bloom_filter(second), bloom_key("b.txt"))
+            assert get_commit_history(paths=["b.txt"]) == [second]
@@ -259,4 +259,128 @@ class TestCheckout:
             assert os.path.exists("uncommitted.txt")
             with open("uncommitted.txt", "r") as f:
                 content = f.read()
-            assert content == "contenu non commité" 
\ No newline at end of file
+            assert content == "contenu non commité"     
+    def _two_commits(self, repo):
+        """Crée deux commits (main : v1, feature : v2) et reste sur main"""
+        create_test_files(repo, {"a.txt": "a", "b.txt": "b v1", "dir/c.txt": "c"})
+        add_files(["."])
+        first = create_commit(write_tree(), message="v1")
+        
+        repo.create_file("b.txt", "b v2")
+        repo.create_file("d.txt", "d")
+        os.remove("dir/c.txt")
+        from src.commands.index import read_index_file, write_index_file
+        index = read_index_file()
+        index.remove("dir/c.txt")
+        write_index_file(index)
+        add_files(["b.txt", "d.txt"])
+        second = create_commit(write_tree(), parent_sha1=first, message="v2")
+        
+        with open(".mon_git/refs/heads/main.txt", "w") as f:
+            f.write(first)
+        with open(".mon_git/refs/heads/feature.txt", "w") as f:
+            f.write(second)
+        # Revenir à l'état de main
+        assert checkout_branch("main", force=True) is True
+        return first, second
+    
+    def test_checkout_updates_only_changed_files(self):
+        """Test que checkout n'écrit que les fichiers qui changent"""
+        with temp_repo() as repo:
+            self._two_commits(repo)
+            assert repo.read_file("b.txt") == "b v1"
+            assert repo.read_file("dir/c.txt") == "c"
+            assert not os.path.exists("d.txt")
+            
+            os.utime("a.txt", (1000000000, 1000000000))
+            assert checkout_branch("feature") is True
+            
+            assert repo.read_file("b.txt") == "b v2"
+            assert repo.read_file("d.txt") == "d"
+            assert not os.path.exists("dir")
+            # Fichier identique dans les deux commits : pas réécrit
+            assert os.stat("a.txt").st_mtime == 1000000000
+            
+            from src.commands.add import read_index
+            assert sorted(read_index()) == ["a.txt", "b.txt", "d.txt"]
+    
+    def test_checkout_refuses_to_overwrite_local_changes(self):
+        """Test que checkout échoue sans rien modifier si un fichier modifié serait écrasé"""
+        with temp_repo() as repo:
+            first, second = self._two_commits(repo)
+            repo.create_file("b.txt", "modification locale")
+            
+            assert checkout_branch("feature") is False
+            assert repo.read_file("b.txt") == "modification locale"
+            assert not os.path.exists("d.txt")
+            from src.commands.rev_parse import rev_parse
+            assert rev_parse("HEAD") == first
+            
+            assert checkout_branch("feature", force=True) is True
+            assert repo.read_file("b.txt") == "b v2"
+    
+    def test_checkout_records_stat_in_index(self):
+        """Test que les fichiers écrits ont leur stat dans l'index"""
+        with temp_repo() as repo:
+            self._two_commits(repo)
+            assert checkout_branch("feature") is True
+            
+            # Index plus récent que les fichiers : aucune entrée "racy"
+            os.utime(".mon_git/index", (2000000000, 2000000000))
+            from src.commands.index import read_index_file, stat_matches
+            index = read_index_file()
+            for name, entry in index.items():
+                assert stat_matches(name, entry['stat'])
+    
+    def test_create_branch_keeps_staged_changes(self):
+        """Test que checkout -b depuis HEAD conserve l'index et le working directory"""
+        with temp_repo() as repo:
+            repo.create_file("a.txt", "a v1")
+            add_files(["a.txt"])
+            first = create_commit(write_tree(), message="v1")
+            with open(".mon_git/refs/heads/main.txt", "w") as f:
+                f.write(first)
+            
+            repo.create_file("staged.txt", "nouveau")
+            repo.create_file("a.txt", "a v2")
+            add_files(["staged.txt", "a.txt"])
+            
+            assert create_and_checkout_branch("feat") is True
+            assert repo.read_file("staged.txt") == "nouveau"
+            assert repo.read_file("a.txt") == "a v2"
+            from src.commands.add import read_index
+            assert sorted(read_index()) == ["a.txt", "staged.txt"]
+    
+    def test_checkout_keeps_staged_changes_on_unchanged_paths(self):
+        """Test que checkout conserve les modifications indexées des fichiers identiques dans les deux commits"""
+        with temp_repo() as repo:
+            self._two_commits(repo)
+            repo.create_file("a.txt", "a indexé")
+            repo.create_file("new.txt", "nouveau")
+            add_files(["a.txt", "new.txt"])
+            from src.commands.add import read_index
+            staged = read_index()
+            
+            assert checkout_branch("feature") is True
+            assert repo.read_file("a.txt") == "a indexé"
+            assert repo.read_file("new.txt") == "nouveau"
+            assert repo.read_file("b.txt") == "b v2"
+            index = read_index()
+            assert index["a.txt"] == staged["a.txt"]
+            assert index["new.txt"] == staged["new.txt"]
+            assert sorted(index) == ["a.txt", "b.txt", "d.txt", "new.txt"]
+    
+    def test_checkout_refuses_to_overwrite_staged_changes(self):
+        """Test que checkout échoue si une modification indexée serait écrasée"""
+        with temp_repo() as repo:
+            first, second = self._two_commits(repo)
+            repo.create_file("b.txt", "b indexé")
+            add_files(["b.txt"])
+            
+            assert checkout_branch("feature") is False
+            assert repo.read_file("b.txt") == "b indexé"
+            from src.commands.rev_parse import rev_parse
+            assert rev_parse("HEAD") == first
+            
+            assert checkout_branch("feature", force=True) is True
+            assert repo.read_file("b.txt") == "b v2"
@@ -200,6 +200,43 @@ class TestCommit:
             obj_type, content = read_object(tree_sha)
             assert obj_type == "tree"
     
+    def test_write_tree_matches_git(self):
+        """Test que les trees imbriqués et leur ordre sont ceux de git"""
+        with temp_repo() as repo:
+            files = {"a.txt": "a", "a-b.txt": "ab", "dir/b.txt": "b", "dir/sub/c.txt": "c", "dir0": "d"}
+            create_test_files(repo, files)
+            add_files(["."])
+            
+            # Valeur obtenue avec "git write-tree" sur la même arborescence
+            assert write_tree() == "c8a6810758a7ad722104fe7de62009525e1207a9"
+    
+    def test_write_tree_reuses_cached_subtrees(self):
+        """Test que seuls les trees du chemin modifié sont recalculés"""
+        with temp_repo() as repo:
+            files = {"dir1/a.txt": "a", "dir2/b.txt": "b", "dir2/sub/c.txt": "c"}
+            create_test_files(repo, files)
+            add_files(["."])
+            write_tree()
+            
+            from src.commands.index import read_index_file
+            assert set(read_index_file().cache_tree) == {"", "dir1", "dir2", "dir2/sub"}
+            
+            repo.create_file("dir1/a.txt", "modifié")
+            add_files(["dir1/a.txt"])
+            assert set(read_index_file().cache_tree) == {"dir2", "dir2/sub"}
+            
+            from src.commands import objects
+            written = []
+            original = objects.write_object
+            objects.write_object = lambda obj_type, content, write=True: written.append(obj_type) or original(obj_type, content, write)
+            try:
+                write_tree()
+            finally:
+                objects.write_object = original
+            
+            assert written == ["tree", "tree"]
+            assert set(read_index_file().cache_tree) == {"", "dir1", "dir2", "dir2/sub"}
+    
     def test_commit_chain(self):
         """Test d'une chaîne de commits"""
         with temp_repo() as repo:
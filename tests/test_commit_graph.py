@@ -0,0 +1,159 @@
+"""
+Tests unitaires pour le commit-graph (commit_graph.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.commit_graph import (write_commit_graph, write_commit_graph_from_refs,
+                                       update_commit_graph, get_commit_graph, get_graph_path)
+from src.commands import commit_graph
+from src.commands.objects import create_commit, create_tree, write_object, object_path
+from src.commands.rev_parse import rev_parse
+from src.commands.log import get_commit_history
+from tests.utils.test_helpers import temp_repo
+
+
+def make_history(count, parent=None):
+    """Crée une chaîne de commits et fait pointer main sur le dernier"""
+    shas = []
+    for i in range(count):
+        blob = write_object("blob", f"version {i} {parent}".encode())
+        tree = create_tree([("100644", "fichier.txt", blob)])
+        parent = create_commit(tree, parent_sha1=parent, message=f"commit {i}")
+        shas.append(parent)
+    with open(".mon_git/refs/heads/main.txt", "w") as f:
+        f.write(parent)
+    return shas
+
+
+class TestCommitGraph:
+    """Tests pour le fichier commit-graph"""
+    
+    def test_write_and_lookup(self):
+        """Test que le graphe restitue parents, génération et date"""
+        with temp_repo() as repo:
+            shas = make_history(3)
+            
+            assert write_commit_graph_from_refs() == 3
+            graph = get_commit_graph()
+            
+            assert len(graph) == 3
+            first = graph.get(shas[0])
+            last = graph.get(shas[2])
+            assert first["parents"] == [] and first["generation"] == 1
+            assert last["parents"] == [shas[1]] and last["generation"] == 3
+            assert last["time"] > 0
+    
+    def test_octopus_merge_edges(self):
+        """Test des parents supplémentaires (chunk EDGE)"""
+        with temp_repo() as repo:
+            tree = "a" * 40
+            commits = {
+                "1" * 40: (tree, [], 100),
+                "2" * 40: (tree, [], 200),
+                "3" * 40: (tree, [], 300),
+                "4" * 40: (tree, ["1" * 40, "2" * 40, "3" * 40], 400),
+            }
+            write_commit_graph(commits)
+            graph = get_commit_graph()
+            
+            assert graph.get("4" * 40)["parents"] == ["1" * 40, "2" * 40, "3" * 40]
+            assert graph.get("4" * 40)["generation"] == 2
+            assert graph.commits() == commits
+    
+    def test_incremental_update_reads_only_new_commits(self):
+        """Test que la mise à jour ne lit que les nouveaux commits"""
+        with temp_repo() as repo:
+            shas = make_history(5)
+            write_commit_graph_from_refs()
+            new_sha = make_history(1, shas[-1])[0]
+            
+            read = []
+            original = commit_graph.read_object
+            commit_graph.read_object = lambda sha: read.append(sha) or original(sha)
+            try:
+                update_commit_graph([new_sha])
+            finally:
+                commit_graph.read_object = original
+            
+            assert read == [new_sha]
+            assert len(get_commit_graph()) == 6
+            assert get_commit_graph().get(new_sha)["generation"] == 6
+    
+    def test_update_appends_layer_without_decoding_graph(self, monkeypatch):
+        """Test que la mise à jour écrit une couche sans relire ni réécrire le graphe existant"""
+        with temp_repo() as repo:
+            shas = make_history(5)
+            write_commit_graph_from_refs()
+            new_sha = make_history(1, shas[-1])[0]
+            
+            decoded = []
+            generations = []
+            original = commit_graph._compute_generations
+            monkeypatch.setattr(commit_graph.CommitGraph, "layer_commits",
+                                lambda self: decoded.append(self) or {})
+            monkeypatch.setattr(commit_graph, "_compute_generations",
+                                lambda commits, base=None: generations.append(set(commits)) or original(commits, base))
+            assert update_commit_graph([new_sha]) == 1
+            monkeypatch.undo()
+            
+            assert decoded == []
+            assert generations == [{new_sha}]
+            # L'ancien graphe est devenu la base d'une chaîne de deux couches
+            assert not os.path.exists(get_graph_path())
+            assert len(commit_graph.read_graph_chain()) == 2
+            graph = get_commit_graph()
+            assert len(graph) == 6
+            assert graph.get(new_sha)["generation"] == 6
+            assert graph.get(new_sha)["parents"] == [shas[-1]]
+            assert graph.get(shas[0])["generation"] == 1
+    
+    def test_chain_stays_short(self):
+        """Test que les couches sont fusionnées : la chaîne reste courte"""
+        with temp_repo() as repo:
+            parent = None
+            shas = []
+            for i in range(32):
+                parent = make_history(1, parent)[0]
+                shas.append(parent)
+                assert update_commit_graph([parent]) == 1
+                assert len(commit_graph.read_graph_chain()) <= 6
+            
+            graph = get_commit_graph()
+            assert len(graph) == 32
+            for i, sha in enumerate(shas):
+                assert graph.get(sha)["generation"] == i + 1
+            layer_files = os.listdir(commit_graph.get_graph_chain_dir())
+            assert len(layer_files) == len(commit_graph.read_graph_chain()) + 1
+            
+            # Un graphe complet remplace la chaîne
+            assert write_commit_graph_from_refs() == 32
+            assert not os.path.exists(commit_graph.get_graph_chain_path())
+            assert len(get_commit_graph()) == 32
+    
+    def test_log_uses_graph(self):
+        """Test que l'historique est parcouru sans lire les objets commit"""
+        with temp_repo() as repo:
+            shas = make_history(4)
+            write_commit_graph_from_refs()
+            for sha in shas[:-1]:
+                os.remove(object_path(sha))
+            
+            assert get_commit_history("HEAD") == list(reversed(shas))
+    
+    def test_rev_parse_ancestry(self):
+        """Test des suffixes ~n et ^n"""
+        with temp_repo() as repo:
+            shas = make_history(4)
+            
+            assert rev_parse("HEAD~1") == shas[2]
+            assert rev_parse("main~3") == shas[0]
+            assert rev_parse("HEAD^") == shas[2]
+            assert rev_parse("HEAD^^") == shas[1]
+            assert rev_parse("HEAD^2") is None
+            assert rev_parse("HEAD~4") is None
@@ -0,0 +1,48 @@
+"""
+Tests unitaires pour la compression delta (delta.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.delta import create_delta, apply_delta
+
+
+class TestDelta:
+    """Tests pour l'encodage copy/insert"""
+    
+    def test_delta_roundtrip_small_change(self):
+        """Test qu'une petite modification produit un petit delta"""
+        base = b"".join(b"parametre_%d = %d\n" % (i, i) for i in range(500))
+        target = base.replace(b"parametre_250 = 250", b"parametre_250 = 999")
+        
+        delta = create_delta(base, target)
+        
+        assert apply_delta(base, delta) == target
+        assert len(delta) < 50
+    
+    def test_delta_roundtrip_unrelated_content(self):
+        """Test d'un delta entre deux contenus sans rapport"""
+        base = b"a" * 100
+        target = bytes(range(256))
+        assert apply_delta(base, create_delta(base, target)) == target
+    
+    def test_delta_empty_objects(self):
+        """Test des cas limites vides"""
+        assert apply_delta(b"", create_delta(b"", b"")) == b""
+        assert apply_delta(b"base", create_delta(b"base", b"")) == b""
+        assert apply_delta(b"", create_delta(b"", b"cible")) == b"cible"
+    
+    def test_delta_max_size(self):
+        """Test que create_delta abandonne au-delà de max_size"""
+        assert create_delta(b"x" * 100, bytes(range(200)), max_size=20) is None
+    
+    def test_apply_delta_wrong_base(self):
+        """Test qu'un delta appliqué à une mauvaise base est rejeté"""
+        delta = create_delta(b"base originale", b"base modifiee")
+        with pytest.raises(ValueError):
+            apply_delta(b"autre", delta)
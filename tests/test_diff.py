@@ -0,0 +1,118 @@
+"""
+Tests unitaires pour la commande diff
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.diff import diff_lines, unified_hunks, show_diff, is_binary
+from src.commands.objects import create_commit, write_tree
+from src.commands.add import add_files
+from src.commands.index import read_index_file, write_index_file
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+def diff_output(capsys, *args, **kwargs):
+    """Lance show_diff et retourne les lignes affichées à partir du premier "diff --git" """
+    capsys.readouterr()
+    assert show_diff(*args, **kwargs) is True
+    lines = capsys.readouterr().out.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.startswith("diff --git")), len(lines))
+    return lines[start:]
+
+
+class TestDiffAlgorithm:
+    """Tests pour le calcul du diff ligne à ligne"""
+
+    def test_minimal_blocks(self):
+        """Les blocs modifiés reconstruisent le nouveau contenu"""
+        a = list("abcabba")
+        b = list("cbabac")
+        blocks = diff_lines(a, b)
+        rebuilt = []
+        pos = 0
+        for i1, i2, j1, j2 in blocks:
+            rebuilt += a[pos:i1] + b[j1:j2]
+            pos = i2
+        rebuilt += a[pos:]
+        assert rebuilt == b
+        # Diff minimal de l'article de Myers : 5 différences
+        assert sum((i2 - i1) + (j2 - j1) for i1, i2, j1, j2 in blocks) == 5
+
+    def test_common_prefix_and_suffix(self):
+        """Une seule ligne modifiée au milieu d'un gros fichier donne un seul bloc"""
+        a = [f"{i}\n".encode() for i in range(10000)]
+        b = list(a)
+        b[5000] = b"changed\n"
+        assert diff_lines(a, b) == [(5000, 5001, 5000, 5001)]
+
+    def test_hunk_format(self):
+        """Hunks unifiés avec 3 lignes de contexte et ligne finale sans retour"""
+        a = [f"{i}\n".encode() for i in range(10)]
+        b = a[:9] + [b"9"]
+        assert unified_hunks(a, b) == [
+            "@@ -7,4 +7,4 @@", " 6", " 7", " 8", "-9", "+9",
+            "\\ No newline at end of file",
+        ]
+
+    def test_binary_detection(self):
+        """Un octet NUL au début du contenu le rend binaire"""
+        assert is_binary(b"abc\0def")
+        assert not is_binary(b"abc\ndef\n")
+
+
+class TestDiffCommand:
+    """Tests pour gitBis diff"""
+
+    def test_worktree_against_index(self, capsys):
+        """Les modifications non indexées sont affichées"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"f.txt": "un\ndeux\ntrois\n", "same.txt": "x\n"})
+            add_files(["f.txt", "same.txt"])
+            repo.create_file("f.txt", "un\n2\ntrois\n")
+
+            lines = diff_output(capsys)
+            assert lines[0] == "diff --git a/f.txt b/f.txt"
+            assert lines[1].startswith("index ") and lines[1].endswith(" 100644")
+            assert lines[2:] == ["--- a/f.txt", "+++ b/f.txt", "@@ -1,3 +1,3 @@",
+                                 " un", "-deux", "+2", " trois"]
+
+    def test_cached_against_empty_head(self, capsys):
+        """--cached sans commit affiche les fichiers indexés comme nouveaux"""
+        with temp_repo() as repo:
+            repo.create_file("new.txt", "a\n")
+            add_files(["new.txt"])
+
+            lines = diff_output(capsys, cached=True)
+            assert lines[:2] == ["diff --git a/new.txt b/new.txt", "new file mode 100644"]
+            assert lines[3:] == ["--- /dev/null", "+++ b/new.txt", "@@ -0,0 +1 @@", "+a"]
+
+    def test_commit_to_commit(self, capsys):
+        """Diff entre deux commits, fichier supprimé et fichier binaire"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"old.txt": "a\n"})
+            with open("bin.dat", "wb") as f:
+                f.write(b"\0\1")
+            add_files(["old.txt", "bin.dat"])
+            first = create_commit(write_tree(), message="un")
+            with open("bin.dat", "wb") as f:
+                f.write(b"\0\2")
+            add_files(["bin.dat"])
+            index = read_index_file()
+            index.remove("old.txt")
+            write_index_file(index)
+            second = create_commit(write_tree(), parent_sha1=first, message="deux")
+
+            lines = diff_output(capsys, [first, second])
+            assert "Binary files a/bin.dat and b/bin.dat differ" in lines
+            assert "deleted file mode 100644" in lines
+            assert lines[-3:] == ["+++ /dev/null", "@@ -1 +0,0 @@", "-a"]
+
+    def test_invalid_revision(self, capsys):
+        """Une référence inconnue fait échouer la commande"""
+        with temp_repo() as repo:
+            assert show_diff(["inconnu"]) is False
@@ -0,0 +1,129 @@
+"""
+Tests unitaires pour la commande diff-tree
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import diff_tree
+from src.commands.diff_tree import diff_trees, show_diff_tree, format_change
+from src.commands.objects import create_commit, write_tree
+from src.commands.add import add_files
+from src.commands.index import read_index_file, write_index_file
+from src.commands.reset import reset
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+def snapshot(files):
+    """Ajoute les fichiers à l'index et retourne le tree correspondant"""
+    add_files(list(files))
+    return write_tree()
+
+
+class TestDiffTree:
+    """Tests pour le diff de trees"""
+
+    def test_added_modified_deleted(self):
+        """Les entrées ajoutées, modifiées et supprimées sont produites dans l'ordre"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a", "b.txt": "b", "src/c.txt": "c"})
+            old_tree = snapshot(["a.txt", "b.txt", "src/c.txt"])
+
+            repo.create_file("b.txt", "b modifié")
+            repo.create_file("src/d.txt", "d")
+            os.remove("a.txt")
+            add_files(["b.txt", "src/d.txt"])
+            index = read_index_file()
+            index.remove("a.txt")
+            write_index_file(index)
+            new_tree = write_tree()
+
+            changes = [(status, path) for status, path, *_ in diff_trees(old_tree, new_tree)]
+            assert changes == [('D', 'a.txt'), ('M', 'b.txt'), ('A', 'src/d.txt')]
+
+    def test_identical_subtrees_are_not_read(self, monkeypatch):
+        """Un sous-dossier dont le SHA-1 est identique n'est jamais lu"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"big/x.txt": "x", "big/y.txt": "y", "top.txt": "1"})
+            old_tree = snapshot(["big/x.txt", "big/y.txt", "top.txt"])
+            repo.create_file("top.txt", "2")
+            new_tree = snapshot(["top.txt"])
+
+            read = []
+            original = diff_tree.read_object
+            monkeypatch.setattr(diff_tree, "read_object",
+                                lambda sha: read.append(sha) or original(sha))
+            changes = list(diff_trees(old_tree, new_tree))
+
+            assert [path for _, path, *_ in changes] == ['top.txt']
+            assert read == [old_tree, new_tree]
+
+    def test_non_recursive_reports_directory(self):
+        """Sans -r, un sous-dossier modifié est une seule entrée 040000"""
+        with temp_repo() as repo:
+            repo.create_file("dir/f.txt", "1")
+            old_tree = snapshot(["dir/f.txt"])
+            repo.create_file("dir/f.txt", "2")
+            new_tree = snapshot(["dir/f.txt"])
+
+            changes = list(diff_trees(old_tree, new_tree, recursive=False))
+            assert len(changes) == 1
+            assert format_change(changes[0]).startswith(":040000 040000 ")
+            assert format_change(changes[0]).endswith(" M\tdir")
+
+    def test_cli_with_commits(self, capsys):
+        """diff-tree accepte des commits et affiche le format raw"""
+        with temp_repo() as repo:
+            repo.create_file("f.txt", "1")
+            first = create_commit(snapshot(["f.txt"]), message="un")
+            repo.create_file("g.txt", "2")
+            second = create_commit(snapshot(["g.txt"]), parent_sha1=first, message="deux")
+
+            assert show_diff_tree(first, second, recursive=True) is True
+            line = capsys.readouterr().out.strip().splitlines()[-1]
+            assert line.startswith(":000000 100644 " + "0" * 40)
+            assert line.endswith(" A\tg.txt")
+
+            assert show_diff_tree("inconnu", second) is False
+
+    def test_reset_mixed_keeps_unchanged_stats(self):
+        """reset --mixed ne modifie que les entrées qui diffèrent du tree cible"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"keep.txt": "garde", "change.txt": "v1"})
+            first = create_commit(snapshot(["keep.txt", "change.txt"]), message="un")
+            with open(".mon_git/refs/heads/main.txt", "w") as f:
+                f.write(first)
+            repo.create_file("change.txt", "v2")
+            second = create_commit(snapshot(["change.txt"]), parent_sha1=first, message="deux")
+            with open(".mon_git/refs/heads/main.txt", "w") as f:
+                f.write(second)
+
+            kept_stat = read_index_file().get("keep.txt")['stat']
+            assert reset(first, "mixed") is True
+
+            index = read_index_file()
+            assert index.get("keep.txt")['stat'] == kept_stat
+            assert index.get("change.txt")['stat'] is None
+            assert index.cache_tree[''] == write_tree()
+
+    def test_paths_only_read_trees_along_path(self, monkeypatch):
+        """Avec paths, seuls les trees le long du chemin sont lus"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a/deep/f.txt": "1", "b/g.txt": "1"})
+            old_tree = snapshot(["a/deep/f.txt", "b/g.txt"])
+            create_test_files(repo, {"a/deep/f.txt": "2", "b/g.txt": "2"})
+            new_tree = snapshot(["a/deep/f.txt", "b/g.txt"])
+
+            read = []
+            original = diff_tree.read_object
+            monkeypatch.setattr(diff_tree, "read_object",
+                                lambda sha: read.append(sha) or original(sha))
+            changes = list(diff_trees(old_tree, new_tree, paths=["a/deep/f.txt"]))
+
+            assert [path for _, path, *_ in changes] == ["a/deep/f.txt"]
+            # Racine, a et a/deep de chaque côté ; b n'est jamais lu
+            assert len(read) == 6
@@ -0,0 +1,199 @@
+"""
+Tests unitaires pour le démon fsmonitor (fsmonitor.py) et add -u
+"""
+
+import pytest
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import index as index_module, add as add_module
+from src.commands.fsmonitor import (ChangeLog, ChangedPaths, FsmonitorDaemon, InotifyWatcher,
+                                    query_changes, send_request)
+from src.commands.status import worktree_status
+from src.commands.add import add_files, update_files, read_index
+from src.commands.index import read_index_file, write_index_file
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+def inotify_available():
+    """inotify utilisable dans cet environnement"""
+    try:
+        InotifyWatcher(ChangeLog()).stop()
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def running_daemon(watcher="auto"):
+    """Démon fsmonitor servi dans un thread du test"""
+    daemon = FsmonitorDaemon(watcher)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    assert daemon.wait_ready(5)
+    try:
+        yield daemon
+    finally:
+        daemon.shutdown()
+        thread.join()
+
+
+def make_old(*paths):
+    """Recule le mtime (sinon les entrées sont "racy" et toujours vérifiées)"""
+    for path in paths:
+        os.utime(path, ns=(1, 1))
+
+
+class TestChangeLog:
+    """Tests pour le journal des chemins modifiés"""
+
+    def test_changes_since_token(self):
+        """Seuls les chemins notés après le jeton sont renvoyés"""
+        changes = ChangeLog()
+        changes.record("a.txt")
+        token = changes.token()
+        changes.record("b.txt")
+        changes.record("src/c.txt")
+        changes.record("b.txt")
+
+        new_token, paths = changes.changes_since(token)
+        assert paths == ["b.txt", "src/c.txt"]
+        assert changes.changes_since(new_token)[1] == []
+
+    def test_stale_tokens(self):
+        """Jeton absent, d'un autre démon ou antérieur au journal : tout vérifier"""
+        changes = ChangeLog(max_events=2)
+        token = changes.token()
+        assert changes.changes_since(None)[1] is None
+        assert changes.changes_since("autre:0")[1] is None
+        for name in ("a", "b", "c"):
+            changes.record(name)
+        assert changes.changes_since(token)[1] is None
+
+        token = changes.token()
+        changes.reset()
+        assert changes.changes_since(token)[1] is None
+
+    def test_changed_paths(self):
+        """Un dossier signalé couvre tout son contenu"""
+        changed = ChangedPaths(["src/new", "a.txt"])
+        assert "a.txt" in changed
+        assert "src/new/deep/file.txt" in changed
+        assert "src/other.txt" not in changed
+        assert changed.touches_dir("src")
+        assert changed.touches_dir("src/new/deep")
+        assert not changed.touches_dir("doc")
+
+
+class TestFsmonitorDaemon:
+    """Tests pour le démon et son protocole"""
+
+    @pytest.mark.parametrize("watcher", ["inotify", "polling"])
+    def test_query_reports_changes(self, watcher):
+        """Le démon signale les fichiers modifiés, créés et supprimés depuis le jeton"""
+        if watcher == "inotify" and not inotify_available():
+            pytest.skip("inotify indisponible")
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a", "src/b.txt": "b"})
+            with running_daemon(watcher):
+                token, changed = query_changes(None)
+                assert token is not None and changed is None
+
+                create_test_files(repo, {"a.txt": "A!", "src/new/c.txt": "c"})
+                os.remove("src/b.txt")
+                token, changed = query_changes(token)
+                assert "a.txt" in changed
+                assert "src/b.txt" in changed
+                assert "src/new/c.txt" in changed
+                assert not any(path.startswith(".mon_git") for path in changed.paths)
+
+                assert len(query_changes(token)[1]) == 0
+            assert send_request({'command': 'status'}) is None
+
+    def test_status_only_checks_reported_paths(self, monkeypatch):
+        """Avec le démon, status ne relit pas le stat des fichiers non signalés"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a", "b.txt": "b", "src/c.txt": "c"})
+            make_old("a.txt", "b.txt", "src/c.txt")
+            add_files(["."])
+            make_old(".", "src")
+            with running_daemon("polling"):
+                # Premier status : jeton inconnu, tout est vérifié
+                worktree_status()
+                assert read_index_file().fsmonitor_token is not None
+
+                create_test_files(repo, {"b.txt": "modifié", "src/d.txt": "d"})
+                stats = []
+                original = index_module.file_stat
+                monkeypatch.setattr(index_module, "file_stat",
+                                    lambda path: stats.append(path) or original(path))
+                index_files, current, untracked = worktree_status()
+
+                assert stats == ["b.txt"]
+                assert current["b.txt"] != index_files["b.txt"]
+                assert current["a.txt"] == index_files["a.txt"]
+                assert untracked == ["src/d.txt"]
+
+    def test_stale_token_falls_back_to_full_scan(self):
+        """Un jeton d'un autre démon : tous les fichiers sont vérifiés"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a"})
+            make_old("a.txt")
+            add_files(["a.txt"])
+            index = read_index_file()
+            index.fsmonitor_token = "0000:1"
+            write_index_file(index)
+            create_test_files(repo, {"a.txt": "modifié"})
+
+            with running_daemon("polling"):
+                index_files, current, untracked = worktree_status()
+            assert current["a.txt"] != index_files["a.txt"]
+
+
+class TestAddUpdate:
+    """Tests pour add -u"""
+
+    def test_update_tracked_files(self, capsys):
+        """add -u indexe les modifications et suppressions, pas les nouveaux fichiers"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a", "b.txt": "b", "c.txt": "c"})
+            add_files(["."])
+            old_index = read_index()
+            create_test_files(repo, {"a.txt": "modifié", "new.txt": "nouveau"})
+            os.remove("b.txt")
+            capsys.readouterr()
+
+            update_files()
+
+            index = read_index()
+            assert index["a.txt"] != old_index["a.txt"]
+            assert "b.txt" not in index
+            assert index["c.txt"] == old_index["c.txt"]
+            assert "new.txt" not in index
+            assert capsys.readouterr().out.splitlines() == ["Ajouté : a.txt", "Supprimé : b.txt"]
+
+    def test_update_with_daemon(self, monkeypatch):
+        """Avec le démon, add -u ne vérifie que les chemins signalés"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a", "b.txt": "b"})
+            make_old("a.txt", "b.txt")
+            add_files(["."])
+            with running_daemon("polling"):
+                worktree_status()
+                create_test_files(repo, {"a.txt": "modifié"})
+                stats = []
+                original = index_module.file_stat
+                monkeypatch.setattr(index_module, "file_stat",
+                                    lambda path: stats.append(path) or original(path))
+                monkeypatch.setattr(add_module, "file_stat", index_module.file_stat)
+
+                update_files()
+
+            # Lu une fois pour la comparaison, une fois au hachage
+            assert set(stats) == {"a.txt"}
+            assert read_index_file().get("a.txt")["stat"] is not None
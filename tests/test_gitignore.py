@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour les règles .gitignore (gitignore.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import scanner
+from src.commands.gitignore import IgnoreMatcher, should_ignore
+from src.commands.add import add_files, read_index
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+def matcher(*patterns):
+    """Matcher pour des patterns de la racine"""
+    return IgnoreMatcher(patterns=list(patterns))
+
+
+class TestGitignore:
+    """Tests pour le matcher .gitignore compilé"""
+
+    def test_basename_and_anchored_patterns(self):
+        """Sans '/', un pattern vaut à toute profondeur ; avec '/', il est ancré"""
+        m = matcher("*.log", "/build", "doc/*.txt")
+        assert m.is_ignored("a.log")
+        assert m.is_ignored("src/deep/a.log")
+        assert m.is_ignored("build", is_dir=True)
+        assert not m.is_ignored("src/build", is_dir=True)
+        assert m.is_ignored("doc/notes.txt")
+        assert not m.is_ignored("doc/sub/notes.txt")
+        assert not m.is_ignored("catalog.txt")
+
+    def test_double_star(self):
+        """'**/' : zéro ou plusieurs dossiers ; '/**' : tout le contenu"""
+        m = matcher("**/cache", "logs/**", "a/**/b")
+        assert m.is_ignored("cache", is_dir=True)
+        assert m.is_ignored("x/y/cache")
+        assert m.is_ignored("logs/2024/jan.txt")
+        assert m.is_ignored("a/b")
+        assert m.is_ignored("a/x/y/b")
+        assert not m.is_ignored("ab")
+
+    def test_negation_and_directory_only(self):
+        """Le dernier pattern l'emporte ; 'dir/' ne concerne que les dossiers"""
+        m = matcher("*.txt", "!keep.txt", "tmp/")
+        assert m.is_ignored("notes.txt")
+        assert not m.is_ignored("keep.txt")
+        assert m.is_ignored("tmp", is_dir=True)
+        assert not m.is_ignored("tmp")
+        assert m.is_ignored("tmp/file.py")
+
+    def test_file_in_ignored_directory_cannot_be_reincluded(self):
+        """Un '!' ne ré-inclut pas un fichier dont le dossier est ignoré"""
+        m = matcher("vendor/", "!vendor/keep.py")
+        assert m.is_ignored("vendor/keep.py")
+
+    def test_nested_gitignore(self):
+        """Un .gitignore de sous-dossier s'applique relativement à son dossier"""
+        with temp_repo() as repo:
+            create_test_files(repo, {
+                ".gitignore": "*.tmp\n",
+                "pkg/.gitignore": "/generated\n!important.tmp\n",
+            })
+            m = IgnoreMatcher()
+            assert m.is_ignored("a.tmp")
+            assert m.is_ignored("pkg/other.tmp")
+            assert not m.is_ignored("pkg/important.tmp")
+            assert m.is_ignored("pkg/generated", is_dir=True)
+            assert not m.is_ignored("generated", is_dir=True)
+
+    def test_compatibility_helpers(self):
+        """should_ignore ne fait plus de test de sous-chaîne"""
+        assert should_ignore("build/out.o", ["build/"])
+        assert not should_ignore("rebuild.py", ["build"])
+
+    def test_add_does_not_enter_ignored_directories(self, monkeypatch):
+        """add ne liste pas le contenu d'un dossier ignoré"""
+        with temp_repo() as repo:
+            create_test_files(repo, {
+                ".gitignore": "node_modules/\n",
+                "app.js": "app",
+                "node_modules/lib/index.js": "lib",
+            })
+            scanned = []
+            original = scanner._list_directory
+            monkeypatch.setattr(scanner, "_list_directory",
+                                lambda path, *args: scanned.append(path) or original(path, *args))
+            add_files(["."])
+
+            assert "app.js" in read_index()
+            assert not any("node_modules" in path for path in read_index())
+            assert not any("node_modules" in path for path in scanned)
@@ -0,0 +1,135 @@
+"""
+Tests unitaires pour l'index binaire (index.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.index import (Index, read_index_file, write_index_file, parse_index,
+                                serialize_index, file_stat, MODE_EXECUTABLE)
+from src.commands.add import add_files, read_index
+from src.commands.reset import write_index as reset_write_index
+from tests.utils.test_helpers import temp_repo
+
+
+class TestIndex:
+    """Tests pour le format binaire de l'index"""
+    
+    def test_roundtrip_sorted(self):
+        """Test que les entrées sont relues triées, avec leur stat"""
+        with temp_repo() as repo:
+            repo.create_file("b.txt", "b")
+            index = Index()
+            index.set("b.txt", "2" * 40, stat=file_stat("b.txt"))
+            index.set("a/z.txt", "1" * 40)
+            index.set("a.txt", "3" * 40)
+            os.utime("b.txt", ns=(1, 1))
+            index.set("b.txt", "2" * 40, stat=file_stat("b.txt"))
+            
+            write_index_file(index)
+            loaded = read_index_file()
+            
+            assert list(loaded) == ["a.txt", "a/z.txt", "b.txt"]
+            assert loaded.get("b.txt")["stat"] == file_stat("b.txt")
+            assert loaded.get("a.txt")["stat"] is None
+            assert "a/z.txt" in loaded and "c.txt" not in loaded
+    
+    def test_entries_are_padded(self):
+        """Test de l'alignement des entrées sur 8 octets"""
+        for name in ("a", "ab", "abcdefgh", "x" * 100):
+            index = Index()
+            index.set(name, "0" * 40)
+            data = serialize_index(index)
+            assert (len(data) - 12 - 20) % 8 == 0
+            assert list(parse_index(data)) == [name]
+    
+    def test_checksum_detects_corruption(self):
+        """Test que la somme de contrôle détecte un index altéré"""
+        index = Index()
+        index.set("a.txt", "0" * 40)
+        data = bytearray(serialize_index(index))
+        data[70] ^= 0xff
+        
+        with pytest.raises(ValueError):
+            parse_index(bytes(data))
+    
+    def test_executable_mode(self):
+        """Test que le mode exécutable est conservé"""
+        with temp_repo() as repo:
+            repo.create_file("script.sh", "#!/bin/sh\n")
+            os.chmod("script.sh", 0o755)
+            add_files(["script.sh"])
+            
+            assert read_index_file().get("script.sh")["mode"] == MODE_EXECUTABLE
+    
+    def test_upgrade_text_index(self):
+        """Test de la conversion automatique de l'ancien index.txt"""
+        with temp_repo() as repo:
+            with open(".mon_git/index.txt", "w") as f:
+                f.write("# Git Index File\n")
+                f.write("100644|" + "a" * 40 + "|file.txt\n")
+            
+            assert read_index() == {"file.txt": "a" * 40}
+            assert not os.path.exists(".mon_git/index.txt")
+            with open(".mon_git/index", "rb") as f:
+                assert f.read(4) == b"DIRC"
+    
+    def test_binary_index_wins_over_stale_text_index(self):
+        """Test qu'un index.txt restant ne remplace pas l'index binaire"""
+        with temp_repo() as repo:
+            repo.create_file("y.txt", "y")
+            add_files(["y.txt"])
+            expected = read_index()
+            with open(".mon_git/index.txt", "w") as f:
+                f.write("100644|" + "a" * 40 + "|ancien.txt\n")
+            
+            assert read_index() == expected
+            assert not os.path.exists(".mon_git/index.txt")
+            assert read_index() == expected
+    
+    def test_upgrade_reset_index(self):
+        """Test de la conversion de l'ancien index "sha filename" de reset"""
+        with temp_repo() as repo:
+            with open(".mon_git/index", "w") as f:
+                f.write("b" * 40 + " dossier/mon fichier.txt\n")
+            
+            assert read_index() == {"dossier/mon fichier.txt": "b" * 40}
+    
+    def test_reset_and_add_share_index(self):
+        """Test que reset et add lisent et écrivent le même index"""
+        with temp_repo() as repo:
+            reset_write_index({"x.txt": "c" * 40})
+            repo.create_file("y.txt", "y")
+            add_files(["y.txt"])
+            
+            index = read_index()
+            assert index["x.txt"] == "c" * 40
+            assert "y.txt" in index
+    
+    def test_index_cache_returns_copies(self, monkeypatch):
+        """Un index inchangé n'est décodé qu'une fois ; chaque lecture reçoit une copie"""
+        from src.commands import index as index_module
+        with temp_repo() as repo:
+            index = Index()
+            index.set("a.txt", "1" * 40)
+            write_index_file(index)
+            os.utime(".mon_git/index", ns=(1, 1))
+            
+            parsed = []
+            original = index_module.parse_index
+            monkeypatch.setattr(index_module, "parse_index",
+                                lambda *args: parsed.append(1) or original(*args))
+            first = read_index_file()
+            first.set("b.txt", "2" * 40)
+            second = read_index_file()
+            
+            assert len(parsed) == 1
+            assert list(second) == ["a.txt"]
+            
+            second.set("c.txt", "3" * 40)
+            write_index_file(second)
+            assert list(read_index_file()) == ["a.txt", "c.txt"]
@@ -79,14 +79,14 @@ class TestInit:
             # Initialiser le dépôt
             init()
             
-            # Vérifier que l'index existe (index.txt dans l'implémentation actuelle)
-            assert os.path.exists(".mon_git/index.txt")
+            # Vérifier que l'index binaire existe
+            assert os.path.exists(".mon_git/index")
             
-            # Vérifier le contenu de l'index
-            with open(".mon_git/index.txt", "r") as f:
+            # Vérifier l'en-tête de l'index : signature DIRC, version 2, aucune entrée
+            with open(".mon_git/index", "rb") as f:
                 content = f.read()
-            assert "# Git Index File" in content
-            assert "# Version: 2" in content
+            assert content[:4] == b"DIRC"
+            assert content[4:12] == b"\x00\x00\x00\x02\x00\x00\x00\x00"
     
     def test_init_removes_existing_repo(self):
         """Test que init supprime un dépôt existant"""
@@ -135,7 +135,7 @@ class TestInit:
             # Vérifier que les fichiers sont des fichiers
             assert os.path.isfile(".mon_git/HEAD.txt")
             assert os.path.isfile(".mon_git/refs/heads/main.txt")
-            assert os.path.isfile(".mon_git/index.txt")
+            assert os.path.isfile(".mon_git/index")
     
     def test_init_multiple_times(self):
         """Test que init peut être appelé plusieurs fois"""
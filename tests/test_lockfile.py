@@ -0,0 +1,113 @@
+"""
+Tests unitaires pour les verrous de fichiers (lockfile.py) et les mises à jour
+concurrentes des refs et de l'index
+"""
+
+import pytest
+import os
+import sys
+import threading
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.lockfile import LockFile, LockError
+from src.commands.refs import write_ref, read_ref, loose_ref_path, RefUpdateError
+from src.commands.index import lock_index, read_index_file, get_index_path
+from src.commands.add import add_files
+from tests.utils.test_helpers import temp_repo
+
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+
+
+class TestLockFile:
+    """Tests pour LockFile"""
+    
+    def test_commit_replaces_target(self):
+        """Test que commit remplace le fichier et libère le verrou"""
+        with temp_repo() as repo:
+            repo.create_file("cible.txt", "ancien")
+            with LockFile("cible.txt") as lock:
+                lock.write("nouveau")
+                assert os.path.exists("cible.txt.lock")
+                assert open("cible.txt").read() == "ancien"
+                lock.commit()
+            
+            assert open("cible.txt").read() == "nouveau"
+            assert not os.path.exists("cible.txt.lock")
+    
+    def test_rollback_keeps_target(self):
+        """Test qu'une exception libère le verrou sans toucher au fichier"""
+        with temp_repo() as repo:
+            repo.create_file("cible.txt", "ancien")
+            with pytest.raises(RuntimeError):
+                with LockFile("cible.txt") as lock:
+                    lock.write("nouveau")
+                    raise RuntimeError("interrompu")
+            
+            assert open("cible.txt").read() == "ancien"
+            assert not os.path.exists("cible.txt.lock")
+    
+    def test_lock_is_exclusive(self):
+        """Test qu'un second verrou sur le même fichier échoue"""
+        with temp_repo() as repo:
+            with LockFile("cible.txt"):
+                with pytest.raises(LockError):
+                    LockFile("cible.txt").acquire(timeout=0)
+                # Un autre fichier n'est pas bloqué
+                with LockFile("autre.txt") as other:
+                    assert other.held
+
+
+class TestConcurrentUpdates:
+    """Tests pour les écritures concurrentes des refs et de l'index"""
+    
+    def test_ref_compare_and_swap(self):
+        """Test que write_ref refuse d'écraser une valeur inattendue"""
+        with temp_repo() as repo:
+            write_ref("refs/heads/dev", SHA_A, expected=None)
+            
+            with pytest.raises(RefUpdateError):
+                write_ref("refs/heads/dev", SHA_B, expected=None)
+            with pytest.raises(RefUpdateError):
+                write_ref("refs/heads/dev", SHA_B, expected=SHA_B)
+            assert read_ref("refs/heads/dev") == SHA_A
+            
+            write_ref("refs/heads/dev", SHA_B, expected=SHA_A)
+            assert read_ref("refs/heads/dev") == SHA_B
+            assert not os.path.exists(loose_ref_path("refs/heads/dev") + ".lock")
+    
+    def test_add_waits_for_index_lock(self):
+        """Test que add attend qu'un autre processus libère le verrou de l'index"""
+        with temp_repo() as repo:
+            repo.create_file("a.txt", "a")
+            lock = lock_index()
+            thread = threading.Thread(target=add_files, args=(["a.txt"],))
+            thread.start()
+            thread.join(0.2)
+            
+            assert thread.is_alive()
+            assert "a.txt" not in read_index_file()
+            
+            lock.rollback()
+            thread.join()
+            assert "a.txt" in read_index_file()
+    
+    def test_concurrent_adds_keep_all_files(self):
+        """Test que des add simultanés ne perdent aucun fichier"""
+        with temp_repo() as repo:
+            names = [f"fichier{i}.txt" for i in range(8)]
+            for name in names:
+                repo.create_file(name, name)
+            
+            threads = [threading.Thread(target=add_files, args=([name],), kwargs={"jobs": 1})
+                       for name in names]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            assert sorted(read_index_file().to_dict()) == names
+            assert not os.path.exists(get_index_path() + ".lock")
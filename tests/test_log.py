@@ -9,8 +9,10 @@ import sys
 # Ajouter le répertoire parent au path pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.commands.log import show_log, read_commit_object
-from src.commands.objects import create_commit, write_tree
+from src.commands.log import show_log, read_commit_object, get_commit_history
+from src.commands import log
+from src.commands.objects import create_commit, write_tree, create_tree, write_object
+from src.commands.commit_graph import write_commit_graph_from_refs
 from src.commands.add import add_files
 from tests.utils.test_helpers import temp_repo, create_test_files
 
@@ -256,4 +258,86 @@ class TestLog:
             result = show_log()
             
             # Vérifier que le log a été affiché
-            assert result is True 
\ No newline at end of file
+            assert result is True
+    
+    def test_log_limited_to_path(self):
+        """log -- <chemin> ne garde que les commits qui modifient ce chemin"""
+        with temp_repo() as repo:
+            repo.create_file("src/app/main.py", "v1")
+            repo.create_file("README.md", "doc")
+            add_files(["src/app/main.py", "README.md"])
+            first = create_commit(write_tree(), message="Premier")
+
+            repo.create_file("README.md", "doc 2")
+            add_files(["README.md"])
+            second = create_commit(write_tree(), message="Doc", parent_sha1=first)
+
+            repo.create_file("src/app/main.py", "v2")
+            add_files(["src/app/main.py"])
+            third = create_commit(write_tree(), message="Code", parent_sha1=second)
+
+            with open(".mon_git/refs/heads/main.txt", "w") as f:
+                f.write(third)
+
+            assert get_commit_history(paths=["src/app/main.py"]) == [third, first]
+            assert get_commit_history(paths=["./src/"]) == [third, first]
+            assert get_commit_history(paths=["README.md"]) == [second, first]
+            assert get_commit_history(paths=["absent.txt"]) == []
+            assert get_commit_history(paths=["src/app/main.py"], max_count=1) == [third]
+
+    def _merge_history(self):
+        """Historique avec un merge : root - a - merge, root - b - merge"""
+        def make(name, parent1=None, parent2=None):
+            blob = write_object("blob", name.encode())
+            tree = create_tree([("100644", f"{name}.txt", blob)])
+            return create_commit(tree, parent_sha1=parent1, parent_sha2=parent2, message=name)
+
+        root = make("root")
+        a = make("a", root)
+        b = make("b", root)
+        merge = make("merge", a, b)
+        with open(".mon_git/refs/heads/main.txt", "w") as f:
+            f.write(merge)
+        return root, a, b, merge
+
+    def test_log_follows_all_parents(self):
+        """Le second parent d'un merge est parcouru, sauf avec --first-parent"""
+        with temp_repo() as repo:
+            root, a, b, merge = self._merge_history()
+
+            history = get_commit_history()
+            assert sorted(history) == sorted([root, a, b, merge])
+            assert history[0] == merge and history[-1] == root
+            assert get_commit_history(first_parent=True) == [merge, a, root]
+
+    def test_log_topo_order(self):
+        """--topo-order : chaque commit apparaît après tous ses enfants"""
+        with temp_repo() as repo:
+            root, a, b, merge = self._merge_history()
+            write_commit_graph_from_refs()
+
+            history = get_commit_history(topo_order=True)
+            assert history == [merge, a, b, root]
+            assert get_commit_history(topo_order=True, first_parent=True) == [merge, a, root]
+
+    def test_log_is_lazy(self, monkeypatch):
+        """log -n 3 ne lit que le début de l'historique"""
+        with temp_repo() as repo:
+            parent = None
+            for i in range(40):
+                blob = write_object("blob", f"v{i}".encode())
+                tree = create_tree([("100644", "f.txt", blob)])
+                parent = create_commit(tree, parent_sha1=parent, message=f"c{i}")
+            with open(".mon_git/refs/heads/main.txt", "w") as f:
+                f.write(parent)
+            write_commit_graph_from_refs()
+
+            looked_up = []
+            original = log.lookup_commit
+            monkeypatch.setattr(log, "lookup_commit",
+                                lambda sha: looked_up.append(sha) or original(sha))
+            assert len(get_commit_history(max_count=3)) == 3
+            assert len(set(looked_up)) <= 4
+            looked_up.clear()
+            assert len(get_commit_history(max_count=3, topo_order=True)) == 3
+            assert len(set(looked_up)) <= 4
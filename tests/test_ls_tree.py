@@ -64,10 +64,14 @@ class TestLsTree:
             obj_type, content = read_object(tree_sha)
             entries = parse_tree_content(content)
             
-            # Vérifier la structure
+            # Vérifier la structure : le sous-répertoire est un tree imbriqué
             assert len(entries) == 2
             assert any(entry["name"] == "file1.txt" for entry in entries)
-            assert any(entry["name"] == "subdir/file2.txt" for entry in entries)
+            subdir = [entry for entry in entries if entry["name"] == "subdir"]
+            assert len(subdir) == 1 and subdir[0]["type"] == "tree"
+            
+            obj_type, content = read_object(subdir[0]["sha"])
+            assert [entry["name"] for entry in parse_tree_content(content)] == ["file2.txt"]
     
     def test_parse_tree_content_empty(self):
         """Test de parsing du contenu d'un tree vide"""
@@ -0,0 +1,97 @@
+"""
+Tests unitaires pour la commande merge-base
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import merge_base as merge_base_module
+from src.commands.merge_base import merge_bases, is_ancestor, merge_base
+from src.commands.commit_graph import write_commit_graph_from_refs
+from src.commands.objects import create_commit, create_tree, write_object
+from tests.utils.test_helpers import temp_repo
+
+
+def make_commit(name, parent1=None, parent2=None):
+    """Crée un commit dont le tree contient un seul fichier nommé name"""
+    blob = write_object("blob", name.encode())
+    tree = create_tree([("100644", f"{name}.txt", blob)])
+    return create_commit(tree, parent_sha1=parent1, parent_sha2=parent2, message=name)
+
+
+def set_branch(name, sha):
+    """Fait pointer une branche sur un commit"""
+    with open(f".mon_git/refs/heads/{name}.txt", "w") as f:
+        f.write(sha)
+
+
+class TestMergeBase:
+    """Tests pour merge-base et --is-ancestor"""
+
+    def test_fork_point(self):
+        """L'ancêtre commun de deux branches est leur point de divergence"""
+        with temp_repo() as repo:
+            root = make_commit("root")
+            base = make_commit("base", root)
+            left = make_commit("left", base)
+            right = make_commit("right", make_commit("right0", base))
+
+            assert merge_bases(left, right) == [base]
+            assert merge_bases(left, base) == [base]
+            assert merge_bases(left, left) == [left]
+
+    def test_criss_cross_merge(self):
+        """Deux meilleurs ancêtres communs, aucun n'étant ancêtre de l'autre"""
+        with temp_repo() as repo:
+            base = make_commit("base")
+            a = make_commit("a", base)
+            b = make_commit("b", base)
+            merge1 = make_commit("m1", a, b)
+            merge2 = make_commit("m2", b, a)
+
+            assert sorted(merge_bases(merge1, merge2)) == sorted([a, b])
+
+    def test_disjoint_histories(self):
+        """Des historiques sans commit commun n'ont pas d'ancêtre commun"""
+        with temp_repo() as repo:
+            assert merge_bases(make_commit("x"), make_commit("y")) == []
+
+    def test_is_ancestor_stops_at_generation(self, monkeypatch):
+        """--is-ancestor ne parcourt pas l'historique sous la génération cible"""
+        with temp_repo() as repo:
+            shas = [make_commit("c0")]
+            for i in range(1, 30):
+                shas.append(make_commit(f"c{i}", shas[-1]))
+            side = make_commit("side", shas[25])
+            set_branch("main", shas[-1])
+            set_branch("side", side)
+            write_commit_graph_from_refs()
+
+            looked_up = []
+            original = merge_base_module.lookup_commit
+            monkeypatch.setattr(merge_base_module, "lookup_commit",
+                                lambda sha: looked_up.append(sha) or original(sha))
+
+            assert is_ancestor(shas[25], shas[-1]) is True
+            assert is_ancestor(side, shas[-1]) is False
+            # Seuls les commits plus récents que la cible sont lus
+            assert shas[10] not in looked_up
+            assert is_ancestor(shas[-1], shas[0]) is False
+
+    def test_command(self, capsys):
+        """merge-base affiche l'ancêtre commun et accepte les noms de branche"""
+        with temp_repo() as repo:
+            base = make_commit("base")
+            set_branch("main", make_commit("main", base))
+            set_branch("feature", make_commit("feature", base))
+
+            capsys.readouterr()
+            assert merge_base("main", "feature") is True
+            assert capsys.readouterr().out.strip() == base
+            assert merge_base(base, "feature", check_ancestor=True) is True
+            assert merge_base("main", "feature", check_ancestor=True) is False
+            assert merge_base("inconnu", "main") is False
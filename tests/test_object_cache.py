@@ -0,0 +1,119 @@
+"""
+Tests unitaires pour le cache d'objets (object_cache.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.object_cache import LRUCache, ObjectCache, DEFAULT_METADATA_BUDGET, DEFAULT_BLOB_BUDGET
+from src.commands.objects import (write_object, read_object, get_object_cache_stats,
+                                  clear_object_cache, configure_object_cache)
+from tests.utils.test_helpers import temp_repo
+
+
+class TestObjectCache:
+    """Tests pour le cache LRU des objets"""
+    
+    def test_lru_evicts_least_recent(self):
+        """Test que l'entrée la moins récemment utilisée est évincée en premier"""
+        cache = LRUCache(30, max_item_bytes=30)
+        cache.put("a", 1, 10)
+        cache.put("b", 2, 10)
+        cache.put("c", 3, 10)
+        cache.get("a")
+        cache.put("d", 4, 10)
+        
+        assert "a" in cache and "c" in cache and "d" in cache
+        assert "b" not in cache
+        assert cache.current_bytes == 30
+        assert cache.evictions == 1
+    
+    def test_lru_rejects_oversized_entry(self):
+        """Test qu'une entrée trop grosse ne vide pas le cache"""
+        cache = LRUCache(100)
+        cache.put("petit", b"x", 1)
+        
+        assert not cache.put("gros", b"y" * 50, 50)
+        assert "petit" in cache and "gros" not in cache
+    
+    def test_blobs_do_not_evict_metadata(self):
+        """Test que les blobs et les commits/trees ont des budgets séparés"""
+        cache = ObjectCache(metadata_budget=1000, blob_budget=100)
+        cache.put("t" * 40, "tree", b"t" * 20)
+        for i in range(20):
+            cache.put(f"{i:040d}", "blob", b"b" * 20)
+        
+        assert cache.get("t" * 40) == ("tree", b"t" * 20)
+        assert cache.blobs.current_bytes <= 100
+    
+    def test_get_counts_one_hit_or_one_miss(self):
+        """Test qu'une lecture compte un seul succès ou un seul échec, quel que soit le cache"""
+        cache = ObjectCache()
+        cache.put("b" * 40, "blob", b"contenu")
+        
+        assert cache.get("b" * 40) == ("blob", b"contenu")
+        assert cache.get("0" * 40) is None
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['metadata']['misses'] == 0 and stats['blobs']['misses'] == 0
+    
+    def test_stats_are_exact_across_threads(self):
+        """Test que les compteurs ne perdent aucune lecture quand plusieurs threads lisent"""
+        from concurrent.futures import ThreadPoolExecutor
+        cache = ObjectCache()
+        cache.put("b" * 40, "blob", b"contenu")
+        
+        def lookups(i):
+            for _ in range(500):
+                cache.get("b" * 40)
+                cache.get(f"{i:040d}")
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lookups, range(8)))
+        
+        stats = cache.stats()
+        assert stats['hits'] == 8 * 500
+        assert stats['misses'] == 8 * 500
+    
+    def test_read_object_hits_cache(self):
+        """Test que la deuxième lecture d'un objet ne touche pas le disque"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"contenu en cache")
+            clear_object_cache()
+            before = get_object_cache_stats()
+            
+            assert read_object(sha) == ("blob", b"contenu en cache")
+            os.remove(os.path.join(".mon_git", "objects", sha[:2], sha[2:]))
+            assert read_object(sha) == ("blob", b"contenu en cache")
+            
+            after = get_object_cache_stats()
+            assert after['misses'] - before['misses'] == 1
+            assert after['hits'] - before['hits'] == 1
+    
+    def test_invalidate_object(self):
+        """Test que l'invalidation force une relecture depuis le disque"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"contenu")
+            read_object(sha)
+            os.remove(os.path.join(".mon_git", "objects", sha[:2], sha[2:]))
+            
+            clear_object_cache(sha)
+            
+            with pytest.raises(ValueError):
+                read_object(sha)
+    
+    def test_configure_budgets(self):
+        """Test du changement des budgets du cache"""
+        try:
+            configure_object_cache(metadata_budget=1024, blob_budget=2048)
+            stats = get_object_cache_stats()
+            assert stats['metadata']['max_bytes'] == 1024
+            assert stats['blobs']['max_bytes'] == 2048
+        finally:
+            configure_object_cache(DEFAULT_METADATA_BUDGET, DEFAULT_BLOB_BUDGET)
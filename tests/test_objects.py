@@ -0,0 +1,141 @@
+"""
+Tests unitaires pour le stockage des objets (objects.py)
+"""
+
+import pytest
+import os
+import sys
+import zlib
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.objects import (
+    write_object, read_object, hash_object, object_path, legacy_object_path,
+    object_exists, migrate_objects, create_commit, hash_file_streaming
+)
+import src.commands.objects as objects_module
+from tests.utils.test_helpers import temp_repo
+
+
+def write_legacy_object(sha, obj_type, body):
+    """Écrit un objet dans l'ancien format texte (.txt)"""
+    path = legacy_object_path(sha)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"# Git Object: {sha}\n")
+        f.write(f"# Type: {obj_type}\n")
+        f.write(f"{obj_type}|0|\n")
+        f.write(body)
+
+
+class TestObjects:
+    """Tests pour le format binaire des objets"""
+    
+    def test_write_object_is_zlib_compressed(self):
+        """Test que l'objet est stocké compressé au format <type> <taille>\\0<contenu>"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"hello")
+            
+            with open(object_path(sha), "rb") as f:
+                data = zlib.decompress(f.read())
+            assert data == b"blob 5\0hello"
+            assert sha == "b6fc4c620b67d95f953a5c1c1230aaab5db5a1b0"
+    
+    def test_binary_blob_roundtrip(self):
+        """Test qu'un fichier binaire est restitué à l'identique"""
+        with temp_repo() as repo:
+            content = bytes(range(256)) * 4
+            with open("image.bin", "wb") as f:
+                f.write(content)
+            
+            sha = hash_object("image.bin")
+            obj_type, data = read_object(sha)
+            
+            assert obj_type == "blob"
+            assert data == content
+    
+    def test_streaming_hash_matches_write_object(self):
+        """Test que le hachage par blocs donne le même objet que write_object"""
+        with temp_repo() as repo:
+            content = os.urandom(3000)
+            with open("gros.bin", "wb") as f:
+                f.write(content)
+            old_chunk = objects_module.STREAM_CHUNK_SIZE
+            objects_module.STREAM_CHUNK_SIZE = 512
+            try:
+                sha = hash_file_streaming("gros.bin")
+            finally:
+                objects_module.STREAM_CHUNK_SIZE = old_chunk
+            
+            assert sha == write_object("blob", content, write=False)
+            with open(object_path(sha), "rb") as f:
+                assert zlib.decompress(f.read()) == b"blob 3000\0" + content
+            assert not [n for n in os.listdir(os.path.join(".mon_git", "objects")) if n.startswith("tmp_obj_")]
+    
+    def test_streaming_hash_without_write(self):
+        """Test que write=False ne crée aucun objet"""
+        with temp_repo() as repo:
+            with open("a.txt", "wb") as f:
+                f.write(b"hello")
+            
+            sha = hash_file_streaming("a.txt", write=False)
+            
+            assert sha == "b6fc4c620b67d95f953a5c1c1230aaab5db5a1b0"
+            assert not os.path.exists(object_path(sha))
+    
+    def test_read_object_not_found(self):
+        """Test de lecture d'un objet inexistant"""
+        with temp_repo() as repo:
+            with pytest.raises(ValueError):
+                read_object("0" * 40)
+    
+    def test_read_legacy_blob(self):
+        """Test que les objets de l'ancien format texte restent lisibles"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"ligne 1\nligne 2\n", write=False)
+            write_legacy_object(sha, "blob", "ligne 1\nligne 2\n")
+            
+            assert object_exists(sha)
+            assert read_object(sha) == ("blob", b"ligne 1\nligne 2\n")
+    
+    def test_migrate_objects(self):
+        """Test de la migration des objets .txt vers le format binaire"""
+        with temp_repo() as repo:
+            blob_sha = write_object("blob", b"contenu", write=False)
+            write_legacy_object(blob_sha, "blob", "contenu")
+            
+            tree_content = b"100644 a.txt\0" + bytes.fromhex(blob_sha)
+            tree_sha = write_object("tree", tree_content, write=False)
+            write_legacy_object(tree_sha, "tree", f"100644 a.txt {blob_sha}\n")
+            
+            commit_content = f"tree {tree_sha}\n\nPremier commit".encode()
+            commit_sha = write_object("commit", commit_content, write=False)
+            write_legacy_object(commit_sha, "commit", f"tree {tree_sha}\n\nPremier commit\n")
+            
+            stats = migrate_objects()
+            
+            assert stats["migrated"] == 3
+            assert stats["corrupted"] == []
+            for sha in (blob_sha, tree_sha, commit_sha):
+                assert os.path.exists(object_path(sha))
+                assert not os.path.exists(legacy_object_path(sha))
+            assert read_object(tree_sha) == ("tree", tree_content)
+            assert read_object(commit_sha) == ("commit", commit_content)
+    
+    def test_migrate_objects_keeps_corrupted(self):
+        """Test qu'un objet altéré par l'ancien format n'est pas migré"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"\xff\xfe binaire", write=False)
+            write_legacy_object(sha, "blob", "�� binaire")
+            
+            stats = migrate_objects()
+            
+            assert stats["corrupted"] == [sha]
+            assert os.path.exists(legacy_object_path(sha))
+    
+    def test_create_commit_missing_tree(self):
+        """Test que create_commit refuse un tree inexistant"""
+        with temp_repo() as repo:
+            with pytest.raises(ValueError):
+                create_commit("1" * 40, message="commit")
@@ -0,0 +1,142 @@
+"""
+Tests unitaires pour la commande repack (packfiles)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.pack import repack, get_packs, list_loose_objects, encode_object_header, decode_object_header
+from src.commands.objects import write_object, read_object, object_exists, create_commit, create_tree, write_tree
+from src.commands.rev_parse import rev_parse
+from src.commands.add import add_files
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+class TestPack:
+    """Tests pour les packfiles"""
+    
+    def test_object_header_roundtrip(self):
+        """Test de l'encodage de l'en-tête type/taille"""
+        for size in (0, 15, 16, 1000, 2 ** 32 + 5):
+            header = encode_object_header(3, size)
+            assert decode_object_header(header, 0) == (3, size, len(header))
+    
+    def test_repack_then_read(self):
+        """Test que read_object lit les objets depuis le pack"""
+        with temp_repo() as repo:
+            shas = {write_object("blob", f"contenu {i}".encode()): f"contenu {i}".encode() for i in range(50)}
+            
+            pack_path = repack(remove_redundant=True)
+            
+            assert os.path.exists(pack_path)
+            assert os.path.exists(pack_path[:-5] + ".idx")
+            assert list_loose_objects() == []
+            for sha, content in shas.items():
+                assert object_exists(sha)
+                assert read_object(sha) == ("blob", content)
+    
+    def test_repack_keeps_loose_without_d(self):
+        """Test que repack sans -d conserve les objets loose"""
+        with temp_repo() as repo:
+            sha = write_object("blob", b"contenu")
+            repack()
+            assert list_loose_objects() == [sha]
+            assert len(get_packs()) == 1
+    
+    def test_repack_consolidates_packs(self):
+        """Test que repack -d regroupe plusieurs packs en un seul"""
+        with temp_repo() as repo:
+            sha1 = write_object("blob", b"premier")
+            repack(remove_redundant=True)
+            sha2 = write_object("blob", b"second")
+            repack(remove_redundant=True)
+            
+            packs = get_packs()
+            assert len(packs) == 1
+            assert sha1 in packs[0] and sha2 in packs[0]
+    
+    def test_commit_and_rev_parse_on_packed_objects(self):
+        """Test que les commits et les SHA courts fonctionnent sur des objets packés"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"file1.txt": "contenu1"})
+            add_files(["file1.txt"])
+            tree_sha = write_tree()
+            repack(remove_redundant=True)
+            
+            commit_sha = create_commit(tree_sha, message="Commit sur pack")
+            repack(remove_redundant=True)
+            
+            assert rev_parse(commit_sha[:7]) == commit_sha
+            assert read_object(commit_sha)[0] == "commit"
+    
+    def test_repack_stores_revisions_as_deltas(self):
+        """Test que les révisions d'un même fichier sont stockées en delta"""
+        with temp_repo() as repo:
+            lines = [f"cle_{i} = valeur {i}\n" for i in range(300)]
+            parent = None
+            contents = []
+            for version in range(4):
+                lines[version * 50] = f"cle modifiee en version {version}\n"
+                contents.append("".join(lines))
+                repo.create_file("config.ini", contents[-1])
+                blob_sha = write_object("blob", contents[-1].encode())
+                tree_sha = create_tree([("100644", "config.ini", blob_sha)])
+                parent = create_commit(tree_sha, message=f"Version {version}", parent_sha1=parent)
+                with open(".mon_git/refs/heads/main.txt", "w") as f:
+                    f.write(parent)
+            
+            blob_shas = [write_object("blob", c.encode(), write=False) for c in contents]
+            pack_path = repack(remove_redundant=True, depth=2)
+            
+            assert os.path.getsize(pack_path) < len(contents[0]) * 2
+            for sha, content in zip(blob_shas, contents):
+                assert read_object(sha) == ("blob", content.encode())
+    
+    def test_repack_empty_repository(self):
+        """Test de repack sans aucun objet"""
+        with temp_repo() as repo:
+            assert repack() is None
+    
+    def test_repack_streams_objects(self, monkeypatch):
+        """Test que repack relit chaque objet au moment de l'écrire au lieu de tout charger"""
+        from src.commands import objects, pack
+        with temp_repo() as repo:
+            for i in range(20):
+                write_object("blob", f"contenu {i}".encode())
+            
+            events = []
+            original_read = objects._read_object_uncached
+            original_header = pack.encode_object_header
+            monkeypatch.setattr(objects, "_read_object_uncached",
+                                lambda sha: events.append("read") or original_read(sha))
+            monkeypatch.setattr(pack, "encode_object_header",
+                                lambda *args: events.append("write") or original_header(*args))
+            repack(remove_redundant=True, window=2)
+            
+            # Un objet est écrit avant que le dernier objet soit relu
+            first_write = events.index("write")
+            last_read = len(events) - 1 - events[::-1].index("read")
+            assert first_write < last_read
+            assert events.count("write") == 20
+    
+    def test_repack_skips_corrupted_legacy_object(self):
+        """Test qu'un objet .txt dont le contenu ne correspond pas à son SHA-1 n'est ni empaqueté ni supprimé"""
+        from src.commands.objects import legacy_object_path
+        with temp_repo() as repo:
+            good = write_object("blob", b"valide")
+            wrong = "ab" * 20
+            path = legacy_object_path(wrong)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"blob 5\0autre")
+            
+            repack(remove_redundant=True)
+            
+            packs = get_packs()
+            assert good in packs[0]
+            assert wrong not in packs[0]
+            assert os.path.exists(path)
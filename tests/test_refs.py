@@ -0,0 +1,102 @@
+"""
+Tests unitaires pour les références et packed-refs (refs.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands import refs
+from src.commands.refs import (pack_refs, read_ref, resolve_ref, write_ref, list_refs,
+                               loose_ref_path, get_packed_refs_path)
+from src.commands.rev_parse import rev_parse
+from src.commands.show_ref import get_all_refs
+from src.commands.checkout import checkout
+from src.commands.reset import reset
+from tests.utils.test_helpers import temp_repo
+
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+
+
+class TestRefs:
+    """Tests pour les références loose et packées"""
+    
+    def test_pack_refs(self):
+        """Test que pack-refs écrit un fichier trié et supprime les refs loose"""
+        with temp_repo() as repo:
+            write_ref("refs/heads/main", SHA_A)
+            write_ref("refs/heads/feature/x", SHA_B)
+            write_ref("refs/tags/v1", SHA_B)
+            
+            assert pack_refs() == 3
+            
+            with open(get_packed_refs_path()) as f:
+                lines = f.read().splitlines()
+            assert lines[0].startswith("# pack-refs with:")
+            assert lines[1:] == [f"{SHA_B} refs/heads/feature/x",
+                                 f"{SHA_A} refs/heads/main",
+                                 f"{SHA_B} refs/tags/v1"]
+            assert not os.path.exists(loose_ref_path("refs/heads/main"))
+            assert rev_parse("main") == SHA_A
+            assert rev_parse("HEAD") == SHA_A
+            assert rev_parse("refs/tags/v1") == SHA_B
+            assert rev_parse("feature/x") == SHA_B
+    
+    def test_loose_overrides_packed(self):
+        """Test qu'une ref loose masque la ligne packée de même nom"""
+        with temp_repo() as repo:
+            write_ref("refs/heads/main", SHA_A)
+            pack_refs()
+            write_ref("refs/heads/main", SHA_B)
+            
+            assert resolve_ref("refs/heads/main") == SHA_B
+            assert get_all_refs() == [(SHA_B, "refs/heads/main")]
+            assert list_refs("refs/tags/") == []
+    
+    def test_loose_ref_cached(self):
+        """Test qu'une ref loose ancienne n'est pas rouverte à chaque lecture"""
+        with temp_repo() as repo:
+            write_ref("refs/heads/main", SHA_A)
+            path = loose_ref_path("refs/heads/main")
+            os.utime(path, (1000000000, 1000000000))
+            
+            opened = []
+            original = refs.read_ref_file
+            refs.read_ref_file = lambda p: opened.append(p) or original(p)
+            try:
+                for _ in range(5):
+                    assert read_ref("refs/heads/main") == SHA_A
+            finally:
+                refs.read_ref_file = original
+            assert len(opened) == 1
+            
+            # Une réécriture est vue immédiatement
+            write_ref("refs/heads/main", SHA_B)
+            assert read_ref("refs/heads/main") == SHA_B
+    
+    def test_checkout_and_reset_with_packed_refs(self):
+        """Test de checkout et reset sur des branches packées"""
+        with temp_repo() as repo:
+            repo.create_file("file1.txt", "contenu")
+            from src.commands.add import add_files
+            from src.commands.objects import write_tree, create_commit
+            add_files(["file1.txt"])
+            first = create_commit(write_tree(), message="premier")
+            second = create_commit(write_tree(), parent_sha1=first, message="second")
+            write_ref("refs/heads/main", second)
+            write_ref("refs/heads/dev", first)
+            pack_refs()
+            
+            assert checkout("dev") is True
+            assert refs.current_branch() == "dev"
+            assert rev_parse("HEAD") == first
+            
+            assert checkout("main") is True
+            assert reset("HEAD~1", "soft") is True
+            assert rev_parse("main") == first
+            assert os.path.exists(loose_ref_path("refs/heads/main"))
@@ -133,6 +133,21 @@ class TestReset:
             index = read_index()
             # L'index devrait contenir les fichiers du premier commit
     
+    def test_reset_hard_restores_subdirectories(self):
+        """Test que reset hard restaure les fichiers des sous-trees"""
+        with temp_repo() as repo:
+            files = {"racine.txt": "racine", "dossier/sous/fichier.txt": "profond"}
+            create_test_files(repo, files)
+            add_files(["."])
+            commit_sha = create_commit(write_tree(), message="Arborescence")
+            
+            repo.create_file("dossier/sous/fichier.txt", "modifié")
+            
+            assert reset_hard(commit_sha) is True
+            assert repo.read_file("dossier/sous/fichier.txt") == "profond"
+            from src.commands.add import read_index
+            assert sorted(read_index()) == ["dossier/sous/fichier.txt", "racine.txt"]
+    
     def test_reset_invalid_commit(self):
         """Test que reset échoue avec un commit invalide"""
         with temp_repo() as repo:
@@ -219,4 +234,66 @@ class TestReset:
             # Vérifier que HEAD est toujours en mode detached
             with open(".mon_git/HEAD.txt", "r") as f:
                 head_content = f.read().strip()
-            assert head_content == commit_sha 
\ No newline at end of file
+            assert head_content == commit_sha     
+    def test_reset_hard_removes_files_not_in_commit(self):
+        """Test que reset hard supprime les fichiers suivis absents du commit"""
+        with temp_repo() as repo:
+            repo.create_file("garde.txt", "garde")
+            add_files(["garde.txt"])
+            commit_sha = create_commit(write_tree(), message="Premier")
+            
+            repo.create_file("nouveau.txt", "nouveau")
+            add_files(["nouveau.txt"])
+            repo.create_file("non_suivi.txt", "non suivi")
+            
+            assert reset_hard(commit_sha) is True
+            assert not os.path.exists("nouveau.txt")
+            assert os.path.exists("non_suivi.txt")
+            assert repo.read_file("garde.txt") == "garde"
+    
+    def _locked_index(self, *args, **kwargs):
+        """Simule un index verrouillé par un autre processus"""
+        from src.commands.lockfile import LockError
+        raise LockError("Unable to create '.mon_git/index.lock': File exists.")
+    
+    def _two_commits(self, repo):
+        """Crée deux commits, HEAD sur le deuxième"""
+        repo.create_file("file1.txt", "v1")
+        add_files(["file1.txt"])
+        first = create_commit(write_tree(), message="Premier commit")
+        repo.create_file("file1.txt", "v2")
+        add_files(["file1.txt"])
+        second = create_commit(write_tree(), parent_sha1=first, message="Deuxième commit")
+        with open(".mon_git/refs/heads/main.txt", "w") as f:
+            f.write(second)
+        return first, second
+    
+    def test_reset_hard_keeps_head_when_index_is_locked(self, monkeypatch):
+        """Test que HEAD ne bouge pas si l'index ne peut pas être mis à jour"""
+        with temp_repo() as repo:
+            first, second = self._two_commits(repo)
+            monkeypatch.setattr("src.commands.reset.checkout_tree", self._locked_index)
+            
+            assert reset_hard(first, expected_head=second) is False
+            from src.commands.rev_parse import rev_parse
+            assert rev_parse("HEAD") == second
+    
+    def test_reset_mixed_keeps_head_when_index_is_locked(self, monkeypatch):
+        """Test que reset mixed ne déplace pas HEAD si l'index est verrouillé"""
+        with temp_repo() as repo:
+            first, second = self._two_commits(repo)
+            monkeypatch.setattr("src.commands.reset.reset_index_to_tree", self._locked_index)
+            
+            assert reset_mixed(first, expected_head=second) is False
+            from src.commands.rev_parse import rev_parse
+            assert rev_parse("HEAD") == second
+    
+    def test_reset_hard_does_not_touch_files_if_head_moved(self):
+        """Test que reset hard échoue avant d'écrire si HEAD a bougé entre-temps"""
+        with temp_repo() as repo:
+            first, second = self._two_commits(repo)
+            
+            assert reset_hard(first, expected_head=first) is False
+            assert repo.read_file("file1.txt") == "v2"
+            from src.commands.rev_parse import rev_parse
+            assert rev_parse("HEAD") == second
@@ -0,0 +1,62 @@
+"""
+Tests unitaires pour le parcours du working directory (scanner.py)
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.scanner import scan_worktree
+from src.commands.gitignore import IgnoreMatcher
+from src.commands.index import file_stat
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+FILES = {
+    "a.txt": "a",
+    "a/b.txt": "b",
+    "a-b.txt": "c",
+    "z/y/x.txt": "d",
+    "build/out.o": "e",
+    ".gitignore": "build/\n",
+}
+
+
+class TestScanner:
+    """Tests pour le scanner du working directory"""
+
+    def test_paths_in_index_order(self):
+        """Les chemins sortent dans l'ordre de l'index : "a-b.txt" < "a.txt" < "a/b.txt" """
+        with temp_repo() as repo:
+            create_test_files(repo, FILES)
+            paths = [entry.path for entry in scan_worktree()]
+            assert paths == [".gitignore", "a-b.txt", "a.txt", "a/b.txt",
+                             "build/out.o", "z/y/x.txt"]
+
+    def test_ignored_directories_are_skipped(self):
+        """Les dossiers ignorés et .mon_git ne sont pas parcourus"""
+        with temp_repo() as repo:
+            create_test_files(repo, FILES)
+            paths = [entry.path for entry in scan_worktree(ignore=IgnoreMatcher())]
+            assert "build/out.o" not in paths
+            assert not any(path.startswith(".mon_git") for path in paths)
+            assert [entry.path for entry in scan_worktree("z", IgnoreMatcher())] == ["z/y/x.txt"]
+
+    def test_stat_matches_index_format(self):
+        """Le stat d'une entrée est celui que l'index enregistre"""
+        with temp_repo() as repo:
+            create_test_files(repo, FILES)
+            for entry in scan_worktree():
+                assert entry.stat == file_stat(entry.path)
+
+    def test_parallel_scan_is_deterministic(self):
+        """Avec plusieurs threads, la sortie est identique au parcours séquentiel"""
+        with temp_repo() as repo:
+            create_test_files(repo, {f"d{i}/sub{j}/f.txt": "x" for i in range(6) for j in range(4)})
+            sequential = [entry.path for entry in scan_worktree(jobs=1)]
+            parallel = [entry.path for entry in scan_worktree(jobs=4)]
+            assert parallel == sequential
+            assert len(sequential) == 24
@@ -0,0 +1,105 @@
+"""
+Tests unitaires pour le mode serveur (serve.py)
+"""
+
+import pytest
+import io
+import os
+import sys
+import json
+import threading
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gitBis
+from src.commands.serve import CommandServer, forward, forward_request
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+class TestServe:
+    """Tests pour gitBis serve"""
+
+    def test_run_captures_output_and_exit_code(self):
+        """La sortie et le code de retour de la commande sont renvoyés"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a"})
+            server = CommandServer(gitBis.main)
+
+            result = server.run(["add", "a.txt"])
+            assert result['exit'] == 0
+            assert "Ajouté : a.txt" in result['stdout']
+
+            assert server.run(["ls-files"])['stdout'] == "a.txt\n"
+            assert server.run(["merge-base", "--is-ancestor", "x", "y"])['exit'] == 1
+            result = server.run(["inconnue"])
+            assert result['exit'] == 2
+            assert "invalid choice" in result['stderr']
+
+    def test_run_in_request_directory(self):
+        """Chaque requête s'exécute dans son dossier, celui du serveur est rétabli"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a"})
+            server = CommandServer(gitBis.main)
+            server.run(["add", "a.txt"])
+            with temp_repo() as other:
+                other_dir = os.getcwd()
+                assert server.run(["ls-files"])['stdout'] == "a.txt\n"
+                result = server.run(["ls-files"], cwd=other_dir)
+                assert result['stdout'] == "Aucun fichier dans l'index\n"
+                assert os.getcwd() == other_dir
+            assert server.run(["serve"])['exit'] == 1
+
+    def test_caches_cleared_after_init_and_repack(self):
+        """Après init ou repack -d, le serveur ne répond plus avec des objets disparus"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "contenu a"})
+            server = CommandServer(gitBis.main)
+            sha = server.run(["hash-object", "-w", "a.txt"])['stdout'].split()[-1]
+            assert "contenu a" in server.run(["cat-file", "-p", sha])['stdout']
+
+            assert server.run(["repack", "-d"])['exit'] == 0
+            assert "contenu a" in server.run(["cat-file", "-p", sha])['stdout']
+
+            server.run(["init"])
+            assert "contenu a" not in server.run(["cat-file", "-p", sha])['stdout']
+
+    def test_stdio_protocol(self):
+        """Une requête JSON par ligne sur stdin, une réponse par ligne sur stdout"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a"})
+            requests = [
+                {"command": "run", "argv": ["add", "a.txt"]},
+                {"command": "run", "argv": ["ls-files"]},
+                {"command": "stop"},
+                {"command": "run", "argv": ["status"]},
+            ]
+            stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests) + "pas du json\n")
+            stdout = io.StringIO()
+            CommandServer(gitBis.main).serve_stdio(stdin, stdout)
+
+            responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+            assert len(responses) == 3
+            assert responses[1] == {"exit": 0, "stdout": "a.txt\n", "stderr": ""}
+            assert responses[2] == {"stopped": True}
+
+    def test_socket_client(self, capsys):
+        """Le client transmet argv au serveur et reprend sa sortie"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a"})
+            assert forward(["status"]) is None
+
+            server = CommandServer(gitBis.main)
+            thread = threading.Thread(target=server.serve_socket, daemon=True)
+            thread.start()
+            assert server.wait_ready(5)
+            try:
+                assert forward(["add", "a.txt"]) == 0
+                assert forward(["rev-parse", "--inconnu"]) == 2
+                capsys.readouterr()
+                assert forward(["ls-files"]) == 0
+                assert capsys.readouterr().out == "a.txt\n"
+            finally:
+                assert forward_request({"command": "stop"}) == {"stopped": True}
+                thread.join()
+            assert not os.path.exists(".mon_git/gitbis.sock")
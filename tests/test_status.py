@@ -0,0 +1,147 @@
+"""
+Tests unitaires pour la commande status
+"""
+
+import pytest
+import os
+import sys
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.commands.status import git_status, refresh_index, worktree_status
+from src.commands import status as status_module, scanner
+from src.commands.add import add_files, read_index_entries
+from src.commands.index import read_index_file, write_index_file
+from src.commands.gitignore import IgnoreMatcher
+from tests.utils.test_helpers import temp_repo, create_test_files
+
+
+class TestStatus:
+    """Tests pour la commande status"""
+    
+    def test_status_detects_modification(self):
+        """Test qu'un fichier modifié après l'ajout est signalé"""
+        with temp_repo() as repo:
+            repo.create_file("test.txt", "contenu")
+            add_files(["test.txt"])
+            repo.create_file("test.txt", "contenu modifié")
+            
+            index_files, current = refresh_index(["test.txt"])
+            
+            assert current["test.txt"] != index_files["test.txt"]
+    
+    def test_clean_file_not_rehashed(self):
+        """Test qu'un fichier dont le stat n'a pas changé n'est pas relu"""
+        with temp_repo() as repo:
+            repo.create_file("test.txt", "contenu")
+            os.utime("test.txt", ns=(1, 1))
+            add_files(["test.txt"])
+            
+            calls = []
+            original = status_module.hash_file
+            status_module.hash_file = lambda path: calls.append(path) or original(path)
+            try:
+                index_files, current = refresh_index(["test.txt"])
+            finally:
+                status_module.hash_file = original
+            
+            assert calls == []
+            assert current["test.txt"] == index_files["test.txt"]
+    
+    def test_racy_entry_is_rehashed(self):
+        """Test qu'une entrée modifiée pendant l'écriture de l'index est relue"""
+        with temp_repo() as repo:
+            repo.create_file("test.txt", "contenu")
+            add_files(["test.txt"])
+            # Index écrit dans la même unité de temps que le fichier : l'entrée est "racy"
+            file_mtime = os.stat("test.txt").st_mtime_ns
+            os.utime(os.path.join(".mon_git", "index"), ns=(file_mtime, file_mtime))
+            repo.create_file("test.txt", "CONTENU")
+            
+            assert read_index_entries()["test.txt"]["stat"] is None
+            index_files, current = refresh_index(["test.txt"])
+            assert current["test.txt"] != index_files["test.txt"]
+    
+    def test_status_refreshes_stat(self):
+        """Test que status met à jour le stat d'un fichier touché mais inchangé"""
+        with temp_repo() as repo:
+            repo.create_file("test.txt", "contenu")
+            add_files(["test.txt"])
+            os.utime("test.txt", ns=(1, 1))
+            
+            git_status()
+            
+            assert read_index_entries()["test.txt"]["stat"]["mtime_ns"] == 1
+
+
+def make_old(*paths):
+    """Recule le mtime de dossiers (sinon le cache les considère "racy")"""
+    for path in paths:
+        os.utime(path, ns=(1, 1))
+
+
+class TestUntrackedCache:
+    """Tests pour le cache des fichiers non suivis"""
+    
+    def count_listings(self, monkeypatch):
+        """Enregistre les dossiers relus par le scanner"""
+        listed = []
+        original = scanner._list_directory
+        monkeypatch.setattr(scanner, "_list_directory",
+                            lambda path, *args: listed.append(path) or original(path, *args))
+        return listed
+    
+    def test_unchanged_directories_are_not_reread(self, monkeypatch):
+        """Un second status reprend du cache les dossiers dont le mtime n'a pas changé"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"a.txt": "a", "src/b.txt": "b", "src/lib/c.txt": "c"})
+            add_files(["a.txt"])
+            make_old(".", "src", "src/lib")
+            assert worktree_status()[2] == ["src/b.txt", "src/lib/c.txt"]
+            
+            listed = self.count_listings(monkeypatch)
+            assert worktree_status()[2] == ["src/b.txt", "src/lib/c.txt"]
+            assert listed == []
+            
+            create_test_files(repo, {"src/lib/d.txt": "d"})
+            assert worktree_status()[2] == ["src/b.txt", "src/lib/c.txt", "src/lib/d.txt"]
+            assert listed == ["src/lib"]
+    
+    def test_index_changes_invalidate_directory(self):
+        """Un fichier ajouté à l'index ou retiré n'est plus (ou redevient) non suivi"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"src/b.txt": "b", "src/c.txt": "c"})
+            make_old(".", "src")
+            assert worktree_status()[2] == ["src/b.txt", "src/c.txt"]
+            
+            add_files(["src/b.txt"])
+            assert worktree_status()[2] == ["src/c.txt"]
+            
+            index = read_index_file()
+            index.remove("src/b.txt")
+            write_index_file(index)
+            assert worktree_status()[2] == ["src/b.txt", "src/c.txt"]
+    
+    def test_gitignore_change_rescans_subdirectories(self):
+        """Modifier un .gitignore relit son dossier et ses sous-dossiers"""
+        with temp_repo() as repo:
+            create_test_files(repo, {".gitignore": "", "src/lib/c.log": "c"})
+            make_old(".", "src", "src/lib")
+            assert worktree_status(IgnoreMatcher())[2] == [".gitignore", "src/lib/c.log"]
+            
+            with open(".gitignore", "w") as f:
+                f.write("*.log\n")
+            assert worktree_status(IgnoreMatcher())[2] == [".gitignore"]
+    
+    def test_cache_is_saved_in_index(self):
+        """Le cache est relu avec l'index"""
+        with temp_repo() as repo:
+            create_test_files(repo, {"src/b.txt": "b"})
+            make_old(".", "src")
+            worktree_status()
+            
+            cache = read_index_file().untracked_cache
+            assert cache["src"]["untracked"] == ["b.txt"]
+            assert cache[""]["dirs"] == ["src"]
+            assert cache["src"]["mtime_ns"] == 1
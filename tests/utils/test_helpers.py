@@ -44,7 +44,10 @@ class TestRepo:
             shutil.rmtree(self.test_dir)
     
     def create_file(self, filename, content=""):
-        """Créer un fichier de test"""
+        """Créer un fichier de test (les dossiers parents sont créés si besoin)"""
+        parent = os.path.dirname(filename)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
         with open(filename, "w") as f:
             f.write(content)
         return filename